@@ -13,7 +13,7 @@ from pathlib import Path
 import requests
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 
 # Auth mínima por API Key (plataforma v1). Import defensivo: si algo falla,
 # el servicio legacy NUNCA debe caer por culpa de la plataforma nueva.
@@ -60,6 +60,28 @@ except Exception:  # pragma: no cover
             return None
 
 
+# Pool de workers precalentados (opt-in, AUDITBRAIN_POOL_SIZE). Import
+# defensivo: sin el módulo, /run_python sigue con el subproceso en frío.
+try:
+    from backend.app.services import runner_pool as _runner_pool
+except Exception:  # pragma: no cover
+    _runner_pool = None
+
+
+# Control de admisión del runner (cola y espera acotadas, ver admission.py).
+# Sin el módulo se vuelve al semáforo simple de siempre.
+try:
+    from backend.app.services import admission as _admission
+except Exception:  # pragma: no cover
+    _admission = None
+
+# Caché de resultados por contenido (opt-in por request con "cache": true).
+try:
+    from backend.app.services import result_cache as _result_cache
+except Exception:  # pragma: no cover
+    _result_cache = None
+
+
 APP_VERSION = "4.0.0"
 
 # ==========================================================
@@ -135,6 +157,11 @@ PUBLISHABLE_EXTENSIONS = {
 }
 EXECUTION_SEMAPHORE = asyncio.Semaphore(EXECUTION_CONCURRENCY)
 os.makedirs(RESULT_DIR, exist_ok=True)
+RESULT_CACHE = (
+    _result_cache.ResultCache(os.path.join(RESULT_DIR, _result_cache.CACHE_DIRNAME))
+    if _result_cache is not None
+    else None
+)
 
 
 def _publish_generated_files(generated_paths, request):
@@ -235,6 +262,13 @@ def _build_result_summary(result):
     return f"Resultado tipo {type(result).__name__}."
 
 
+def _wants_cache(body, output_expectations):
+    flag = body.get("cache")
+    if flag is None and isinstance(output_expectations, dict):
+        flag = output_expectations.get("cache")
+    return flag is True or str(flag).strip().lower() in {"1", "true", "yes"}
+
+
 def _compact_document_service_payload(document_service_payload):
     if not isinstance(document_service_payload, dict):
         return document_service_payload
@@ -248,6 +282,20 @@ def _compact_document_service_payload(document_service_payload):
     return compacted
 
 
+def _execution_slot(request, bounded=True):
+    """Turno de ejecución: admisión acotada para requests síncronas.
+
+    Los jobs async (``bounded=False``) ya pasaron por su propia cola: esperan
+    sin plazo y sin vigilar la conexión, que por diseño ya se cerró.
+    """
+    if _admission is None:
+        return EXECUTION_SEMAPHORE
+    return _admission.EXECUTION_ADMISSION.slot(
+        is_disconnected=request.is_disconnected if bounded else None,
+        bounded=bounded,
+    )
+
+
 def _kill_process_tree(process):
     """Mata todo el grupo de procesos del runner (no solo el runner)."""
     try:
@@ -274,31 +322,40 @@ async def _execute_script_subprocess(code, inputs):
     with open(payload_path, "w", encoding="utf-8") as fh:
         json.dump({"code": code, "inputs": inputs}, fh, ensure_ascii=False)
 
-    process = await asyncio.create_subprocess_exec(
-        PYTHON_EXECUTABLE,
-        RUNNER_PATH,
-        payload_path,
-        output_path,
-        cwd=job_dir,
-        env=env,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        start_new_session=True,
-        preexec_fn=_sandbox.make_rlimit_preexec(),
-    )
-
-    try:
-        stdout_bytes, stderr_bytes = await asyncio.wait_for(
-            process.communicate(),
-            timeout=EXECUTION_TIMEOUT_SECONDS,
-        )
-    except asyncio.TimeoutError:
-        _kill_process_tree(process)
-        await process.communicate()
-        raise TimeoutError(
-            f"La ejecucion excedio el limite de {EXECUTION_TIMEOUT_SECONDS} segundos."
+    timeout_message = f"La ejecucion excedio el limite de {EXECUTION_TIMEOUT_SECONDS} segundos."
+    if _runner_pool is not None and _runner_pool.enabled():
+        # Worker precalentado: mismo entorno saneado y rlimits (ver runner_pool).
+        try:
+            returncode, stdout_bytes, stderr_bytes = await _runner_pool.run_job(
+                payload_path, output_path, job_dir, EXECUTION_TIMEOUT_SECONDS
+            )
+        except TimeoutError:
+            raise TimeoutError(timeout_message)
+    else:
+        process = await asyncio.create_subprocess_exec(
+            PYTHON_EXECUTABLE,
+            RUNNER_PATH,
+            payload_path,
+            output_path,
+            cwd=job_dir,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            preexec_fn=_sandbox.make_rlimit_preexec(),
         )
 
+        try:
+            stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                process.communicate(),
+                timeout=EXECUTION_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            _kill_process_tree(process)
+            await process.communicate()
+            raise TimeoutError(timeout_message)
+        returncode = process.returncode
+
     runner_stdout = stdout_bytes.decode("utf-8", errors="replace")
     runner_stderr = stderr_bytes.decode("utf-8", errors="replace")
 
@@ -311,7 +368,7 @@ async def _execute_script_subprocess(code, inputs):
     with open(output_path, "r", encoding="utf-8") as fh:
         result_payload = json.load(fh)
 
-    if process.returncode != 0 and "error" not in result_payload:
+    if returncode != 0 and "error" not in result_payload:
         result_payload["error"] = (
             "La ejecucion del runner fallo."
             + (f" STDERR: {runner_stderr[:500]}" if runner_stderr else "")
@@ -324,6 +381,32 @@ async def _execute_script_subprocess(code, inputs):
     result_payload["job_dir"] = job_dir
     return result_payload
 
+
+# ==========================================================
+# Pool de workers precalentados — arranque y parada.
+# Con AUDITBRAIN_POOL_SIZE=0 (default) ambos hooks son no-op.
+# ==========================================================
+@app.on_event("startup")
+async def _runner_pool_startup():
+    if _runner_pool is not None and _runner_pool.enabled():
+        await asyncio.to_thread(_runner_pool.start)
+
+
+@app.on_event("shutdown")
+async def _runner_pool_shutdown():
+    if _runner_pool is not None:
+        await asyncio.to_thread(_runner_pool.shutdown)
+
+
+@app.on_event("shutdown")
+async def _ict_worker_shutdown():
+    """Apaga los procesos hijos de generación ICT (ver backend/app/ict/worker.py)."""
+    try:
+        from backend.app.ict import worker as _ict_worker
+    except Exception:  # pragma: no cover
+        return
+    await asyncio.to_thread(_ict_worker.shutdown)
+
 # ==========================================================
 # Health check DEDICADO para Render.
 #
@@ -381,6 +464,9 @@ async def run_python(request: Request, _auth: None = Depends(_require_api_key)):
     - AuditSmart (auditoría financiera, tributaria, forense, sistemas)
     - H&G Abogados IA (asesoría legal, societaria, digital, propiedad intelectual)
     - GPT Maestro RPA (automatización, chatbots, flujos, ETL, IA generativa)
+
+    Con ``"execution_mode": "async"`` responde 202 con un ``job_id`` al
+    instante y el resultado se consulta en ``GET /run_python/jobs/{job_id}``.
     """
 
     try:
@@ -388,6 +474,25 @@ async def run_python(request: Request, _auth: None = Depends(_require_api_key)):
         # Lectura del cuerpo JSON
         # ----------------------------
         body = await request.json()
+    except Exception as e:
+        return {
+            "error": str(e),
+            "traceback": traceback.format_exc(),
+            "service": "AuditBrain Python Runner"
+        }
+
+    if _wants_async(body):
+        return _submit_async_job(body, request)
+    return await _run_python_body(body, request)
+
+
+async def _run_python_body(body, request, job=None):
+    """Ejecuta el script de /run_python y arma la respuesta final.
+
+    Lo comparten el modo síncrono y los jobs async; ``job`` (si viene) es el
+    registro del job async, que pasa a ``running`` al obtener el semáforo.
+    """
+    try:
         code = body.get("script", "")
         inputs = body.get("inputs", {})
         execution_context = body.get("execution_context", {})
@@ -406,8 +511,21 @@ async def run_python(request: Request, _auth: None = Depends(_require_api_key)):
         # ----------------------------
         # Preparación del entorno seguro de ejecución
         # ----------------------------
-        async with EXECUTION_SEMAPHORE:
-            execution_output = await _execute_script_subprocess(code, inputs)
+        # Caché opt-in: un acierto evita el subproceso (y el semáforo).
+        cache_key = None
+        execution_output = None
+        if _wants_cache(body, output_expectations) and RESULT_CACHE is not None and RESULT_CACHE.enabled:
+            cache_key = RESULT_CACHE.key(code, inputs)
+            execution_output = await asyncio.to_thread(RESULT_CACHE.get, cache_key)
+
+        if execution_output is None:
+            async with _execution_slot(request, bounded=job is None):
+                if job is not None:
+                    job["status"] = "running"
+                    job["started_at"] = _utcnow_iso()
+                execution_output = await _execute_script_subprocess(code, inputs)
+            if cache_key:
+                await asyncio.to_thread(RESULT_CACHE.put, cache_key, execution_output)
 
         if execution_output.get("error"):
             return {
@@ -439,6 +557,11 @@ async def run_python(request: Request, _auth: None = Depends(_require_api_key)):
             response_data.pop("stdout")
         if not response_data["stderr"]:
             response_data.pop("stderr")
+        if cache_key:
+            response_data["cache"] = {
+                "hit": "cached_at" in execution_output,
+                "key": cache_key[:16],
+            }
         generated_files = _publish_generated_files(execution_output.get("generated_paths", []), request)
         if generated_files:
             response_data["generated_files"] = generated_files
@@ -641,6 +764,21 @@ async def run_python(request: Request, _auth: None = Depends(_require_api_key)):
         return response_data
 
     except Exception as e:
+        if _admission is not None and isinstance(e, _admission.AdmissionRejected):
+            return JSONResponse(
+                status_code=e.status_code,
+                content={
+                    "error": e.message,
+                    "retry_after": e.retry_after,
+                    "service": "AuditBrain Python Runner"
+                },
+                headers=e.headers,
+            )
+        if _admission is not None and isinstance(e, _admission.ClientDisconnected):
+            return {
+                "error": "El cliente se desconectó antes de obtener turno; el script no se ejecutó.",
+                "service": "AuditBrain Python Runner"
+            }
         return {
             "error": str(e),
             "traceback": traceback.format_exc(),
@@ -648,6 +786,109 @@ async def run_python(request: Request, _auth: None = Depends(_require_api_key)):
         }
 
 
+# ==========================================================
+# Modo asíncrono de /run_python (opt-in por request)
+#
+# La Action de un GPT abandona a los ~45 s, pero el servidor deja correr el
+# script hasta EXECUTION_TIMEOUT_SECONDS. Con "execution_mode": "async" el
+# cliente recibe un job_id al instante y consulta el resultado después.
+# Los jobs viven en memoria del proceso (igual que resultados/): un reinicio
+# los pierde. La cola es acotada: con AUDITBRAIN_ASYNC_QUEUE_MAX jobs
+# pendientes (en cola o corriendo) se rechaza con 429 en vez de apilar
+# trabajo indefinidamente delante de EXECUTION_SEMAPHORE.
+# ==========================================================
+ASYNC_QUEUE_MAX = max(1, int(os.getenv("AUDITBRAIN_ASYNC_QUEUE_MAX", "8")))
+ASYNC_JOB_TTL_SECONDS = int(os.getenv("AUDITBRAIN_ASYNC_JOB_TTL_SECONDS", "3600"))
+ASYNC_RETRY_AFTER_SECONDS = 30
+ASYNC_JOBS = {}
+#: Referencias fuertes a las tareas en vuelo: asyncio solo guarda una
+#: referencia débil y el GC podría recolectar un job a mitad de ejecución.
+_ASYNC_TASKS = set()
+
+
+def _utcnow_iso():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _wants_async(body):
+    if not isinstance(body, dict) or not body.get("script"):
+        return False
+    output_expectations = body.get("output_expectations") or {}
+    mode = body.get("execution_mode")
+    if not mode and isinstance(output_expectations, dict):
+        mode = output_expectations.get("execution_mode")
+    return str(mode or "").strip().lower() == "async"
+
+
+def _purge_async_jobs():
+    """Olvida los jobs terminados hace más de ASYNC_JOB_TTL_SECONDS."""
+    cutoff = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(
+        seconds=ASYNC_JOB_TTL_SECONDS
+    )
+    for job_id, job in list(ASYNC_JOBS.items()):
+        finished_at = job.get("finished_at")
+        if finished_at and datetime.datetime.fromisoformat(finished_at) < cutoff:
+            ASYNC_JOBS.pop(job_id, None)
+
+
+def _submit_async_job(body, request):
+    _purge_async_jobs()
+    pending = sum(1 for job in ASYNC_JOBS.values() if job["status"] in ("queued", "running"))
+    if pending >= ASYNC_QUEUE_MAX:
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": f"Cola de ejecución llena ({pending} jobs pendientes). Reintente más tarde.",
+                "service": "AuditBrain Python Runner"
+            },
+            headers={"Retry-After": str(ASYNC_RETRY_AFTER_SECONDS)},
+        )
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "status": "queued",
+        "submitted_at": _utcnow_iso(),
+        "started_at": None,
+        "finished_at": None,
+    }
+    ASYNC_JOBS[job_id] = job
+    task = asyncio.create_task(_run_async_job(job, body, request), name=f"run_python_{job_id}")
+    _ASYNC_TASKS.add(task)
+    task.add_done_callback(_ASYNC_TASKS.discard)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"{str(request.base_url).rstrip('/')}/run_python/jobs/{job_id}",
+            "service": "AuditBrain Python Runner"
+        },
+    )
+
+
+async def _run_async_job(job, body, request):
+    try:
+        response_data = await _run_python_body(body, request, job=job)
+    except Exception as e:  # pragma: no cover - _run_python_body ya captura
+        response_data = {"error": str(e), "service": "AuditBrain Python Runner"}
+    job["response"] = response_data
+    job["status"] = "failed" if response_data.get("error") else "completed"
+    job["finished_at"] = _utcnow_iso()
+
+
+@app.get("/run_python/jobs/{job_id}")
+async def run_python_job(job_id: str, _auth: None = Depends(_require_api_key)):
+    """Estado de un job async; al terminar incluye la respuesta de /run_python
+    (result compacto, result_summary, generated_files, document_service...)."""
+    job = ASYNC_JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job no encontrado o expirado.")
+    payload = dict(job.get("response") or {})
+    payload.update({key: value for key, value in job.items() if key != "response"})
+    return payload
+
+
 # ==========================================================
 # Montaje aditivo de la Plataforma v1 (/api/v1/*)
 # Import defensivo: si la plataforma falla al cargar, el servicio legacy
@@ -685,6 +926,35 @@ try:
                 "Bootstrap de BD/admin omitido: %s", _db_exc
             )
 
+    @app.on_event("startup")
+    async def _job_queue_startup():
+        """Arranca el pool de la cola durable de jobs en este proceso
+        (modo ``embedded``; ver backend/app/services/job_queue.py). Los jobs
+        que un reinicio dejó a medias se retoman al vencer su lease."""
+        try:
+            import asyncio
+
+            from backend.app.services import job_queue as _job_queue
+
+            if _job_queue.enabled():
+                await asyncio.to_thread(_job_queue.start)
+        except Exception as _queue_exc:  # pragma: no cover
+            import logging
+
+            logging.getLogger("auditbrain").warning(
+                "Cola de jobs no iniciada: %s", _queue_exc
+            )
+
+    @app.on_event("shutdown")
+    async def _job_queue_shutdown():
+        try:
+            import asyncio
+
+            from backend.app.services import job_queue as _job_queue
+        except Exception:  # pragma: no cover
+            return
+        await asyncio.to_thread(_job_queue.shutdown)
+
     #: Handle de la tarea periódica de cleanup. Se guarda a nivel de módulo por
     #: dos razones: (1) asyncio solo mantiene una referencia DÉBIL a las tareas
     #: creadas con create_task —sin guardar el handle, el GC puede recolectar la
@@ -0,0 +1,119 @@
+"""Worker precalentado del pool de /run_python.
+
+Importa UNA vez las librerías pesadas (pandas/numpy/openpyxl por defecto) y
+luego atiende jobs leídos por stdin, delegando cada uno en
+``auditbrain_exec_runner.main()`` (el motor real, intocado). Así el script del
+GPT no paga el import de pandas en su propio presupuesto de tiempo.
+
+Protocolo (una línea JSON por mensaje):
+
+- stdin  <- ``{"payload": ..., "output": ..., "cwd": ...}`` (un job)
+- stdout -> ``{"returncode": N, "rss_kb": N}`` al terminar cada job
+
+Durante el job los descriptores 1 y 2 apuntan a archivos ``.log`` del
+directorio del job (lo que el runner no captura, p. ej. salidas de C), y el
+canal del protocolo usa un duplicado del stdout original. Si el script escapa
+del runner (``sys.exit``/``SystemExit``) el worker informa el código y sale:
+un proceso en ese estado no se reutiliza.
+
+Se lanza por ruta absoluta con el mismo entorno saneado y rlimits que el
+runner en frío (ver backend/app/services/runner_pool.py); como el runner, solo
+usa stdlib y su propio directorio en ``sys.path``.
+"""
+
+import importlib
+import json
+import os
+import sys
+
+import auditbrain_exec_runner
+
+# El directorio del worker (raíz del proyecto) entra en sys.path por lanzarse
+# por ruta; ya importado el runner se retira, para que el script del GPT no
+# pueda hacer ``import backend...`` (misma intención que sandbox.py).
+_WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != _WORKER_DIR]
+
+PRELOAD_MODULES = [
+    name.strip()
+    for name in os.getenv("AUDITBRAIN_POOL_PRELOAD", "pandas,numpy,openpyxl").split(",")
+    if name.strip()
+]
+STDOUT_LOG = "runner_stdout.log"
+STDERR_LOG = "runner_stderr.log"
+
+
+def _rss_kb() -> int:
+    """RSS actual del worker en KB (0 si no se puede leer)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+
+            return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        except Exception:
+            return 0
+
+
+def _preload() -> None:
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Una librería ausente no invalida el worker: el script que la
+            # necesite fallará igual que en el runner en frío.
+            continue
+
+
+def _run_job(job: dict) -> int:
+    """Ejecuta un job con fd 1/2 redirigidos a los logs del job."""
+    cwd = job["cwd"]
+    os.chdir(cwd)
+    saved_out, saved_err = os.dup(1), os.dup(2)
+    out_fh = open(os.path.join(cwd, STDOUT_LOG), "wb")
+    err_fh = open(os.path.join(cwd, STDERR_LOG), "wb")
+    returncode = 0
+    try:
+        os.dup2(out_fh.fileno(), 1)
+        os.dup2(err_fh.fileno(), 2)
+        sys.argv = [auditbrain_exec_runner.__file__, job["payload"], job["output"]]
+        try:
+            auditbrain_exec_runner.main()
+        except SystemExit as exc:
+            returncode = exc.code if isinstance(exc.code, int) and exc.code else 1
+        except BaseException:
+            returncode = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os.dup2(saved_out, 1)
+        os.dup2(saved_err, 2)
+        os.close(saved_out)
+        os.close(saved_err)
+        out_fh.close()
+        err_fh.close()
+    return returncode
+
+
+def main() -> None:
+    proto = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    _preload()
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            return
+        returncode = _run_job(json.loads(line))
+        proto.write(json.dumps({"returncode": returncode, "rss_kb": _rss_kb()}) + "\n")
+        proto.flush()
+        if returncode != 0:
+            return
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ import logging
 
 from fastapi import APIRouter
 
-from backend.app.api import canva, documents, health, python, router as router_module, skill_run
+from backend.app.api import canva, documents, health, metrics, python, router as router_module, skill_run
 from backend.app.auth import router as auth_router
 from backend.app.aud.obligaciones_fiscales import router as aud_of_router
 from backend.app.aud.informe_cumplimiento_tributario import router as aud_informe_ict_router
@@ -29,6 +29,7 @@ api_router.include_router(health.router)
 api_router.include_router(auth_router.router)
 api_router.include_router(router_module.router)
 api_router.include_router(python.router)
+api_router.include_router(metrics.router)
 api_router.include_router(skill_run.router)
 api_router.include_router(documents.router)
 api_router.include_router(context_router.router)
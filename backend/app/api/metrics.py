@@ -0,0 +1,26 @@
+"""Métricas de recursos por ruta (diagnóstico OOM/CPU).
+
+Acceso: igual que el runner (admin o X-API-Key). Los datos los acumula
+``ResourceMetricsMiddleware`` solo si ``ENABLE_RESOURCE_METRICS=true``; con
+la instrumentación apagada el endpoint responde ``enabled: false`` y listas
+vacías.
+"""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from backend.app.auth.deps import require_runner_access
+from backend.app.core import resource_metrics
+
+router = APIRouter(tags=["platform"], dependencies=[Depends(require_runner_access)])
+
+
+@router.get("/metrics/resources")
+async def resource_metrics_snapshot(format: str = Query("json", pattern="^(json|prometheus)$")):
+    """Agregados por ruta y top-N de requests más pesadas (JSON o Prometheus)."""
+    if format == "prometheus":
+        return PlainTextResponse(
+            resource_metrics.REGISTRY.prometheus(),
+            media_type="text/plain; version=0.0.4",
+        )
+    return resource_metrics.REGISTRY.snapshot()
@@ -4,19 +4,37 @@ Acceso: admin (JWT) o X-API-Key (GPTs server-to-server). Ver
 require_runner_access. El runner queda restringido al rol admin.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 
 from backend.app.api.models import PythonRunRequest
 from backend.app.auth.deps import require_runner_access
-from backend.app.services import python_runner_service
+from backend.app.services import admission, python_runner_service, runner_pool
 
 router = APIRouter(tags=["python"], dependencies=[Depends(require_runner_access)])
 
 
 @router.post("/python/run")
-async def python_run(body: PythonRunRequest):
-    return await python_runner_service.run_python_code(
-        code=body.script,
-        inputs=body.inputs,
-        response_mode=body.response_mode,
-    )
+async def python_run(body: PythonRunRequest, request: Request):
+    try:
+        return await python_runner_service.run_python_code(
+            code=body.script,
+            inputs=body.inputs,
+            response_mode=body.response_mode,
+            is_disconnected=request.is_disconnected,
+        )
+    except admission.AdmissionRejected as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message, headers=exc.headers)
+    except admission.ClientDisconnected:
+        return {"error": "El cliente se desconectó antes de obtener turno; el script no se ejecutó."}
+
+
+@router.get("/python/pool")
+async def python_pool_stats():
+    """Métricas del pool de workers precalentados (ver runner_pool)."""
+    return runner_pool.stats()
+
+
+@router.get("/python/admission")
+async def python_admission_stats():
+    """Cola de ejecución: profundidad, esperas (histogramas) y rechazos."""
+    return admission.stats()
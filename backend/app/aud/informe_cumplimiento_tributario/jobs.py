@@ -102,11 +102,8 @@ def process_job(job_id: int) -> None:
             "docx_size_bytes": len(docx_bytes),
         })
         log.info("ict-report job %s done", job_id)
-    except Exception as e:  # noqa: BLE001
+    except Exception:
         log.exception("ict-report job %s failed", job_id)
-        try:
-            service.mark_failed(db, job_id, str(e))
-        except Exception:
-            log.exception("no se pudo marcar failed el job %s", job_id)
+        raise  # la cola reintenta o marca el error (job_queue.py)
     finally:
         db.close()
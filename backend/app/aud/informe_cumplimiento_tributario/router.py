@@ -7,7 +7,7 @@ import json
 from io import BytesIO
 
 from fastapi import (
-    APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status,
+    APIRouter, Depends, File, Form, HTTPException, UploadFile, status,
 )
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
@@ -15,13 +15,14 @@ from sqlalchemy.orm import Session
 from backend.app.auth.deps import get_current_user
 from backend.app.auth.models import User
 from backend.app.aud.obligaciones_fiscales import file_storage
-from backend.app.aud.informe_cumplimiento_tributario import jobs, service
+from backend.app.aud.informe_cumplimiento_tributario import service
 from backend.app.aud.informe_cumplimiento_tributario.parsers import (
     declaracion_ir as p_decl,
     informe_auditoria_externa as p_iae,
 )
 from backend.app.core.config import settings
 from backend.app.db.session import get_db
+from backend.app.services import job_queue
 
 router = APIRouter(
     prefix="/aud/informe-cumplimiento-tributario",
@@ -70,7 +71,6 @@ async def parse_preview_endpoint(
 
 @router.post("/jobs", status_code=status.HTTP_201_CREATED)
 async def create_job_endpoint(
-    background_tasks: BackgroundTasks,
     project_id: int = Form(...),
     cliente_name: str = Form(...),
     ejercicio: str = Form(...),
@@ -122,7 +122,7 @@ async def create_job_endpoint(
         "override_fecha_declaracion_ir": override_fecha_declaracion_ir,
     }).encode("utf-8"))
 
-    background_tasks.add_task(jobs.process_job, job.id)
+    job_queue.enqueue(db, job.id, "informe_cumplimiento")
     return _job_out(job)
 
 
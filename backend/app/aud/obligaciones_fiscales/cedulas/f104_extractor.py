@@ -82,10 +82,16 @@ def extract_all_f104(paths: list[Path]) -> tuple[dict[str, dict], list[str]]:
     - month_data: {"01": {periodo, casilleros}, "02": ...}
     - errors: lista de mensajes de error por archivo problemático
     """
+    from backend.app.ict.parsers.parallel import parse_paths
+
+    paths = list(paths)
     month_data: dict[str, dict] = {}
     errors: list[str] = []
-    for path in paths:
-        data = extract_f104(path.read_bytes())
+    # En paralelo con PDF_PARSE_WORKERS > 1, resultados en el orden de
+    # `paths`. Un error de lectura se propaga igual que en el bucle original.
+    for path, (data, exc) in zip(paths, parse_paths(extract_f104, paths)):
+        if exc is not None:
+            raise exc
         if data is None:
             errors.append(f"No se pudo parsear: {path.name}")
             continue
@@ -13,7 +13,7 @@ import asyncio
 import datetime
 import logging
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
 
 from backend.app.aud.obligaciones_fiscales import file_storage
 from backend.app.aud.obligaciones_fiscales.models import ToolJob
@@ -62,12 +62,16 @@ def cleanup_once() -> dict:
             file_storage.delete_job_dir(j.id)
             summary["post_download_cleanups"] += 1
 
-        # 4. Zombie jobs: status 'processing' por > 30 min → error
+        # 4. Zombie jobs: status 'processing' por > 30 min → error. Los que
+        # están en la cola de jobs no cuentan: esperan turno o corren con un
+        # lease vivo, y si su worker muere la cola misma los retoma.
         zombie_threshold = now - datetime.timedelta(minutes=30)
         zombies = db.execute(
             select(ToolJob).where(
                 ToolJob.status == "processing",
                 ToolJob.created_at < zombie_threshold,
+                or_(ToolJob.queue_status.is_(None),
+                    ToolJob.queue_status.notin_(("queued", "leased"))),
             )
         ).scalars().all()
         for j in zombies:
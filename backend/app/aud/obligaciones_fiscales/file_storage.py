@@ -10,6 +10,8 @@ Estructura:
         mayor_general/...
         mayor_especifico/...
         f101/...
+      movimientos/          (líneas del Mayor General leídas en la fase 1;
+                             ver mayor/persistencia.py)
       output.xlsx
 """
 
@@ -24,6 +26,8 @@ from backend.app.core.config import settings
 
 OUTPUT_FILENAME = "output.xlsx"
 INPUTS_DIR = "inputs"
+MOVIMIENTOS_DIR = "movimientos"
+LIBRO_DIR = "libro"
 
 
 def _root() -> Path:
@@ -77,6 +81,14 @@ def output_path(job_dir: Path) -> Path:
     return job_dir / OUTPUT_FILENAME
 
 
+def movimientos_dir(job_dir: Path) -> Path:
+    return job_dir / MOVIMIENTOS_DIR
+
+
+def libro_dir(job_dir: Path) -> Path:
+    return job_dir / LIBRO_DIR
+
+
 def delete_job_dir(job_id: int) -> None:
     d = job_dir(job_id)
     if d.exists():
@@ -10,10 +10,40 @@ from backend.app.aud.obligaciones_fiscales import (
 )
 from backend.app.aud.obligaciones_fiscales.models import ToolJob
 from backend.app.db.session import SessionLocal
+from backend.app.services.parse_cache import cached_parse
 
 log = logging.getLogger(__name__)
 
 
+# Cada cuántas líneas leídas la fase 1 publica su avance en el job.
+AVANCE_CADA_FILAS = 20_000
+
+
+class _Avance:
+    """Destino de ``leer_mayor`` que publica el avance de la fase 1 en
+    ``summary_json["progreso"]`` (el cliente lo ve con ``GET /jobs/{id}``)."""
+
+    def __init__(self, db, job_id: int, perfilador, *, archivos: int) -> None:
+        self.db = db
+        self.job_id = job_id
+        self.perfilador = perfilador
+        self.archivos = archivos
+        self.archivos_leidos = 0
+
+    def agregar(self, **_campos) -> None:
+        if self.perfilador.lineas % AVANCE_CADA_FILAS == 0:
+            self.publicar()
+
+    def publicar(self, etapa: str = "leyendo") -> None:
+        service.mark_progress(self.db, self.job_id, {
+            "etapa": etapa,
+            "archivos": self.archivos,
+            "archivos_leidos": self.archivos_leidos,
+            "filas_leidas": self.perfilador.lineas,
+            "cuentas_perfiladas": self.perfilador.cuentas,
+        })
+
+
 def clasificar_mayor_job(job_id: int) -> None:
     """FASE 1: lee el Mayor General, clasifica sus cuentas y deja el job en
     'revision' para que el auditor apruebe."""
@@ -21,8 +51,9 @@ def clasificar_mayor_job(job_id: int) -> None:
         clasificacion_service,
         homologaciones,
     )
+    from backend.app.aud.obligaciones_fiscales.mayor import persistencia
     from backend.app.aud.obligaciones_fiscales.mayor.clasificador import clasificar
-    from backend.app.aud.obligaciones_fiscales.mayor.cuentas import perfilar
+    from backend.app.aud.obligaciones_fiscales.mayor.cuentas import PerfiladorIncremental
     from backend.app.aud.obligaciones_fiscales.mayor.reader import leer_mayor
     from backend.app.context.models import Project
 
@@ -34,32 +65,49 @@ def clasificar_mayor_job(job_id: int) -> None:
             log.error("clasificar_mayor_job: ToolJob %s not found", job_id)
             return
 
-        rutas = file_storage.list_inputs(file_storage.job_dir(job_id), "mayor_general")
+        job_dir = file_storage.job_dir(job_id)
+        rutas = file_storage.list_inputs(job_dir, "mayor_general")
         if not rutas:
             service.mark_failed(db, job_id, "No hay Mayor General cargado.")
             return
 
-        movimientos = []
+        # Para clasificar solo hacen falta los perfiles por cuenta: cada
+        # línea se acumula en el perfilador apenas se lee y no se guarda, así
+        # que la memoria crece con las cuentas, no con las líneas del mayor.
+        # En la misma pasada las líneas van a disco para la fase 2.
+        perfilador = PerfiladorIncremental()
+        escritor = persistencia.EscritorMovimientos(file_storage.movimientos_dir(job_dir))
+        avance = _Avance(db, job_id, perfilador, archivos=len(rutas))
+        destino = persistencia.Reparto(perfilador, escritor, avance)
         errores: list[str] = []
         hojas: list[str] = []
-        for ruta in rutas:
-            lectura = leer_mayor(ruta.read_bytes())
-            if not lectura.mapeo_suficiente:
-                service.mark_failed(
-                    db, job_id,
-                    f"{ruta.name}: no se reconocieron las columnas mínimas "
-                    f"(faltan {', '.join(lectura.columnas_faltantes)}). "
-                    f"Errores: {'; '.join(lectura.errores) or 'ninguno'}",
-                )
-                return
-            movimientos.extend(lectura.movimientos)
-            errores.extend(lectura.errores)
-            hojas.extend(lectura.hojas_leidas)
+        fuentes: list[list] = []
+        try:
+            for ruta in rutas:
+                data = ruta.read_bytes()
+                fuentes.append(persistencia.huella(ruta.name, data))
+                lectura = leer_mayor(data, destino=destino)
+                if not lectura.mapeo_suficiente:
+                    service.mark_failed(
+                        db, job_id,
+                        f"{ruta.name}: no se reconocieron las columnas mínimas "
+                        f"(faltan {', '.join(lectura.columnas_faltantes)}). "
+                        f"Errores: {'; '.join(lectura.errores) or 'ninguno'}",
+                    )
+                    return
+                errores.extend(lectura.errores)
+                hojas.extend(lectura.hojas_leidas)
+                avance.archivos_leidos += 1
+                avance.publicar()
+            escritor.cerrar(fuentes)
+        finally:
+            escritor.descartar()
 
         proyecto = db.get(Project, job.project_id)
         historial = homologaciones.historial_de_cliente(db, client_id=proyecto.client_id)
 
-        perfiles = perfilar(movimientos)
+        avance.publicar(etapa="clasificando")
+        perfiles = perfilador.perfiles()
         resultados = clasificar(perfiles, historial=historial)
         clasificacion_service.guardar_clasificacion(
             db, job_id=job_id, resultados=resultados, perfiles=perfiles
@@ -70,7 +118,7 @@ def clasificar_mayor_job(job_id: int) -> None:
             por_confianza[r.confianza] = por_confianza.get(r.confianza, 0) + 1
 
         service.mark_revision(db, job_id, {
-            "movimientos_leidos": len(movimientos),
+            "movimientos_leidos": perfilador.lineas,
             "cuentas": len(perfiles),
             "hojas_leidas": hojas,
             "por_confianza": por_confianza,
@@ -80,25 +128,20 @@ def clasificar_mayor_job(job_id: int) -> None:
             "errores_lectura": errores[:10],
         })
         log.info("job %s clasificado: %s cuentas", job_id, len(perfiles))
-    except Exception as e:  # noqa: BLE001
+    except Exception:
         log.exception("clasificar_mayor_job %s failed", job_id)
-        try:
-            service.mark_failed(db, job_id, str(e))
-        except Exception:
-            log.exception("could not mark job %s as failed", job_id)
+        raise  # la cola reintenta o marca el error (job_queue.py)
     finally:
         db.close()
 
 
 def process_job(job_id: int) -> None:
     """Procesa un job: lee inputs de /tmp, arma el libro DM, escribe output.xlsx."""
+    from backend.app.aud.obligaciones_fiscales.libro.cache import CacheLibro
     from backend.app.aud.obligaciones_fiscales.libro.ensamblador import armar_libro
-    from backend.app.aud.obligaciones_fiscales.libro.fuentes import (
-        leer_ats,
-        leer_declaraciones,
-    )
-    from backend.app.aud.obligaciones_fiscales.mayor import clasificacion_service
+    from backend.app.aud.obligaciones_fiscales.mayor import clasificacion_service, persistencia
     from backend.app.aud.obligaciones_fiscales.mayor.reader import leer_mayor
+    from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos
 
     db = SessionLocal()
     try:
@@ -118,21 +161,33 @@ def process_job(job_id: int) -> None:
             "f101": file_storage.list_inputs(job_dir, "f101"),
         }
 
-        movimientos = []
-        for ruta in file_storage.list_inputs(job_dir, "mayor_general"):
-            movimientos.extend(leer_mayor(ruta.read_bytes()).movimientos)
-        f104_monthly, f103_monthly = leer_declaraciones(job_dir)
+        # Las líneas del Mayor las dejó en disco la fase 1 (se mapean, no se
+        # copian). Si no están o ya no corresponden a los archivos del slot
+        # (jobs anteriores, lector nuevo), se relee el Excel.
+        movimientos = persistencia.cargar_movimientos(
+            file_storage.movimientos_dir(job_dir), inputs["mayor_general"]
+        )
+        if movimientos is None:
+            movimientos = TablaMovimientos.concatenar(
+                cached_parse(leer_mayor, ruta.read_bytes()).movimientos
+                for ruta in inputs["mayor_general"]
+            )
+        # Las declaraciones y las filas de 'Detalle mayor' no dependen de las
+        # categorías: una regeneración tras corregir las toma de la caché del job.
+        cache = CacheLibro(job_dir)
+        f104_monthly, f103_monthly, ats_resumenes = cache.declaraciones()
 
         excel_bytes = armar_libro(
             clasificacion=clasificacion_service.clasificacion_de_job(db, job_id=job_id),
             movimientos=movimientos,
             f104_monthly=f104_monthly,
             f103_monthly=f103_monthly,
-            ats_resumenes=leer_ats(job_dir),
+            ats_resumenes=ats_resumenes,
             cliente=job.cliente_name,
             periodo=job.period_label,
             preparado_por=job.prepared_by_name,
             revisado_por=job.reviewed_by_name,
+            cache=cache,
         )
 
         out = file_storage.output_path(job_dir)
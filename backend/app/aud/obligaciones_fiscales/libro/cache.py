@@ -0,0 +1,110 @@
+"""Lo que no depende de las categorías, guardado por job entre regeneraciones.
+
+Después de que el auditor corrige categorías (``aplicar_correcciones``),
+volver a generar el libro era rehacerlo todo: parsear de nuevo los PDFs/XML
+de F-104, F-103 y ATS y reescribir la hoja 'Detalle mayor' entera, cuando lo
+único que cambió es la columna Categoría de esa hoja, el resumen de mayores
+y las cédulas que lo referencian.
+
+``CacheLibro`` guarda en ``<job_dir>/libro/``:
+
+- ``declaraciones/``: F-104, F-103 y ATS ya leídos (pickle de nuestros
+  propios resultados, nunca de archivos subidos).
+- ``detalle/``: el ``<sheetData>`` de 'Detalle mayor' sin la celda de
+  categoría de cada movimiento (ver ``hoja_detalle``).
+
+Cada entrada lleva en ``clave.json`` lo que la hace válida: huella de los
+archivos del slot que la originó y versión del código que la produjo (más lo
+que agregue quien la usa). Si algo no coincide, la entrada no se usa y el
+llamador la reconstruye.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pickle
+import shutil
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+from backend.app.aud.obligaciones_fiscales import file_storage
+from backend.app.aud.obligaciones_fiscales.mayor.persistencia import huellas
+from backend.app.services.parse_cache import module_version
+
+log = logging.getLogger(__name__)
+
+FORMATO = 1
+CLAVE = "clave.json"
+SLOTS_DECLARACIONES = ("f104", "f103", "ats")
+
+
+class CacheLibro:
+    """Entradas de la caché del libro de un job."""
+
+    def __init__(self, job_dir: Path) -> None:
+        self.job_dir = Path(job_dir)
+        self.directorio = file_storage.libro_dir(self.job_dir)
+        self._huellas: dict[str, list] = {}
+
+    def huellas(self, slot: str) -> list[list]:
+        """Huella de los archivos subidos al slot (se calcula una vez)."""
+        if slot not in self._huellas:
+            self._huellas[slot] = huellas(file_storage.list_inputs(self.job_dir, slot))
+        return self._huellas[slot]
+
+    def cargar(self, nombre: str, clave: dict) -> Path | None:
+        """Directorio de la entrada ``nombre`` si fue guardada con ``clave``."""
+        directorio = self.directorio / nombre
+        try:
+            guardada = json.loads((directorio / CLAVE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return directorio if guardada == {"formato": FORMATO, **clave} else None
+
+    def guardar(self, nombre: str, clave: dict, escribir: Callable[[Path], None]) -> bool:
+        """Publica la entrada ``nombre``: ``escribir`` llena un directorio
+        temporal que después reemplaza al anterior. ``True`` si quedó."""
+        directorio = self.directorio / nombre
+        tmp = self.directorio / f".{nombre}.{uuid.uuid4().hex}"
+        try:
+            tmp.mkdir(parents=True)
+            escribir(tmp)
+            (tmp / CLAVE).write_text(
+                json.dumps({"formato": FORMATO, **clave}, ensure_ascii=False), encoding="utf-8"
+            )
+            if directorio.exists():
+                shutil.rmtree(directorio)
+            tmp.rename(directorio)
+        except (OSError, ValueError):
+            log.warning("no se pudo guardar %s en la caché del libro", nombre, exc_info=True)
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        return True
+
+    def declaraciones(self) -> tuple[dict, dict, dict]:
+        """(f104_monthly, f103_monthly, ats_resumenes) del job, leídos una vez."""
+        from backend.app.aud.obligaciones_fiscales.libro.fuentes import (
+            leer_ats,
+            leer_declaraciones,
+        )
+
+        clave = {
+            "version": module_version("backend.app.aud.obligaciones_fiscales.libro.fuentes"),
+            "fuentes": {slot: self.huellas(slot) for slot in SLOTS_DECLARACIONES},
+        }
+        directorio = self.cargar("declaraciones", clave)
+        if directorio is not None:
+            try:
+                return pickle.loads((directorio / "declaraciones.pkl").read_bytes())
+            except Exception:  # noqa: BLE001 - una entrada ilegible es un fallo de caché
+                log.warning("declaraciones ilegibles en %s", directorio, exc_info=True)
+
+        f104_monthly, f103_monthly = leer_declaraciones(self.job_dir)
+        leidas = (f104_monthly, f103_monthly, leer_ats(self.job_dir))
+        self.guardar(
+            "declaraciones", clave,
+            lambda tmp: (tmp / "declaraciones.pkl").write_bytes(pickle.dumps(leidas)),
+        )
+        return leidas
@@ -8,6 +8,16 @@ Orden de CONSTRUCCIÓN obligatorio (no es el orden de las pestañas): DM4 →
 DM5 → DM6 → DM7 → DM3, porque cada una referencia a la anterior por fórmula
 (DM6 lee de DM4 y DM5; DM7 de DM5; DM3 de DM7). Construir en otro orden
 significaría referenciar un mapa de direcciones que todavía no existe.
+
+Las hojas de datos grandes (Detalle mayor y las DATOS) se escriben en
+streaming: sus filas van a disco a medida que se generan y nunca se vuelven
+a leer (las cédulas sólo usan sus mapas de direcciones), así que un mayor de
+200k líneas no deja millones de celdas vivas en memoria.
+
+Con ``cache`` (``libro/cache.py``), una regeneración del mismo job reutiliza
+lo que no depende de las categorías: 'Detalle mayor' se construye PRIMERO
+—así sus ids de estilo no dependen del resto del libro— y solo reescribe su
+columna Categoría; el resumen de mayores y las cédulas se rehacen siempre.
 """
 
 from __future__ import annotations
@@ -16,6 +26,9 @@ from io import BytesIO
 
 from openpyxl import Workbook
 
+from backend.app.ict.fillers import streaming
+
+from backend.app.aud.obligaciones_fiscales.libro.cache import CacheLibro
 from backend.app.aud.obligaciones_fiscales.libro.cedulas.dm3_saldos import build_dm3
 from backend.app.aud.obligaciones_fiscales.libro.cedulas.dm4_compras import build_dm4
 from backend.app.aud.obligaciones_fiscales.libro.cedulas.dm5_ventas import build_dm5
@@ -65,27 +78,43 @@ def armar_libro(
     periodo: str = "",
     preparado_por: str | None = None,
     revisado_por: str | None = None,
+    cache: CacheLibro | None = None,
 ) -> bytes:
     """Devuelve los bytes del libro DM con sus hojas de datos y sus cédulas."""
     wb = Workbook()
     if "Sheet" in wb.sheetnames:
         del wb["Sheet"]
-
+    try:
+        return _armar(
+            wb, clasificacion=clasificacion, movimientos=movimientos,
+            f104_monthly=f104_monthly, f103_monthly=f103_monthly,
+            ats_resumenes=ats_resumenes, cliente=cliente, periodo=periodo,
+            preparado_por=preparado_por, revisado_por=revisado_por, cache=cache,
+        )
+    finally:
+        streaming.discard_streaming_sheets(wb)
+
+
+def _armar(
+    wb: Workbook, *, clasificacion, movimientos, f104_monthly, f103_monthly,
+    ats_resumenes, cliente, periodo, preparado_por, revisado_por, cache,
+) -> bytes:
+    build_hoja_detalle(
+        wb, movimientos, {f.codigo_cuenta: f.categoria_final for f in clasificacion},
+        streaming=True, cache=cache,
+    )
     # Los movimientos también van a la hoja resumen: el desglose de ventas
     # por tarifa se calcula asiento por asiento, no se puede derivar de los
     # totales por cuenta y mes.
     dir_mayores = build_hoja_mayores(wb, clasificacion, movimientos)
-    build_hoja_detalle(
-        wb, movimientos, {f.codigo_cuenta: f.categoria_final for f in clasificacion}
-    )
     hojas_datos = construir_hojas_de_casilleros(
-        wb, f104_monthly=f104_monthly, f103_monthly=f103_monthly
+        wb, f104_monthly=f104_monthly, f103_monthly=f103_monthly, streaming=True
     )
     dir_f104 = hojas_datos["f104"]
     dir_f103 = hojas_datos["f103"]
     # El ATS es opcional: si el cliente no lo entregó, la hoja se crea igual
     # con la matriz en cero para que el auditor vea qué se esperaba.
-    dir_ats = construir_hoja_ats(wb, ats_resumenes or {})
+    dir_ats = construir_hoja_ats(wb, ats_resumenes or {}, streaming=True)
 
     periodos = _periodos_del_ejercicio(f104_monthly, f103_monthly, periodo)
     nombres_cuenta = {f.codigo_cuenta: f.nombre_cuenta for f in clasificacion}
@@ -123,5 +152,5 @@ def armar_libro(
     wb._sheets = [wb[h] for h in orden]
 
     bio = BytesIO()
-    wb.save(bio)
+    streaming.save_workbook(wb, bio)
     return bio.getvalue()
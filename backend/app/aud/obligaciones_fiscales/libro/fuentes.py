@@ -23,6 +23,7 @@ from backend.app.ict.fillers.source_data_sheets import (
     build_f103_sheet,
     build_f104_sheet,
 )
+from backend.app.ict.fillers.streaming import create_streaming_sheet
 
 SHEET_ATS = "DATOS ATS"
 
@@ -81,7 +82,7 @@ def _valor_campo_ats(resumen: ResumenATS | None, campo: str) -> float:
 
 
 def construir_hoja_ats(
-    wb: Workbook, resumenes: dict[str, ResumenATS]
+    wb: Workbook, resumenes: dict[str, ResumenATS], *, streaming: bool = False
 ) -> dict[tuple[str, str], str]:
     """Crea 'DATOS ATS': valores literales por mes que DM8 referencia por
     fórmula. Devuelve {(campo, "01".."12") → addr}.
@@ -91,10 +92,13 @@ def construir_hoja_ats(
     abierto (varían por cliente): se listan los que aparezcan en cualquiera
     de los meses recibidos. Los porcentajes de retención de IVA son fijos
     (10/20/30/50/70/100/NC, catálogo del SRI).
+
+    Con ``streaming=True`` la hoja se escribe como las DATOS del ICT (ver
+    ict/fillers/streaming.py): hay que guardar con ``save_workbook``.
     """
     if SHEET_ATS in wb.sheetnames:
         del wb[SHEET_ATS]
-    ws = wb.create_sheet(SHEET_ATS)
+    ws = create_streaming_sheet(wb, SHEET_ATS) if streaming else wb.create_sheet(SHEET_ATS)
 
     ws.cell(1, 1, "DATOS ATS · Talón Resumen del Anexo Transaccional").font = Font(
         name="Calibri", size=11, bold=True
@@ -180,7 +184,7 @@ def _calificar(lookup: dict[tuple[str, str], str], hoja: str) -> dict[tuple[str,
 
 
 def construir_hojas_de_casilleros(
-    wb: Workbook, *, f104_monthly: dict, f103_monthly: dict
+    wb: Workbook, *, f104_monthly: dict, f103_monthly: dict, streaming: bool = False
 ) -> dict[str, dict]:
     """Crea DATOS F-104 y DATOS F-103. Devuelve {"f104": lookup, "f103": lookup}.
 
@@ -188,8 +192,12 @@ def construir_hojas_de_casilleros(
     una cédula las publique como fórmula sin más envoltura.
     """
     return {
-        "f104": _calificar(build_f104_sheet(wb, f104_monthly or {}), SHEET_F104),
-        "f103": _calificar(build_f103_sheet(wb, f103_monthly or {}), SHEET_F103),
+        "f104": _calificar(
+            build_f104_sheet(wb, f104_monthly or {}, streaming=streaming), SHEET_F104
+        ),
+        "f103": _calificar(
+            build_f103_sheet(wb, f103_monthly or {}, streaming=streaming), SHEET_F103
+        ),
     }
 
 
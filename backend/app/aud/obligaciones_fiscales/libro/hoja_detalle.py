@@ -7,9 +7,24 @@ originó sin saltar entre pestañas.
 
 from __future__ import annotations
 
-from openpyxl.styles import Alignment, Font
+import mmap
+import re
+from array import array
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+from openpyxl.cell import Cell
+from openpyxl.cell._writer import write_cell
+from openpyxl.styles import Alignment, Font, NamedStyle
 from openpyxl.utils import get_column_letter
 from openpyxl.workbook import Workbook
+from openpyxl.xml.functions import xmlfile
+
+from backend.app.aud.obligaciones_fiscales.libro.cache import CacheLibro
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos
+from backend.app.ict.fillers.streaming import create_streaming_sheet
+from backend.app.services.parse_cache import module_version
 
 SHEET_DETALLE = "Detalle mayor"
 SIN_CLASIFICAR = "SIN_CLASIFICAR"
@@ -27,18 +42,95 @@ FORMATO_NUM = "#,##0.00"
 FILA_ENCABEZADO = 3
 
 
-def build_hoja_detalle(wb: Workbook, movimientos, categorias: dict[str, str]) -> None:
-    """Escribe todos los movimientos clasificados en una sola hoja filtrable."""
+# Estilos con nombre del libro, registrados una vez: cada celda apunta al
+# estilo en vez de recibir su propio Font y formato (un mayor de 200k líneas
+# son 2,6M celdas).
+ESTILO_DATO = "OF detalle"
+ESTILO_IMPORTE = "OF detalle importe"
+ESTILO_FECHA = "OF detalle fecha"
+_COLUMNAS_IMPORTE = (10, 11, 12)
+_COLUMNA_FECHA = 4
+
+
+ALINEACION_ENCABEZADO = Alignment(horizontal="center", wrap_text=True)
+
+# Celda de categoría de una fila de datos en el XML volcado de la hoja.
+_CELDA_CATEGORIA = re.compile(rb'<row r="(\d+)"[^>]*>(<c r="A\d+"[^>]*?(?:/>|>.*?</c>))', re.S)
+
+
+def _registrar_estilos(wb: Workbook) -> None:
+    for nombre, formato in ((ESTILO_DATO, "General"), (ESTILO_IMPORTE, FORMATO_NUM),
+                            (ESTILO_FECHA, "yyyy-mm-dd")):
+        if nombre not in wb.named_styles:
+            wb.add_named_style(NamedStyle(nombre, font=FONT_DATA, number_format=formato))
+
+
+def _ids_de_estilo(ws) -> list[int]:
+    """Registra en el libro, en un orden fijo, los estilos de la hoja y
+    devuelve sus ids (título, encabezado, dato, importe, fecha).
+
+    Así los ids no dependen de qué aparece primero en los datos y el XML
+    guardado en la caché sigue valiendo en el libro de la regeneración.
+    """
+    titulo = Cell(ws)
+    titulo.font = FONT_TITULO
+    encabezado = Cell(ws)
+    encabezado.font = FONT_ENCABEZADO
+    encabezado.alignment = ALINEACION_ENCABEZADO
+    celdas = [titulo, encabezado]
+    for nombre in (ESTILO_DATO, ESTILO_IMPORTE, ESTILO_FECHA):
+        c = Cell(ws)
+        c.style = nombre
+        celdas.append(c)
+    return [c.style_id for c in celdas]
+
+
+def build_hoja_detalle(
+    wb: Workbook,
+    movimientos,
+    categorias: dict[str, str],
+    *,
+    streaming: bool = False,
+    cache: CacheLibro | None = None,
+) -> None:
+    """Escribe todos los movimientos clasificados en una sola hoja filtrable.
+
+    Con ``streaming=True`` las filas se vuelcan a disco a medida que se
+    escriben (ver ict/fillers/streaming.py) y el libro se guarda con
+    ``streaming.save_workbook``. Con ``cache`` además, la hoja se guarda sin
+    la columna Categoría y una regeneración del mismo mayor solo reescribe
+    esa columna.
+    """
     if SHEET_DETALLE in wb.sheetnames:
         del wb[SHEET_DETALLE]
-    ws = wb.create_sheet(SHEET_DETALLE)
+    ws = create_streaming_sheet(wb, SHEET_DETALLE) if streaming else wb.create_sheet(SHEET_DETALLE)
+    _registrar_estilos(wb)
+    ids = _ids_de_estilo(ws)
+
+    clave = None
+    if cache is not None and streaming:
+        clave = {
+            "version": module_version(__name__),
+            "lector": module_version("backend.app.aud.obligaciones_fiscales.mayor.reader"),
+            "fuentes": cache.huellas("mayor_general"),
+            "filas": len(movimientos),
+            "estilos": ids,
+        }
+        directorio = cache.cargar("detalle", clave)
+        if directorio is not None and _desde_cache(ws, directorio, movimientos, categorias):
+            _propiedades(ws, FILA_ENCABEZADO + len(movimientos))
+            return
 
     ws.cell(1, 1, "DETALLE DEL MAYOR · movimientos clasificados").font = FONT_TITULO
 
     for i, texto in enumerate(ENCABEZADO, start=1):
         c = ws.cell(FILA_ENCABEZADO, i, texto)
         c.font = FONT_ENCABEZADO
-        c.alignment = Alignment(horizontal="center", wrap_text=True)
+        c.alignment = ALINEACION_ENCABEZADO
+
+    estilos = [ESTILO_DATO] * (len(ENCABEZADO) + 1)
+    for i in _COLUMNAS_IMPORTE:
+        estilos[i] = ESTILO_IMPORTE
 
     fila = FILA_ENCABEZADO + 1
     for m in movimientos:
@@ -48,19 +140,93 @@ def build_hoja_detalle(wb: Workbook, movimientos, categorias: dict[str, str]) ->
             m.identificacion, m.persona, m.descripcion,
             m.debe, m.haber, m.saldo, m.mes or "",
         ]
+        estilos[_COLUMNA_FECHA] = ESTILO_FECHA if m.fecha else ESTILO_DATO
         for i, v in enumerate(valores, start=1):
-            c = ws.cell(fila, i, v)
-            c.font = FONT_DATA
-            if i in (10, 11, 12):
-                c.number_format = FORMATO_NUM
-            if i == 4 and m.fecha:
-                c.number_format = "yyyy-mm-dd"
+            ws.cell(fila, i, v).style = estilos[i]
         fila += 1
+    _propiedades(ws, fila - 1)
+
+    if clave is not None:
+        ws.finish()
+        cache.guardar("detalle", clave, lambda tmp: _guardar_sin_categorias(ws.rows_path, tmp, fila - 1))
 
-    ultima = max(fila - 1, FILA_ENCABEZADO + 1)
+
+def _propiedades(ws, ultima: int) -> None:
+    ultima = max(ultima, FILA_ENCABEZADO + 1)
     ws.auto_filter.ref = (
         f"A{FILA_ENCABEZADO}:{get_column_letter(len(ENCABEZADO))}{ultima}"
     )
     ws.freeze_panes = f"A{FILA_ENCABEZADO + 1}"
     for i, ancho in enumerate(ANCHOS, start=1):
         ws.column_dimensions[get_column_letter(i)].width = ancho
+
+
+def _guardar_sin_categorias(origen: str, destino: Path, ultima: int) -> None:
+    """Copia el ``<sheetData>`` volcado sin la celda de categoría de cada
+    fila de datos; ``cortes.bin`` dice dónde iba cada una."""
+    cortes = array("q")
+    with open(origen, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as datos, \
+            open(destino / "filas.xml", "wb") as out:
+        desde = escritos = 0
+        for m in _CELDA_CATEGORIA.finditer(datos):
+            if int(m.group(1)) <= FILA_ENCABEZADO:
+                continue
+            out.write(datos[desde:m.start(2)])
+            escritos += m.start(2) - desde
+            cortes.append(escritos)
+            desde = m.end(2)
+        out.write(datos[desde:])
+    if len(cortes) != ultima - FILA_ENCABEZADO:
+        raise ValueError(f"se esperaban {ultima - FILA_ENCABEZADO} filas y se encontraron {len(cortes)}")
+    with open(destino / "cortes.bin", "wb") as fh:
+        cortes.tofile(fh)
+
+
+def _celda_categoria(ws, valor) -> bytes:
+    """La celda de categoría tal como la escribe openpyxl, sin su ``<c r="A…"``."""
+    celda = Cell(ws, row=1, column=1, value=valor)
+    celda.style = ESTILO_DATO
+    buf = BytesIO()
+    with xmlfile(buf) as xf:
+        write_cell(xf, ws, celda, True)
+    return buf.getvalue()[len(b'<c r="A1"'):]
+
+
+def _desde_cache(ws, directorio: Path, movimientos, categorias: dict[str, str]) -> bool:
+    """Arma la hoja con las filas guardadas y la categoría actual de cada
+    movimiento. ``False`` si la entrada no se pudo leer."""
+    # Una celda por código de cuenta distinto, no por movimiento.
+    if isinstance(movimientos, TablaMovimientos):
+        vocabulario = movimientos.vocabularios["codigo"]
+        claves = movimientos.textos["codigo"].tolist()
+        por_clave = {k: vocabulario[k] for k in np.unique(movimientos.textos["codigo"]).tolist()}
+    else:
+        claves = [m.codigo for m in movimientos]
+        por_clave = {c: c for c in set(claves)}
+    celda_de = {
+        k: _celda_categoria(ws, categorias.get(codigo, SIN_CLASIFICAR))
+        for k, codigo in por_clave.items()
+    }
+    celdas = map(celda_de.__getitem__, claves)
+    try:
+        cortes = np.fromfile(directorio / "cortes.bin", dtype=np.int64).tolist()
+        fh = open(directorio / "filas.xml", "rb")
+    except OSError:
+        return False
+    if len(cortes) != len(movimientos):
+        fh.close()
+        return False
+
+    def escribir(dest) -> None:
+        with fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            desde = 0
+            for fila, (corte, celda) in enumerate(zip(cortes, celdas), start=FILA_ENCABEZADO + 1):
+                dest.write(datos[desde:corte])
+                dest.write(b'<c r="A%d"' % fila)
+                dest.write(celda)
+                desde = corte
+            dest.write(datos[desde:])
+
+    ultima = max(FILA_ENCABEZADO + len(cortes), FILA_ENCABEZADO)
+    ws.replace_rows(escribir, (1, 1, ultima, len(ENCABEZADO)))
+    return True
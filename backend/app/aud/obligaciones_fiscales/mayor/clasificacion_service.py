@@ -5,7 +5,7 @@ from __future__ import annotations
 import datetime
 from dataclasses import asdict
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 
 from backend.app.aud.obligaciones_fiscales.mayor.cuentas import monto_segun_libros
@@ -37,26 +37,30 @@ def guardar_clasificacion(
     contable (activo↔pasivo), pero si ocurre, "Según libros" saldría con el
     signo equivocado hasta que se regenere la clasificación completa.
     """
-    db.execute(delete(MayorClasificacionJob).where(MayorClasificacionJob.job_id == job_id))
+    filas = []
     for r in resultados:
         p = perfiles.get(r.codigo)
-        db.add(
-            MayorClasificacionJob(
-                job_id=job_id,
-                codigo_cuenta=r.codigo,
-                nombre_cuenta=r.nombre,
-                n_movimientos=p.n_movimientos if p else 0,
-                debe=p.debe if p else 0.0,
-                haber=p.haber if p else 0.0,
-                por_mes_json=monto_segun_libros(p, r.categoria) if p else None,
-                categoria_sugerida=r.categoria,
-                categoria_final=r.categoria,
-                tarifa=r.tarifa,
-                confianza=r.confianza,
-                origen=r.origen,
-                senales_json=[asdict(s) for s in r.senales],
-            )
-        )
+        filas.append({
+            "job_id": job_id,
+            "codigo_cuenta": r.codigo,
+            "nombre_cuenta": r.nombre,
+            "n_movimientos": p.n_movimientos if p else 0,
+            "debe": p.debe if p else 0.0,
+            "haber": p.haber if p else 0.0,
+            "por_mes_json": monto_segun_libros(p, r.categoria) if p else None,
+            "categoria_sugerida": r.categoria,
+            "categoria_final": r.categoria,
+            "tarifa": r.tarifa,
+            "confianza": r.confianza,
+            "origen": r.origen,
+            "senales_json": [asdict(s) for s in r.senales],
+            "corregida": False,
+        })
+    # Borrado + inserción masiva (executemany) en una sola transacción:
+    # sin un objeto ORM ni un round-trip por cuenta.
+    db.execute(delete(MayorClasificacionJob).where(MayorClasificacionJob.job_id == job_id))
+    if filas:
+        db.execute(insert(MayorClasificacionJob), filas)
     db.commit()
     return len(resultados)
 
@@ -49,25 +49,20 @@ def _decidir(puntajes: dict[str, int]) -> tuple[str | None, str]:
     return lider, "baja"
 
 
-def clasificar_cuenta(
-    perfil: PerfilCuenta,
-    *,
-    historial: dict[str, str] | None = None,
-    clasificadas: dict[str, str] | None = None,
-) -> ResultadoClasificacion:
-    """Clasifica una cuenta con toda la evidencia disponible."""
-    historial = historial or {}
-    clasificadas = clasificadas or {}
+def _senales_propias(perfil: PerfilCuenta, historial: dict[str, str]) -> list[Senal]:
+    """Señales que dependen solo de la cuenta: iguales en las dos pasadas."""
+    return (
+        sig.senal_historial(perfil, historial)
+        + sig.senal_nombre(perfil)
+        + sig.senal_codigo(perfil)
+        + sig.senal_naturaleza(perfil)
+        + sig.senal_movimientos(perfil)
+    )
 
-    senales: list[Senal] = []
-    senales += sig.senal_historial(perfil, historial)
-    senales += sig.senal_nombre(perfil)
-    senales += sig.senal_codigo(perfil)
-    senales += sig.senal_naturaleza(perfil)
-    senales += sig.senal_movimientos(perfil)
-    senales += sig.senal_contrapartidas(perfil, clasificadas)
-    senales += sig.senal_rama(perfil, clasificadas)
 
+def _resultado(
+    perfil: PerfilCuenta, senales: list[Senal], historial: dict[str, str]
+) -> ResultadoClasificacion:
     puntajes = _acumular(senales)
     categoria, confianza = _decidir(puntajes)
     origen = "historial" if perfil.codigo in historial else "reglas"
@@ -89,16 +84,40 @@ def clasificar_cuenta(
     )
 
 
+def clasificar_cuenta(
+    perfil: PerfilCuenta,
+    *,
+    historial: dict[str, str] | None = None,
+    clasificadas: dict[str, str] | None = None,
+) -> ResultadoClasificacion:
+    """Clasifica una cuenta con toda la evidencia disponible."""
+    historial = historial or {}
+    clasificadas = clasificadas or {}
+
+    senales = _senales_propias(perfil, historial)
+    senales += sig.senal_contrapartidas(perfil, clasificadas)
+    senales += sig.senal_rama(perfil, clasificadas)
+    return _resultado(perfil, senales, historial)
+
+
 def clasificar(
     perfiles: dict[str, PerfilCuenta],
     *,
     historial: dict[str, str] | None = None,
 ) -> list[ResultadoClasificacion]:
-    """Clasifica todas las cuentas del mayor en dos pasadas."""
+    """Clasifica todas las cuentas del mayor en dos pasadas.
+
+    Mismo resultado que llamar ``clasificar_cuenta`` dos veces por cuenta,
+    pero las señales propias de cada cuenta se calculan una sola vez y la
+    segunda pasada solo agrega contrapartidas y rama (esta última con los
+    votos por rama contados una vez, ver ``senales.IndiceRamas``).
+    """
     historial = historial or {}
 
+    propias = {codigo: _senales_propias(p, historial) for codigo, p in perfiles.items()}
+    # Sin cuentas clasificadas, contrapartidas y rama no aportan señales.
     primera = {
-        codigo: clasificar_cuenta(p, historial=historial)
+        codigo: _resultado(p, list(propias[codigo]), historial)
         for codigo, p in perfiles.items()
     }
     # Solo lo resuelto con confianza alta sirve de apoyo para las demás.
@@ -108,8 +127,13 @@ def clasificar(
         if r.categoria and r.confianza == "alta"
     }
 
+    ramas = sig.IndiceRamas(apoyo)
     segunda = [
-        clasificar_cuenta(p, historial=historial, clasificadas=apoyo)
-        for p in perfiles.values()
+        _resultado(
+            p,
+            propias[codigo] + sig.senal_contrapartidas(p, apoyo) + ramas.senal(p),
+            historial,
+        )
+        for codigo, p in perfiles.items()
     ]
     return sorted(segunda, key=lambda r: r.codigo)
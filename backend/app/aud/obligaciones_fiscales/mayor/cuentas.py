@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from collections import Counter, defaultdict
+import datetime
+from collections.abc import Iterable
+
+import numpy as np
 
 from backend.app.aud.obligaciones_fiscales.mayor.catalogo import CATEGORIAS
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos, centavos
 from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento, PerfilCuenta
 
 # Naturalezas que aumentan por el débito. Las demás (pasivo, ingreso,
@@ -15,69 +19,280 @@ MAX_DESCRIPCIONES = 20
 MAX_CONTRAPARTIDAS = 5
 
 
+# Cuentas distintas de un asiento que cuentan como contrapartidas entre sí
+# (las primeras en aparecer). Un asiento de cierre o de apertura toca todas
+# las cuentas del mayor y no dice nada de ninguna; además acota a N² las
+# parejas por asiento y el buffer por asiento del perfilado en streaming.
+MAX_CUENTAS_POR_ASIENTO = 200
+
+# Parejas de cuentas que se arman por tanda al contar contrapartidas, para
+# acotar la memoria de los arreglos intermedios.
+MAX_PAREJAS_POR_TANDA = 1 << 21
+
+
 def _prefijo(asiento: str) -> str:
     partes = asiento.split()
     return partes[0].upper() if partes else ""
 
 
-def _contrapartidas(movimientos: list[Movimiento]) -> dict[str, list[tuple[str, int]]]:
+def _agrupar(claves: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Group-by conservando el orden de primera aparición.
+
+    Devuelve ``(distintas, grupo)``: las claves distintas en el orden en que
+    aparecen por primera vez y, por elemento, el número de su grupo.
+    """
+    distintas, primera, inversa = np.unique(claves, return_index=True, return_inverse=True)
+    orden = np.argsort(primera, kind="stable")
+    rango = np.empty_like(orden)
+    rango[orden] = np.arange(len(orden))
+    return distintas[orden], rango[inversa.reshape(-1)]
+
+
+def _sumar(grupo: np.ndarray, valores: np.ndarray, n: int) -> list[int]:
+    total = np.zeros(n, dtype=np.int64)
+    np.add.at(total, grupo, valores)
+    return total.tolist()
+
+
+def _secuencias(tamanos: np.ndarray) -> np.ndarray:
+    """``0, 1, …, t-1`` por cada tamaño ``t``, concatenadas."""
+    return np.arange(int(tamanos.sum())) - np.repeat(np.cumsum(tamanos) - tamanos, tamanos)
+
+
+def _contrapartidas(asiento: np.ndarray, cuenta: np.ndarray, n_cuentas: int) -> dict[int, list[tuple[int, int]]]:
     """Cuentas que aparecen en el mismo número de asiento.
 
+    ``asiento``: índice del asiento de cada línea (0 = sin asiento);
+    ``cuenta``: número de cuenta de cada línea. Devuelve, por cuenta, las
+    ``MAX_CONTRAPARTIDAS`` cuentas con más asientos compartidos. A igual
+    cantidad gana la que compartió asiento primero (la línea del mayor en
+    que ambas ya estaban en un mismo asiento) y, en la misma línea, la que
+    apareció antes en ese asiento: el mismo orden en que
+    ``PerfiladorIncremental`` las va contando.
+
     Con un mayor filtrado a cuentas de impuestos casi no hay asientos
     compartidos: la señal simplemente no aporta, no penaliza.
     """
-    por_asiento: dict[str, set[str]] = defaultdict(set)
-    for m in movimientos:
-        if m.asiento:
-            por_asiento[m.asiento].add(m.codigo)
-
-    conteo: dict[str, Counter] = defaultdict(Counter)
-    for cuentas in por_asiento.values():
-        if len(cuentas) < 2:
-            continue
-        for codigo in cuentas:
-            for otra in cuentas:
-                if otra != codigo:
-                    conteo[codigo][otra] += 1
-
-    return {
-        codigo: c.most_common(MAX_CONTRAPARTIDAS) for codigo, c in conteo.items()
-    }
-
-
-def perfilar(movimientos: list[Movimiento]) -> dict[str, PerfilCuenta]:
-    """Agrupa los movimientos por código de cuenta."""
-    perfiles: dict[str, PerfilCuenta] = {}
-    prefijos: dict[str, Counter] = defaultdict(Counter)
-
-    for m in movimientos:
-        p = perfiles.get(m.codigo)
+    con_asiento = np.flatnonzero(asiento != 0)
+    if not con_asiento.size:
+        return {}
+    # Cada (asiento, cuenta) una vez, con la línea en que la cuenta entra al
+    # asiento; agrupados por asiento y, dentro, en orden de entrada.
+    pares, primera = np.unique(
+        asiento[con_asiento].astype(np.int64) * n_cuentas + cuenta[con_asiento],
+        return_index=True,
+    )
+    entrada = con_asiento[primera]
+    orden = np.lexsort((entrada, pares // n_cuentas))
+    grupo, cuentas, entrada = pares[orden] // n_cuentas, pares[orden] % n_cuentas, entrada[orden]
+
+    inicio = np.flatnonzero(np.r_[True, grupo[1:] != grupo[:-1]])
+    tamano = np.minimum(np.diff(np.r_[inicio, len(grupo)]), MAX_CUENTAS_POR_ASIENTO)
+    compartido = tamano >= 2
+    inicio, tamano = inicio[compartido], tamano[compartido]
+    if not inicio.size:
+        return {}
+
+    parejas = tamano * tamano
+    tanda = (np.cumsum(parejas) - parejas) // MAX_PAREJAS_POR_TANDA
+    claves, desempates = [], []
+    for t in np.unique(tanda).tolist():
+        ini, tam = inicio[tanda == t], tamano[tanda == t]
+        # Todas las parejas (i, j) de las primeras cuentas de cada asiento.
+        rango_j = _secuencias(np.repeat(tam, tam))
+        i = np.repeat(np.repeat(ini, tam) + _secuencias(tam), np.repeat(tam, tam))
+        j = np.repeat(ini, tam * tam) + rango_j
+        distinta = i != j
+        i, j, rango_j = i[distinta], j[distinta], rango_j[distinta]
+        claves.append(cuentas[i] * n_cuentas + cuentas[j])
+        desempates.append(
+            np.maximum(entrada[i], entrada[j]).astype(np.int64) * MAX_CUENTAS_POR_ASIENTO + rango_j
+        )
+
+    distintas, pareja = np.unique(np.concatenate(claves), return_inverse=True)
+    pareja = pareja.reshape(-1)
+    veces = np.bincount(pareja, minlength=len(distintas))
+    desempate = np.full(len(distintas), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(desempate, pareja, np.concatenate(desempates))
+    codigo, otra = distintas // n_cuentas, distintas % n_cuentas
+    salida: dict[int, list[tuple[int, int]]] = {}
+    for k in np.lexsort((desempate, -veces, codigo)).tolist():
+        lista = salida.setdefault(int(codigo[k]), [])
+        if len(lista) < MAX_CONTRAPARTIDAS:
+            lista.append((int(otra[k]), int(veces[k])))
+    return salida
+
+
+def perfilar(movimientos: Iterable[Movimiento]) -> dict[str, PerfilCuenta]:
+    """Agrupa los movimientos por código de cuenta.
+
+    Las agregaciones son group-bys sobre las columnas de
+    ``TablaMovimientos`` (una lista de ``Movimiento`` se convierte antes).
+    Perfiles, meses, prefijos y descripciones salen en el orden en que
+    aparecen en el mayor.
+    """
+    t = TablaMovimientos.desde(movimientos)
+    if not len(t):
+        return {}
+    vocab = t.vocabularios
+    codigos, cuenta = _agrupar(t.textos["codigo"])
+    n = len(codigos)
+    debe, haber = t.importes["debe"], t.importes["haber"]
+
+    n_movimientos = np.bincount(cuenta, minlength=n).tolist()
+    total_debe, total_haber = _sumar(cuenta, debe, n), _sumar(cuenta, haber, n)
+    perfiles = [
+        PerfilCuenta(
+            codigo=vocab["codigo"][c],
+            nombre="",
+            n_movimientos=n_movimientos[g],
+            debe=total_debe[g] / 100,
+            haber=total_haber[g] / 100,
+        )
+        for g, c in enumerate(codigos.tolist())
+    ]
+
+    # Nombre: el primero no vacío de la cuenta.
+    filas = np.flatnonzero(t.textos["cuenta"] != 0)
+    grupos, primera = np.unique(cuenta[filas], return_index=True)
+    for g, k in zip(grupos.tolist(), t.textos["cuenta"][filas[primera]].tolist()):
+        perfiles[g].nombre = vocab["cuenta"][k]
+
+    filas = np.flatnonzero(t.mes != 0)
+    claves, grupo = _agrupar(cuenta[filas].astype(np.int64) * 13 + t.mes[filas])
+    mes_debe = _sumar(grupo, debe[filas], len(claves))
+    mes_haber = _sumar(grupo, haber[filas], len(claves))
+    for k, clave in enumerate(claves.tolist()):
+        p, mes = perfiles[clave // 13], f"{clave % 13:02d}"
+        p.por_mes[mes] = (mes_debe[k] - mes_haber[k]) / 100
+        p.por_mes_debe[mes] = mes_debe[k] / 100
+        p.por_mes_haber[mes] = mes_haber[k] / 100
+
+    # Prefijos de asiento: se calculan una vez por asiento distinto.
+    prefijos: dict[str, int] = {}
+    prefijo_de = []
+    for asiento in vocab["asiento"]:
+        pref = _prefijo(asiento)
+        prefijo_de.append(prefijos.setdefault(pref, len(prefijos)) if pref else -1)
+    prefijo = np.array(prefijo_de, dtype=np.int64)[t.textos["asiento"]]
+    nombres, n_pref = list(prefijos), max(len(prefijos), 1)
+    filas = np.flatnonzero(prefijo >= 0)
+    claves, grupo = _agrupar(cuenta[filas].astype(np.int64) * n_pref + prefijo[filas])
+    veces = np.bincount(grupo, minlength=len(claves)).tolist()
+    for k, clave in enumerate(claves.tolist()):
+        perfiles[clave // n_pref].prefijos_asiento[nombres[clave % n_pref]] = veces[k]
+
+    # Descripciones: las primeras MAX_DESCRIPCIONES no vacías de cada cuenta.
+    filas = np.flatnonzero(t.textos["descripcion"] != 0)
+    filas = filas[np.argsort(cuenta[filas], kind="stable")]
+    grupo = cuenta[filas]
+    inicio = np.flatnonzero(np.r_[True, grupo[1:] != grupo[:-1]]) if filas.size else filas
+    rango = _secuencias(np.diff(np.r_[inicio, len(filas)]))
+    filas = filas[rango < MAX_DESCRIPCIONES]
+    for g, k in zip(cuenta[filas].tolist(), t.textos["descripcion"][filas].tolist()):
+        perfiles[g].descripciones.append(vocab["descripcion"][k])
+
+    for g, pares in _contrapartidas(t.textos["asiento"], cuenta, n).items():
+        perfiles[g].contrapartidas = [(perfiles[o].codigo, veces) for o, veces in pares]
+
+    return {p.codigo: p for p in perfiles}
+
+
+class PerfiladorIncremental:
+    """``perfilar`` en una sola pasada, sin guardar los movimientos.
+
+    Recibe las líneas una a una con la misma firma que
+    ``ConstructorTabla.agregar`` (se le pasa a ``leer_mayor`` como
+    ``destino``) y va acumulando por cuenta. La memoria crece con las
+    cuentas y con los asientos distintos (de cada asiento solo se guardan
+    sus primeras ``MAX_CUENTAS_POR_ASIENTO`` cuentas, como números), no con
+    las líneas. ``perfiles()`` da exactamente lo mismo que ``perfilar``
+    sobre las mismas líneas.
+    """
+
+    def __init__(self) -> None:
+        self._perfiles: dict[str, PerfilCuenta] = {}
+        self._codigos: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._centavos: dict[str, list[int]] = {}  # codigo → [debe, haber]
+        self._por_mes: dict[str, dict[str, list[int]]] = {}  # codigo → mes → [debe, haber]
+        self._asientos: dict[str, tuple[int, ...]] = {}
+        self._conteo: list[dict[int, int]] = []
+        self._prefijos: dict[str, str] = {}
+        self.lineas = 0
+
+    @property
+    def cuentas(self) -> int:
+        return len(self._perfiles)
+
+    def agregar(
+        self,
+        *,
+        codigo: str,
+        cuenta: str = "",
+        fecha: datetime.date | None = None,
+        asiento: str = "",
+        descripcion: str = "",
+        debe: float = 0.0,
+        haber: float = 0.0,
+        **_resto,
+    ) -> None:
+        self.lineas += 1
+        p = self._perfiles.get(codigo)
         if p is None:
-            p = PerfilCuenta(codigo=m.codigo, nombre=m.cuenta)
-            perfiles[m.codigo] = p
-        if not p.nombre and m.cuenta:
-            p.nombre = m.cuenta
+            p = self._perfiles[codigo] = PerfilCuenta(codigo=codigo, nombre=cuenta)
+            self._ids[codigo] = len(self._codigos)
+            self._codigos.append(codigo)
+            self._centavos[codigo] = [0, 0]
+            self._por_mes[codigo] = {}
+            self._conteo.append({})
+        if not p.nombre and cuenta:
+            p.nombre = cuenta
         p.n_movimientos += 1
-        p.debe = round(p.debe + m.debe, 2)
-        p.haber = round(p.haber + m.haber, 2)
-        if m.mes:
-            p.por_mes[m.mes] = round(p.por_mes.get(m.mes, 0.0) + m.neto, 2)
-            p.por_mes_debe[m.mes] = round(p.por_mes_debe.get(m.mes, 0.0) + m.debe, 2)
-            p.por_mes_haber[m.mes] = round(p.por_mes_haber.get(m.mes, 0.0) + m.haber, 2)
-        pref = _prefijo(m.asiento)
-        if pref:
-            prefijos[m.codigo][pref] += 1
-        if m.descripcion and len(p.descripciones) < MAX_DESCRIPCIONES:
-            p.descripciones.append(m.descripcion)
-
-    for codigo, contador in prefijos.items():
-        perfiles[codigo].prefijos_asiento = dict(contador)
-
-    for codigo, pares in _contrapartidas(movimientos).items():
-        if codigo in perfiles:
-            perfiles[codigo].contrapartidas = pares
-
-    return perfiles
+        d, h = centavos(debe), centavos(haber)
+        totales = self._centavos[codigo]
+        totales[0] += d
+        totales[1] += h
+        if fecha:
+            mes = self._por_mes[codigo].setdefault(f"{fecha.month:02d}", [0, 0])
+            mes[0] += d
+            mes[1] += h
+        if asiento:
+            pref = self._prefijos.get(asiento)
+            if pref is None:
+                pref = self._prefijos[asiento] = _prefijo(asiento)
+            if pref:
+                p.prefijos_asiento[pref] = p.prefijos_asiento.get(pref, 0) + 1
+            self._contar_contrapartidas(asiento, self._ids[codigo])
+        if descripcion and len(p.descripciones) < MAX_DESCRIPCIONES:
+            p.descripciones.append(descripcion)
+
+    def _contar_contrapartidas(self, asiento: str, cuenta: int) -> None:
+        presentes = self._asientos.get(asiento, ())
+        if cuenta in presentes or len(presentes) >= MAX_CUENTAS_POR_ASIENTO:
+            return
+        nueva = self._conteo[cuenta]
+        for otra in presentes:
+            nueva[otra] = nueva.get(otra, 0) + 1
+            conteo = self._conteo[otra]
+            conteo[cuenta] = conteo.get(cuenta, 0) + 1
+        self._asientos[asiento] = presentes + (cuenta,)
+
+    def perfiles(self) -> dict[str, PerfilCuenta]:
+        for codigo, p in self._perfiles.items():
+            debe, haber = self._centavos[codigo]
+            p.debe, p.haber = debe / 100, haber / 100
+            for mes, (d, h) in self._por_mes[codigo].items():
+                p.por_mes[mes] = (d - h) / 100
+                p.por_mes_debe[mes] = d / 100
+                p.por_mes_haber[mes] = h / 100
+        for cuenta, conteo in enumerate(self._conteo):
+            # sorted es estable: a igual cantidad queda el orden de conteo.
+            mejores = sorted(conteo.items(), key=lambda par: -par[1])[:MAX_CONTRAPARTIDAS]
+            self._perfiles[self._codigos[cuenta]].contrapartidas = [
+                (self._codigos[otra], veces) for otra, veces in mejores
+            ]
+        return dict(self._perfiles)
 
 
 def monto_segun_libros(perfil: PerfilCuenta, categoria: str | None) -> dict[str, float]:
@@ -10,7 +10,7 @@ from __future__ import annotations
 import datetime
 import unicodedata
 
-from sqlalchemy import select
+from sqlalchemy import case, select
 from sqlalchemy.orm import Session
 
 from backend.app.aud.obligaciones_fiscales.mayor.models import MayorHomologacion
@@ -37,42 +37,87 @@ def guardar_homologaciones(
     asignaciones: list[dict],
     user_id: int | None = None,
 ) -> int:
-    """Upsert de las cuentas que el auditor aprobó. Devuelve cuántas guardó."""
+    """Upsert de las cuentas que el auditor aprobó. Devuelve cuántas guardó.
+
+    Un solo ``INSERT ... ON CONFLICT (client_id, codigo_cuenta) DO UPDATE``
+    para todas las cuentas (antes: un SELECT y un INSERT/UPDATE por cuenta).
+    Si una cuenta viene repetida, cuenta cada uso y gana su última
+    asignación, como al guardarlas una por una.
+    """
     ahora = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    por_codigo: dict[str, dict] = {}
     guardadas = 0
     for a in asignaciones:
         categoria = a.get("categoria")
         codigo = (a.get("codigo_cuenta") or "").strip()
         if not categoria or not codigo:
             continue
-        fila = db.execute(
+        anterior = por_codigo.get(codigo)
+        nombre_norm = _norm(a.get("nombre_cuenta", ""))
+        por_codigo[codigo] = {
+            "client_id": client_id,
+            "codigo_cuenta": codigo,
+            "nombre_norm": nombre_norm or (anterior["nombre_norm"] if anterior else ""),
+            "categoria": categoria,
+            "tarifa": a.get("tarifa"),
+            "veces_usada": anterior["veces_usada"] + 1 if anterior else 1,
+            "creada_por_user_id": user_id,
+            "created_at": ahora,
+            "updated_at": ahora,
+        }
+        guardadas += 1
+    if not por_codigo:
+        return 0
+
+    tabla = MayorHomologacion.__table__
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as _insert
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as _insert
+    else:  # pragma: no cover - solo se despliega sobre Postgres (y SQLite en tests)
+        _guardar_fila_a_fila(db, list(por_codigo.values()), ahora)
+        return guardadas
+
+    stmt = _insert(tabla)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tabla.c.client_id, tabla.c.codigo_cuenta],
+        set_={
+            "categoria": stmt.excluded.categoria,
+            "tarifa": stmt.excluded.tarifa,
+            # Un nombre vacío no pisa el que ya se conocía.
+            "nombre_norm": case(
+                (stmt.excluded.nombre_norm != "", stmt.excluded.nombre_norm),
+                else_=tabla.c.nombre_norm,
+            ),
+            "veces_usada": tabla.c.veces_usada + stmt.excluded.veces_usada,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt, list(por_codigo.values()))
+    db.commit()
+    return guardadas
+
+
+def _guardar_fila_a_fila(db: Session, filas: list[dict], ahora: datetime.datetime) -> None:
+    """Camino genérico para dialectos sin ``ON CONFLICT``: un solo SELECT."""
+    existentes = {
+        f.codigo_cuenta: f
+        for f in db.execute(
             select(MayorHomologacion).where(
-                MayorHomologacion.client_id == client_id,
-                MayorHomologacion.codigo_cuenta == codigo,
+                MayorHomologacion.client_id == filas[0]["client_id"],
+                MayorHomologacion.codigo_cuenta.in_([f["codigo_cuenta"] for f in filas]),
             )
-        ).scalar_one_or_none()
+        ).scalars()
+    }
+    for f in filas:
+        fila = existentes.get(f["codigo_cuenta"])
         if fila is None:
-            db.add(
-                MayorHomologacion(
-                    client_id=client_id,
-                    codigo_cuenta=codigo,
-                    nombre_norm=_norm(a.get("nombre_cuenta", "")),
-                    categoria=categoria,
-                    tarifa=a.get("tarifa"),
-                    veces_usada=1,
-                    creada_por_user_id=user_id,
-                    created_at=ahora,
-                    updated_at=ahora,
-                )
-            )
-        else:
-            fila.categoria = categoria
-            fila.tarifa = a.get("tarifa")
-            fila.nombre_norm = _norm(a.get("nombre_cuenta", "")) or fila.nombre_norm
-            fila.veces_usada += 1
-            fila.updated_at = ahora
-            db.add(fila)
-        guardadas += 1
-    if guardadas:
-        db.commit()
-    return guardadas
+            db.add(MayorHomologacion(**f))
+            continue
+        fila.categoria = f["categoria"]
+        fila.tarifa = f["tarifa"]
+        fila.nombre_norm = f["nombre_norm"] or fila.nombre_norm
+        fila.veces_usada += f["veces_usada"]
+        fila.updated_at = ahora
+    db.commit()
@@ -0,0 +1,272 @@
+"""Movimientos del Mayor General guardados en disco entre la fase 1 y la 2.
+
+La fase 1 (``clasificar_mayor_job``) ya recorre el Excel línea a línea para
+perfilar las cuentas; mientras lo hace, ``EscritorMovimientos`` deja las
+líneas normalizadas en ``<job_dir>/movimientos/``. La fase 2
+(``process_job``) y cualquier regeneración del libro las cargan con
+``cargar_movimientos`` en lugar de volver a pasar openpyxl sobre los mismos
+bytes.
+
+Formato (una columna por archivo, en el orden de las líneas, con el dtype
+nativo de ``TablaMovimientos``):
+
+- ``<columna>.bin``: importes en centavos (int64), fecha ordinal (int32),
+  mes (int8), fila (int32) y el índice de cada columna de texto (int32).
+- El vocabulario de cada columna de texto va en ``<columna>.txt`` (los
+  valores en UTF-8, uno detrás de otro) y ``<columna>.fin`` (int64, dónde
+  termina cada uno); la entrada 0 es ``""`` y no se guarda. Los valores se
+  decodifican solo al acceder.
+- ``codigo``, ``cuenta`` y ``asiento`` se internan como en la tabla en
+  memoria (``perfilar`` agrupa por esos índices). El resto (documento,
+  persona, descripción…) casi no se repite: cada línea con texto agrega su
+  propia entrada y el escritor no guarda nada en memoria.
+- ``meta.json``: número de líneas, versión del formato y del lector, y la
+  huella (nombre, tamaño, sha256) de cada archivo de origen.
+
+``cargar_movimientos`` abre las columnas con ``np.memmap`` (sin copiarlas a
+memoria) y devuelve ``None`` si no hay nada guardado, si el formato o el
+lector cambiaron, o si los archivos del slot ya no son los mismos: el
+llamador vuelve a leer el Excel.
+
+Un error de disco al guardar deja el escritor inactivo: la clasificación
+sigue y la fase 2 relee el Excel.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import shutil
+import uuid
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import (
+    IMPORTES,
+    TEXTOS,
+    TablaMovimientos,
+    centavos,
+)
+from backend.app.services.parse_cache import module_version
+
+log = logging.getLogger(__name__)
+
+FORMATO = 1
+META = "meta.json"
+INTERNADOS = ("codigo", "cuenta", "asiento")
+FILAS_POR_TANDA = 65536
+
+# columna → (typecode de array, dtype de numpy)
+_BINARIAS: dict[str, tuple[str, str]] = {
+    **{c: ("i", "int32") for c in TEXTOS},
+    **{c: ("q", "int64") for c in IMPORTES},
+    "fecha": ("i", "int32"),
+    "mes": ("b", "int8"),
+    "fila": ("i", "int32"),
+    **{f"{c}.fin": ("q", "int64") for c in TEXTOS},
+}
+
+
+def _version_lector() -> str:
+    return module_version("backend.app.aud.obligaciones_fiscales.mayor.reader")
+
+
+def huella(nombre: str, data: bytes) -> list:
+    return [nombre, len(data), hashlib.sha256(data).hexdigest()]
+
+
+def huellas(rutas: list[Path]) -> list[list]:
+    return [huella(r.name, r.read_bytes()) for r in rutas]
+
+
+class Reparto:
+    """Entrega cada línea a varios destinos de ``leer_mayor``."""
+
+    def __init__(self, *destinos) -> None:
+        self.destinos = destinos
+
+    def agregar(self, **campos) -> None:
+        for destino in self.destinos:
+            destino.agregar(**campos)
+
+
+class EscritorMovimientos:
+    """Destino de ``leer_mayor`` que escribe las líneas en disco por tandas.
+
+    Escribe en un directorio temporal junto a ``directorio``; ``cerrar`` lo
+    reemplaza de forma atómica. En memoria solo quedan la tanda en curso y
+    los vocabularios de código, cuenta y asiento.
+    """
+
+    def __init__(self, directorio: Path) -> None:
+        self.directorio = Path(directorio)
+        self._tmp = self.directorio.with_name(f".{self.directorio.name}.{uuid.uuid4().hex}")
+        # valor → índice de las columnas internadas; en las demás, cuántas
+        # entradas lleva el vocabulario.
+        self._vocab: dict[str, dict[str, int]] = {c: {} for c in INTERNADOS}
+        self._entradas = {c: 0 for c in TEXTOS}
+        self._columnas = {c: array(tipo) for c, (tipo, _) in _BINARIAS.items()}
+        self._textos = {c: bytearray() for c in TEXTOS}
+        self._fin = {c: 0 for c in TEXTOS}
+        self.filas = 0
+        self.activo = True
+        try:
+            self._tmp.mkdir(parents=True)
+        except OSError:
+            log.warning("no se pudo crear %s; los movimientos no se guardan", self._tmp)
+            self.activo = False
+
+    def agregar(
+        self,
+        *,
+        codigo: str,
+        cuenta: str = "",
+        fecha: datetime.date | None = None,
+        asiento: str = "",
+        documento: str = "",
+        identificacion: str = "",
+        persona: str = "",
+        descripcion: str = "",
+        debe: float = 0.0,
+        haber: float = 0.0,
+        saldo: float = 0.0,
+        fila: int = 0,
+    ) -> None:
+        if not self.activo:
+            return
+        col = self._columnas
+        self.filas += 1
+        textos = (codigo, cuenta, asiento, documento, identificacion, persona, descripcion)
+        for c, valor in zip(TEXTOS, textos):
+            col[c].append(self._indice(c, valor))
+        for c, valor in zip(IMPORTES, (debe, haber, saldo)):
+            col[c].append(centavos(valor))
+        col["fecha"].append(fecha.toordinal() if fecha else 0)
+        col["mes"].append(fecha.month if fecha else 0)
+        col["fila"].append(fila)
+        if len(col["fila"]) >= FILAS_POR_TANDA:
+            self._volcar()
+
+    def _indice(self, columna: str, valor: str) -> int:
+        if not valor:
+            return 0
+        vocab = self._vocab.get(columna)
+        if vocab is not None and valor in vocab:
+            return vocab[valor]
+        datos = valor.encode("utf-8")
+        self._textos[columna] += datos
+        self._fin[columna] += len(datos)
+        self._columnas[f"{columna}.fin"].append(self._fin[columna])
+        self._entradas[columna] += 1
+        if vocab is not None:
+            vocab[valor] = self._entradas[columna]
+        return self._entradas[columna]
+
+    def _volcar(self) -> None:
+        try:
+            for c, datos in self._columnas.items():
+                with open(self._tmp / f"{c}.bin", "ab") as fh:
+                    datos.tofile(fh)
+                del datos[:]
+            for c, datos in self._textos.items():
+                with open(self._tmp / f"{c}.txt", "ab") as fh:
+                    fh.write(datos)
+                del datos[:]
+        except OSError:
+            log.warning("no se pudieron guardar los movimientos en %s", self._tmp, exc_info=True)
+            self.descartar()
+
+    def cerrar(self, fuentes: list[list]) -> bool:
+        """Termina de escribir y publica el directorio. ``True`` si quedó."""
+        if not self.activo:
+            return False
+        self._volcar()
+        if not self.activo:
+            return False
+        meta = {
+            "formato": FORMATO,
+            "lector": _version_lector(),
+            "filas": self.filas,
+            "fuentes": fuentes,
+            "entradas": self._entradas,
+        }
+        try:
+            (self._tmp / META).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+            if self.directorio.exists():
+                shutil.rmtree(self.directorio)
+            self._tmp.rename(self.directorio)
+        except OSError:
+            log.warning("no se pudo publicar %s", self.directorio, exc_info=True)
+            self.descartar()
+            return False
+        self.activo = False
+        return True
+
+    def descartar(self) -> None:
+        self.activo = False
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+class _TextosEnDisco(Sequence):
+    """Vocabulario de una columna guardada: ``fin[k - 1]`` es dónde termina
+    la entrada ``k`` en ``datos`` (la 0 es el texto vacío)."""
+
+    def __init__(self, fin: np.ndarray, datos: np.ndarray) -> None:
+        self._fin = fin
+        self._datos = datos
+
+    def __len__(self) -> int:
+        return len(self._fin) + 1
+
+    def __getitem__(self, k: int) -> str:
+        if k <= 0:
+            return ""
+        ini = int(self._fin[k - 2]) if k >= 2 else 0
+        return bytes(self._datos[ini:int(self._fin[k - 1])]).decode("utf-8")
+
+
+def _mapear(ruta: Path, dtype: str, n: int) -> np.ndarray:
+    if n == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(ruta, dtype=dtype, mode="r", shape=(n,))
+
+
+def cargar_movimientos(directorio: Path, rutas: list[Path]) -> TablaMovimientos | None:
+    """La tabla guardada en la fase 1, si sigue correspondiendo a ``rutas``."""
+    directorio = Path(directorio)
+    try:
+        meta = json.loads((directorio / META).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if meta.get("formato") != FORMATO or meta.get("lector") != _version_lector():
+        return None
+    try:
+        if meta.get("fuentes") != huellas(rutas):
+            return None
+        n = int(meta["filas"])
+        columnas = {
+            c: _mapear(directorio / f"{c}.bin", dtype, n)
+            for c, (_, dtype) in _BINARIAS.items() if not c.endswith(".fin")
+        }
+        vocabularios: dict[str, Sequence[str]] = {}
+        for c in TEXTOS:
+            fin = _mapear(directorio / f"{c}.fin.bin", "int64", int(meta["entradas"][c]))
+            ruta = directorio / f"{c}.txt"
+            datos = _mapear(ruta, "uint8", ruta.stat().st_size)
+            vocabularios[c] = _TextosEnDisco(fin, datos)
+    except (OSError, ValueError, KeyError):
+        log.warning("movimientos guardados ilegibles en %s", directorio, exc_info=True)
+        return None
+    return TablaMovimientos(
+        vocabularios=vocabularios,
+        textos={c: columnas[c] for c in TEXTOS},
+        importes={c: columnas[c] for c in IMPORTES},
+        fecha=columnas["fecha"],
+        mes=columnas["mes"],
+        fila=columnas["fila"],
+    )
@@ -14,10 +14,10 @@ from io import BytesIO
 from openpyxl import load_workbook
 
 from backend.app.aud.obligaciones_fiscales.cedulas.base import _parse_amount_sri
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import ConstructorTabla
 from backend.app.aud.obligaciones_fiscales.mayor.tipos import (
     COLUMNAS_MINIMAS,
     LecturaMayor,
-    Movimiento,
 )
 
 # Sinónimos por campo. Se compara por igualdad exacta sobre el encabezado
@@ -197,8 +197,14 @@ def _es_fila_acumulado(cuenta: str, descripcion: str) -> bool:
     return False
 
 
-def _leer_hoja(ws, mapeo: dict[str, int], fila_encabezado: int, lectura: LecturaMayor) -> None:
-    """Lee los movimientos de UNA hoja ya mapeada y los agrega a `lectura`."""
+def _leer_hoja(
+    ws,
+    mapeo: dict[str, int],
+    fila_encabezado: int,
+    lectura: LecturaMayor,
+    destino,
+) -> None:
+    """Lee los movimientos de UNA hoja ya mapeada y los entrega a `destino`."""
     col = mapeo
 
     def celda(fila, campo):
@@ -230,25 +236,23 @@ def _leer_hoja(ws, mapeo: dict[str, int], fila_encabezado: int, lectura: Lectura
             lectura.filas_descartadas += 1
             continue
 
-        lectura.movimientos.append(
-            Movimiento(
-                codigo=codigo,
-                cuenta=cuenta,
-                fecha=fecha,
-                asiento=asiento,
-                documento=_texto(celda(fila, "documento")),
-                identificacion=_texto(celda(fila, "identificacion")),
-                persona=_texto(celda(fila, "persona")),
-                descripcion=descripcion,
-                debe=_importe(celda(fila, "debe"), lectura=lectura, fila_num=n, campo="debe"),
-                haber=_importe(celda(fila, "haber"), lectura=lectura, fila_num=n, campo="haber"),
-                saldo=_importe(celda(fila, "saldo"), lectura=lectura, fila_num=n, campo="saldo"),
-                fila=n,
-            )
+        destino.agregar(
+            codigo=codigo,
+            cuenta=cuenta,
+            fecha=fecha,
+            asiento=asiento,
+            documento=_texto(celda(fila, "documento")),
+            identificacion=_texto(celda(fila, "identificacion")),
+            persona=_texto(celda(fila, "persona")),
+            descripcion=descripcion,
+            debe=_importe(celda(fila, "debe"), lectura=lectura, fila_num=n, campo="debe"),
+            haber=_importe(celda(fila, "haber"), lectura=lectura, fila_num=n, campo="haber"),
+            saldo=_importe(celda(fila, "saldo"), lectura=lectura, fila_num=n, campo="saldo"),
+            fila=n,
         )
 
 
-def leer_mayor(contenido: bytes) -> LecturaMayor:
+def leer_mayor(contenido: bytes, *, destino=None) -> LecturaMayor:
     """Lee un mayor en .xlsx/.xlsm y devuelve sus movimientos normalizados.
 
     Si el mayor viene repartido en varias hojas con el mismo encabezado
@@ -256,6 +260,14 @@ def leer_mayor(contenido: bytes) -> LecturaMayor:
     comprobante), se leen TODAS las que alcancen el mapeo mínimo: elegir
     solo la de mejor puntaje perdería los movimientos de las demás sin
     avisar.
+
+    ``lectura.movimientos`` es una ``TablaMovimientos`` (mayor/tabla.py):
+    se recorre como una lista de ``Movimiento`` pero guarda las líneas por
+    columnas.
+
+    Con ``destino`` (cualquier objeto con ``agregar(**campos)``, p. ej. un
+    ``cuentas.PerfiladorIncremental``) cada línea se le entrega apenas se
+    lee y no se guarda: ``lectura.movimientos`` queda vacío.
     """
     try:
         wb = load_workbook(BytesIO(contenido), data_only=True, read_only=True)
@@ -305,6 +317,7 @@ def leer_mayor(contenido: bytes) -> LecturaMayor:
             )
 
         lectura = LecturaMayor()
+        tabla = ConstructorTabla()
         for nombre, fila_encabezado, mapeo, _puntaje in candidatos:
             if any(c not in mapeo for c in COLUMNAS_MINIMAS):
                 continue  # esta hoja concreta no alcanza el mapeo mínimo
@@ -313,8 +326,11 @@ def leer_mayor(contenido: bytes) -> LecturaMayor:
                 lectura.fila_encabezado = fila_encabezado
                 lectura.columnas_detectadas = mapeo
             lectura.hojas_leidas.append(nombre)
-            _leer_hoja(wb[nombre], mapeo, fila_encabezado, lectura)
+            _leer_hoja(wb[nombre], mapeo, fila_encabezado, lectura,
+                       tabla if destino is None else destino)
 
+        if destino is None:
+            lectura.movimientos = tabla.construir()
         return lectura
     finally:
         wb.close()
@@ -10,6 +10,7 @@ from __future__ import annotations
 import re
 import unicodedata
 from collections import Counter
+from functools import lru_cache
 
 from backend.app.aud.obligaciones_fiscales.mayor.catalogo import (
     CATEGORIAS,
@@ -42,22 +43,41 @@ def extraer_tarifa(nombre: str) -> float | None:
     return float(m.group(1).replace(",", "."))
 
 
+# Todos los patrones de nombre en un solo regex. El lookahead prueba cada
+# posición sin consumir texto, así que se ven TODAS las apariciones; en una
+# misma posición nunca coinciden dos alternativas (ninguna es prefijo de
+# otra), de modo que el conjunto de rasgos es exactamente el que darían las
+# búsquedas por separado.
+_RE_RASGOS_NOMBRE = re.compile(
+    r"(?=(?:(?P<iva>iva)|(?P<diferido>diferido)|(?P<retenido>retenido)"
+    r"|(?P<compra>compra|adquisic|importac)|(?P<venta>venta)"
+    r"|(?P<ret>\bret\b|retenc)|(?P<ingreso>ingreso|servicio|descuento|rebaja)))"
+)
+
+
+@lru_cache(maxsize=8192)
+def rasgos_nombre(nombre: str) -> frozenset[str]:
+    """Rasgos del nombre normalizado que usa ``senal_nombre``.
+
+    Cacheado: el mismo plan de cuentas vuelve en cada job del cliente.
+    """
+    return frozenset(m.lastgroup for m in _RE_RASGOS_NOMBRE.finditer(_norm(nombre)))
+
+
 def senal_nombre(perfil: PerfilCuenta) -> list[Senal]:
     """Patrones de dominio sobre el nombre de la cuenta."""
-    n = _norm(perfil.nombre)
-    if not n:
-        return []
+    r = rasgos_nombre(perfil.nombre or "")
 
-    if "iva" in n and "diferido" in n:
+    if "iva" in r and "diferido" in r:
         return [Senal("IVA_DIFERIDO", PESO_NOMBRE, f"nombre contiene 'IVA diferido': {perfil.nombre!r}")]
-    if "iva" in n and "retenido" in n:
+    if "iva" in r and "retenido" in r:
         return [Senal("IVA_RETENIDO", PESO_NOMBRE, f"nombre contiene 'IVA retenido': {perfil.nombre!r}")]
-    if "iva" in n and re.search(r"compra|adquisic|importac", n):
+    if "iva" in r and "compra" in r:
         return [Senal("IVA_COMPRAS", PESO_NOMBRE, f"nombre indica IVA de compras: {perfil.nombre!r}")]
-    if "iva" in n and "venta" in n:
+    if "iva" in r and "venta" in r:
         return [Senal("IVA_VENTAS", PESO_NOMBRE, f"nombre indica IVA de ventas: {perfil.nombre!r}")]
 
-    if re.search(r"\bret\b|retenc", n):
+    if "ret" in r:
         tarifa = extraer_tarifa(perfil.nombre)
         if tarifa in TARIFAS_SOLO_RET_IVA:
             return [Senal("RET_IVA", PESO_NOMBRE, f"nombre con tarifa {tarifa}% de retención de IVA")]
@@ -68,7 +88,7 @@ def senal_nombre(perfil: PerfilCuenta) -> list[Senal]:
             Senal("RET_IVA", PESO_NOMBRE_AMBIGUO, "nombre menciona retención, sin tarifa"),
         ]
 
-    if re.search(r"venta|ingreso|servicio|descuento|rebaja", n):
+    if "venta" in r or "ingreso" in r:
         return [Senal("VENTAS", PESO_NOMBRE, f"nombre indica ventas o ingresos: {perfil.nombre!r}")]
 
     return []
@@ -196,6 +216,7 @@ def senal_historial(perfil: PerfilCuenta, historial: dict[str, str]) -> list[Sen
 _RE_SEPARADORES_RAMA = re.compile(r"[.\-/\s]+")
 
 
+@lru_cache(maxsize=65536)
 def _rama(codigo: str) -> str | None:
     """Prefijo (rama) de la cuenta sin su último segmento.
 
@@ -241,3 +262,54 @@ def senal_rama(perfil: PerfilCuenta, clasificadas: dict[str, str]) -> list[Senal
         Senal(categoria, PESO_RAMA,
               f"{n} cuenta(s) hermana(s) de la rama {rama} están en {categoria}")
     ]
+
+
+class IndiceRamas:
+    """Votos por rama de las cuentas ya clasificadas, contados una sola vez.
+
+    ``senal_rama`` recorre todas las clasificadas por cada cuenta: cuadrático
+    en el plan de cuentas. Aquí cada cuenta solo descuenta su propio voto. El
+    desempate es el de ``Counter.most_common``: a igual cantidad gana la
+    categoría que aparece primero en ``clasificadas``.
+    """
+
+    def __init__(self, clasificadas: dict[str, str]):
+        self._clasificadas = clasificadas
+        self._posicion: dict[str, int] = {}
+        # rama → categoría → [votos, primera posición, segunda posición]
+        self._ramas: dict[str, dict[str, list]] = {}
+        for pos, (codigo, categoria) in enumerate(clasificadas.items()):
+            rama = _rama(codigo)
+            if not rama:
+                continue
+            self._posicion[codigo] = pos
+            voto = self._ramas.setdefault(rama, {}).get(categoria)
+            if voto is None:
+                self._ramas[rama][categoria] = [1, pos, None]
+            else:
+                if voto[0] == 1:
+                    voto[2] = pos
+                voto[0] += 1
+
+    def senal(self, perfil: PerfilCuenta) -> list[Senal]:
+        """Lo mismo que ``senal_rama(perfil, clasificadas)``."""
+        rama = _rama(perfil.codigo)
+        votos = self._ramas.get(rama) if rama else None
+        if not votos:
+            return []
+        propia = self._clasificadas.get(perfil.codigo)
+        mejor = None
+        for categoria, (n, primera, segunda) in votos.items():
+            if categoria == propia:
+                n -= 1
+                if primera == self._posicion[perfil.codigo]:
+                    primera = segunda
+            if n and (mejor is None or (n, -primera) > (mejor[1], -mejor[2])):
+                mejor = (categoria, n, primera)
+        if mejor is None:
+            return []
+        categoria, n, _ = mejor
+        return [
+            Senal(categoria, PESO_RAMA,
+                  f"{n} cuenta(s) hermana(s) de la rama {rama} están en {categoria}")
+        ]
@@ -0,0 +1,224 @@
+"""Movimientos del mayor en columnas.
+
+Un mayor de cientos de miles de líneas como ``list[Movimiento]`` ocupa
+cientos de MB: cada línea es un dataclass con 12 atributos, tres floats y
+ocho str propios, y el código y el nombre de la cuenta se repiten en cada
+línea. ``TablaMovimientos`` guarda lo mismo por columnas:
+
+- Textos internados: cada columna de texto es un arreglo de índices a su
+  vocabulario de valores distintos (el índice 0 es siempre ``""``).
+- Importes en centavos enteros (``int64``). Se redondean al leer, igual que
+  ``ventas_tarifa._cent``: el mayor es contable y no hay fracciones de
+  centavo, y sumar enteros da exactamente lo que daban las sumas con
+  ``round(..., 2)`` paso a paso.
+- Fecha como ordinal (``int32``, 0 = sin fecha) y el mes ya calculado
+  (``int8``, 0 = sin mes) para las agrupaciones por mes.
+
+La tabla ES una secuencia de ``Movimiento``: ``len``, índice e iteración
+devuelven objetos ``Movimiento`` armados al vuelo, así que el código que
+recorre movimientos no cambia. Lo que agrega sobre TODAS las líneas
+(``cuentas.perfilar``) trabaja directo sobre las columnas.
+
+Como el resto del motor: sin base de datos ni FastAPI.
+"""
+
+from __future__ import annotations
+
+import datetime
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+
+import numpy as np
+
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento
+
+TEXTOS = ("codigo", "cuenta", "asiento", "documento", "identificacion", "persona", "descripcion")
+IMPORTES = ("debe", "haber", "saldo")
+
+
+def centavos(valor: float) -> int:
+    return round(valor * 100)
+
+
+class _Vocabulario:
+    """Valores distintos de una columna de texto, en orden de aparición."""
+
+    def __init__(self) -> None:
+        self.valores: list[str] = [""]
+        self._indice: dict[str, int] = {"": 0}
+
+    def indice(self, valor: str) -> int:
+        i = self._indice.get(valor)
+        if i is None:
+            i = self._indice[valor] = len(self.valores)
+            self.valores.append(valor)
+        return i
+
+
+class ConstructorTabla:
+    """Acumula movimientos fila a fila (en arreglos compactos, sin crear
+    ningún ``Movimiento``) y arma la tabla al final."""
+
+    def __init__(self) -> None:
+        self._vocab = {c: _Vocabulario() for c in TEXTOS}
+        self._textos = {c: array("i") for c in TEXTOS}
+        self._importes = {c: array("q") for c in IMPORTES}
+        self._fecha = array("i")
+        self._mes = array("b")
+        self._fila = array("i")
+
+    def __len__(self) -> int:
+        return len(self._fila)
+
+    def agregar(
+        self,
+        *,
+        codigo: str,
+        cuenta: str = "",
+        fecha: datetime.date | None = None,
+        asiento: str = "",
+        documento: str = "",
+        identificacion: str = "",
+        persona: str = "",
+        descripcion: str = "",
+        debe: float = 0.0,
+        haber: float = 0.0,
+        saldo: float = 0.0,
+        fila: int = 0,
+    ) -> None:
+        textos = (codigo, cuenta, asiento, documento, identificacion, persona, descripcion)
+        for columna, valor in zip(TEXTOS, textos):
+            self._textos[columna].append(self._vocab[columna].indice(valor))
+        for columna, valor in zip(IMPORTES, (debe, haber, saldo)):
+            self._importes[columna].append(centavos(valor))
+        self._fecha.append(fecha.toordinal() if fecha else 0)
+        self._mes.append(fecha.month if fecha else 0)
+        self._fila.append(fila)
+
+    def agregar_movimiento(self, m: Movimiento) -> None:
+        self.agregar(
+            codigo=m.codigo, cuenta=m.cuenta, fecha=m.fecha, asiento=m.asiento,
+            documento=m.documento, identificacion=m.identificacion,
+            persona=m.persona, descripcion=m.descripcion,
+            debe=m.debe, haber=m.haber, saldo=m.saldo, fila=m.fila,
+        )
+
+    def construir(self) -> "TablaMovimientos":
+        return TablaMovimientos(
+            vocabularios={c: self._vocab[c].valores for c in TEXTOS},
+            textos={c: np.array(self._textos[c], dtype=np.int32) for c in TEXTOS},
+            importes={c: np.array(self._importes[c], dtype=np.int64) for c in IMPORTES},
+            fecha=np.array(self._fecha, dtype=np.int32),
+            mes=np.array(self._mes, dtype=np.int8),
+            fila=np.array(self._fila, dtype=np.int32),
+        )
+
+
+class TablaMovimientos(Sequence):
+    """Movimientos del mayor por columnas; se recorre como ``list[Movimiento]``.
+
+    ``textos[col]`` son índices a ``vocabularios[col]``; ``importes[col]``
+    son centavos.
+    """
+
+    def __init__(
+        self,
+        *,
+        vocabularios: dict[str, list[str]],
+        textos: dict[str, np.ndarray],
+        importes: dict[str, np.ndarray],
+        fecha: np.ndarray,
+        mes: np.ndarray,
+        fila: np.ndarray,
+    ) -> None:
+        self.vocabularios = vocabularios
+        self.textos = textos
+        self.importes = importes
+        self.fecha = fecha
+        self.mes = mes
+        self.fila = fila
+
+    @classmethod
+    def vacia(cls) -> "TablaMovimientos":
+        return ConstructorTabla().construir()
+
+    @classmethod
+    def desde(cls, movimientos: Iterable[Movimiento]) -> "TablaMovimientos":
+        """La misma tabla si ya lo es; si no, la arma desde los ``Movimiento``."""
+        if isinstance(movimientos, TablaMovimientos):
+            return movimientos
+        constructor = ConstructorTabla()
+        for m in movimientos:
+            constructor.agregar_movimiento(m)
+        return constructor.construir()
+
+    @classmethod
+    def concatenar(cls, partes: Iterable[Iterable[Movimiento]]) -> "TablaMovimientos":
+        """Une varias tablas (p. ej. un mayor por archivo) en el orden dado."""
+        partes = [cls.desde(p) for p in partes]
+        if len(partes) == 1:
+            return partes[0]
+        vocab = {c: _Vocabulario() for c in TEXTOS}
+        textos: dict[str, list[np.ndarray]] = {c: [] for c in TEXTOS}
+        for parte in partes:
+            for c in TEXTOS:
+                remapeo = np.array(
+                    [vocab[c].indice(v) for v in parte.vocabularios[c]], dtype=np.int32
+                )
+                textos[c].append(remapeo[parte.textos[c]])
+
+        def unir(arreglos: list[np.ndarray], dtype) -> np.ndarray:
+            return np.concatenate(arreglos) if arreglos else np.zeros(0, dtype=dtype)
+
+        return cls(
+            vocabularios={c: vocab[c].valores for c in TEXTOS},
+            textos={c: unir(textos[c], np.int32) for c in TEXTOS},
+            importes={c: unir([p.importes[c] for p in partes], np.int64) for c in IMPORTES},
+            fecha=unir([p.fecha for p in partes], np.int32),
+            mes=unir([p.mes for p in partes], np.int8),
+            fila=unir([p.fila for p in partes], np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.fila)
+
+    def __getitem__(self, i: int) -> Movimiento:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("índice de movimiento fuera de rango")
+        return self.movimientos([i])[0]
+
+    def __iter__(self) -> Iterator[Movimiento]:
+        lote = 4096
+        for inicio in range(0, len(self), lote):
+            yield from self.movimientos(range(inicio, min(inicio + lote, len(self))))
+
+    def movimientos(self, indices) -> list[Movimiento]:
+        """Los ``Movimiento`` de las filas ``indices`` (en ese orden)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        textos = [
+            [self.vocabularios[c][k] for k in self.textos[c][indices].tolist()] for c in TEXTOS
+        ]
+        importes = [(self.importes[c][indices] / 100).tolist() for c in IMPORTES]
+        fechas = [
+            datetime.date.fromordinal(o) if o else None for o in self.fecha[indices].tolist()
+        ]
+        salida = []
+        for (codigo, cuenta, asiento, documento, identificacion, persona, descripcion,
+             debe, haber, saldo, fecha, fila) in zip(
+                *textos, *importes, fechas, self.fila[indices].tolist()):
+            salida.append(Movimiento(
+                codigo=codigo, cuenta=cuenta, fecha=fecha, asiento=asiento,
+                documento=documento, identificacion=identificacion, persona=persona,
+                descripcion=descripcion, debe=debe, haber=haber, saldo=saldo, fila=fila,
+            ))
+        return salida
+
+    def de_cuentas(self, codigos: Iterable[str]) -> list[Movimiento]:
+        """Los movimientos (en orden) de las cuentas ``codigos``."""
+        buscados = set(codigos)
+        ids = [i for i, c in enumerate(self.vocabularios["codigo"]) if c in buscados]
+        return self.movimientos(np.flatnonzero(np.isin(self.textos["codigo"], ids)))
@@ -7,6 +7,7 @@ prueba sin base de datos ni servidor.
 from __future__ import annotations
 
 import datetime
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 
 # Columnas mínimas para poder trabajar: sin código no hay cuenta, y sin
@@ -42,9 +43,13 @@ class Movimiento:
 
 @dataclass
 class LecturaMayor:
-    """Resultado de leer un archivo de mayor."""
+    """Resultado de leer un archivo de mayor.
 
-    movimientos: list[Movimiento] = field(default_factory=list)
+    ``leer_mayor`` deja en ``movimientos`` una ``TablaMovimientos``
+    (mayor/tabla.py), que se recorre igual que una lista de ``Movimiento``.
+    """
+
+    movimientos: Sequence[Movimiento] = field(default_factory=list)
     columnas_detectadas: dict[str, int] = field(default_factory=dict)
     columnas_faltantes: list[str] = field(default_factory=list)
     hoja: str = ""
@@ -30,26 +30,55 @@ Dos decisiones que NO son libres, porque cambiarlas mueve las cifras:
   exactamente el total que la hoja de mayores ya publica, o el papel de
   trabajo deja de cuadrar.
 
+Asientos grandes (los de cierre llegan a cientos de líneas): hasta
+``MAX_LINEAS_BUSQUEDA`` líneas la búsqueda es en profundidad con cotas; por
+encima se parte el asiento en dos mitades y, para cada tamaño, se cruzan las
+sumas ordenadas de las combinaciones de cada mitad (meet-in-the-middle). Es
+exacta —misma respuesta que la búsqueda completa— mientras no se agote el
+presupuesto del asiento (``MAX_COMBINACIONES`` sumas, contadas, no
+cronometradas: el resultado no depende de la máquina); si se agota, el
+asiento queda POR ASIGNAR como antes. ``PRESUPUESTO_LIBRO`` es solo una red
+de seguridad en segundos para el libro entero, que se registra en el log.
+
 Función pura: sin base de datos ni FastAPI, igual que el resto del motor.
 """
 
 from __future__ import annotations
 
+import logging
+import time
 from collections import defaultdict
+from collections.abc import Callable, Iterable
+
+import numpy as np
 
 from backend.app.aud.obligaciones_fiscales.mayor.catalogo import CATEGORIAS
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos
 from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento
 
+log = logging.getLogger(__name__)
+
 BUCKETS = ("gravada", "cero", "por_asignar")
 TARIFAS = (0.15, 0.12, 0.14, 0.05)
 TOLERANCIA = 5  # centavos
 
-# Tope de la búsqueda combinatoria. El asiento resuelto más grande del mayor
-# real tiene 19 líneas de venta y el ambiguo más grande 22; por encima de este
-# tope el asiento se marca POR ASIGNAR sin buscar, para que un mayor con
-# asientos de cierre de cientos de líneas no cuelgue la generación del libro.
+# Hasta este tamaño se busca en profundidad. El asiento resuelto más grande
+# del mayor real tiene 19 líneas de venta y el ambiguo más grande 22.
 MAX_LINEAS_BUSQUEDA = 24
 
+# Presupuesto de la búsqueda por mitades de UN asiento (todas las tarifas):
+# sumas parciales enumeradas en las tablas de las dos mitades más sumas
+# cruzadas con ``searchsorted``. Es un conteo, no un reloj, así que el mismo
+# asiento se resuelve igual en cualquier máquina. Agotado, el asiento queda
+# POR ASIGNAR, para que un mayor con asientos de cierre de cientos de líneas
+# no cuelgue la generación del libro.
+MAX_COMBINACIONES = 1 << 19
+
+# Red de seguridad por libro: pasado este tiempo, los asientos grandes que
+# faltan quedan POR ASIGNAR sin buscar (y se deja un warning en el log).
+# No debería dispararse: el presupuesto por asiento ya acota la búsqueda.
+PRESUPUESTO_LIBRO = 10.0  # segundos
+
 _NATURALEZAS_DEUDORAS = frozenset({"activo", "gasto"})
 
 
@@ -83,13 +112,7 @@ def _buscar(v, prefijo, i, faltan, suma, elegidos, objetivo, hallados) -> None:
     _buscar(v, prefijo, i + 1, faltan, suma, elegidos, objetivo, hallados)
 
 
-def subconjunto_unico(valores: list[int], objetivo: int) -> set[int] | None:
-    """Índices del único subconjunto propio de ``valores`` que suma ``objetivo``.
-
-    Recorre los tamaños de menor a mayor: el primero con exactamente una
-    combinación es la respuesta; el primero con dos o más abandona la
-    búsqueda (el asiento es ambiguo y no se adivina).
-    """
+def _en_profundidad(valores: list[int], objetivo: int) -> set[int] | None:
     n = len(valores)
     orden = sorted(range(n), key=lambda i: -valores[i])
     v = [valores[i] for i in orden]
@@ -107,6 +130,139 @@ def subconjunto_unico(valores: list[int], objetivo: int) -> set[int] | None:
     return None
 
 
+class _SinPresupuesto(Exception):
+    pass
+
+
+class _Mitad:
+    """Combinaciones de una mitad de las líneas, por tamaño.
+
+    La tabla del tamaño ``a`` guarda las sumas ORDENADAS de todas las
+    combinaciones de ``a`` líneas y, para reconstruirlas, la última línea de
+    cada una y su posición en la tabla del tamaño ``a - 1``. Se arman a
+    medida que hacen falta, cada una extendiendo la anterior.
+    """
+
+    def __init__(self, valores: np.ndarray, base: int) -> None:
+        self.valores = valores
+        self.base = base
+        self.sumas = [np.zeros(1, dtype=np.int64)]
+        self.ultima = [np.full(1, -1, dtype=np.int32)]
+        self.padre = [np.zeros(1, dtype=np.int64)]
+        ordenados = np.sort(valores)
+        self.minima = np.concatenate(([0], np.cumsum(ordenados)))
+        self.maxima = np.concatenate(([0], np.cumsum(ordenados[::-1])))
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def extender(self, cupo: int) -> int:
+        """Arma la tabla del tamaño siguiente; devuelve cuántas sumas tiene."""
+        ultima = self.ultima[-1]
+        siguientes = len(self.valores) - 1 - ultima.astype(np.int64)
+        total = int(siguientes.sum())
+        if total > cupo:
+            raise _SinPresupuesto
+        padre = np.repeat(np.arange(len(ultima)), siguientes)
+        inicio = np.cumsum(siguientes) - siguientes
+        linea = ultima[padre] + 1 + (np.arange(total) - inicio[padre])
+        sumas = self.sumas[-1][padre] + self.valores[linea]
+        orden = np.argsort(sumas, kind="stable")
+        self.sumas.append(sumas[orden])
+        self.ultima.append(linea[orden].astype(np.int32))
+        self.padre.append(padre[orden])
+        return total
+
+    def lineas(self, tamano: int, i: int) -> list[int]:
+        salida = []
+        for a in range(tamano, 0, -1):
+            salida.append(self.base + int(self.ultima[a][i]))
+            i = int(self.padre[a][i])
+        return salida
+
+
+class _PorMitades:
+    """Búsqueda de ``subconjunto_unico`` para asientos grandes.
+
+    Para cada tamaño ``k`` (de menor a mayor) cuenta, hasta dos, los pares
+    (combinación de ``a`` líneas de la primera mitad, de ``k - a`` de la
+    segunda) cuya suma cae en ``objetivo ± TOLERANCIA``: en la tabla ordenada
+    de una mitad, ``searchsorted`` da el rango de sumas compatibles con cada
+    suma de la otra. Los pares cuyas cotas (las ``a`` líneas menores/mayores)
+    no alcanzan el objetivo se saltan sin armar sus tablas. Las tablas se
+    reutilizan entre tarifas.
+    """
+
+    def __init__(self, valores: list[int]) -> None:
+        v = np.asarray(valores, dtype=np.int64)
+        corte = len(v) // 2
+        self.izq = _Mitad(v[:corte], 0)
+        self.der = _Mitad(v[corte:], corte)
+        self.cupo = MAX_COMBINACIONES
+
+    def _gastar(self, trabajo: int) -> None:
+        if trabajo > self.cupo:
+            raise _SinPresupuesto
+        self.cupo -= trabajo
+
+    def _sumas(self, mitad: _Mitad, tamano: int) -> np.ndarray:
+        while len(mitad.sumas) <= tamano:
+            self.cupo -= mitad.extender(self.cupo)
+        return mitad.sumas[tamano]
+
+    def _pares(self, k: int, objetivo: int) -> list[tuple[int, int, int, int]]:
+        izq, der = self.izq, self.der
+        bajo, alto = objetivo - TOLERANCIA, objetivo + TOLERANCIA
+        pares: list[tuple[int, int, int, int]] = []
+        for a in range(max(0, k - len(der)), min(k, len(izq)) + 1):
+            b = k - a
+            if izq.minima[a] + der.minima[b] > alto or izq.maxima[a] + der.maxima[b] < bajo:
+                continue
+            si, sd = self._sumas(izq, a), self._sumas(der, b)
+            i0 = int(np.searchsorted(si, bajo - sd[-1], "left"))
+            i1 = int(np.searchsorted(si, alto - sd[0], "right"))
+            parte = si[i0:i1]
+            self._gastar(len(parte))
+            desde = np.searchsorted(sd, bajo - parte, "left")
+            hasta = np.searchsorted(sd, alto - parte, "right")
+            for i in np.flatnonzero(hasta > desde)[:2].tolist():
+                for j in range(int(desde[i]), min(int(hasta[i]), int(desde[i]) + 2)):
+                    pares.append((a, i0 + i, b, j))
+            if len(pares) > 1:
+                break
+        return pares
+
+    def unico(self, objetivo: int) -> set[int] | None:
+        try:
+            for k in range(1, len(self.izq) + len(self.der)):
+                pares = self._pares(k, objetivo)
+                if len(pares) == 1:
+                    a, i, b, j = pares[0]
+                    return set(self.izq.lineas(a, i) + self.der.lineas(b, j))
+                if pares:
+                    return None
+        except _SinPresupuesto:
+            return None
+        return None
+
+
+def _buscador(valores: list[int]) -> Callable[[int], set[int] | None]:
+    if len(valores) <= MAX_LINEAS_BUSQUEDA:
+        return lambda objetivo: _en_profundidad(valores, objetivo)
+    return _PorMitades(valores).unico
+
+
+def subconjunto_unico(valores: list[int], objetivo: int) -> set[int] | None:
+    """Índices del único subconjunto propio de ``valores`` que suma ``objetivo``.
+
+    Recorre los tamaños de menor a mayor: el primero con exactamente una
+    combinación es la respuesta; el primero con dos o más abandona la
+    búsqueda (el asiento es ambiguo y no se adivina). En asientos grandes,
+    agotar ``MAX_COMBINACIONES`` también devuelve None.
+    """
+    return _buscador(valores)(objetivo)
+
+
 def _lado_que_aumenta(codigo_categoria: str | None):
     cat = CATEGORIAS.get(codigo_categoria or "")
     usa_debe = cat is None or cat.naturaleza_esperada in _NATURALEZAS_DEUDORAS
@@ -114,7 +270,7 @@ def _lado_que_aumenta(codigo_categoria: str | None):
 
 
 def separar_ventas_por_tarifa(
-    movimientos: list[Movimiento], categorias: dict[str, str | None]
+    movimientos: Iterable[Movimiento], categorias: dict[str, str | None]
 ) -> dict[str, dict[str, dict[str, float]]]:
     """Desglose de las cuentas de VENTAS por tarifa.
 
@@ -127,6 +283,9 @@ def separar_ventas_por_tarifa(
     iva_ventas = {c for c, k in categorias.items() if k == "IVA_VENTAS"}
     monto = _lado_que_aumenta("VENTAS")
 
+    if isinstance(movimientos, TablaMovimientos):
+        # Solo se arman los Movimiento de las cuentas que intervienen.
+        movimientos = movimientos.de_cuentas(ventas | iva_ventas)
     por_asiento: dict[str, list[Movimiento]] = defaultdict(list)
     for m in movimientos:
         if m.codigo in ventas or m.codigo in iva_ventas:
@@ -143,6 +302,8 @@ def separar_ventas_por_tarifa(
             destino = salida[m.codigo][bucket]
             destino[m.mes] = round(destino.get(m.mes, 0.0) + monto(m), 2)
 
+    limite_libro = time.monotonic() + PRESUPUESTO_LIBRO
+    cortado = False
     for movs in por_asiento.values():
         lineas = [m for m in movs if m.codigo in ventas]
         if not lineas:
@@ -160,14 +321,24 @@ def separar_ventas_por_tarifa(
             continue
 
         indices = None
-        if len(lineas) <= MAX_LINEAS_BUSQUEDA:
-            for tarifa in TARIFAS:
-                objetivo = round(iva / tarifa)
-                if objetivo > total + TOLERANCIA:
-                    continue
-                indices = subconjunto_unico(valores, objetivo)
-                if indices is not None:
-                    break
+        if len(valores) > MAX_LINEAS_BUSQUEDA and time.monotonic() > limite_libro:
+            if not cortado:
+                cortado = True
+                log.warning(
+                    "ventas_tarifa: se agotaron los %.0f s del libro; los asientos "
+                    "de más de %d líneas que faltan quedan por asignar",
+                    PRESUPUESTO_LIBRO, MAX_LINEAS_BUSQUEDA,
+                )
+            anotar("por_asignar", lineas)
+            continue
+        buscar = _buscador(valores)
+        for tarifa in TARIFAS:
+            objetivo = round(iva / tarifa)
+            if objetivo > total + TOLERANCIA:
+                continue
+            indices = buscar(objetivo)
+            if indices is not None:
+                break
 
         if indices is None:
             anotar("por_asignar", lineas)
@@ -59,3 +59,14 @@ class ToolJob(Base):
     finished_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
     downloaded_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
     expires_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+    # Cola de jobs (backend/app/services/job_queue.py). ``queue_status`` NULL:
+    # el job nunca pasó por la cola (borradores, jobs anteriores a la cola).
+    queue_task: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    queue_status: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    queue_priority: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    queue_attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    queue_max_attempts: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    queue_run_after: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    queue_lease_owner: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    queue_lease_until: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    queue_heartbeat_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
@@ -23,6 +23,7 @@ from backend.app.aud.obligaciones_fiscales import (
     file_storage,
     jobs,
     service,
+    worker,
 )
 from backend.app.aud.obligaciones_fiscales.schemas import (
     FIRMAS_VALIDAS,
@@ -193,13 +194,20 @@ def get_slots_endpoint(
     return _estado_slots(job_id)
 
 
-@router.post("/jobs/{job_id}/procesar", response_model=JobOut)
+@router.post(
+    "/jobs/{job_id}/procesar",
+    response_model=JobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def procesar_endpoint(
     job_id: int,
     current: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Fase 1: clasifica el Mayor General y deja el job listo para revisión."""
+    """Fase 1: encola la clasificación del Mayor General y responde de
+    inmediato con el job en 'pending'. El cliente consulta GET /jobs/{id}
+    (avance en summary_json.progreso) hasta que queda en 'revision' o
+    'failed'. Ver worker.py."""
     try:
         job = service.get_job(db, current, job_id)
     except PermissionError as e:
@@ -209,7 +217,8 @@ def procesar_endpoint(
     if not file_storage.list_inputs(file_storage.job_dir(job_id), "mayor_general"):
         raise HTTPException(400, detail="Sube el Mayor General de Impuestos antes de procesar.")
 
-    jobs.clasificar_mayor_job(job_id)
+    if not worker.encolar(db, job_id):
+        raise HTTPException(409, detail="El job ya está en cola o en proceso.")
     db.expire_all()
     return JobOut.model_validate(service.get_job(db, current, job_id))
 
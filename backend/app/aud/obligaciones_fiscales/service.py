@@ -80,6 +80,26 @@ def list_jobs_for_project(
     )
 
 
+def mark_pending(db: Session, job_id: int, summary: dict | None = None) -> None:
+    job = db.get(ToolJob, job_id)
+    if job:
+        job.status = "pending"
+        job.error_message = None
+        job.summary_json = summary
+        db.add(job)
+        db.commit()
+
+
+def mark_progress(db: Session, job_id: int, progreso: dict) -> None:
+    """Publica el avance de un job en curso en ``summary_json["progreso"]``."""
+    job = db.get(ToolJob, job_id)
+    if job:
+        # Un dict nuevo: SQLAlchemy no detecta mutaciones dentro de un JSON.
+        job.summary_json = {**(job.summary_json or {}), "progreso": progreso}
+        db.add(job)
+        db.commit()
+
+
 def mark_running(db: Session, job_id: int) -> None:
     job = db.get(ToolJob, job_id)
     if job:
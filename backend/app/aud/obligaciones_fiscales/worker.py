@@ -0,0 +1,37 @@
+"""Fase 1 de AUD/OF (clasificación del Mayor General) fuera del request.
+
+``POST /procesar`` corría ``jobs.clasificar_mayor_job`` dentro del request:
+la lectura completa con openpyxl, el perfilado y las dos pasadas del
+clasificador ocurrían mientras el cliente esperaba, con un hilo del
+threadpool de FastAPI ocupado todo ese tiempo. Ahora el endpoint deja el job
+en ``pending`` (``summary_json["fase"] = "clasificacion"``), lo encola y
+responde 202. El cliente consulta ``GET /jobs/{id}``: mientras dura, el
+avance está en ``summary_json["progreso"]`` (archivos y filas leídas,
+cuentas perfiladas) y al terminar el job pasa a ``revision`` o ``failed``.
+
+La clasificación corre en la cola durable compartida con las demás
+herramientas (``backend/app/services/job_queue.py``, tarea
+``aud_of.clasificacion``, la de mayor prioridad): concurrencia, reintentos y
+recuperación tras un reinicio son los de la cola. Repetir la fase 1 es
+seguro: ``guardar_clasificacion`` reemplaza la clasificación del job y los
+movimientos guardados se reescriben enteros.
+"""
+
+from __future__ import annotations
+
+from backend.app.services import job_queue
+
+FASE = "clasificacion"
+TAREA = "aud_of.clasificacion"
+
+
+def encolar(db, job_id: int) -> bool:
+    """Encola la fase 1 y deja el job en ``pending`` en el mismo UPDATE.
+
+    False si el job ya estaba en cola o corriendo: en ese caso no se toca.
+    """
+    return job_queue.enqueue(db, job_id, TAREA, job_values={
+        "status": "pending",
+        "error_message": None,
+        "summary_json": {"fase": FASE, "progreso": {}},
+    })
@@ -1,4 +1,4 @@
-"""Dispatcher genérico que el worker invoca desde BackgroundTasks."""
+"""Dispatcher genérico que la cola de jobs (services/job_queue.py) invoca."""
 
 from __future__ import annotations
 
@@ -46,10 +46,9 @@ def process_tool_job(job_id: int) -> None:
 
     try:
         tool.processor(job_id)
-    except Exception as e:  # noqa: BLE001
+    except Exception:
         log.exception("process_tool_job %s failed", job_id)
-        _mark_error(job_id, str(e))
-        return
+        raise  # la cola reintenta o marca el error (job_queue.py)
 
     db = SessionLocal()
     try:
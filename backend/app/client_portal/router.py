@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import os
 
-from fastapi import APIRouter, BackgroundTasks, Cookie, Depends, HTTPException, Request, Response, UploadFile, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Request, Response, UploadFile, status
 from fastapi.responses import FileResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
@@ -23,7 +23,6 @@ from backend.app.auth.service import (
     invalidate_session,
     has_active_session,
 )
-from backend.app.client_portal import jobs as cp_jobs
 from backend.app.client_portal import service as cp_service
 from backend.app.client_portal.schemas import (
     CategoryOut,
@@ -37,6 +36,7 @@ from backend.app.client_portal.schemas import (
 from backend.app.client_portal.rate_limit import check_and_record
 from backend.app.client_portal.tool_registry import CATEGORIES, get_tool, list_enabled_tools
 from backend.app.db.session import get_db
+from backend.app.services import job_queue
 
 router = APIRouter(prefix="/client", tags=["client-portal"])
 
@@ -238,14 +238,13 @@ MAX_FILE_BYTES = 50 * 1024 * 1024  # 50 MB per file
 )
 async def create_client_job_endpoint(
     tool_code: str,
-    background_tasks: BackgroundTasks,
     request: Request,
     user: User = Depends(require_client_with_device),
     db: Session = Depends(get_db),
 ):
     """Recibe multipart con un campo de archivo por slot.
-    Valida MIMEs según el tool registrado, guarda en /tmp, crea ToolJob,
-    lanza BackgroundTask.
+    Valida MIMEs según el tool registrado, guarda en /tmp, crea ToolJob y
+    lo encola (services/job_queue.py).
     """
     try:
         tool = get_tool(tool_code)
@@ -313,7 +312,7 @@ async def create_client_job_endpoint(
         db.commit()
         raise
 
-    background_tasks.add_task(cp_jobs.process_tool_job, job.id)
+    job_queue.enqueue(db, job.id, "client_portal.tool")
     return JobOut.model_validate(job)
 
 
@@ -14,6 +14,14 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 
 
+def env_int(name: str, default: int = 0) -> int:
+    """Entero de la variable ``name``; ``default`` si falta o no es un entero."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except (TypeError, ValueError):
+        return default
+
+
 class Settings:
     """Settings de solo lectura, resueltos desde el entorno en import time."""
 
@@ -0,0 +1,343 @@
+"""Instrumentación de recursos por request (diagnóstico OOM/CPU) — OPT-IN.
+
+app.py monta ``ResourceMetricsMiddleware`` solo si ``ENABLE_RESOURCE_METRICS``
+es ``true`` (default en código: apagado; render.yaml lo enciende mientras dure
+el diagnóstico del OOM). Por cada request mide:
+
+- latencia (histograma por ruta),
+- RSS del proceso antes y después, y el **pico** durante la request,
+- tiempo de CPU del proceso y de los hijos reapeados (el runner),
+- bytes de request y de response.
+
+Cada request emite además una línea ``REQUEST_METRICS`` en el log. Solo se
+registran método, plantilla de ruta (``/api/v1/ict/sessions/{session_id}``,
+nunca la URL concreta ni la query), status y números: ni headers, ni cuerpos,
+ni tokens.
+
+Pico de RSS: en Linux se usa ``VmHWM`` de ``/proc/self/status``. Cuando una
+request empieza sin otras en vuelo, el contador se reinicia escribiendo ``5``
+en ``/proc/self/clear_refs``; así el pico de esa request es exacto. Con
+requests concurrentes el pico es el del proceso durante la ventana (se
+atribuye a todas las que se solapan). Sin ``/proc`` queda como
+``max(antes, después)``.
+
+Los agregados por ruta y las ``RESOURCE_METRICS_TOP_N`` requests más pesadas
+(por crecimiento de RSS hasta el pico) se sirven en
+``GET /api/v1/metrics/resources`` como JSON o, con ``?format=prometheus``,
+en formato de exposición de Prometheus. Solo stdlib: nada de psutil.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_log = logging.getLogger("auditbrain")
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def metrics_enabled() -> bool:
+    return os.getenv("ENABLE_RESOURCE_METRICS", "false").strip().lower() in {"1", "true", "yes"}
+
+
+def _top_n() -> int:
+    try:
+        return max(0, int(os.getenv("RESOURCE_METRICS_TOP_N", "20")))
+    except ValueError:
+        return 20
+
+
+class Histogram:
+    """Histograma acumulado al estilo Prometheus (``le`` + ``+Inf``)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        pairs, running = [], 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            running += count
+            pairs.append((str(bound), running))
+        return pairs
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets": dict(self.cumulative()),
+            "count": self.count,
+            "sum": round(self.total, 4),
+        }
+
+
+# --- Lectura de memoria del proceso --------------------------------------
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """RSS actual del proceso (0 si la plataforma no expone ``/proc``)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _hwm_bytes() -> int:
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _reset_hwm() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _children_cpu() -> float:
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+# --- Agregados -------------------------------------------------------------
+
+class _RouteStats:
+    __slots__ = (
+        "count", "status", "latency", "cpu_seconds", "children_cpu_seconds",
+        "rss_growth_bytes", "peak_rss_bytes", "bytes_in", "bytes_out",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.status: Dict[str, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.cpu_seconds = 0.0
+        self.children_cpu_seconds = 0.0
+        self.rss_growth_bytes = 0
+        self.peak_rss_bytes = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+class ResourceMetricsRegistry:
+    def __init__(self, top_n: Optional[int] = None):
+        self.top_n = _top_n() if top_n is None else top_n
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._heaviest: List[tuple] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def begin(self) -> bool:
+        """Marca una request en vuelo; reinicia el pico si es la única."""
+        with self._lock:
+            self._in_flight += 1
+            alone = self._in_flight == 1
+        return _reset_hwm() if alone else False
+
+    def end(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def record(self, sample: dict) -> None:
+        key = (sample["method"], sample["route"])
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats()
+            stats.count += 1
+            status = str(sample["status"])
+            stats.status[status] = stats.status.get(status, 0) + 1
+            stats.latency.observe(sample["duration_s"])
+            stats.cpu_seconds += sample["cpu_s"]
+            stats.children_cpu_seconds += sample["children_cpu_s"]
+            stats.rss_growth_bytes += sample["rss_after_bytes"] - sample["rss_before_bytes"]
+            stats.peak_rss_bytes = max(stats.peak_rss_bytes, sample["rss_peak_bytes"])
+            stats.bytes_in += sample["bytes_in"]
+            stats.bytes_out += sample["bytes_out"]
+
+            if self.top_n:
+                weight = sample["rss_peak_bytes"] - sample["rss_before_bytes"]
+                entry = (weight, next(self._seq), sample)
+                if len(self._heaviest) < self.top_n:
+                    heapq.heappush(self._heaviest, entry)
+                elif weight > self._heaviest[0][0]:
+                    heapq.heapreplace(self._heaviest, entry)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._heaviest.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = [
+                {
+                    "method": method,
+                    "route": route,
+                    "count": s.count,
+                    "status": dict(s.status),
+                    "latency_seconds": s.latency.snapshot(),
+                    "cpu_seconds": round(s.cpu_seconds, 4),
+                    "children_cpu_seconds": round(s.children_cpu_seconds, 4),
+                    "rss_growth_mb": round(s.rss_growth_bytes / 1048576, 2),
+                    "peak_rss_mb": round(s.peak_rss_bytes / 1048576, 2),
+                    "bytes_in": s.bytes_in,
+                    "bytes_out": s.bytes_out,
+                }
+                for (method, route), s in sorted(self._routes.items())
+            ]
+            heaviest = [dict(e[2]) for e in sorted(self._heaviest, reverse=True)]
+        return {
+            "enabled": metrics_enabled(),
+            "process_rss_mb": round(current_rss_bytes() / 1048576, 2),
+            "routes": routes,
+            "heaviest_requests": heaviest,
+        }
+
+    def prometheus(self) -> str:
+        """Agregados en formato de exposición de Prometheus (text/plain 0.0.4)."""
+        lines = [
+            "# HELP auditbrain_process_rss_bytes RSS actual del proceso web.",
+            "# TYPE auditbrain_process_rss_bytes gauge",
+            f"auditbrain_process_rss_bytes {current_rss_bytes()}",
+        ]
+        with self._lock:
+            items = sorted(self._routes.items())
+            lines += [
+                "# HELP auditbrain_request_duration_seconds Latencia por ruta.",
+                "# TYPE auditbrain_request_duration_seconds histogram",
+            ]
+            for (method, route), s in items:
+                labels = f'method="{method}",route="{_escape(route)}"'
+                for bound, count in s.latency.cumulative():
+                    lines.append(
+                        f'auditbrain_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                    )
+                lines.append(f"auditbrain_request_duration_seconds_sum{{{labels}}} {s.latency.total:.6f}")
+                lines.append(f"auditbrain_request_duration_seconds_count{{{labels}}} {s.latency.count}")
+
+            counters = (
+                ("auditbrain_request_cpu_seconds_total", "CPU del proceso web por ruta.", "counter",
+                 lambda s: f"{s.cpu_seconds:.6f}"),
+                ("auditbrain_request_children_cpu_seconds_total", "CPU de subprocesos reapeados por ruta.",
+                 "counter", lambda s: f"{s.children_cpu_seconds:.6f}"),
+                ("auditbrain_request_rss_growth_bytes_total", "Crecimiento neto de RSS por ruta.",
+                 "counter", lambda s: str(s.rss_growth_bytes)),
+                ("auditbrain_request_peak_rss_bytes", "Pico de RSS observado por ruta.", "gauge",
+                 lambda s: str(s.peak_rss_bytes)),
+                ("auditbrain_request_bytes_in_total", "Bytes recibidos por ruta.", "counter",
+                 lambda s: str(s.bytes_in)),
+                ("auditbrain_request_bytes_out_total", "Bytes enviados por ruta.", "counter",
+                 lambda s: str(s.bytes_out)),
+            )
+            for name, help_text, kind, value in counters:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for (method, route), s in items:
+                    lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {value(s)}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+REGISTRY = ResourceMetricsRegistry()
+
+
+# --- Middleware ASGI -------------------------------------------------------
+
+class ResourceMetricsMiddleware:
+    """Middleware ASGI puro (no ``BaseHTTPMiddleware``): no bufferiza ni
+    altera el streaming de respuestas como las descargas de Excel."""
+
+    def __init__(self, app, registry: Optional[ResourceMetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or REGISTRY
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counters = {"in": 0, "out": 0, "status": 500}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                counters["in"] += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                counters["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                counters["out"] += len(message.get("body", b""))
+            await send(message)
+
+        hwm_reset = self.registry.begin()
+        rss_before = current_rss_bytes()
+        hwm_before = _hwm_bytes()
+        cpu_before = time.process_time()
+        children_before = _children_cpu()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            rss_after = current_rss_bytes()
+            hwm_after = _hwm_bytes()
+            self.registry.end()
+            peak = max(rss_before, rss_after)
+            if hwm_reset or hwm_after > hwm_before:
+                peak = max(peak, hwm_after)
+            route = scope.get("route")
+            sample = {
+                "method": scope.get("method", ""),
+                "route": getattr(route, "path", None) or "<unmatched>",
+                "status": counters["status"],
+                "duration_s": round(duration, 4),
+                "cpu_s": round(time.process_time() - cpu_before, 4),
+                "children_cpu_s": round(_children_cpu() - children_before, 4),
+                "rss_before_bytes": rss_before,
+                "rss_after_bytes": rss_after,
+                "rss_peak_bytes": peak,
+                "bytes_in": counters["in"],
+                "bytes_out": counters["out"],
+                "at": time.time(),
+            }
+            self.registry.record(sample)
+            _log.info(
+                "REQUEST_METRICS method=%s route=%s status=%s duration_s=%.3f cpu_s=%.3f "
+                "rss_before_mb=%.1f rss_after_mb=%.1f rss_peak_mb=%.1f bytes_in=%d bytes_out=%d",
+                sample["method"], sample["route"], sample["status"], duration, sample["cpu_s"],
+                rss_before / 1048576, rss_after / 1048576, peak / 1048576,
+                sample["bytes_in"], sample["bytes_out"],
+            )
@@ -238,6 +238,29 @@ def init_db() -> None:
                     text("ALTER TABLE tool_jobs ADD COLUMN mayor_especifico_categoria VARCHAR(32)")
                 )
 
+    # Migración aditiva en ``tool_jobs``: cola de jobs (services/job_queue.py).
+    if "tool_jobs" in inspector.get_table_names():
+        cols_jobs = {c["name"] for c in inspector.get_columns("tool_jobs")}
+        for col_name, col_type in [
+            ("queue_task", "VARCHAR(64)"),
+            ("queue_status", "VARCHAR(16)"),
+            ("queue_priority", "INTEGER DEFAULT 0 NOT NULL"),
+            ("queue_attempts", "INTEGER DEFAULT 0 NOT NULL"),
+            ("queue_max_attempts", "INTEGER"),
+            ("queue_run_after", "TIMESTAMP"),
+            ("queue_lease_owner", "VARCHAR(120)"),
+            ("queue_lease_until", "TIMESTAMP"),
+            ("queue_heartbeat_at", "TIMESTAMP"),
+        ]:
+            if col_name not in cols_jobs:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE tool_jobs ADD COLUMN {col_name} {col_type}"))
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_tool_jobs_queue "
+                "ON tool_jobs (queue_status, queue_priority)"
+            ))
+
     # Backfill de entitlements: concede la sección Tributarias a los clientes
     # existentes en el primer arranque tras activar el gating comercial.
     try:
@@ -17,6 +17,7 @@ from backend.app.ict.audit.schemas import (
     AnexosMetrics,
     Status,
 )
+from backend.app.ict.fillers.cell_index import CellIndex
 
 ANEXO_CODES = ["A1", "A2", "A3", "A4", "A5", "A6", "A7", "A8", "A9"]
 ANEXO_NOMBRES = {
@@ -32,24 +33,25 @@ ANEXO_NOMBRES = {
 }
 
 
-def _read_cas_value(sheet, cas: str) -> Optional[Decimal]:
-    """Find a row in DATOS F-101 where col A == cas and return col C as Decimal."""
-    for row in sheet.iter_rows(min_row=2, values_only=False):
-        if row and row[0].value and str(row[0].value).strip() == cas:
-            val = row[2].value if len(row) > 2 else None
-            if val is None:
-                return None
-            return Decimal(str(val))
-    return None
+def _read_cas_value(index: CellIndex, cas: str) -> Optional[Decimal]:
+    """Return DATOS F-101 col C for ``cas`` as Decimal (None if absent/empty)."""
+    val = index.f101_value(cas)
+    if val is None:
+        return None
+    return Decimal(str(val))
 
 
-def compute_a1_metrics(wb: Workbook) -> A1Metrics:
-    """Compute A1 mapeo metrics from a workbook with DATOS F-101 and A1 sheets."""
-    f101 = wb["DATOS F-101"] if "DATOS F-101" in wb.sheetnames else None
+def compute_a1_metrics(wb: Workbook, index: Optional[CellIndex] = None) -> A1Metrics:
+    """Compute A1 mapeo metrics from a workbook with DATOS F-101 and A1 sheets.
+
+    ``index`` is the generation's ``CellIndex``; built from ``wb`` if omitted.
+    """
     a1 = wb["A1"] if "A1" in wb.sheetnames else None
+    if index is None:
+        index = CellIndex.from_workbook(wb)
 
-    activo_total = _read_cas_value(f101, "499") if f101 else None
-    pasivo_pat_total = _read_cas_value(f101, "699") if f101 else None
+    activo_total = _read_cas_value(index, "499")
+    pasivo_pat_total = _read_cas_value(index, "699")
     activo_total = activo_total or Decimal("0")
     pasivo_pat_total = pasivo_pat_total or Decimal("0")
     diferencia = activo_total - pasivo_pat_total
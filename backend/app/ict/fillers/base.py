@@ -1,7 +1,8 @@
 """Filler protocol + helpers for ICT 2025 Excel template manipulation.
 
 Este módulo centraliza:
-  - load_template(): carga el template oficial preservando fórmulas y links.
+  - load_template(): carga el template oficial preservando fórmulas y links
+    (una copia del snapshot de template_cache.py, parseado una sola vez).
   - safe_set(): escribe en una celda de forma segura. NUNCA sobreescribe
     MergedCells ni fórmulas; opcionalmente registra cada escritura en el
     trace log para que generate_excel pueda producir la hoja
@@ -16,10 +17,13 @@ from contextvars import ContextVar
 from pathlib import Path
 from typing import Protocol
 
-from openpyxl import Workbook, load_workbook
+from openpyxl import Workbook
 from openpyxl.cell.cell import Cell
 from openpyxl.worksheet.merge import MergedCell
 
+from backend.app.ict.fillers import template_cache
+from backend.app.ict.fillers.trace import TraceLog
+
 TEMPLATE_PATH = Path(__file__).parent.parent / "templates" / "ict_2025_template.xlsx"
 
 
@@ -30,7 +34,7 @@ def load_template() -> Workbook:
             f"ICT template not found at {TEMPLATE_PATH}. "
             "Copy the official SRI template here before running ICT generation."
         )
-    return load_workbook(TEMPLATE_PATH, data_only=False, keep_links=True)
+    return template_cache.load(TEMPLATE_PATH)
 
 
 # ---------------------------------------------------------------------------
@@ -39,17 +43,18 @@ def load_template() -> Workbook:
 # su propio trace) y para que los fillers no tengan que recibir un parámetro.
 # ---------------------------------------------------------------------------
 
-_TRACE: ContextVar[list[dict] | None] = ContextVar("_ict_trace", default=None)
+_TRACE: ContextVar[TraceLog | None] = ContextVar("_ict_trace", default=None)
 
 
 def reset_trace() -> None:
     """Inicia un nuevo trace log para la generación actual."""
-    _TRACE.set([])
+    _TRACE.set(TraceLog())
 
 
-def get_trace() -> list[dict]:
-    """Devuelve el trace acumulado (lista de dicts) o vacío si no hay sesión."""
-    return _TRACE.get() or []
+def get_trace() -> TraceLog:
+    """Devuelve el trace acumulado (ver fillers/trace.py) o uno vacío si no hay sesión."""
+    trace = _TRACE.get()
+    return trace if trace is not None else TraceLog()
 
 
 def _record(anexo: str | None, casillero: str | None, sheet: str,
@@ -58,15 +63,8 @@ def _record(anexo: str | None, casillero: str | None, sheet: str,
     trace = _TRACE.get()
     if trace is None:
         return
-    trace.append({
-        "anexo": anexo or "",
-        "casillero": str(casillero or ""),
-        "sheet": sheet,
-        "cell": cell_addr,
-        "origen": origen or "",
-        "valor": value,
-        "status": status,  # "written" | "skipped_formula" | "skipped_merged"
-    })
+    # status: "written" | "skipped_formula" | "skipped_merged" | "error"
+    trace.append(anexo or "", str(casillero or ""), sheet, cell_addr, value, origen or "", status)
 
 
 def safe_set_formula(
@@ -159,7 +157,7 @@ def safe_set(
     return True
 
 
-def write_trace_sheet(workbook: Workbook) -> None:
+def write_trace_sheet(workbook: Workbook, *, streaming: bool = False) -> None:
     """Genera la hoja TRAZABILIDAD como dashboard interactivo.
 
     Diseño:
@@ -173,23 +171,32 @@ def write_trace_sheet(workbook: Workbook) -> None:
 
     Pensado para que el auditor pueda filtrar por anexo, por casillero,
     por sheet o por estado y verificar el linaje origen→destino al instante.
+
+    Con ``streaming=True`` la hoja se escribe por filas a disco en vez de
+    quedar en memoria (una fila por escritura de los fillers; ver
+    fillers/streaming.py).
     """
+    from copy import copy
+
     from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
     from openpyxl.utils import get_column_letter
-    from collections import Counter
 
     trace = get_trace()
 
     SHEET_NAME = "TRAZABILIDAD"
     if SHEET_NAME in workbook.sheetnames:
         del workbook[SHEET_NAME]
-    ws = workbook.create_sheet(SHEET_NAME)
+    if streaming:
+        from backend.app.ict.fillers.streaming import create_streaming_sheet
+        ws = create_streaming_sheet(workbook, SHEET_NAME)
+    else:
+        ws = workbook.create_sheet(SHEET_NAME)
 
     # ---- Stats globales ----
-    written = [t for t in trace if t.get("status") == "written"]
-    skipped_f = [t for t in trace if t.get("status") == "skipped_formula"]
-    skipped_m = [t for t in trace if t.get("status") == "skipped_merged"]
-    by_anexo = Counter(t.get("anexo", "—") for t in written)
+    n_written = trace.count("written")
+    n_skipped_f = trace.count("skipped_formula")
+    n_skipped_m = trace.count("skipped_merged")
+    by_anexo = trace.written_by_anexo()
 
     # ---- Estilos ----
     THIN = Side(border_style="thin", color="A0A0A0")
@@ -247,9 +254,9 @@ def write_trace_sheet(workbook: Workbook) -> None:
             for c in (col, col+1):
                 ws.cell(r, c).border = BORDER_KPI
 
-    kpi(4, 1, "ESCRITURAS EXITOSAS", f"{len(written):,}")
-    kpi(4, 3, "FÓRMULAS PROTEGIDAS", f"{len(skipped_f):,}")
-    kpi(4, 5, "CELDAS MERGED", f"{len(skipped_m):,}")
+    kpi(4, 1, "ESCRITURAS EXITOSAS", f"{n_written:,}")
+    kpi(4, 3, "FÓRMULAS PROTEGIDAS", f"{n_skipped_f:,}")
+    kpi(4, 5, "CELDAS MERGED", f"{n_skipped_m:,}")
 
     # ---- Stats por anexo (fila 8) ----
     ws.cell(8, 1, value="Por anexo:").font = Font(name="Calibri", size=10, bold=True)
@@ -287,8 +294,10 @@ def write_trace_sheet(workbook: Workbook) -> None:
         c.border = BORDER_DATA
     ws.row_dimensions[table_start].height = 26
 
-    # Combinar TODAS las entradas (written + skipped) para auditoría completa
-    all_entries = sorted(trace, key=lambda x: (x.get("anexo", ""), x.get("sheet", ""), x.get("cell", "")))
+    # Combinar TODAS las entradas (written + skipped) para auditoría completa,
+    # ordenadas por (anexo, hoja, celda). Se leen como tuplas del TraceLog,
+    # sin armar un dict por entrada.
+    order = trace.sorted_order()
 
     STATUS_ICON = {
         "written": "✓ OK",
@@ -296,71 +305,68 @@ def write_trace_sheet(workbook: Workbook) -> None:
         "skipped_merged": "⛌ Celda combinada",
         "error": "✗ Error",
     }
-
-    for i, entry in enumerate(all_entries, start=table_start + 1):
-        anexo = entry.get("anexo", "")
-        casillero = entry.get("casillero", "")
-        sheet = entry.get("sheet", "")
-        cell_addr = entry.get("cell", "")
-        valor = entry.get("valor", "")
-        origen = entry.get("origen", "")
-        status = entry.get("status", "")
-        status_disp = STATUS_ICON.get(status, status)
-
-        # Fila completa con fondo del color del anexo
+    # Estilos de las filas de datos
+    FONT_ANEXO = Font(name="Calibri", size=9, bold=True, color="2D5F8B")
+    FONT_LINK = Font(name="Calibri", size=9, color="2D5F8B", underline="single")
+    FONT_STATUS = {
+        "written": Font(name="Calibri", size=9, color="2E7D32", bold=True),
+        "skipped_formula": Font(name="Calibri", size=9, color="EF6C00"),
+        "skipped_merged": Font(name="Calibri", size=9, color="757575"),
+    }
+    FONT_STATUS_OTHER = Font(name="Calibri", size=9, color="C62828")
+    ALIGN_CENTER = Alignment(horizontal="center", vertical="center")
+    ALIGN_LEFT = Alignment(horizontal="left", vertical="center")
+    ALIGN_RIGHT = Alignment(horizontal="right", vertical="center")
+    ALIGN_WRAP = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    NUM_FMT_VALOR = '#,##0.00;-#,##0.00;"—"'
+    # Los 7 estilos de una fila dependen solo de (anexo, valor numérico,
+    # estado): se resuelven contra las tablas de estilos del libro una vez
+    # por combinación y las filas siguientes copian el StyleArray.
+    row_styles: dict[tuple, list] = {}
+
+    def style_row(row, anexo, numeric, status):
+        key = (anexo, numeric, status)
+        cached = row_styles.get(key)
+        cells = [ws.cell(row, c) for c in range(1, 8)]
+        if cached is not None:
+            for cell, style in zip(cells, cached):
+                cell._style = copy(style)
+            return
         fill_row = PatternFill("solid", fgColor=ANEXO_COLORS.get(anexo, "FFFFFF"))
-
-        # Anexo
-        c1 = ws.cell(i, 1, value=anexo)
-        c1.font = Font(name="Calibri", size=9, bold=True, color="2D5F8B")
-        c1.alignment = Alignment(horizontal="center", vertical="center")
-        # Casillero
-        c2 = ws.cell(i, 2, value=casillero)
-        c2.font = FONT_DATA
-        c2.alignment = Alignment(horizontal="center", vertical="center")
-        # Hoja
-        c3 = ws.cell(i, 3, value=sheet)
-        c3.font = FONT_DATA
-        c3.alignment = Alignment(horizontal="left", vertical="center")
+        fonts = (FONT_ANEXO, FONT_DATA, FONT_DATA, FONT_LINK, FONT_DATA, FONT_DATA,
+                 FONT_STATUS.get(status, FONT_STATUS_OTHER))
+        aligns = (ALIGN_CENTER, ALIGN_CENTER, ALIGN_LEFT, ALIGN_CENTER,
+                  ALIGN_RIGHT if numeric else ALIGN_LEFT, ALIGN_WRAP, ALIGN_CENTER)
+        for cell, font, align in zip(cells, fonts, aligns):
+            cell.font = font
+            cell.alignment = align
+            cell.fill = fill_row
+            cell.border = BORDER_DATA
+        if numeric:
+            cells[4].number_format = NUM_FMT_VALOR
+        row_styles[key] = [copy(cell._style) for cell in cells]
+
+    for i, (anexo, casillero, sheet, cell_addr, valor, origen, status) in enumerate(
+        trace.rows(order), start=table_start + 1
+    ):
+        ws.cell(i, 1, value=anexo)
+        ws.cell(i, 2, value=casillero)
+        ws.cell(i, 3, value=sheet)
         # Celda destino con hipervínculo
         c4 = ws.cell(i, 4, value=cell_addr)
-        c4.font = Font(name="Calibri", size=9, color="2D5F8B", underline="single")
-        c4.alignment = Alignment(horizontal="center", vertical="center")
         try:
             # Hipervínculo a la hoja+celda real del anexo
             safe_sheet_ref = f"'{sheet}'!{cell_addr}" if " " in sheet else f"{sheet}!{cell_addr}"
             c4.hyperlink = f"#{safe_sheet_ref}"
         except Exception:
             pass
-        # Valor
-        c5 = ws.cell(i, 5, value=valor if isinstance(valor, (int, float, str)) else str(valor))
-        c5.font = FONT_DATA
-        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
-            c5.number_format = '#,##0.00;-#,##0.00;"—"'
-            c5.alignment = Alignment(horizontal="right", vertical="center")
-        else:
-            c5.alignment = Alignment(horizontal="left", vertical="center")
-        # Origen
-        c6 = ws.cell(i, 6, value=origen)
-        c6.font = FONT_DATA
-        c6.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-        # Estado
-        c7 = ws.cell(i, 7, value=status_disp)
-        if status == "written":
-            c7.font = Font(name="Calibri", size=9, color="2E7D32", bold=True)
-        elif status == "skipped_formula":
-            c7.font = Font(name="Calibri", size=9, color="EF6C00")
-        elif status == "skipped_merged":
-            c7.font = Font(name="Calibri", size=9, color="757575")
-        else:
-            c7.font = Font(name="Calibri", size=9, color="C62828")
-        c7.alignment = Alignment(horizontal="center", vertical="center")
-
-        for c in range(1, 8):
-            ws.cell(i, c).fill = fill_row
-            ws.cell(i, c).border = BORDER_DATA
-
-    last_row = table_start + len(all_entries)
+        ws.cell(i, 5, value=valor if isinstance(valor, (int, float, str)) else str(valor))
+        ws.cell(i, 6, value=origen)
+        ws.cell(i, 7, value=STATUS_ICON.get(status, status))
+        numeric = isinstance(valor, (int, float)) and not isinstance(valor, bool)
+        style_row(i, anexo, numeric, status)
+
+    last_row = table_start + len(order)
     # AutoFilter
     ws.auto_filter.ref = f"A{table_start}:G{last_row}"
 
@@ -373,7 +379,7 @@ def write_trace_sheet(workbook: Workbook) -> None:
     ws.freeze_panes = f"A{table_start + 1}"
 
     # Si no hay nada, mensaje informativo
-    if not all_entries:
+    if not order:
         ws.cell(row=table_start + 1, column=1,
                 value="(sin entradas — los fillers no registraron trazabilidad)")
 
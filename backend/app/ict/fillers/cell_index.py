@@ -0,0 +1,98 @@
+"""Índice de celdas de las hojas DATOS F-101 y DATOS BALANCE del ICT.
+
+Las métricas de auditoría (``audit/metrics.py``), los builders de
+VERIFICACIÓN A1 y ``balance_rows_for_casillero`` (fillers A3/A9 y
+``set_casillero_ref``) buscaban un casillero recorriendo la hoja o la lista
+del balance desde el principio, una vez por casillero: con los 888
+casilleros del F-101 y todas las cuentas del cliente el costo era
+casilleros × filas.
+
+``CellIndex`` recorre cada hoja UNA vez y guarda:
+
+- DATOS F-101: casillero → (fila, valor declarado) del detalle (se detiene
+  en el bloque "🔍 CUADRE POR CASILLERO", que repite casilleros);
+- DATOS BALANCE: casillero → filas de sus cuentas, y cuántas filas de
+  cuenta tiene la hoja.
+
+``service.generate_excel`` lo construye una vez por generación, después de
+las hojas DATOS, y lo deja en el shared_context como ``_cell_index``.
+Funciona igual con hojas en streaming: solo lee las columnas que esas hojas
+retienen (A-C en F-101, A-B en BALANCE).
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+SHEET_F101 = "DATOS F-101"
+SHEET_BALANCE = "DATOS BALANCE"
+
+# Primera fila de cuentas en DATOS BALANCE (título en 1, encabezado en 3).
+BALANCE_FIRST_ROW = 4
+
+_CUADRE_MARK = "🔍"
+
+
+class CellIndex:
+    """Casillero → fila/valor (DATOS F-101) y casillero → filas (DATOS BALANCE)."""
+
+    def __init__(self) -> None:
+        self._f101: dict[str, tuple[int, object]] = {}
+        self._balance: dict[str, list[int]] = defaultdict(list)
+        self.balance_cuentas = 0
+
+    @classmethod
+    def from_workbook(cls, wb) -> "CellIndex":
+        """Índice de las hojas DATOS de ``wb`` (vacío si no existen)."""
+        index = cls()
+        if SHEET_F101 in wb.sheetnames:
+            index._index_f101(wb[SHEET_F101])
+        if SHEET_BALANCE in wb.sheetnames:
+            index._index_balance(wb[SHEET_BALANCE])
+        return index
+
+    def _index_f101(self, ws) -> None:
+        for row, (cas, _nombre, valor) in enumerate(
+            ws.iter_rows(min_row=2, max_col=3, values_only=True), start=2
+        ):
+            cas = str(cas or "").strip()
+            if _CUADRE_MARK in cas:
+                break
+            if cas.isdigit() and cas not in self._f101:
+                self._f101[cas] = (row, valor)
+
+    def _index_balance(self, ws) -> None:
+        for row, (cas, codigo) in enumerate(
+            ws.iter_rows(min_row=BALANCE_FIRST_ROW, max_col=2, values_only=True),
+            start=BALANCE_FIRST_ROW,
+        ):
+            cas = str(cas or "").strip()
+            codigo = str(codigo or "").strip()
+            # El bloque CUADRE (título, encabezado "Casillero", fila TOTAL)
+            # cierra el detalle de cuentas.
+            if _CUADRE_MARK in cas or cas == "TOTAL" or "Casillero" in cas:
+                break
+            if cas.isdigit() or codigo:
+                self.balance_cuentas += 1
+            if cas:
+                self._balance[cas].append(row)
+
+    # ---- Consultas -------------------------------------------------------
+
+    @property
+    def f101_casilleros(self) -> set[str]:
+        """Casilleros presentes en DATOS F-101."""
+        return set(self._f101)
+
+    def f101_row(self, cas: str) -> int | None:
+        entry = self._f101.get(str(cas).strip())
+        return entry[0] if entry else None
+
+    def f101_value(self, cas: str):
+        """Valor de la col C de DATOS F-101 (None si el casillero no está)."""
+        entry = self._f101.get(str(cas).strip())
+        return entry[1] if entry else None
+
+    def balance_rows(self, cas: str) -> list[int]:
+        """Filas de DATOS BALANCE de todas las cuentas del casillero."""
+        return list(self._balance.get(str(cas).strip(), ()))
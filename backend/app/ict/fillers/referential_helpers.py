@@ -157,7 +157,14 @@ def lookups_from_context(anexo_data: dict) -> tuple[dict, dict, dict, list]:
 def balance_rows_for_casillero(anexo_data: dict, casillero: str,
                                balance_lookup: list[int]) -> list[int]:
     """Devuelve las filas en DATOS BALANCE de TODAS las cuentas cuyo
-    casillero_sri coincide. balance_lookup[i] es la fila de la i-ésima cuenta."""
+    casillero_sri coincide. balance_lookup[i] es la fila de la i-ésima cuenta.
+
+    En una generación el shared_context trae el ``CellIndex`` (``_cell_index``)
+    de DATOS BALANCE y la respuesta sale de ahí sin recorrer el balance.
+    """
+    index = anexo_data.get("_cell_index")
+    if index is not None and balance_lookup:
+        return index.balance_rows(casillero)
     cas = str(casillero).strip()
     balance: list[dict] = anexo_data.get("balance_mapeado", []) or []
     rows = []
@@ -12,15 +12,21 @@ proyecto: nunca truncar información del cliente).
 
 Este módulo aporta:
   - `shift_formula_rows`: reajusta refs de fila >= umbral en una fórmula.
-  - `expand_tabular_block`: inserta N filas en un cuadro y deja la hoja
-    consistente (fórmulas reajustadas, merges recreados, estilo copiado).
+  - `RowExpansionPlan`: junta TODAS las expansiones de una hoja y las aplica
+    con un solo desplazamiento (fórmulas reajustadas, merges recreados,
+    estilo copiado).
+  - `expand_tabular_block`: un plan de una sola expansión.
 """
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
+from collections import namedtuple
 from copy import copy
+from itertools import accumulate
 
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.merge import MergedCell, MergedCellRange
 
 
 # Referencia de celda LOCAL (misma hoja): columna(s) + fila, con $ opcional.
@@ -35,13 +41,10 @@ _CELL_REF = re.compile(
 _EXTERNAL_REF = re.compile(r"!\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?")
 
 
-def _shift_segment(seg: str, threshold: int, amount: int) -> str:
+def _shift_segment(seg: str, remap) -> str:
     def repl(m: re.Match) -> str:
         col_abs, col, row_abs, row = m.group(1), m.group(2), m.group(3), m.group(4)
-        r = int(row)
-        if r >= threshold:
-            r += amount
-        return f"{col_abs}{col}{row_abs}{r}"
+        return f"{col_abs}{col}{row_abs}{remap(int(row))}"
 
     return _CELL_REF.sub(repl, seg)
 
@@ -57,7 +60,15 @@ def shift_formula_rows(formula, threshold: int, amount: int):
     Si ``formula`` no es una cadena que empiece con '=' o ``amount`` es 0,
     se devuelve sin cambios.
     """
-    if amount == 0 or not isinstance(formula, str) or not formula.startswith("="):
+    if amount == 0:
+        return formula
+    return remap_formula_rows(formula, lambda r: r + amount if r >= threshold else r)
+
+
+def remap_formula_rows(formula, remap):
+    """Como ``shift_formula_rows`` pero con la fila nueva de cada referencia
+    local dada por ``remap(fila)`` (varias inserciones a la vez)."""
+    if not isinstance(formula, str) or not formula.startswith("="):
         return formula
 
     out: list[str] = []
@@ -92,20 +103,243 @@ def shift_formula_rows(formula, threshold: int, amount: int):
             j = i
             while j < n and formula[j] not in "\"'":
                 j += 1
-            out.append(_shift_segment(formula[i:j], threshold, amount))
+            out.append(_shift_segment(formula[i:j], remap))
             i = j
     return "".join(out)
 
 
-def _copy_cell_style(src_cell, dst_cell) -> None:
-    """Copia el estilo (no el valor) de una celda a otra."""
-    if src_cell.has_style:
-        dst_cell.font = copy(src_cell.font)
-        dst_cell.border = copy(src_cell.border)
-        dst_cell.fill = copy(src_cell.fill)
-        dst_cell.number_format = src_cell.number_format
-        dst_cell.protection = copy(src_cell.protection)
-        dst_cell.alignment = copy(src_cell.alignment)
+# Campos del StyleArray que _copy_cell_style nunca copió: el estilo con
+# nombre (xfId) y los flags quotePrefix/pivotButton quedan en 0.
+_UNCOPIED_STYLE_FIELDS = ("xfId", "quotePrefix", "pivotButton")
+
+_Block = namedtuple("_Block", "insert_at amount style_row inner_merges last_col")
+
+
+def _copied_style(src_cell):
+    """StyleArray para una fila nueva copiada de ``src_cell`` (mismos ids de
+    font/borde/relleno/formato/alineación/protección, sin objetos nuevos)."""
+    style = copy(src_cell._style)
+    for field in _UNCOPIED_STYLE_FIELDS:
+        setattr(style, field, 0)
+    return style
+
+
+def _merge_new_rows(ws, first: int, amount: int, col_ini: int, col_fin: int) -> None:
+    """Fusiona ``col_ini:col_fin`` en las ``amount`` filas nuevas desde ``first``.
+
+    Las filas nuevas tienen todas el mismo estilo, así que ``merge_cells``
+    (que recalcula los bordes del merge y re-registra estilos) se usa en la
+    primera; las demás copian sus StyleArray.
+    """
+    ws.merge_cells(start_row=first, start_column=col_ini, end_row=first, end_column=col_fin)
+    styles = [copy(ws._cells[(first, c)]._style) for c in range(col_ini, col_fin + 1)]
+    for row in range(first + 1, first + amount):
+        ws.merged_cells.ranges.add(MergedCellRange(
+            ws, f"{get_column_letter(col_ini)}{row}:{get_column_letter(col_fin)}{row}"))
+        for c, style in zip(range(col_ini, col_fin + 1), styles):
+            cell = ws.cell(row, c) if c == col_ini else MergedCell(ws, row, c)
+            cell._style = copy(style)
+            ws._cells[(row, c)] = cell
+
+
+class RowExpansionPlan:
+    """Todas las expansiones de bloques tabulares de UNA hoja, aplicadas juntas.
+
+    ``expand_tabular_block`` hacía, por cada bloque, un snapshot de valor +
+    estilo (con ``copy()`` de font/borde/relleno/alineación/protección) de
+    todas las celdas debajo del punto de inserción, ``insert_rows`` y la
+    re-aplicación completa: O(filas × columnas) objetos de estilo creados y
+    hasheados por bloque, repetido si la hoja crecía en varios cuadros.
+
+    El plan junta las expansiones (``add``, en filas de la hoja ANTES de
+    expandir) y ``apply`` las aplica de una vez:
+
+      1. Cada celda desde la primera inserción se mueve UNA vez a su fila
+         final; conserva su objeto y su StyleArray (los ids de estilo del
+         libro), así que no se copia ni se re-registra ningún estilo.
+      2. Las fórmulas de las celdas desplazadas se reajustan en una pasada
+         (``remap_formula_rows``) con el desplazamiento acumulado.
+      3. Los merges desde la primera inserción se recrean desplazados y las
+         filas nuevas toman el StyleArray de su ``style_row``, su alto y sus
+         merges internos.
+
+    El resultado es el de aplicar ``expand_tabular_block`` a cada bloque de
+    abajo hacia arriba (mismos valores, fórmulas, estilos, merges, altos y
+    celdas creadas); solo puede cambiar qué id de estilo repetido de la
+    plantilla usa una celda.
+    """
+
+    def __init__(self, ws) -> None:
+        self.ws = ws
+        self._blocks: list[_Block] = []
+
+    def add(
+        self,
+        *,
+        insert_at: int,
+        amount: int,
+        style_row: int,
+        inner_merges: list[tuple[int, int]] | None = None,
+        last_col: int = 13,
+    ) -> None:
+        """Agrega una expansión (mismos argumentos que ``expand_tabular_block``)."""
+        if amount <= 0:
+            return
+        if style_row >= insert_at:
+            raise ValueError(f"style_row {style_row} debe estar antes de insert_at {insert_at}")
+        if any(b.insert_at == insert_at for b in self._blocks):
+            raise ValueError(f"ya hay una expansión en la fila {insert_at}")
+        self._blocks.append(_Block(insert_at, amount, style_row, tuple(inner_merges or ()), last_col))
+
+    def shift(self, row: int) -> int:
+        """Fila final de la fila ``row`` (coordenadas previas a expandir)."""
+        return row + sum(b.amount for b in self._blocks if b.insert_at <= row)
+
+    def apply(self) -> None:
+        blocks = sorted(self._blocks, key=lambda b: b.insert_at)
+        self._blocks = []
+        if not blocks:
+            return
+        ws = self.ws
+        starts = [b.insert_at for b in blocks]
+        offsets = [0, *accumulate(b.amount for b in blocks)]
+        top = starts[0]
+
+        def final_row(row: int) -> int:
+            return row + offsets[bisect_right(starts, row)]
+
+        # Estilo de cada style_row tal como estaba antes de tocar nada (sus
+        # MergedCells incluidas: un merge más arriba todavía no se quitó).
+        row_styles = {
+            b.insert_at: [
+                _copied_style(src) if src.has_style else None
+                for src in (ws.cell(b.style_row, c) for c in range(1, b.last_col + 1))
+            ]
+            for b in blocks
+        }
+
+        wanted = self._replay_positions(blocks)
+
+        # 1) Merges desde la primera inserción: se quitan y se recrean al final.
+        old_merges = [
+            (mc.min_col, mc.min_row, mc.max_col, mc.max_row)
+            for mc in ws.merged_cells.ranges
+            if mc.min_row >= top
+        ]
+        for col_ini, row_ini, col_fin, row_fin in old_merges:
+            try:
+                ws.unmerge_cells(start_row=row_ini, start_column=col_ini,
+                                 end_row=row_fin, end_column=col_fin)
+            except (KeyError, ValueError):
+                pass
+
+        # 2) Un solo movimiento de celdas. Las de columnas <= last_col de algún
+        #    bloque que las desplazó se re-asignan (fórmulas reajustadas).
+        cells = ws._cells
+        moved = {}
+        for key in [k for k in cells if k[0] >= top]:
+            cell = cells.pop(key)
+            r, c = key
+            cell.row = final_row(r)
+            moved[(cell.row, c)] = cell
+            if isinstance(cell, MergedCell):
+                continue
+            active = [b for b in blocks if b.insert_at <= r and c <= b.last_col]
+            if not active:
+                continue
+            val = cell.value
+            if isinstance(val, str) and val.startswith("="):
+                val = remap_formula_rows(val, lambda ref, bs=active: ref + sum(
+                    b.amount for b in bs if b.insert_at <= ref))
+            cell.value = val
+        cells.update(moved)
+
+        # 3) Filas nuevas con el StyleArray de su style_row, y las celdas
+        #    vacías que el camino celda por celda dejaba creadas.
+        for b in blocks:
+            first = final_row(b.insert_at - 1) + 1
+            for r in range(first, first + b.amount):
+                for c, style in enumerate(row_styles[b.insert_at], start=1):
+                    cell = ws.cell(r, c)
+                    if style is not None:
+                        cell._style = copy(style)
+        for r, c in wanted.difference(cells):
+            ws.cell(r, c)
+
+        # 4) Merges desplazados y merges internos de las filas nuevas.
+        for col_ini, row_ini, col_fin, row_fin in old_merges:
+            delta = final_row(row_ini) - row_ini
+            ws.merge_cells(
+                start_row=row_ini + delta, start_column=col_ini,
+                end_row=row_fin + delta, end_column=col_fin,
+            )
+        for b in blocks:
+            first = final_row(b.insert_at - 1) + 1
+            for col_ini, col_fin in b.inner_merges:
+                _merge_new_rows(ws, first, b.amount, col_ini, col_fin)
+
+        ws._current_row = ws.max_row
+
+    def _replay_positions(self, blocks) -> set[tuple[int, int]]:
+        """Posiciones (fila, col) que quedan con celda, y altos de fila.
+
+        Repite, bloque por bloque de abajo hacia arriba y solo sobre
+        coordenadas, lo que hacían snapshot + unmerge + ``insert_rows`` +
+        formateo: ``insert_rows`` materializa el rectángulo hasta
+        ``max_row``/``max_column`` (contados sin los merges recién quitados) y
+        ``row_dimensions`` no se desplaza con las celdas. Aplica los altos a
+        la hoja y devuelve las posiciones finales.
+        """
+        ws = self.ws
+        dims = ws.row_dimensions
+        positions = set(ws._cells)
+        merges = [
+            (mc.min_row, mc.min_col, mc.max_row, mc.max_col) for mc in ws.merged_cells.ranges
+        ]
+
+        def merge_cells(m):
+            return {(r, c) for r in range(m[0], m[2] + 1) for c in range(m[1], m[3] + 1)}
+
+        for b in reversed(blocks):
+            a, n, last_col = b.insert_at, b.amount, b.last_col
+            max_row = max((r for r, _ in positions), default=1)
+            snapshot = {(r, c) for r in range(a, max_row + 1) for c in range(1, last_col + 1)}
+            positions |= snapshot
+
+            old_heights = {
+                r: dims[r].height
+                for r in range(a, max_row + 1)
+                if dims[r].height is not None
+            }
+            shifted = [m for m in merges if m[0] >= a]
+            merges = [m for m in merges if m[0] < a]
+            for m in shifted:
+                positions -= merge_cells(m) - {(m[0], m[1])}
+
+            rect_rows = max((r for r, _ in positions), default=1)
+            rect_cols = max((c for _, c in positions), default=1)
+            positions |= {(r, c) for r in range(a, rect_rows + 1) for c in range(1, rect_cols + 1)}
+            positions = {(r + n, c) if r >= a else (r, c) for r, c in positions}
+            positions |= {(r + n, c) for r, c in snapshot}
+            for r, h in old_heights.items():
+                dims[r + n].height = h
+
+            for m in shifted:
+                m = (m[0] + n, m[1], m[2] + n, m[3])
+                positions |= merge_cells(m)
+                merges.append(m)
+
+            src_height = dims[b.style_row].height
+            positions |= {(b.style_row, c) for c in range(1, last_col + 1)}
+            for r in range(a, a + n):
+                if src_height is not None:
+                    dims[r].height = src_height
+                positions |= {(r, c) for c in range(1, last_col + 1)}
+                for col_ini, col_fin in b.inner_merges:
+                    m = (r, col_ini, r, col_fin)
+                    positions |= merge_cells(m)
+                    merges.append(m)
+        return positions
 
 
 def expand_tabular_block(
@@ -121,21 +355,12 @@ def expand_tabular_block(
 
     `openpyxl.insert_rows` es poco fiable al desplazar: pierde valores, bordes
     y merges de algunas celdas (verificado en 3.1.5 — caso A5 con 5 filas
-    insertadas perdía los casilleros 807/808 del Cuadro D y sus bordes). En
-    vez de confiar en él, se toma un SNAPSHOT completo (valor + estilo) de
-    todas las celdas a desplazar ANTES de insertar y se RE-APLICA después en
-    la posición + amount. Así el resultado es determinista e idéntico al
-    original, solo desplazado.
-
-    Pasos:
-      1. Snapshot (valor + estilo) de cada celda en filas >= insert_at.
-      2. Capturar merges (>= insert_at) y alturas de fila; eliminar esos
-         merges para que el desplazamiento no los corrompa.
-      3. insert_rows(insert_at, amount).
-      4. Re-aplicar el snapshot a la posición + amount (valor con fórmulas
-         reajustadas + estilo completo). Re-aplicar alturas.
-      5. Recrear los merges desplazados (+amount).
-      6. Formatear las filas nuevas desde ``style_row`` + merges internos.
+    insertadas perdía los casilleros 807/808 del Cuadro D y sus bordes). Por
+    eso no se usa: ``RowExpansionPlan`` mueve cada celda (valor + estilo) a su
+    fila final, reajusta las fórmulas, recrea los merges desplazados y
+    formatea las filas nuevas desde ``style_row`` + merges internos. Si una
+    hoja crece en varios cuadros, usar un solo plan con todas las
+    expansiones en vez de llamar a esta función por cuadro.
 
     Args:
       insert_at:   fila donde se insertan las nuevas (las que estaban aquí
@@ -144,84 +369,9 @@ def expand_tabular_block(
       style_row:   fila plantilla cuyo estilo/alto se copia a las nuevas.
       inner_merges: lista de (col_ini, col_fin) a fusionar dentro de cada
                    fila nueva (ej. [(5,6),(7,8),(9,10)] para E:F,G:H,I:J).
-      last_col:    última columna (1-based) a snapshotear/formatear.
+      last_col:    última columna (1-based) a reajustar/formatear.
     """
-    if amount <= 0:
-        return
-
-    max_row = ws.max_row
-
-    # 1) Snapshot de valor + estilo de TODAS las celdas en filas >= insert_at
-    #    (incluye celdas vacías con borde — las que openpyxl suele perder).
-    snapshot: dict[tuple[int, int], dict] = {}
-    for r in range(insert_at, max_row + 1):
-        for c in range(1, last_col + 1):
-            cell = ws.cell(r, c)
-            snapshot[(r, c)] = {
-                "value": cell.value,
-                "font": copy(cell.font),
-                "border": copy(cell.border),
-                "fill": copy(cell.fill),
-                "number_format": cell.number_format,
-                "alignment": copy(cell.alignment),
-                "protection": copy(cell.protection),
-            }
-
-    # 2) Capturar merges (>= insert_at) y alturas; eliminar esos merges para
-    #    que el insert_rows no los deje en estado inconsistente.
-    old_merges = [
-        (mc.min_col, mc.min_row, mc.max_col, mc.max_row)
-        for mc in ws.merged_cells.ranges
-        if mc.min_row >= insert_at
-    ]
-    for col_ini, row_ini, col_fin, row_fin in old_merges:
-        try:
-            ws.unmerge_cells(start_row=row_ini, start_column=col_ini,
-                             end_row=row_fin, end_column=col_fin)
-        except (KeyError, ValueError):
-            pass
-    old_heights = {
-        r: ws.row_dimensions[r].height
-        for r in range(insert_at, max_row + 1)
-        if ws.row_dimensions[r].height is not None
-    }
-
-    # 3) Insertar las filas.
-    ws.insert_rows(insert_at, amount)
-
-    # 4) Re-aplicar snapshot (valor + estilo) a la posición + amount. Las
-    #    fórmulas se reajustan (refs de fila >= insert_at → +amount).
-    for (r, c), snap in snapshot.items():
-        dst = ws.cell(r + amount, c)
-        val = snap["value"]
-        if isinstance(val, str) and val.startswith("="):
-            val = shift_formula_rows(val, threshold=insert_at, amount=amount)
-        dst.value = val
-        dst.font = snap["font"]
-        dst.border = snap["border"]
-        dst.fill = snap["fill"]
-        dst.number_format = snap["number_format"]
-        dst.alignment = snap["alignment"]
-        dst.protection = snap["protection"]
-    for r, h in old_heights.items():
-        ws.row_dimensions[r + amount].height = h
-
-    # 5) Recrear los merges desplazados (+amount).
-    for col_ini, row_ini, col_fin, row_fin in old_merges:
-        ws.merge_cells(
-            start_row=row_ini + amount, start_column=col_ini,
-            end_row=row_fin + amount, end_column=col_fin,
-        )
-
-    # 6) Formatear las filas nuevas desde style_row + merges internos.
-    src_height = ws.row_dimensions[style_row].height
-    for new_row in range(insert_at, insert_at + amount):
-        if src_height is not None:
-            ws.row_dimensions[new_row].height = src_height
-        for col in range(1, last_col + 1):
-            _copy_cell_style(ws.cell(style_row, col), ws.cell(new_row, col))
-        for col_ini, col_fin in (inner_merges or []):
-            ws.merge_cells(
-                start_row=new_row, start_column=col_ini,
-                end_row=new_row, end_column=col_fin,
-            )
+    plan = RowExpansionPlan(ws)
+    plan.add(insert_at=insert_at, amount=amount, style_row=style_row,
+             inner_merges=inner_merges, last_col=last_col)
+    plan.apply()
@@ -225,11 +225,28 @@ def _write_header(ws, row: int, headers: list[str]) -> None:
     ws.row_dimensions[row].height = 24
 
 
+def _new_sheet(wb: Workbook, title: str, streaming: bool, retain_columns=()):
+    """Crea (o recrea) la hoja ``title`` al final del libro.
+
+    Con ``streaming=True`` la hoja se escribe por filas a disco (ver
+    fillers/streaming.py); ``retain_columns`` son las columnas que se releen
+    después de escribirlas (controles de nombre vacío, VERIFICACIÓN A1).
+    """
+    if title in wb.sheetnames:
+        del wb[title]
+    if streaming:
+        from backend.app.ict.fillers.streaming import create_streaming_sheet
+        return create_streaming_sheet(wb, title, retain_columns=retain_columns)
+    return wb.create_sheet(title)
+
+
 # ---------------- F-101 ----------------
 def build_f101_sheet(
     wb: Workbook,
     f101: dict,
     casillero_names: dict[str, str] | None = None,
+    *,
+    streaming: bool = False,
 ) -> dict[str, int]:
     """Crea hoja DATOS F-101 con TODOS los casilleros canónicos del F-101 SRI.
 
@@ -263,9 +280,7 @@ def build_f101_sheet(
     """
     from backend.app.ict.catalogo_f101 import F101_CASILLERO_NAMES
 
-    if SHEET_F101 in wb.sheetnames:
-        del wb[SHEET_F101]
-    ws = wb.create_sheet(SHEET_F101)
+    ws = _new_sheet(wb, SHEET_F101, streaming, retain_columns=(1, 2, 3))
 
     _write_title(ws, "📄 DATOS F-101 · Declaración Anual del Impuesto a la Renta")
     _write_header(ws, 3, ["Casillero", "Nombre del Casillero", "Valor Declarado", "Observación"])
@@ -494,7 +509,9 @@ def build_f101_sheet(
 
 
 # ---------------- F-103 ----------------
-def build_f103_sheet(wb: Workbook, f103_monthly: dict) -> dict[tuple[str, str], str]:
+def build_f103_sheet(
+    wb: Workbook, f103_monthly: dict, *, streaming: bool = False
+) -> dict[tuple[str, str], str]:
     """Crea hoja DATOS F-103 con TODOS los casilleros canónicos del F-103 SRI.
 
     REGLA del proyecto (pedido del usuario):
@@ -516,9 +533,7 @@ def build_f103_sheet(wb: Workbook, f103_monthly: dict) -> dict[tuple[str, str],
     """
     from backend.app.ict.catalogo_f103 import F103_CASILLERO_NAMES
 
-    if SHEET_F103 in wb.sheetnames:
-        del wb[SHEET_F103]
-    ws = wb.create_sheet(SHEET_F103)
+    ws = _new_sheet(wb, SHEET_F103, streaming, retain_columns=(1, 2))
 
     _write_title(ws, "📋 DATOS F-103 · Declaraciones Mensuales de Retenciones IR")
 
@@ -620,7 +635,9 @@ def build_f103_sheet(wb: Workbook, f103_monthly: dict) -> dict[tuple[str, str],
 
 
 # ---------------- F-104 ----------------
-def build_f104_sheet(wb: Workbook, f104_monthly: dict) -> dict[tuple[str, str], str]:
+def build_f104_sheet(
+    wb: Workbook, f104_monthly: dict, *, streaming: bool = False
+) -> dict[tuple[str, str], str]:
     """Crea hoja DATOS F-104 con TODOS los casilleros canónicos del F-104 SRI.
 
     REGLA del proyecto (pedido del usuario):
@@ -638,9 +655,7 @@ def build_f104_sheet(wb: Workbook, f104_monthly: dict) -> dict[tuple[str, str],
     """
     from backend.app.ict.catalogo_f104 import F104_CASILLERO_NAMES
 
-    if SHEET_F104 in wb.sheetnames:
-        del wb[SHEET_F104]
-    ws = wb.create_sheet(SHEET_F104)
+    ws = _new_sheet(wb, SHEET_F104, streaming, retain_columns=(1, 2))
 
     _write_title(ws, "📑 DATOS F-104 · Declaraciones Mensuales de IVA")
 
@@ -740,7 +755,9 @@ def build_f104_sheet(wb: Workbook, f104_monthly: dict) -> dict[tuple[str, str],
 
 
 # ---------------- BALANCE MAPEADO ----------------
-def build_balance_sheet(wb: Workbook, balance: list[dict]) -> list[int]:
+def build_balance_sheet(
+    wb: Workbook, balance: list[dict], *, streaming: bool = False
+) -> list[int]:
     """Crea hoja DATOS BALANCE con TODAS las cuentas del balance mapeado.
 
     Returns:
@@ -749,9 +766,7 @@ def build_balance_sheet(wb: Workbook, balance: list[dict]) -> list[int]:
             original. Permite a A1 generar fórmulas tipo
             ='DATOS BALANCE'!D<row_idx>.
     """
-    if SHEET_BALANCE in wb.sheetnames:
-        del wb[SHEET_BALANCE]
-    ws = wb.create_sheet(SHEET_BALANCE)
+    ws = _new_sheet(wb, SHEET_BALANCE, streaming, retain_columns=(1, 2))
 
     _write_title(ws, "📊 DATOS BALANCE MAPEADO · Cuentas y saldos del cliente",
                  span_cols=5)
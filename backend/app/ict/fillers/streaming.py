@@ -0,0 +1,280 @@
+"""Hojas en streaming para el ICT: escribir DATOS/TRAZABILIDAD sin tenerlas en RAM.
+
+openpyxl materializa un objeto ``Cell`` (más su ``StyleArray``) por cada
+celda escrita, y los conserva hasta el ``save()``. Las hojas que genera
+AuditBrain —DATOS F-101 (888 casilleros + CUADRE), DATOS F-103/F-104
+(pivots mensuales), DATOS BALANCE (todas las cuentas del cliente) y
+TRAZABILIDAD (una fila por escritura de los fillers)— son las más grandes del
+libro y vivían enteras en memoria desde que se construían hasta el final de
+``generate_excel``.
+
+``StreamingWorksheet`` es una ``Worksheet`` normal del libro (mismo nombre,
+misma posición, ``sheet_state``, anchos, merges, freeze panes y autofiltro),
+pero sus celdas solo viven en una ventana de ``WINDOW_ROWS`` filas: en cuanto
+el builder avanza, las filas anteriores se serializan a un archivo temporal
+con el MISMO escritor de celdas de openpyxl (``write_cell``), usando las
+tablas de estilos del libro plantilla. Al guardar, ``save_workbook`` escribe
+la hoja de siempre (propiedades, vistas, columnas, merges, hipervínculos…)
+e inserta ese ``<sheetData>`` ya serializado dentro del paquete. El XML que
+resulta es el mismo que habría escrito openpyxl con la hoja en memoria.
+
+Reglas para el builder que escribe en una hoja en streaming:
+
+- Escribir por filas crecientes. Volver a una fila más vieja que la ventana
+  lanza ``RuntimeError`` (nunca se pierde un dato en silencio).
+- Releer filas ya volcadas solo es posible en ``retain_columns``: se guarda
+  el valor de esas columnas (no el objeto celda) para las verificaciones que
+  recorren la hoja después (conteos de VERIFICACIÓN A1, control de nombres
+  vacíos).
+- El libro se guarda con ``save_workbook`` de este módulo, no con
+  ``wb.save``: openpyxl por sí solo escribiría la hoja vacía.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import datetime
+from collections import defaultdict, namedtuple
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from openpyxl.cell._writer import write_cell
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._writer import ALL_TEMP_FILES, WorksheetWriter, create_temporary_file
+from openpyxl.worksheet.hyperlink import Hyperlink
+from openpyxl.worksheet.worksheet import Worksheet
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.xml.functions import xmlfile
+
+# Filas que se mantienen como objetos Cell antes de volcarlas. Los builders
+# vuelven como mucho 2-3 filas atrás (tarjetas KPI de TRAZABILIDAD, merges
+# de títulos); el margen sobra y el costo es constante.
+WINDOW_ROWS = 32
+
+_EMPTY_SHEET_DATA = re.compile(rb"<sheetData\s*/>|<sheetData>\s*</sheetData>")
+
+RetainedCell = namedtuple("RetainedCell", ["value"])
+
+
+class StreamingWorksheet(Worksheet):
+    """Worksheet cuyas filas se vuelcan a disco a medida que se escriben."""
+
+    def __init__(self, parent, title=None, retain_columns=()):
+        super().__init__(parent, title)
+        self._rows_path = create_temporary_file(suffix=".sheetData.xml")
+        self._rows = self._row_writer()
+        next(self._rows)
+        self._flushed_upto = 0
+        self._highest_row = 0
+        self._bounds = None  # (min_row, min_col, max_row, max_col) de lo volcado
+        self._links: list[tuple] = []
+        self._retained = {col: {} for col in retain_columns}
+        self._finished = False
+
+    # ---- Acceso a celdas -------------------------------------------------
+
+    def cell(self, row, column, value=None):
+        if 0 < row <= self._flushed_upto and value is None and column in self._retained:
+            return RetainedCell(self._retained[column].get(row))
+        return super().cell(row, column, value)
+
+    def _get_cell(self, row, column):
+        if self._finished:
+            raise RuntimeError(f"La hoja '{self.title}' ya se cerró; no admite más escrituras.")
+        if row <= self._flushed_upto:
+            raise RuntimeError(
+                f"Hoja en streaming '{self.title}': la fila {row} ya se volcó a disco "
+                f"(ventana de {WINDOW_ROWS} filas). Escribir en orden de filas."
+            )
+        if row > self._highest_row:
+            self._highest_row = row
+            if row - WINDOW_ROWS > self._flushed_upto:
+                self._flush(row - WINDOW_ROWS)
+        return super()._get_cell(row, column)
+
+    @property
+    def max_row(self):
+        flushed = self._bounds[2] if self._bounds else 1
+        return max(flushed, super().max_row)
+
+    @property
+    def max_column(self):
+        flushed = self._bounds[3] if self._bounds else 1
+        return max(flushed, super().max_column)
+
+    def calculate_dimension(self):
+        if self._bounds is None:
+            return super().calculate_dimension()
+        min_row, min_col, max_row, max_col = self._bounds
+        return f"{get_column_letter(min_col)}{min_row}:{get_column_letter(max_col)}{max_row}"
+
+    # ---- Volcado ---------------------------------------------------------
+
+    def _row_writer(self):
+        with xmlfile(self._rows_path) as xf:
+            with xf.element("sheetData"):
+                try:
+                    while True:
+                        row_idx, cells = yield
+                        self._write_row(xf, row_idx, cells)
+                except GeneratorExit:
+                    pass
+
+    def _write_row(self, xf, row_idx, cells):
+        # Igual que WorksheetWriter.write_row, celda por celda.
+        attrs = {"r": f"{row_idx}"}
+        attrs.update(self.row_dimensions.get(row_idx, {}))
+        with xf.element("row", attrs):
+            for cell in cells:
+                if cell._comment is not None:
+                    raise TypeError(
+                        f"Hoja en streaming '{self.title}': comentarios de celda no soportados."
+                    )
+                if cell._value is None and not cell.has_style:
+                    continue
+                write_cell(xf, self, cell, cell.has_style)
+        for link in self._hyperlinks:
+            self._links.append((link.ref, link.location, link.tooltip, link.display, link.target))
+        self._hyperlinks = []
+
+    def _flush(self, upto: int) -> None:
+        rows = defaultdict(list)
+        for key in [k for k in self._cells if k[0] <= upto]:
+            rows[key[0]].append(self._cells.pop(key))
+        for row_idx in [r for r in self.row_dimensions if r <= upto]:
+            rows.setdefault(row_idx, [])
+
+        for row_idx in sorted(rows):
+            if row_idx <= self._flushed_upto:
+                raise RuntimeError(
+                    f"Hoja en streaming '{self.title}': la fila {row_idx} se modificó "
+                    "después de volcarse a disco."
+                )
+            cells = sorted(rows[row_idx], key=lambda c: c.column)
+            for cell in cells:
+                self._track(row_idx, cell)
+            self._rows.send((row_idx, cells))
+            self.row_dimensions.pop(row_idx, None)
+        self._flushed_upto = max(self._flushed_upto, upto)
+
+    def _track(self, row_idx, cell):
+        col = cell.column
+        if col in self._retained and cell.value is not None:
+            self._retained[col][row_idx] = cell.value
+        if self._bounds is None:
+            self._bounds = (row_idx, col, row_idx, col)
+        else:
+            min_row, min_col, max_row, max_col = self._bounds
+            self._bounds = (min(min_row, row_idx), min(min_col, col),
+                            max(max_row, row_idx), max(max_col, col))
+
+    def finish(self) -> None:
+        """Vuelca las filas pendientes y cierra el ``<sheetData>``. Idempotente."""
+        if self._finished:
+            return
+        pending = [k[0] for k in self._cells] + list(self.row_dimensions)
+        if pending:
+            self._flush(max(pending))
+        self._rows.close()
+        self._finished = True
+
+    @property
+    def rows_path(self) -> str:
+        """Archivo con el ``<sheetData>`` volcado (completo después de ``finish``)."""
+        return self._rows_path
+
+    def replace_rows(self, write, bounds) -> None:
+        """Usa como ``<sheetData>`` el XML que ``write(archivo)`` escribe, ya
+        serializado (p. ej. filas guardadas de una generación anterior).
+
+        ``bounds`` es (min_row, min_col, max_row, max_col) de ese XML, para la
+        dimensión de la hoja. Los ``s="…"`` del XML deben ser ids de estilo de
+        ESTE libro. La hoja no debe tener celdas escritas y queda cerrada.
+        """
+        if self._cells or self._flushed_upto or self._finished:
+            raise RuntimeError(f"La hoja '{self.title}' ya tiene filas; no se pueden reemplazar.")
+        self._rows.close()
+        with open(self._rows_path, "wb") as dest:
+            write(dest)
+        self._bounds = tuple(bounds)
+        self._flushed_upto = self._highest_row = bounds[2]
+        self._finished = True
+
+    def hyperlinks(self) -> list[Hyperlink]:
+        return [
+            Hyperlink(ref=ref, location=location, tooltip=tooltip, display=display, target=target)
+            for ref, location, tooltip, display, target in self._links
+        ]
+
+    def discard(self) -> None:
+        """Borra el archivo temporal con las filas volcadas."""
+        self._rows.close()
+        try:
+            os.remove(self._rows_path)
+        except OSError:
+            pass
+        if self._rows_path in ALL_TEMP_FILES:
+            ALL_TEMP_FILES.remove(self._rows_path)
+
+
+def create_streaming_sheet(wb, title: str, retain_columns=()) -> StreamingWorksheet:
+    """Agrega al final de ``wb`` una hoja en streaming (como ``wb.create_sheet``)."""
+    ws = StreamingWorksheet(parent=wb, title=title, retain_columns=retain_columns)
+    wb._add_sheet(ws)
+    return ws
+
+
+def discard_streaming_sheets(wb) -> None:
+    """Libera los temporales de todas las hojas en streaming de ``wb``."""
+    for ws in wb.worksheets:
+        if isinstance(ws, StreamingWorksheet):
+            ws.discard()
+
+
+class _StreamingExcelWriter(ExcelWriter):
+    """ExcelWriter que inserta el ``<sheetData>`` volcado de cada hoja en
+    streaming dentro del XML que openpyxl genera para esa hoja."""
+
+    def write_worksheet(self, ws):
+        if not isinstance(ws, StreamingWorksheet):
+            return super().write_worksheet(ws)
+
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        ws.finish()
+
+        from io import BytesIO
+
+        writer = WorksheetWriter(ws, out=BytesIO())
+        writer.write_top()
+        writer.write_rows()  # sin celdas en memoria: <sheetData/> vacío
+        ws._hyperlinks = ws.hyperlinks()
+        writer.write_tail()
+        ws._hyperlinks = []
+        skeleton = writer.read()
+
+        match = _EMPTY_SHEET_DATA.search(skeleton)
+        if match is None:  # pragma: no cover - depende del escritor XML de openpyxl
+            raise RuntimeError(f"No se encontró <sheetData> en la hoja '{ws.title}'.")
+        with self._archive.open(ws.path[1:], "w") as dest:
+            dest.write(skeleton[: match.start()])
+            with open(ws._rows_path, "rb") as src:
+                shutil.copyfileobj(src, dest, 1024 * 1024)
+            dest.write(skeleton[match.end():])
+
+        ws._rels = writer._rels
+        self.manifest.append(ws)
+
+
+def save_workbook(wb, target) -> None:
+    """Equivalente a ``wb.save(target)`` que sabe escribir hojas en streaming.
+
+    Con un libro sin hojas en streaming el resultado es el mismo que el de
+    openpyxl. Se puede llamar más de una vez sobre el mismo libro.
+    """
+    archive = ZipFile(target, "w", ZIP_DEFLATED, allowZip64=True)
+    wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    _StreamingExcelWriter(wb, archive).save()
@@ -0,0 +1,152 @@
+"""Plantilla SRI ya parseada: cada generación recibe una copia propia y barata.
+
+``load_template`` hacía ``load_workbook(ict_2025_template.xlsx)`` en cada
+``generate_excel``: descomprimir el paquete, parsear el XML de las 10 hojas
+(~9.000 celdas con fórmulas y estilos), los estilos y los links externos;
+unos 350 ms, siempre para producir el mismo ``Workbook``.
+
+Ahora la plantilla se parsea una vez y se guarda como snapshot: el pickle del
+``Workbook`` recién cargado. Cada generación obtiene su copia con
+``pickle.loads`` (~20 ms), un objeto independiente: lo que los fillers
+escriban en él nunca llega al snapshot ni a otra generación.
+
+- En memoria: los bytes del snapshot, por proceso.
+- En disco: ``<AUD_OF_TMP_DIR>/_template_cache/<clave>.pkl``. La generación
+  corre en un proceso hijo nuevo cada vez (``ICT_GENERATION_WORKER_MAX_JOBS``
+  = 1), así que sin este nivel cada hijo volvería a parsear la plantilla. El
+  primero que la parsea después de un deploy escribe el snapshot; el
+  directorio lo escribe solo AuditBrain.
+- Clave: sha256 del archivo de plantilla + versión de openpyxl + versión
+  del formato. Reemplazar la plantilla (o actualizar openpyxl) invalida el
+  snapshot; en memoria se revisa tamaño y fecha de modificación en cada
+  llamada para no re-hashear.
+
+La copia guarda igual que la plantilla recién cargada (mismos valores,
+fórmulas, estilos, merges y links). Solo puede cambiar la numeración de los
+estilos repetidos dentro de ``styles.xml``.
+
+``ICT_TEMPLATE_CACHE=0`` vuelve a ``load_workbook`` en cada generación.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import uuid
+from pathlib import Path
+
+import openpyxl
+from openpyxl import Workbook, load_workbook
+
+log = logging.getLogger(__name__)
+
+CACHE_DIRNAME = "_template_cache"
+FORMAT = 1
+
+_lock = threading.Lock()
+# {ruta: ((tamaño, mtime_ns), bytes del snapshot)}
+_snapshots: dict[str, tuple[tuple[int, int], bytes]] = {}
+
+
+def enabled() -> bool:
+    return os.getenv("ICT_TEMPLATE_CACHE", "1").strip().lower() not in {"0", "false", "no"}
+
+
+def _parse(path: Path) -> Workbook:
+    return load_workbook(path, data_only=False, keep_links=True)
+
+
+def _cache_dir() -> Path:
+    from backend.app.core.config import settings
+
+    return settings.aud_of_tmp_dir_path / CACHE_DIRNAME
+
+
+def _key(path: Path) -> str:
+    digest = hashlib.sha256(f"{FORMAT}\0{openpyxl.__version__}\0".encode("utf-8"))
+    digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _read_snapshot(entry: Path) -> bytes | None:
+    try:
+        return entry.read_bytes()
+    except OSError:
+        return None
+
+
+def _write_snapshot(entry: Path, data: bytes) -> None:
+    tmp = entry.with_name(f".{entry.name}.{uuid.uuid4().hex}")
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(data)
+        os.replace(tmp, entry)
+    except OSError:
+        log.warning("no se pudo guardar el snapshot de la plantilla ICT", exc_info=True)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _copy(data: bytes) -> Workbook:
+    wb = pickle.loads(data)
+    # Las DimensionHolder son defaultdict: pickle no conserva su
+    # default_factory ni su hoja, y ``ws.row_dimensions[n]`` de una fila sin
+    # dimensión lanzaría KeyError. Se vuelven a atar como en Worksheet._setup.
+    for ws in wb.worksheets:
+        if not hasattr(ws, "row_dimensions"):  # Chartsheet
+            continue
+        for holder, factory in ((ws.row_dimensions, ws._add_row),
+                                (ws.column_dimensions, ws._add_column)):
+            holder.worksheet = ws
+            holder.default_factory = factory
+    return wb
+
+
+def _entry(path: Path) -> Path:
+    return _cache_dir() / f"{_key(path)}.pkl"
+
+
+def _snapshot(path: Path) -> bytes:
+    stat = path.stat()
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    cached = _snapshots.get(str(path))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    entry = _entry(path)
+    data = _read_snapshot(entry)
+    if data is None:
+        data = pickle.dumps(_parse(path), protocol=pickle.HIGHEST_PROTOCOL)
+        _write_snapshot(entry, data)
+    _snapshots[str(path)] = (stamp, data)
+    return data
+
+
+def load(path: Path) -> Workbook:
+    """Copia independiente del ``Workbook`` de ``path``."""
+    if not enabled():
+        return _parse(path)
+    with _lock:
+        data = _snapshot(path)
+    try:
+        return _copy(data)
+    except Exception:  # noqa: BLE001 - snapshot corrupto o de otro Python
+        log.warning("snapshot ilegible de la plantilla %s", path, exc_info=True)
+    with _lock:
+        _snapshots.pop(str(path), None)
+        try:
+            _entry(path).unlink()
+        except OSError:
+            pass
+    return _parse(path)
+
+
+def clear() -> None:
+    """Olvida los snapshots en memoria de este proceso (los de disco quedan)."""
+    with _lock:
+        _snapshots.clear()
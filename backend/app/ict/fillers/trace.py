@@ -0,0 +1,117 @@
+"""Trace log de los fillers ICT en columnas, para la hoja TRAZABILIDAD.
+
+Cada ``safe_set``/``safe_set_formula`` (también las omitidas) agregaba un
+dict de 7 claves a una lista: con los 888 casilleros del F-101 y las grillas
+mensuales de F-103/F-104, decenas de miles de dicts vivos hasta el final de
+``generate_excel``, casi todos repitiendo los mismos strings (anexo, hoja,
+origen, estado).
+
+``TraceLog`` guarda lo mismo en columnas:
+
+- anexo, casillero, hoja, celda, origen y estado como ids de una tabla de
+  strings internados (``array('I')``, 4 bytes por campo);
+- el valor escrito tal cual, en una lista (es el mismo objeto que quedó en
+  la celda).
+
+Las búsquedas por hoja+celda (``at``) y por casillero (``for_casillero``)
+usan índices que se construyen la primera vez que se consultan y se
+extienden con las entradas nuevas. ``rows`` entrega tuplas en el orden de la
+hoja TRAZABILIDAD sin armar un dict por entrada; iterar el log sigue
+devolviendo dicts con las claves de siempre.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from collections.abc import Iterator
+
+FIELDS = ("anexo", "casillero", "sheet", "cell", "valor", "origen", "status")
+
+
+class TraceLog:
+    """Entradas del trace de una generación, en columnas."""
+
+    def __init__(self) -> None:
+        self._strings: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._anexo = array("I")
+        self._casillero = array("I")
+        self._sheet = array("I")
+        self._cell = array("I")
+        self._origen = array("I")
+        self._status = array("I")
+        self._valores: list = []
+        self._by_cell: dict[tuple[int, int], list[int]] = {}
+        self._by_casillero: dict[int, list[int]] = {}
+        self._indexed = 0
+
+    def _intern(self, text: str) -> int:
+        key = self._ids.get(text)
+        if key is None:
+            key = self._ids[text] = len(self._strings)
+            self._strings.append(text)
+        return key
+
+    def append(self, anexo: str, casillero: str, sheet: str, cell: str,
+               valor, origen: str, status: str) -> None:
+        intern = self._intern
+        self._anexo.append(intern(anexo))
+        self._casillero.append(intern(casillero))
+        self._sheet.append(intern(sheet))
+        self._cell.append(intern(cell))
+        self._origen.append(intern(origen))
+        self._status.append(intern(status))
+        self._valores.append(valor)
+
+    def __len__(self) -> int:
+        return len(self._valores)
+
+    def row(self, i: int) -> tuple:
+        """(anexo, casillero, sheet, cell, valor, origen, status) de la entrada ``i``."""
+        s = self._strings
+        return (s[self._anexo[i]], s[self._casillero[i]], s[self._sheet[i]],
+                s[self._cell[i]], self._valores[i], s[self._origen[i]], s[self._status[i]])
+
+    def __getitem__(self, i: int) -> dict:
+        return dict(zip(FIELDS, self.row(range(len(self))[i])))
+
+    def __iter__(self) -> Iterator[dict]:
+        return (dict(zip(FIELDS, self.row(i))) for i in range(len(self)))
+
+    def sorted_order(self) -> list[int]:
+        """Posiciones ordenadas por (anexo, hoja, celda); estable como ``sorted``."""
+        s = self._strings
+        return sorted(range(len(self)), key=lambda i: (
+            s[self._anexo[i]], s[self._sheet[i]], s[self._cell[i]]))
+
+    def rows(self, order: list[int] | None = None) -> Iterator[tuple]:
+        """Tuplas de ``row`` en el orden dado (por defecto, el de inserción)."""
+        return (self.row(i) for i in (range(len(self)) if order is None else order))
+
+    def count(self, status: str) -> int:
+        key = self._ids.get(status)
+        return 0 if key is None else self._status.count(key)
+
+    def written_by_anexo(self) -> Counter:
+        """Escrituras exitosas por anexo."""
+        written = self._ids.get("written")
+        return Counter(self._strings[a] for a, st in zip(self._anexo, self._status)
+                       if st == written)
+
+    def _index(self) -> None:
+        for i in range(self._indexed, len(self)):
+            self._by_cell.setdefault((self._sheet[i], self._cell[i]), []).append(i)
+            self._by_casillero.setdefault(self._casillero[i], []).append(i)
+        self._indexed = len(self)
+
+    def at(self, sheet: str, cell: str) -> list[dict]:
+        """Entradas (en orden) que apuntaron a ``sheet!cell``."""
+        self._index()
+        key = (self._ids.get(sheet), self._ids.get(cell))
+        return [self[i] for i in self._by_cell.get(key, ())]
+
+    def for_casillero(self, casillero: str) -> list[dict]:
+        """Entradas (en orden) del casillero SRI ``casillero``."""
+        self._index()
+        return [self[i] for i in self._by_casillero.get(self._ids.get(str(casillero)), ())]
@@ -23,6 +23,8 @@ from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.table import Table, TableStyleInfo
 
 from backend.app.ict.cell_maps.a1 import A1_CASILLEROS_ORDERED, A1_SHEET
+from backend.app.ict.fillers.cell_index import CellIndex
+from backend.app.ict.fillers.trace import TraceLog
 
 
 SHEET_NAME = "VERIFICACIÓN A1"
@@ -578,6 +580,7 @@ def _build_validacion_cobertura(
     balance_mapeado: list[dict],
     balance_cuentas_sin_saldo: list[dict],
     workbook: Workbook,
+    index: CellIndex | None = None,
 ) -> int:
     """Renderiza sección "🔒 VALIDACIÓN DE COBERTURA" — pedido cliente 2026-06-07:
     "verificar que del formulario 101 llegue toda la información a DATOS F-101
@@ -588,7 +591,13 @@ def _build_validacion_cobertura(
       - Cuántas cuentas del balance se parsearon vs cuántas en DATOS BALANCE
       - Cuántas cuentas tienen problemas (sin cas, sin saldo, etc.)
       - Estado global: ✓ OK / ⚠ REVISAR / ✗ PÉRDIDA DE DATOS
+
+    ``index`` es el ``CellIndex`` de la generación (se construye desde
+    ``workbook`` si no se pasa): las hojas DATOS se recorren una sola vez.
     """
+    if index is None:
+        index = CellIndex.from_workbook(workbook)
+
     # ============================================================
     # 1. Conteos del PARSER (lo que se extrajo de los archivos fuente)
     # ============================================================
@@ -601,42 +610,19 @@ def _build_validacion_cobertura(
     # ============================================================
     # 2. Conteos del EXCEL GENERADO (lo que llegó a las hojas)
     # ============================================================
-    f101_cas_excel = 0
-    if "DATOS F-101" in workbook.sheetnames:
-        ws_f101 = workbook["DATOS F-101"]
-        for r in range(4, ws_f101.max_row + 1):
-            cas = str(ws_f101.cell(r, 1).value or "").strip()
-            if cas.isdigit():
-                f101_cas_excel += 1
-
-    balance_cuentas_excel = 0
-    if "DATOS BALANCE" in workbook.sheetnames:
-        ws_bal = workbook["DATOS BALANCE"]
-        # Las filas con cuenta son las que tienen valor en col A (cas) o B (código)
-        for r in range(4, ws_bal.max_row + 1):
-            a = str(ws_bal.cell(r, 1).value or "").strip()
-            b = str(ws_bal.cell(r, 2).value or "").strip()
-            # Excluir filas del bloque "CUADRE POR CASILLERO" (titulares como TOTAL)
-            if "🔍" in a or "TOTAL" == a or "Casillero" in a:
-                break  # llegamos al bloque cuadre, terminamos
-            if a.isdigit() or b:
-                balance_cuentas_excel += 1
+    f101_cas_en_excel = index.f101_casilleros
+    f101_cas_excel = len(f101_cas_en_excel)
+    balance_cuentas_excel = index.balance_cuentas
 
     # ============================================================
     # 3. Cas declarados en F-101 con valor pero NO en DATOS F-101
     # ============================================================
     f101_perdidos = []
     if "DATOS F-101" in workbook.sheetnames:
-        cas_en_excel = set()
-        ws_f101 = workbook["DATOS F-101"]
-        for r in range(4, ws_f101.max_row + 1):
-            cas = str(ws_f101.cell(r, 1).value or "").strip()
-            if cas.isdigit():
-                cas_en_excel.add(cas)
         for cas, v in f101.items():
             if v in (None, 0, 0.0):
                 continue
-            if cas not in cas_en_excel:
+            if cas not in f101_cas_en_excel:
                 f101_perdidos.append({"cas": cas, "valor": v})
 
     # ============================================================
@@ -800,7 +786,7 @@ def build_verification_sheet(
     f104_monthly: dict | None = None,
     f101_lookup: dict[str, int] | None = None,
     balance_lookup: list[int] | None = None,
-    trace_log: list[dict] | None = None,
+    trace_log: TraceLog | None = None,
     balance_cuentas_sin_saldo: list[dict] | None = None,
 ) -> None:
     """Hoja VERIFICACION A1 - resumen ejecutivo en 4 recuadros (rediseno
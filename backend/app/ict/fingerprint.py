@@ -0,0 +1,200 @@
+"""Huella de las entradas de una sesión ICT: ``/process`` sin cambios no rehace nada.
+
+``POST /sessions/{id}/process`` re-parseaba todos los archivos guardados y
+volvía a correr ``generate_excel`` completo (plantilla, DATOS, fillers,
+interpretación IA) aunque el cliente solo hubiera vuelto a pulsar
+"Procesar". Ahora, cuando termina una generación, se guarda junto a los
+Excel de ``_output/`` la huella de todo lo que los produjo y el reporte que
+devolvió ``process_session``:
+
+- ``archivos``: sha256 de cada archivo subido (``<anexo>/<slot>/<nombre>``).
+  Se recalcula solo si cambió el tamaño o la fecha de modificación.
+- ``contribuyente``: RUC, razón social, ejercicio y número de adhesivo.
+- ``plantilla``: sha256 de la plantilla SRI.
+- ``versiones``: versión de cada parser de slot y del generador
+  (``parse_cache.module_version``: el código del módulo y de lo que importa).
+- ``datos``: hash de ``extracted_data`` y ``uploaded_files`` de cada anexo
+  (los campos cargados a mano no vienen de ningún archivo).
+
+Si la huella actual es igual a la guardada y los Excel siguen en disco,
+``/process`` devuelve el reporte guardado. Si difiere, se procesa como
+siempre y la respuesta dice qué entradas cambiaron (``changed_inputs``).
+La interpretación IA del papel de trabajo es la de la generación guardada.
+
+``ICT_PROCESS_FINGERPRINT=0`` desactiva el atajo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from backend.app.services.parse_cache import module_version, parser_version
+
+log = logging.getLogger(__name__)
+
+FINGERPRINT_FILENAME = "fingerprint.json"
+OUTPUT_DIRNAME = "_output"
+OUTPUT_FILES = ("ICT_SRI.xlsx", "ICT_PAPEL_TRABAJO.xlsx")
+GENERATOR_MODULE = "backend.app.ict.service"
+
+
+def enabled() -> bool:
+    return os.getenv("ICT_PROCESS_FINGERPRINT", "1").strip().lower() not in {"0", "false", "no"}
+
+
+def _session_root(session_id: int) -> Path:
+    from backend.app.aud.obligaciones_fiscales import file_storage
+
+    return file_storage._root() / "ict" / f"{session_id}"
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for bloque in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def _json_hash(value) -> str:
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def _file_hashes(root: Path, previous: dict) -> dict[str, list]:
+    """{"A1/f101/f101.pdf": [tamaño, mtime_ns, sha256]} de los archivos subidos.
+
+    Si tamaño y mtime coinciden con la huella anterior se reutiliza su sha256.
+    """
+    hashes: dict[str, list] = {}
+    if not root.exists():
+        return hashes
+    for path in sorted(root.rglob("*")):
+        rel = path.relative_to(root)
+        if rel.parts[0] == OUTPUT_DIRNAME or not path.is_file():
+            continue
+        key = rel.as_posix()
+        stat = path.stat()
+        before = previous.get(key)
+        if before and before[:2] == [stat.st_size, stat.st_mtime_ns]:
+            hashes[key] = before
+        else:
+            hashes[key] = [stat.st_size, stat.st_mtime_ns, _sha256(path)]
+    return hashes
+
+
+def _template_hash() -> str:
+    from backend.app.ict.fillers.base import TEMPLATE_PATH
+
+    try:
+        stat = TEMPLATE_PATH.stat()
+    except OSError:
+        return "missing"
+    return _template_hash_at(str(TEMPLATE_PATH), stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=4)
+def _template_hash_at(path: str, size: int, mtime_ns: int) -> str:
+    return _sha256(Path(path))
+
+
+def _versions() -> dict[str, str]:
+    from backend.app.ict.router import SLOT_PARSERS
+
+    versions = {f"parser:{slot}": parser_version(p) for slot, p in SLOT_PARSERS.items()}
+    versions["generador"] = module_version(GENERATOR_MODULE)
+    return versions
+
+
+def compute(session, previous: dict | None = None) -> dict:
+    """Huella actual de la sesión. ``previous`` evita re-hashear archivos sin cambios."""
+    previous_files = (previous or {}).get("archivos", {})
+    return {
+        "archivos": _file_hashes(_session_root(session.id), previous_files),
+        "contribuyente": {
+            "ruc": session.ruc,
+            "razon_social": session.razon_social,
+            "ejercicio_fiscal": session.ejercicio_fiscal,
+            "numero_adhesivo": session.numero_adhesivo or "",
+        },
+        "plantilla": _template_hash(),
+        "versiones": _versions(),
+        "datos": {
+            a.anexo_code: _json_hash({
+                "extracted_data": a.extracted_data or {},
+                "uploaded_files": a.uploaded_files or {},
+            })
+            for a in session.anexos
+        },
+    }
+
+
+def _comparable(fingerprint: dict) -> dict:
+    # El tamaño y el mtime solo sirven para no re-hashear: se compara el contenido.
+    return {
+        **fingerprint,
+        "archivos": {k: v[2] for k, v in fingerprint.get("archivos", {}).items()},
+    }
+
+
+def changed_inputs(previous: dict | None, current: dict) -> list[str]:
+    """Qué entradas difieren entre dos huellas, p. ej. ``["archivo A2/f104/enero.pdf",
+    "contribuyente razon_social", "versión parser:f101"]``."""
+    if not previous:
+        return ["sin procesamiento anterior"]
+    before, now = _comparable(previous), _comparable(current)
+    changes: list[str] = []
+    for section, label in (("archivos", "archivo"), ("contribuyente", "contribuyente"),
+                           ("versiones", "versión"), ("datos", "datos del anexo")):
+        a, b = before.get(section, {}), now.get(section, {})
+        changes += [f"{label} {k}" for k in sorted(set(a) | set(b)) if a.get(k) != b.get(k)]
+    if before.get("plantilla") != now.get("plantilla"):
+        changes.append("plantilla")
+    return changes
+
+
+def load(session_id: int) -> dict | None:
+    """``{"fingerprint": ..., "report": ...}`` guardado por la última generación."""
+    path = _session_root(session_id) / OUTPUT_DIRNAME / FINGERPRINT_FILENAME
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def outputs_ready(session_id: int) -> bool:
+    out_dir = _session_root(session_id) / OUTPUT_DIRNAME
+    return all((out_dir / name).exists() for name in OUTPUT_FILES)
+
+
+def is_fresh(stored: dict | None, current: dict, session_id: int) -> bool:
+    return (
+        stored is not None
+        and _comparable(stored.get("fingerprint", {})) == _comparable(current)
+        and outputs_ready(session_id)
+    )
+
+
+def store(session_id: int, fingerprint: dict, report: dict) -> None:
+    out_dir = _session_root(session_id) / OUTPUT_DIRNAME
+    path = out_dir / FINGERPRINT_FILENAME
+    tmp = path.with_name(f".{FINGERPRINT_FILENAME}.{os.getpid()}")
+    try:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps({"fingerprint": fingerprint, "report": report},
+                                  ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        log.warning("no se pudo guardar la huella de la sesión ICT %s", session_id, exc_info=True)
+
+
+def invalidate(session_id: int) -> None:
+    try:
+        (_session_root(session_id) / OUTPUT_DIRNAME / FINGERPRINT_FILENAME).unlink()
+    except OSError:
+        pass
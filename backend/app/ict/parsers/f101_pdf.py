@@ -5,17 +5,17 @@ Reuses regex helpers from obligaciones_fiscales for casillero extraction.
 
 from __future__ import annotations
 
-from io import BytesIO
+import re
 
-import pdfplumber
-
-from backend.app.aud.obligaciones_fiscales.cedulas.base import find_periodo
+from backend.app.aud.obligaciones_fiscales.cedulas.base import _MES_ES_TO_NUM, find_periodo
+from backend.app.ict.parsers.pdf_pages import PageTargets, digit_runs, extract_text, squeeze
 # Usamos la versión ROBUSTA de find_casillero_value que sabe lidiar con el
 # ruido de columnas del PDF SRI (líneas tipo "550 0.00 0.00 1234.56" donde
 # 1234.56 es la columna del año actual). La versión simple en cedulas/base.py
 # fallaba en los casilleros TOTAL (550, 589, 698) cuyas líneas tienen varios
 # 0.00 antes del valor real.
 from backend.app.tax.planificacion_utilidades.parsers.sri_text import (
+    find_casillero_line_value,
     find_casillero_value,
 )
 
@@ -112,11 +112,72 @@ ALL_F101_CASILLEROS: list[str] = [
 ]
 
 
+# Las tres formas de período de find_periodo, sin espacios y sin exigir el
+# mes/año exactos: si el texto rápido de una página no las cumple, la página
+# no puede contener una coincidencia de find_periodo.
+_PERIODO_LOOSE = (
+    re.compile(r"odofiscal", re.IGNORECASE),
+    re.compile(r"mes:*\d{1,3}a.o", re.IGNORECASE),
+    re.compile(r"\d/20\d\d"),
+)
+_PERIODO_FISCAL = re.compile(r"Per[ií]odo\s+Fiscal[:\s]+([A-ZÁÉÍÓÚÑ]+)\s+(20\d{2})", re.IGNORECASE)
+_PERIODO_MES_ANIO = re.compile(r"Mes[:\s]*0?(\d{1,2})\s*A[ñn]o[:\s]*(\d{4})", re.IGNORECASE)
+
+
+class _F101Targets(PageTargets):
+    """Paso 1 de find_casillero_value (la primera línea que termina en el
+    importe del casillero) hecho página a página, más el período.
+
+    El período queda decidido cuando ninguna página posterior puede cambiar
+    el resultado de find_periodo: "Período Fiscal" con un mes válido, o uno
+    con mes inválido seguido de un "Mes: MM Año: AAAA".
+    """
+
+    def __init__(self) -> None:
+        self.values: dict[str, float] = {}
+        self._open = set(ALL_F101_CASILLEROS)
+        self._text: list[str] = []
+        self._periodo_decidido = False
+
+    def feed(self, page_text: str) -> None:
+        for line in page_text.split("\n"):
+            for num in self._open & digit_runs(line):
+                v = find_casillero_line_value(line, num)
+                if v is not None:
+                    self.values[num] = v
+                    self._open.discard(num)
+        self._text.append(page_text)
+        if not self._periodo_decidido:
+            text = "\n".join(self._text)
+            m = _PERIODO_FISCAL.search(text)
+            if m:
+                self._periodo_decidido = m.group(1).upper() in _MES_ES_TO_NUM or bool(
+                    _PERIODO_MES_ANIO.search(text)
+                )
+
+    def open_codes(self) -> set[str]:
+        return self._open
+
+    def fields_may_match(self, quick_text: str) -> bool:
+        if self._periodo_decidido:
+            return False
+        compact = squeeze(quick_text)
+        return any(p.search(compact) for p in _PERIODO_LOOSE)
+
+    def done(self) -> bool:
+        return self._periodo_decidido and not self._open
+
+
 def parse_f101(pdf_bytes: bytes) -> dict:
-    """Read F-101 PDF and return {'periodo': str|None, 'casilleros': {num: float}, 'errores': []}."""
+    """Read F-101 PDF and return {'periodo': str|None, 'casilleros': {num: float}, 'errores': []}.
+
+    Solo se extrae el texto de las páginas que pueden aportar un casillero o
+    el período todavía pendientes (ver parsers/pdf_pages.py); el resultado es
+    el mismo que con el texto del documento completo.
+    """
+    targets = _F101Targets()
     try:
-        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-            text = "\n".join(p.extract_text() or "" for p in pdf.pages)
+        text = extract_text(pdf_bytes, targets)
     except Exception as e:  # noqa: BLE001
         return {"periodo": None, "casilleros": {}, "errores": [f"PDF inválido: {e}"]}
 
@@ -130,7 +191,10 @@ def parse_f101(pdf_bytes: bytes) -> dict:
     periodo = find_periodo(text)
     casilleros: dict[str, float] = {}
     for num in ALL_F101_CASILLEROS:
-        v = find_casillero_value(text, num)
+        # Los que no salieron por línea pasan por el fallback global.
+        v = targets.values.get(num)
+        if v is None and num in targets.open_codes():
+            v = find_casillero_value(text, num)
         if v is not None:
             casilleros[num] = v
 
@@ -23,10 +23,9 @@ y el parser de lista los agrega por mes.
 from __future__ import annotations
 
 import re
-from io import BytesIO
 from pathlib import Path
 
-import pdfplumber
+from backend.app.ict.parsers.pdf_pages import PageTargets, digit_runs, extract_text, squeeze
 
 # Casilleros principales a capturar (subset estable; el F-103 tiene ~200)
 # Ordenados por bloque.
@@ -396,6 +395,57 @@ def _extract_casilleros(text: str) -> dict[str, float]:
     return result
 
 
+_MONETARIO = r"(-?\d+(?:[.,]\d+)*)"
+_MARCADOR = "RETENCIONES EN LA FUENTE"
+_PERIODO_RE = re.compile(r"Per[íi]odo\s+Fiscal:\s*([A-Z]+)\s+(\d{4})", re.IGNORECASE)
+_RUC_RE = re.compile(r"Identificaci[óo]n:\s*(\d{10,13})")
+_RAZON_RE = re.compile(r"Raz[óo]n\s+Social:\s*([^\n]+)")
+
+
+class _F103Targets(PageTargets):
+    """Lo que parse_f103 busca, con su primera coincidencia: el marcador del
+    formulario, período, RUC, razón social y cada casillero. Una página sin
+    ninguno de ellos pendiente no se extrae (ver parsers/pdf_pages.py)."""
+
+    # Versiones sin espacios y tolerantes de cada campo de cabecera.
+    _LOOSE = {
+        "marcador": re.compile(r"RETENCIONESENLAFUENTE", re.IGNORECASE),
+        "periodo": re.compile(r"odofiscal:", re.IGNORECASE),
+        "ruc": re.compile(r"dentificaci.n:", re.IGNORECASE),
+        "razon": re.compile(r"nsocial:", re.IGNORECASE),
+    }
+
+    def __init__(self) -> None:
+        self._open = set(ALL_CASILLEROS)
+        self._fields = {
+            "marcador": lambda t: _MARCADOR in t.upper(),
+            "periodo": _PERIODO_RE.search,
+            "ruc": _RUC_RE.search,
+            "razon": _RAZON_RE.search,
+        }
+        self._pages: list[str] = []
+
+    def feed(self, page_text: str) -> None:
+        self._pages.append(page_text)
+        text = "\n".join(self._pages)
+        window = text[-(len(page_text) + 64):]
+        for cas in self._open & digit_runs(window):
+            if re.search(rf"\b{cas}\b\s+{_MONETARIO}", text):
+                self._open.discard(cas)
+        for name in [n for n, found in self._fields.items() if found(text)]:
+            del self._fields[name]
+
+    def open_codes(self) -> set[str]:
+        return self._open
+
+    def fields_may_match(self, quick_text: str) -> bool:
+        compact = squeeze(quick_text)
+        return any(self._LOOSE[name].search(compact) for name in self._fields)
+
+    def done(self) -> bool:
+        return not self._fields and not self._open
+
+
 def parse_f103(pdf_bytes: bytes) -> dict | None:
     """Parse a single F-103 PDF. Returns {'periodo', 'casilleros'} or None on error.
 
@@ -415,8 +465,7 @@ def parse_f103(pdf_bytes: bytes) -> dict | None:
         }
     """
     try:
-        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-            text = "\n".join((p.extract_text() or "") for p in pdf.pages)
+        text = extract_text(pdf_bytes, _F103Targets())
     except Exception:
         return None
 
@@ -430,8 +479,8 @@ def parse_f103(pdf_bytes: bytes) -> dict | None:
         return None
 
     # Razón social y RUC son útiles para validación cruzada con la sesión
-    ruc_match = re.search(r"Identificaci[óo]n:\s*(\d{10,13})", text)
-    razon_match = re.search(r"Raz[óo]n\s+Social:\s*([^\n]+)", text)
+    ruc_match = _RUC_RE.search(text)
+    razon_match = _RAZON_RE.search(text)
 
     return {
         "periodo": periodo,
@@ -449,14 +498,17 @@ def parse_all_f103(paths: list[Path]) -> tuple[dict[str, dict], list[str]]:
         monthly_data: {'YYYY-MM': {'casilleros': {...}, 'ruc': ..., 'razon_social': ...}}
         errors: list of human-readable error strings for files that failed
     """
+    from backend.app.ict.parsers.parallel import parse_paths
+
+    paths = list(paths)
     monthly: dict[str, dict] = {}
     errors: list[str] = []
 
-    for path in paths:
-        try:
-            data = parse_f103(path.read_bytes())
-        except Exception as e:
-            errors.append(f"{path.name}: {e}")
+    # Con PDF_PARSE_WORKERS > 1 los PDFs se parsean en paralelo; los
+    # resultados llegan en el orden de `paths` (ver parsers/parallel.py).
+    for path, (data, exc) in zip(paths, parse_paths(parse_f103, paths)):
+        if exc is not None:
+            errors.append(f"{path.name}: {exc}")
             continue
         if not data:
             errors.append(f"{path.name}: no se pudo extraer F-103 (¿formato inválido?)")
@@ -0,0 +1,89 @@
+"""Parseo de lotes de PDFs en paralelo (F-103/F-104 mensuales).
+
+pdfplumber es Python puro y CPU-bound: los 12 F-103 + 12 F-104 de un
+ejercicio se parseaban uno tras otro en un solo núcleo (casi un minuto),
+mientras el resto de núcleos de la instancia quedaba ocioso. Con
+``PDF_PARSE_WORKERS > 1`` los lotes se reparten en un pool de procesos
+acotado, creado para el lote y cerrado al terminarlo.
+
+El contrato no cambia respecto al bucle secuencial:
+
+- Los resultados vuelven EN EL ORDEN DE ENTRADA, así que las reglas de
+  período duplicado ("se mantiene el primero") dan lo mismo.
+- Cada archivo trae su propio resultado o su propia excepción
+  (``ParseOutcome``); el llamador decide, igual que antes, si la reporta
+  como error de ese archivo o la propaga.
+- Si un proceso hijo muere (p. ej. OOM con un PDF enorme), los archivos que
+  tenía pendientes se reportan como error propio, no tumban el lote.
+
+Con ``PDF_PARSE_WORKERS=1`` (default) no se crea ningún proceso: es el bucle
+de siempre. El parser tiene que ser una función de módulo (picklable). Cada
+archivo pasa por la caché de parseos (services/parse_cache.py): un PDF ya
+parseado con la misma versión del parser no se vuelve a abrir.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+from backend.app.core.config import env_int
+from backend.app.services.parse_cache import cached_parse
+
+
+PDF_PARSE_WORKERS = max(1, env_int("PDF_PARSE_WORKERS", 1))
+
+
+class ParseOutcome(NamedTuple):
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+def _read_and_parse(parser: Callable[[bytes], Any], path: Path) -> Any:
+    return cached_parse(parser, Path(path).read_bytes())
+
+
+def _run_one(fn: Callable, item: Any) -> ParseOutcome:
+    try:
+        return ParseOutcome(fn(item))
+    except Exception as exc:
+        return ParseOutcome(error=exc)
+
+
+def _run(fn: Callable, items: Sequence, workers: Optional[int]) -> list[ParseOutcome]:
+    workers = min(PDF_PARSE_WORKERS if workers is None else max(1, workers), len(items))
+    if workers <= 1:
+        return [_run_one(fn, item) for item in items]
+
+    outcomes: list[ParseOutcome] = []
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [pool.submit(fn, item) for item in items]
+        for future in futures:
+            try:
+                outcomes.append(ParseOutcome(future.result()))
+            except Exception as exc:  # incluye BrokenProcessPool
+                outcomes.append(ParseOutcome(error=exc))
+    return outcomes
+
+
+def parse_paths(
+    parser: Callable[[bytes], Any], paths: Sequence[Path], *, workers: Optional[int] = None
+) -> list[ParseOutcome]:
+    """``parser(path.read_bytes())`` para cada ruta. La lectura del archivo
+    cuenta como parte del parseo (sus errores van al ``ParseOutcome``)."""
+    from functools import partial
+
+    return _run(partial(_read_and_parse, parser), list(paths), workers)
+
+
+def parse_payloads(
+    parser: Callable[[bytes], Any], payloads: Sequence[bytes], *, workers: Optional[int] = None
+) -> list[ParseOutcome]:
+    """``parser(data)`` para cada contenido ya leído (p. ej. uploads HTTP)."""
+    from functools import partial
+
+    return _run(partial(cached_parse, parser), list(payloads), workers)
@@ -0,0 +1,143 @@
+"""Extracción de texto dirigida por páginas para los formularios SRI.
+
+``page.extract_text()`` de pdfplumber es casi todo el costo de parsear un
+F-101/F-103 (~0.1 s por página: pdfminer interpreta cada glifo), y los
+parsers lo llamaban sobre TODAS las páginas antes de correr sus regex. Un
+F-101 largo trae, después de las tablas de casilleros, páginas de anexos y
+detalles que no aportan ningún casillero.
+
+Aquí el texto se extrae página a página, en orden, y solo de las páginas que
+todavía pueden aportar algo:
+
+1. Un texto rápido por página con pdfium (``pypdfium2``, ya dependencia de
+   pdfplumber; ~30× más rápido) da los números que aparecen en cada página.
+2. El parser describe lo que le falta en un ``PageTargets``: los casilleros
+   aún no resueltos y los campos de cabecera (período, RUC…). Una página se
+   salta solo si su texto rápido no contiene NINGÚN casillero pendiente como
+   número completo ni puede contener un campo pendiente.
+3. En cuanto todo está resuelto se deja de leer el PDF (salida anticipada).
+
+Por qué el resultado es el mismo: en todas las regex de casilleros el
+código aparece como número completo (sin dígitos pegados antes ni después),
+y un casillero "resuelto" lo está por la PRIMERA coincidencia del documento,
+que ya se leyó. Las páginas saltadas no contienen ningún casillero pendiente,
+así que no pueden aportar una coincidencia anterior ni distinta. Para no
+crear coincidencias que crucen una página saltada, la decisión mira también
+el final del texto ya extraído. Mientras no haya salido texto no se salta
+nada (un PDF escaneado sigue dando "sin texto extraíble"). Sin pdfium (o si
+falla) no se salta ninguna página; solo queda la salida anticipada.
+
+Cada página se cierra (``page.close()``) al extraerla, así pdfplumber no
+acumula en memoria los objetos de layout de todo el documento.
+"""
+
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import Optional
+
+import pdfplumber
+
+_DIGIT_RUN = re.compile(r"\d+")
+_TAIL_CHARS = 64
+
+
+def digit_runs(text: str) -> frozenset[str]:
+    """Números completos (secuencias maximales de dígitos) del texto."""
+    return frozenset(_DIGIT_RUN.findall(text))
+
+
+def squeeze(text: str) -> str:
+    """Texto sin espacios, para predicados tolerantes a cómo cada motor
+    reparte los espacios."""
+    return re.sub(r"\s+", "", text)
+
+
+def quick_page_texts(pdf_bytes: bytes) -> Optional[list[str]]:
+    """Texto de cada página con pdfium, o ``None`` si no está disponible."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:  # pragma: no cover - pdfplumber lo instala
+        return None
+    try:
+        doc = pdfium.PdfDocument(pdf_bytes)
+    except Exception:
+        return None
+    texts: list[str] = []
+    try:
+        for page in doc:
+            textpage = page.get_textpage()
+            try:
+                texts.append(textpage.get_text_range())
+            finally:
+                textpage.close()
+                page.close()
+    except Exception:
+        return None
+    finally:
+        doc.close()
+    return texts
+
+
+class PageTargets(ABC):
+    """Lo que un parser todavía busca en el PDF.
+
+    Subclases: ``feed`` y ``open_codes`` son obligatorios;
+    ``fields_may_match`` dice si un texto rápido podría contener algún campo
+    de cabecera pendiente.
+    """
+
+    @abstractmethod
+    def feed(self, page_text: str) -> None:
+        """Recibe el texto de cada página extraída (en orden) y actualiza qué
+        quedó resuelto."""
+
+    @abstractmethod
+    def open_codes(self) -> set[str]:
+        """Casilleros pendientes."""
+
+    def fields_may_match(self, quick_text: str) -> bool:
+        return False
+
+    def done(self) -> bool:
+        return False
+
+    def page_may_matter(self, quick_text: str) -> bool:
+        open_codes = self.open_codes()
+        if open_codes and not open_codes.isdisjoint(digit_runs(quick_text)):
+            return True
+        return self.fields_may_match(quick_text)
+
+
+def extract_text(pdf_bytes: bytes, targets: PageTargets) -> str:
+    """Texto de las páginas que pueden aportar a ``targets``, unido con
+    ``"\\n"`` como el ``"\\n".join(p.extract_text() ...)`` de siempre.
+
+    Las excepciones al abrir el PDF se propagan (cada parser las maneja como
+    antes).
+    """
+    quick = quick_page_texts(pdf_bytes)
+    parts: list[str] = []
+    tail = ""
+    seen_text = False
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        for index, page in enumerate(pdf.pages):
+            if targets.done():
+                break
+            if (
+                seen_text
+                and quick is not None
+                and index < len(quick)
+                and not targets.page_may_matter(tail + "\n" + quick[index])
+            ):
+                page.close()
+                continue
+            text = page.extract_text() or ""
+            page.close()
+            parts.append(text)
+            seen_text = seen_text or bool(text.strip())
+            tail = (tail + "\n" + text)[-_TAIL_CHARS:]
+            targets.feed(text)
+    return "\n".join(parts)
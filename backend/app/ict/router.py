@@ -16,6 +16,8 @@ from backend.app.ict.parsers.f103_pdf import parse_f103
 from backend.app.ict.parsers.facturacion_sri import parse_facturacion
 from backend.app.ict.parsers.mayor_excel import parse_mayor
 from backend.app.ict.parsers.ats_xml import parse_ats
+from backend.app.ict.parsers import parallel
+from backend.app.services.parse_cache import cached_parse
 
 SLOT_PARSERS = {
     # ----- Documentos PRINCIPALES (visibles en la barra del portal cliente) -----
@@ -174,11 +176,31 @@ def process_session_endpoint(
     versión actual del parser. Esto garantiza que cuando se mejora un
     parser (ej. más casilleros del F-101), las sesiones existentes se
     benefician sin necesidad de re-subir archivos.
+
+    Si nada cambió desde la última generación (archivos, contribuyente,
+    plantilla, versiones de parsers y fillers, datos de los anexos; ver
+    ict/fingerprint.py) devuelve el reporte guardado con ``cached=True`` sin
+    re-parsear ni regenerar. Si algo cambió, ``changed_inputs`` dice qué.
     """
+    from time import perf_counter
+
+    from backend.app.ict import fingerprint
+
+    start = perf_counter()
     try:
         session = ict_service.get_session(db, session_id=session_id, user=user)
     except PermissionError as e:
         raise HTTPException(403, detail=str(e))
+
+    stored = current = None
+    if fingerprint.enabled():
+        stored = fingerprint.load(session.id)
+        current = fingerprint.compute(session, (stored or {}).get("fingerprint"))
+        if fingerprint.is_fresh(stored, current, session.id):
+            return {**stored["report"], "cached": True, "changed_inputs": [],
+                    "total_ms": int((perf_counter() - start) * 1000)}
+        fingerprint.invalidate(session.id)
+
     # Re-parsear primero — si el parser se actualizó desde la última
     # vez que el cliente subió archivos, esto recupera los casilleros
     # nuevos. Si no hay archivos guardados, no hace nada.
@@ -189,7 +211,15 @@ def process_session_endpoint(
     except Exception:
         import logging
         logging.exception("reparse_session_uploads falló para sesión %s, continúo con datos cacheados", session_id)
-    return ict_service.process_session(db, session=session)
+    report = ict_service.process_session(db, session=session)
+    if current is None:
+        return report
+    # La huella se guarda DESPUÉS del re-parseo: es la que verá el próximo
+    # /process si nadie toca nada.
+    if report.get("excel_ready"):
+        fingerprint.store(session.id, fingerprint.compute(session, current), report)
+    return {**report, "cached": False,
+            "changed_inputs": fingerprint.changed_inputs((stored or {}).get("fingerprint"), current)}
 
 
 @router.post("/sessions/{session_id}/reparse", status_code=200)
@@ -259,7 +289,7 @@ def download_excel_endpoint(
         return FileResponse(legacy_cached, media_type=_XLSX_MIME, headers=headers)
 
     # Sin caché: hay que generar en memoria, no hay archivo que transmitir.
-    excel_bytes, _ = ict_service.generate_excel(db, session=session)
+    excel_bytes, _ = ict_service.generate_excel_isolated(db, session=session)
     return StreamingResponse(
         BytesIO(excel_bytes), media_type=_XLSX_MIME, headers=headers
     )
@@ -312,7 +342,7 @@ def download_papel_trabajo_endpoint(
 
     # Sin cache: generar al vuelo. Puede tardar ~30-60s si está activo
     # el LLM motor (9 interpretaciones IA en paralelo).
-    _sri, excel_bytes = ict_service.generate_excel(db, session=session)
+    _sri, excel_bytes = ict_service.generate_excel_isolated(db, session=session)
     return StreamingResponse(
         BytesIO(excel_bytes), media_type=_XLSX_MIME, headers=headers
     )
@@ -367,8 +397,31 @@ async def upload_for_anexo_endpoint(
     last_filename: str = files[0].filename if files else "archivo"
     last_size: int = 0
 
-    for upload in files:
-        data = await upload.read()
+    # Slots multi con PDF_PARSE_WORKERS > 1: los PDFs mensuales se leen
+    # primero y se parsean como lote en el pool (ver parsers/parallel.py).
+    # Los resultados vuelven en el orden de `files`, así que el bucle de abajo
+    # se comporta igual que si parseara archivo por archivo. La lectura se
+    # corta en el primer archivo que excede el tamaño: el bucle responde 413
+    # al llegar a él, después de haber procesado los anteriores, como antes.
+    # Sin pool no se bufferea el lote (hasta 12 × 50 MB): cada archivo se
+    # lee, se parsea y se suelta antes de leer el siguiente.
+    batch = IS_MULTI and parallel.PDF_PARSE_WORKERS > 1 and len(files) > 1
+    prefetched: list[bytes] = []
+    preparsed: list = []
+    if batch:
+        for upload in files:
+            prefetched.append(await upload.read())
+            if len(prefetched[-1]) > MAX_SIZE:
+                break
+        preparsed = await asyncio.to_thread(
+            parallel.parse_payloads, parser, [d for d in prefetched if len(d) <= MAX_SIZE]
+        )
+
+    for idx, upload in enumerate(files):
+        if batch:
+            data, prefetched[idx] = prefetched[idx], b""
+        else:
+            data = await upload.read()
         if len(data) > MAX_SIZE:
             raise HTTPException(413, detail=f"Archivo {upload.filename} excede 50 MB")
         total_bytes += len(data)
@@ -380,7 +433,12 @@ async def upload_for_anexo_endpoint(
         # lote: el health check de Render caducaba a los 5s y la instancia se
         # reiniciaba a mitad de la carga del cliente. `to_thread` lo saca del
         # loop sin alterar el resultado ni el orden de procesamiento.
-        parsed = await asyncio.to_thread(parser, data)
+        if batch:
+            parsed, parse_error = preparsed[idx]
+            if parse_error is not None:
+                raise parse_error
+        else:
+            parsed = await asyncio.to_thread(cached_parse, parser, data)
 
         if parsed.get("errores"):
             warnings_acc.extend([f"{upload.filename}: {e}" for e in parsed["errores"]])
@@ -207,6 +207,7 @@ def reparse_session_uploads(db: Session, *, session: ICTSession) -> dict:
     casilleros_despues}} para reportar al usuario qué cambió.
     """
     from backend.app.ict.router import SLOT_PARSERS
+    from backend.app.services.parse_cache import cached_parse
 
     report: dict = {}
     root = _ict_job_dir(session.id, "").parent  # /tmp/ict/<id>/
@@ -236,13 +237,17 @@ def reparse_session_uploads(db: Session, *, session: ICTSession) -> dict:
 
             if slot_name in ("f104", "f103"):
                 # Multi-mes: re-parsear cada archivo y acumular en monthly
+                from backend.app.ict.parsers.parallel import parse_paths
+
                 monthly: dict = {}
-                for f in sorted(slot_dir.iterdir()):
-                    if not f.is_file():
-                        continue
+                month_files = [f for f in sorted(slot_dir.iterdir()) if f.is_file()]
+                # En paralelo con PDF_PARSE_WORKERS > 1; mismo orden de archivos.
+                for f, (parsed, parse_error) in zip(
+                    month_files, parse_paths(parser, month_files)
+                ):
                     try:
-                        data = f.read_bytes()
-                        parsed = parser(data)
+                        if parse_error is not None:
+                            raise parse_error
                         periodo = parsed.get("periodo")
                         if periodo:
                             mes_key = str(periodo).split("/")[0].strip() \
@@ -264,7 +269,8 @@ def reparse_session_uploads(db: Session, *, session: ICTSession) -> dict:
                 f = files[0]
                 try:
                     data = f.read_bytes()
-                    parsed = parser(data)
+                    # Misma versión del parser + mismos bytes → desde la caché.
+                    parsed = cached_parse(parser, data)
                     archivos_re = 1
                     if slot_name == "f101":
                         new_extracted["f101"] = parsed["casilleros"]
@@ -554,6 +560,7 @@ def generate_excel(db: Session, *, session: ICTSession) -> tuple[bytes, bytes]:
     """
     from io import BytesIO
     from backend.app.ict.fillers.base import load_template, reset_trace, write_trace_sheet
+    from backend.app.ict.fillers.streaming import discard_streaming_sheets, save_workbook
     from backend.app.ict.fillers.indice import IndiceFiller
     from backend.app.ict.fillers.a1_mapeo import A1Filler
     from backend.app.ict.fillers.a2_ingresos import A2Filler
@@ -569,6 +576,10 @@ def generate_excel(db: Session, *, session: ICTSession) -> tuple[bytes, bytes]:
     # su escritura en el log y al final se vierte en la hoja "Trazabilidad".
     reset_trace()
 
+    # Hojas DATOS y TRAZABILIDAD en streaming: se vuelcan a disco por filas y
+    # se insertan en el paquete al guardar (ver fillers/streaming.py).
+    streaming = _streaming_sheets_enabled()
+
     wb = load_template()
     session_data = {
         "razon_social": session.razon_social,
@@ -604,14 +615,24 @@ def generate_excel(db: Session, *, session: ICTSession) -> tuple[bytes, bytes]:
         from backend.app.ict.fillers.source_data_sheets import (
             build_f101_sheet, build_f103_sheet, build_f104_sheet, build_balance_sheet,
         )
+        from backend.app.ict.fillers.cell_index import CellIndex
         from backend.app.ict.cell_maps.a1 import A1_CASILLEROS_ORDERED
         casillero_names = dict(A1_CASILLEROS_ORDERED)
         f101_lookup = build_f101_sheet(
-            wb, shared_context.get("f101", {}) or {}, casillero_names
+            wb, shared_context.get("f101", {}) or {}, casillero_names, streaming=streaming
+        )
+        f103_lookup = build_f103_sheet(
+            wb, shared_context.get("f103_monthly", {}) or {}, streaming=streaming
+        )
+        f104_lookup = build_f104_sheet(
+            wb, shared_context.get("f104_monthly", {}) or {}, streaming=streaming
+        )
+        balance_lookup = build_balance_sheet(
+            wb, shared_context.get("balance_mapeado", []) or [], streaming=streaming
         )
-        f103_lookup = build_f103_sheet(wb, shared_context.get("f103_monthly", {}) or {})
-        f104_lookup = build_f104_sheet(wb, shared_context.get("f104_monthly", {}) or {})
-        balance_lookup = build_balance_sheet(wb, shared_context.get("balance_mapeado", []) or [])
+        # Casillero → fila de DATOS F-101 / DATOS BALANCE, una sola pasada
+        # por hoja (ver fillers/cell_index.py).
+        shared_context["_cell_index"] = CellIndex.from_workbook(wb)
     except Exception:
         import logging
         logging.exception("build_*_sheet falló para sesión %s", session.id)
@@ -698,7 +719,7 @@ def generate_excel(db: Session, *, session: ICTSession) -> tuple[bytes, bytes]:
     # Permite al auditor cruzar cualquier celda llenada con su origen
     # (F-101 página X, Balance Mapeado fila Y, F-103 mes ZZZZ-MM, etc).
     try:
-        write_trace_sheet(wb)
+        write_trace_sheet(wb, streaming=streaming)
     except Exception:
         import logging
         logging.exception("write_trace_sheet falló para sesión %s", session.id)
@@ -733,26 +754,51 @@ def generate_excel(db: Session, *, session: ICTSession) -> tuple[bytes, bytes]:
     # de `load_workbook(plantilla)`, así que lo que openpyxl no sabe
     # representar (p. ej. la forma decorativa "Line 2" de drawing1.xml) ya se
     # había perdido en esa primera carga, no en el round-trip que se elimina.
+    #
+    # `save_workbook` (fillers/streaming.py) es `wb.save` más el paso que
+    # inserta las filas ya volcadas de las hojas en streaming.
     # ------------------------------------------------------------------
-
-    # 1) Papel de trabajo: el libro tal cual, con TODAS las hojas visibles.
-    buf_papel = BytesIO()
-    wb.save(buf_papel)
-    bytes_papel = buf_papel.getvalue()
-    buf_papel.close()  # libera el buffer intermedio antes del segundo guardado
-
-    # 2) SRI: MISMO libro, ahora con las hojas DATOS/internas ocultas (nunca
-    #    borradas — ver CLAUDE.md: borrarlas rompería las fórmulas con #REF!)
-    #    y la estructura bloqueada con contraseña.
-    _apply_sri_sheet_visibility(wb)
-    buf_sri = BytesIO()
-    wb.save(buf_sri)
-    bytes_sri = buf_sri.getvalue()
-    buf_sri.close()
+    try:
+        # 1) Papel de trabajo: el libro tal cual, con TODAS las hojas visibles.
+        buf_papel = BytesIO()
+        save_workbook(wb, buf_papel)
+        bytes_papel = buf_papel.getvalue()
+        buf_papel.close()  # libera el buffer intermedio antes del segundo guardado
+
+        # 2) SRI: MISMO libro, ahora con las hojas DATOS/internas ocultas (nunca
+        #    borradas — ver CLAUDE.md: borrarlas rompería las fórmulas con #REF!)
+        #    y la estructura bloqueada con contraseña.
+        _apply_sri_sheet_visibility(wb)
+        buf_sri = BytesIO()
+        save_workbook(wb, buf_sri)
+        bytes_sri = buf_sri.getvalue()
+        buf_sri.close()
+    finally:
+        discard_streaming_sheets(wb)
 
     return bytes_sri, bytes_papel
 
 
+def generate_excel_isolated(db: Session, *, session: ICTSession) -> tuple[bytes, bytes]:
+    """Como ``generate_excel``, pero la generación corre en un proceso hijo
+    (ver ``ict/worker.py``): el pico de memoria no queda en el proceso web.
+
+    Con ``ICT_GENERATION_WORKER=inline`` se genera aquí mismo. Lanza
+    ``ICTGenerationError`` si el hijo vence el plazo o muere.
+    """
+    from backend.app.ict import worker
+
+    return worker.generate(session)
+
+
+def _streaming_sheets_enabled() -> bool:
+    """``ICT_STREAMING_SHEETS=0`` vuelve a construir las hojas DATOS y
+    TRAZABILIDAD en memoria (camino anterior, mismo resultado)."""
+    import os
+
+    return os.getenv("ICT_STREAMING_SHEETS", "1").strip().lower() not in {"0", "false", "no"}
+
+
 def _liberar_memoria_tras_generacion() -> None:
     """Devuelve al sistema la memoria del workbook recién generado.
 
@@ -870,7 +916,7 @@ def process_session(db: Session, *, session: ICTSession) -> dict:
     #    disco para descarga rápida desde los endpoints.
     excel_ready = False
     try:
-        bytes_sri, bytes_papel = generate_excel(db, session=session)
+        bytes_sri, bytes_papel = generate_excel_isolated(db, session=session)
         out_dir = _ict_job_dir(session.id, "_output")
         (out_dir / "ICT.xlsx").write_bytes(bytes_sri)            # backwards-compat
         (out_dir / "ICT_SRI.xlsx").write_bytes(bytes_sri)
@@ -883,6 +929,8 @@ def process_session(db: Session, *, session: ICTSession) -> dict:
         import logging
         logging.exception("Pre-generación Excel falló para sesión %s", session.id)
     finally:
+        # Con el worker en proceso hijo (default) el libro nunca vivió aquí;
+        # sigue haciendo falta con ICT_GENERATION_WORKER=inline.
         _liberar_memoria_tras_generacion()
 
     total_ms = int((perf_counter() - start) * 1000)
@@ -0,0 +1,184 @@
+"""Generación del ICT en un proceso hijo, fuera del proceso web.
+
+``generate_excel`` arma el libro completo en memoria (plantilla, DATOS,
+fillers, VERIFICACIÓN A1, TRAZABILIDAD) y al terminar el proceso web se
+quedaba con el residuo: aun con ``_liberar_memoria_tras_generacion``
+(``gc.collect`` + ``malloc_trim``) el RSS del worker de uvicorn reposaba en
+~730 MB. Además, mientras duraba la generación el GIL lo tenía openpyxl y el
+resto de requests de ese proceso se arrastraban.
+
+Aquí la generación corre en un proceso hijo (``spawn``, nunca ``fork`` de un
+proceso con hilos) que recibe SOLO los datos planos de la sesión
+(``session_snapshot``: contribuyente + ``extracted_data`` de cada anexo) y
+devuelve los dos entregables ``(bytes_sri, bytes_papel)``. El pico de memoria
+vive y muere en el hijo.
+
+Knobs (leídos del entorno aquí, como en runner_pool.py):
+
+- ``ICT_GENERATION_WORKER``: ``process`` (default) o ``inline`` (en el mismo
+  proceso, el camino anterior).
+- ``ICT_GENERATION_WORKERS``: generaciones simultáneas (default 1). Las demás
+  esperan turno; así dos auditores no duplican el pico en el contenedor.
+- ``ICT_GENERATION_WORKER_MAX_JOBS``: generaciones por hijo antes de
+  reciclarlo (default 1 = un hijo por generación, la memoria vuelve al SO al
+  salir). Con valores mayores el hijo se reutiliza y se ahorra el arranque
+  (~1-2 s de imports), a costa de que su RSS quede alto entre jobs.
+- ``ICT_GENERATION_TIMEOUT_SECONDS``: tope por generación (default 600). Al
+  vencer se matan los hijos y se lanza ``ICTGenerationError``.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+from typing import Optional
+
+from backend.app.core.config import env_int
+
+logger = logging.getLogger("auditbrain.ict.worker")
+
+
+WORKER_MODE = os.getenv("ICT_GENERATION_WORKER", "process").strip().lower()
+WORKERS = max(1, env_int("ICT_GENERATION_WORKERS", 1))
+WORKER_MAX_JOBS = max(1, env_int("ICT_GENERATION_WORKER_MAX_JOBS", 1))
+TIMEOUT_SECONDS = max(1, env_int("ICT_GENERATION_TIMEOUT_SECONDS", 600))
+
+
+class ICTGenerationError(RuntimeError):
+    """El proceso hijo no entregó el Excel (timeout o muerte del hijo, p. ej. OOM)."""
+
+
+def session_snapshot(session) -> dict:
+    """Copia plana (picklable) de lo que ``generate_excel`` lee de la sesión."""
+    return {
+        "id": session.id,
+        "ruc": session.ruc,
+        "razon_social": session.razon_social,
+        "ejercicio_fiscal": session.ejercicio_fiscal,
+        "numero_adhesivo": session.numero_adhesivo or "",
+        "anexos": [
+            {
+                "anexo_code": a.anexo_code,
+                "status": a.status,
+                "extracted_data": a.extracted_data or {},
+            }
+            for a in session.anexos
+        ],
+    }
+
+
+def _session_from_snapshot(snapshot: dict) -> SimpleNamespace:
+    anexos = [SimpleNamespace(**a) for a in snapshot["anexos"]]
+    return SimpleNamespace(**{**snapshot, "anexos": anexos})
+
+
+def _generate_from_snapshot(snapshot: dict) -> tuple[bytes, bytes]:
+    """Punto de entrada en el hijo. ``generate_excel`` no toca la base."""
+    from backend.app.ict.service import generate_excel
+
+    return generate_excel(None, session=_session_from_snapshot(snapshot))
+
+
+class ICTGenerationWorker:
+    """Ejecutor de generaciones ICT en procesos hijos. Seguro entre hilos."""
+
+    def __init__(
+        self,
+        mode: str = WORKER_MODE,
+        workers: int = WORKERS,
+        max_jobs: int = WORKER_MAX_JOBS,
+        timeout: float = TIMEOUT_SECONDS,
+    ):
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_jobs = max(1, max_jobs)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._counters = {"generated": 0, "failed": 0, "timeouts": 0, "crashes": 0}
+
+    def enabled(self) -> bool:
+        return self.mode == "process"
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_jobs,
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Mata los hijos de ``executor`` y lo olvida (el próximo job crea otro)."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        for proc in list((executor._processes or {}).values()):
+            try:
+                proc.kill()
+            except Exception:  # pragma: no cover - el hijo ya murió
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def generate(self, snapshot: dict) -> tuple[bytes, bytes]:
+        if not self.enabled():
+            return _generate_from_snapshot(snapshot)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_generate_from_snapshot, snapshot)
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._counters["timeouts"] += 1
+            self._discard_executor(executor)
+            raise ICTGenerationError(
+                f"La generación del ICT de la sesión {snapshot.get('id')} superó "
+                f"{self.timeout} s; se detuvo el proceso."
+            )
+        except BrokenProcessPool as exc:
+            self._counters["crashes"] += 1
+            self._discard_executor(executor)
+            raise ICTGenerationError(
+                f"El proceso de generación del ICT de la sesión {snapshot.get('id')} "
+                "terminó de forma anormal (posible falta de memoria)."
+            ) from exc
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        self._counters["generated"] += 1
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_jobs": self.max_jobs,
+            "timeout_seconds": self.timeout,
+            **self._counters,
+        }
+
+
+ICT_WORKER = ICTGenerationWorker()
+
+
+def generate(session) -> tuple[bytes, bytes]:
+    """``(bytes_sri, bytes_papel)`` de la sesión, generados en el worker."""
+    return ICT_WORKER.generate(session_snapshot(session))
+
+
+def shutdown() -> None:
+    ICT_WORKER.shutdown()
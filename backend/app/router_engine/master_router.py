@@ -7,6 +7,7 @@ los módulos futuros responden como stub (501) sin lógica de negocio.
 
 from backend.app.document_services import universal_document_client
 from backend.app.services import python_runner_service
+from backend.app.services.admission import AdmissionRejected
 
 OPERATIONAL_TARGETS = {"python_runner", "document_generator"}
 
@@ -58,11 +59,14 @@ async def route(payload: dict) -> dict:
         )
 
     if target == "python_runner":
-        result = await python_runner_service.run_python_code(
-            code=inner.get("script", ""),
-            inputs=inner.get("inputs", {}),
-            response_mode=inner.get("response_mode"),
-        )
+        try:
+            result = await python_runner_service.run_python_code(
+                code=inner.get("script", ""),
+                inputs=inner.get("inputs", {}),
+                response_mode=inner.get("response_mode"),
+            )
+        except AdmissionRejected as exc:
+            raise RouterError(exc.status_code, exc.message)
         return {"target": target, "status": "ok", "result": result}
 
     if target == "document_generator":
@@ -27,6 +27,8 @@ import time
 from pathlib import Path
 from typing import Callable, Dict, Optional
 
+from backend.app.core.config import env_int
+
 # --- Scrub de entorno ---------------------------------------------------
 
 # Nombres exactos que nunca deben llegar al subproceso.
@@ -85,13 +87,6 @@ def build_child_env(
 
 # --- Límites de recursos (opt-in) --------------------------------------
 
-def _env_int(name: str, default: int = 0) -> int:
-    try:
-        return int(os.getenv(name, str(default)))
-    except (TypeError, ValueError):
-        return default
-
-
 def make_rlimit_preexec() -> Optional[Callable[[], None]]:
     """Devuelve un ``preexec_fn`` que aplica rlimits, o ``None``.
 
@@ -103,11 +98,11 @@ def make_rlimit_preexec() -> Optional[Callable[[], None]]:
     if os.name != "posix":
         return None
 
-    as_mb = _env_int("AUDITBRAIN_RLIMIT_AS_MB", 0)
-    cpu_s = _env_int("AUDITBRAIN_RLIMIT_CPU_SECONDS", 0)
-    fsize_mb = _env_int("AUDITBRAIN_RLIMIT_FSIZE_MB", 0)
-    nproc = _env_int("AUDITBRAIN_RLIMIT_NPROC", 0)
-    nofile = _env_int("AUDITBRAIN_RLIMIT_NOFILE", 0)
+    as_mb = env_int("AUDITBRAIN_RLIMIT_AS_MB", 0)
+    cpu_s = env_int("AUDITBRAIN_RLIMIT_CPU_SECONDS", 0)
+    fsize_mb = env_int("AUDITBRAIN_RLIMIT_FSIZE_MB", 0)
+    nproc = env_int("AUDITBRAIN_RLIMIT_NPROC", 0)
+    nofile = env_int("AUDITBRAIN_RLIMIT_NOFILE", 0)
 
     if not any((as_mb, cpu_s, fsize_mb, nproc, nofile)):
         return None
@@ -137,7 +132,7 @@ def make_rlimit_preexec() -> Optional[Callable[[], None]]:
 
 # --- Limpieza de jobs antiguos -----------------------------------------
 
-JOB_TTL_SECONDS = _env_int("AUDITBRAIN_JOB_TTL_SECONDS", 3600)
+JOB_TTL_SECONDS = env_int("AUDITBRAIN_JOB_TTL_SECONDS", 3600)
 _JOB_PREFIX = "auditbrain_job_"
 
 
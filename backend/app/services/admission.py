@@ -0,0 +1,211 @@
+"""Control de admisión delante del límite de concurrencia del runner.
+
+Con ``EXECUTION_CONCURRENCY=1`` las requests extra de /run_python esperaban
+en un ``asyncio.Semaphore`` sin límite ni plazo: una request podía esperar
+4 minutos y ejecutarse cuando el GPT que la pidió ya se había rendido. Aquí
+la espera queda acotada:
+
+- Cola máxima (``AUDITBRAIN_ADMISSION_MAX_QUEUE``): si ya hay esa cantidad
+  de requests esperando, la nueva se rechaza al instante con **429**.
+- Espera máxima (``AUDITBRAIN_ADMISSION_MAX_WAIT_SECONDS``): si el slot no
+  llega a tiempo, se rechaza con **503**. Ambos rechazos llevan
+  ``Retry-After`` estimado con la duración media de las ejecuciones.
+- Si el cliente se desconecta mientras espera, la espera se cancela y el
+  script nunca se ejecuta.
+
+Los jobs async de /run_python (que ya pasaron por su propia cola acotada)
+entran con ``bounded=False``: esperan su turno sin plazo y sin contar para la
+cola de las requests síncronas.
+
+Un único controlador (``EXECUTION_ADMISSION``) lo comparten app.py y la
+plataforma v1, de modo que ``EXECUTION_CONCURRENCY`` limita las ejecuciones
+del proceso entero. Profundidad de cola y tiempos de espera se exponen como
+histogramas en ``stats()`` para dimensionar la capacidad.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.app.core.config import env_int
+from backend.app.core.resource_metrics import Histogram
+
+
+EXECUTION_CONCURRENCY = max(1, env_int("EXECUTION_CONCURRENCY", 1))
+ADMISSION_MAX_QUEUE = max(0, env_int("AUDITBRAIN_ADMISSION_MAX_QUEUE", 4))
+ADMISSION_MAX_WAIT_SECONDS = max(0, env_int("AUDITBRAIN_ADMISSION_MAX_WAIT_SECONDS", 40))
+DEFAULT_RETRY_AFTER_SECONDS = 30
+_DISCONNECT_POLL_SECONDS = 1.0
+
+WAIT_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120)
+QUEUE_BUCKETS = (0, 1, 2, 4, 8, 16, 32)
+
+
+class AdmissionRejected(Exception):
+    """La request no entra: cola llena (429) o espera vencida (503)."""
+
+    def __init__(self, status_code: int, message: str, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class ClientDisconnected(Exception):
+    """El cliente cerró la conexión mientras esperaba su turno."""
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        concurrency: int = EXECUTION_CONCURRENCY,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        max_wait_seconds: float = ADMISSION_MAX_WAIT_SECONDS,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._waiting = 0  # requests síncronas (bounded) esperando
+        self._waiting_unbounded = 0  # jobs async esperando (no cuentan para la cola)
+        self._running = 0
+        self._avg_run_seconds: Optional[float] = None
+        self._counters: Dict[str, int] = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_wait_timeout": 0,
+            "cancelled_disconnect": 0,
+        }
+        self.wait_seconds = Histogram(WAIT_BUCKETS)
+        self.queue_depth = Histogram(QUEUE_BUCKETS)
+
+    def retry_after(self) -> int:
+        """Segundos sugeridos al cliente: turnos por delante × duración media.
+
+        Solo cuentan las requests síncronas en cola, igual que para el 429.
+        """
+        if self._avg_run_seconds is None:
+            return DEFAULT_RETRY_AFTER_SECONDS
+        turns = (self._waiting + self.concurrency) / self.concurrency
+        return max(1, min(300, math.ceil(self._avg_run_seconds * turns)))
+
+    async def _wait_for_slot(
+        self, timeout: Optional[float], is_disconnected: Optional[Callable[[], Awaitable[bool]]]
+    ) -> None:
+        acquire = asyncio.ensure_future(self._semaphore.acquire())
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                step = _DISCONNECT_POLL_SECONDS if is_disconnected else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    step = remaining if step is None else min(step, remaining)
+                done, _ = await asyncio.wait({acquire}, timeout=step)
+                if done:
+                    acquire.result()
+                    return
+                if is_disconnected is not None and await is_disconnected():
+                    raise ClientDisconnected
+        except BaseException:
+            if acquire.done() and not acquire.cancelled() and acquire.exception() is None:
+                self._semaphore.release()
+            else:
+                acquire.cancel()
+            raise
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        bounded: bool = True,
+    ):
+        """Reserva un slot de ejecución o lanza ``AdmissionRejected``.
+
+        ``is_disconnected`` (p. ej. ``request.is_disconnected``) se consulta
+        mientras se espera; si devuelve ``True`` se lanza ``ClientDisconnected``.
+        """
+        free = not self._semaphore.locked()
+        if bounded and not free and self._waiting >= self.max_queue:
+            self._counters["rejected_queue_full"] += 1
+            raise AdmissionRejected(
+                429,
+                f"Servidor ocupado: {self._waiting} ejecuciones en cola. Reintente más tarde.",
+                self.retry_after(),
+            )
+
+        if bounded:
+            self.queue_depth.observe(self._waiting)
+            self._waiting += 1
+        else:
+            self._waiting_unbounded += 1
+        started = time.monotonic()
+        try:
+            await self._wait_for_slot(
+                self.max_wait_seconds if bounded and self.max_wait_seconds else None,
+                is_disconnected,
+            )
+        except asyncio.TimeoutError:
+            self._counters["rejected_wait_timeout"] += 1
+            raise AdmissionRejected(
+                503,
+                f"No hubo turno de ejecución en {self.max_wait_seconds} s. Reintente más tarde.",
+                self.retry_after(),
+            )
+        except ClientDisconnected:
+            self._counters["cancelled_disconnect"] += 1
+            raise
+        finally:
+            if bounded:
+                self._waiting -= 1
+            else:
+                self._waiting_unbounded -= 1
+            self.wait_seconds.observe(time.monotonic() - started)
+
+        self._counters["admitted"] += 1
+        self._running += 1
+        run_started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+            elapsed = time.monotonic() - run_started
+            self._avg_run_seconds = (
+                elapsed
+                if self._avg_run_seconds is None
+                else 0.8 * self._avg_run_seconds + 0.2 * elapsed
+            )
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+            "running": self._running,
+            "waiting": self._waiting,
+            "waiting_unbounded": self._waiting_unbounded,
+            "avg_run_seconds": (
+                None if self._avg_run_seconds is None else round(self._avg_run_seconds, 3)
+            ),
+            "retry_after_seconds": self.retry_after(),
+            **self._counters,
+            "wait_seconds": self.wait_seconds.snapshot(),
+            "queue_depth_on_arrival": self.queue_depth.snapshot(),
+        }
+
+
+EXECUTION_ADMISSION = AdmissionController()
+
+
+def stats() -> dict:
+    return EXECUTION_ADMISSION.stats()
@@ -0,0 +1,466 @@
+"""Cola durable de jobs sobre la tabla ``tool_jobs``.
+
+Las herramientas del portal cliente, el Informe de Cumplimiento Tributario y
+la fase 1 de AUD/OF corrían en ``BackgroundTasks`` (o en un hilo con cola en
+memoria) dentro del proceso web. Un reinicio perdía los jobs en vuelo
+—``cleanup_once`` los marcaba "zombie" media hora después— y no había tope
+de concurrencia: tres Excel grandes a la vez podían tumbar el contenedor por
+memoria.
+
+Ahora el endpoint solo **encola**: marca la fila del ``ToolJob`` con
+``queue_status='queued'``, la tarea y su prioridad, y responde. Un pool de
+workers la reclama y la ejecuta:
+
+- **Reclamo**: ``UPDATE ... WHERE id = :id AND queue_status = 'queued'``; solo
+  gana quien ve ``rowcount == 1``. Es portable (SQLite en tests, Postgres en
+  producción) y dos pools contra la misma base nunca toman el mismo job.
+- **Lease + latido**: el job reclamado queda ``leased`` hasta
+  ``queue_lease_until``. Mientras corre, el pool extiende el lease cada
+  ``LEASE_SECONDS / 4``. Si el proceso muere, el lease vence y cualquier pool
+  vuelve a encolar el job.
+- **Reintentos**: si la tarea lanza, o su lease vence, se reintenta con
+  backoff exponencial (``RETRY_BASE_SECONDS * 2^(intento-1)``) hasta
+  ``MAX_ATTEMPTS``; después el job queda ``dead`` y su ``status`` en el
+  estado de error de la herramienta, con el motivo en ``error_message``.
+  Mientras espera el reintento, el ``status`` del job vuelve a su estado
+  pendiente. Las tareas registran su error en el log y **relanzan** la
+  excepción sin tocar el ``status``: solo la cola lo pasa a error, cuando se
+  agotan los intentos (un poller nunca ve "failed" en un job que se va a
+  reintentar). Los fallos que no cambian al reintentar (falta un input, tool
+  no registrada) los marcan las tareas y retornan sin lanzar. Un job que mata al worker
+  por memoria deja de reintentarse solo.
+- **Prioridad**: mayor primero; a igual prioridad, el más antiguo. La fase 1
+  de AUD/OF (el auditor espera en pantalla) va antes que el informe ICT y
+  que las herramientas del portal cliente.
+
+Knobs (leídos del entorno aquí, como en runner_pool.py):
+
+- ``AUDITBRAIN_JOB_QUEUE_MODE``: ``embedded`` (default: el proceso web corre
+  el pool), ``external`` (el web solo encola; el pool corre aparte con
+  ``python -m backend.app.services.job_queue``) o ``inline`` (la tarea corre
+  dentro del request que la encola; solo para desarrollo).
+- ``AUDITBRAIN_JOB_QUEUE_WORKERS``: jobs simultáneos por pool (default 1).
+- ``AUDITBRAIN_JOB_QUEUE_POLL_SECONDS``, ``AUDITBRAIN_JOB_QUEUE_LEASE_SECONDS``,
+  ``AUDITBRAIN_JOB_QUEUE_MAX_ATTEMPTS``, ``AUDITBRAIN_JOB_QUEUE_RETRY_BASE_SECONDS``.
+
+``external`` exige que el proceso worker vea el mismo ``AUD_OF_TMP_DIR`` que
+el web (los archivos de cada job viven en disco, no en la base).
+"""
+
+from __future__ import annotations
+
+import datetime
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+
+from backend.app.aud.obligaciones_fiscales.models import ToolJob
+from backend.app.core.config import env_int
+from backend.app.db.session import SessionLocal
+
+logger = logging.getLogger("auditbrain.job_queue")
+
+
+QUEUE_MODE = os.getenv("AUDITBRAIN_JOB_QUEUE_MODE", "embedded").strip().lower()
+WORKERS = max(1, env_int("AUDITBRAIN_JOB_QUEUE_WORKERS", 1))
+POLL_SECONDS = max(1, env_int("AUDITBRAIN_JOB_QUEUE_POLL_SECONDS", 2))
+LEASE_SECONDS = max(8, env_int("AUDITBRAIN_JOB_QUEUE_LEASE_SECONDS", 120))
+MAX_ATTEMPTS = max(1, env_int("AUDITBRAIN_JOB_QUEUE_MAX_ATTEMPTS", 3))
+RETRY_BASE_SECONDS = max(0, env_int("AUDITBRAIN_JOB_QUEUE_RETRY_BASE_SECONDS", 30))
+SHUTDOWN_GRACE_SECONDS = 10
+
+QUEUED, LEASED, DONE, DEAD = "queued", "leased", "done", "dead"
+
+
+@dataclass(frozen=True)
+class Tarea:
+    """Función ``f(job_id)`` a ejecutar, por ruta ``modulo:funcion``.
+
+    La ruta se resuelve al ejecutar (no al importar este módulo): evita
+    imports circulares con los routers y respeta los monkeypatch de tests.
+    """
+
+    ruta: str
+    prioridad: int = 0
+    estado_error: str = "failed"
+    estado_pendiente: str = "pending"
+
+    def funcion(self):
+        modulo, nombre = self.ruta.split(":")
+        return getattr(importlib.import_module(modulo), nombre)
+
+
+TAREAS: Dict[str, Tarea] = {
+    "aud_of.clasificacion": Tarea(
+        "backend.app.aud.obligaciones_fiscales.jobs:clasificar_mayor_job", prioridad=10
+    ),
+    "informe_cumplimiento": Tarea(
+        "backend.app.aud.informe_cumplimiento_tributario.jobs:process_job", prioridad=5
+    ),
+    "client_portal.tool": Tarea(
+        "backend.app.client_portal.jobs:process_tool_job", estado_error="error"
+    ),
+}
+
+
+def _ahora() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue:
+    """Encolado y pool de workers de la cola durable."""
+
+    def __init__(self, mode: str = QUEUE_MODE, workers: int = WORKERS):
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._en_curso: set[int] = set()
+        self._counters = {"enqueued": 0, "claimed": 0, "done": 0, "retried": 0,
+                          "dead": 0, "lease_expired": 0}
+
+    # -- encolado ---------------------------------------------------------
+
+    def enqueue(
+        self,
+        db,
+        job_id: int,
+        tarea: str,
+        *,
+        priority: Optional[int] = None,
+        job_values: Optional[dict] = None,
+    ) -> bool:
+        """Encola ``tarea`` para el job. False si ya estaba en cola o corriendo.
+
+        ``job_values`` (p. ej. ``status='pending'``) se escriben en el mismo
+        UPDATE que encola: si el job no se encola, la fila no se toca, y un
+        pool no puede reclamarlo antes de que queden escritos.
+        En modo ``inline`` el job se reclama en el mismo UPDATE y corre aquí.
+        """
+        definicion = TAREAS[tarea]
+        inline = self.mode == "inline"
+        ahora = _ahora()
+        valores = dict(
+            queue_task=tarea,
+            queue_status=LEASED if inline else QUEUED,
+            queue_priority=definicion.prioridad if priority is None else priority,
+            queue_attempts=1 if inline else 0,
+            queue_max_attempts=MAX_ATTEMPTS,
+            queue_run_after=None,
+            queue_lease_owner=self.owner if inline else None,
+            queue_lease_until=ahora + datetime.timedelta(seconds=LEASE_SECONDS) if inline else None,
+            queue_heartbeat_at=ahora if inline else None,
+            **(job_values or {}),
+        )
+        r = db.execute(
+            update(ToolJob)
+            .where(ToolJob.id == job_id,
+                   or_(ToolJob.queue_status.is_(None), ToolJob.queue_status.in_((DONE, DEAD))))
+            .values(**valores)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if r.rowcount != 1:
+            return False
+        self._counters["enqueued"] += 1
+        if inline:
+            self._ejecutar(job_id, tarea)
+        else:
+            self._despertar.set()
+        return True
+
+    # -- pool -------------------------------------------------------------
+
+    def start(self) -> None:
+        """Arranca el despachador (idempotente)."""
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._parar.clear()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="job-queue"
+            )
+            self._hilo = threading.Thread(
+                target=self._despachar, name="job-queue-dispatcher", daemon=True
+            )
+            self._hilo.start()
+
+    def shutdown(self, wait: float = SHUTDOWN_GRACE_SECONDS) -> None:
+        """Deja de reclamar jobs. Los que siguen corriendo al vencer ``wait``
+        conservan su lease: si el proceso muere, otro pool los retoma."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+            executor, self._executor = self._executor, None
+        self._parar.set()
+        self._despertar.set()
+        if hilo is not None:
+            hilo.join(wait)
+        if executor is not None:
+            fin = time.monotonic() + wait
+            while self._en_curso and time.monotonic() < fin:
+                time.sleep(0.05)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run_forever(self) -> None:
+        """Pool en primer plano (proceso worker dedicado)."""
+        self.start()
+        try:
+            while not self._parar.wait(1.0):
+                pass
+        finally:
+            self.shutdown()
+
+    def _despachar(self) -> None:
+        proximo_latido = 0.0
+        while not self._parar.is_set():
+            try:
+                if time.monotonic() >= proximo_latido:
+                    self._latir()
+                    self.requeue_expired()
+                    proximo_latido = time.monotonic() + LEASE_SECONDS / 4
+                with self._lock:
+                    libres = self.workers - len(self._en_curso)
+                for job_id, tarea in self._reclamar(libres) if libres > 0 else []:
+                    with self._lock:
+                        executor = self._executor
+                        if executor is None:
+                            break
+                        self._en_curso.add(job_id)
+                    executor.submit(self._correr_en_pool, job_id, tarea)
+            except Exception:
+                logger.exception("job_queue: error en el despachador")
+            self._despertar.wait(POLL_SECONDS)
+            self._despertar.clear()
+
+    def _correr_en_pool(self, job_id: int, tarea: str) -> None:
+        try:
+            self._ejecutar(job_id, tarea)
+        finally:
+            with self._lock:
+                self._en_curso.discard(job_id)
+            self._despertar.set()
+
+    def _reclamar(self, limite: int) -> List[Tuple[int, str]]:
+        db = SessionLocal()
+        try:
+            ahora = _ahora()
+            candidatos = db.execute(
+                select(ToolJob.id, ToolJob.queue_task)
+                .where(ToolJob.queue_status == QUEUED,
+                       or_(ToolJob.queue_run_after.is_(None), ToolJob.queue_run_after <= ahora))
+                .order_by(ToolJob.queue_priority.desc(), ToolJob.id)
+                .limit(limite * 4)
+            ).all()
+            tomados: List[Tuple[int, str]] = []
+            for job_id, tarea in candidatos:
+                if len(tomados) >= limite:
+                    break
+                r = db.execute(
+                    update(ToolJob)
+                    .where(ToolJob.id == job_id, ToolJob.queue_status == QUEUED)
+                    .values(queue_status=LEASED, queue_lease_owner=self.owner,
+                            queue_lease_until=ahora + datetime.timedelta(seconds=LEASE_SECONDS),
+                            queue_heartbeat_at=ahora,
+                            queue_attempts=ToolJob.queue_attempts + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                if r.rowcount == 1:  # otro pool pudo ganarlo entre el SELECT y el UPDATE
+                    tomados.append((job_id, tarea))
+            self._counters["claimed"] += len(tomados)
+            return tomados
+        finally:
+            db.close()
+
+    def _ejecutar(self, job_id: int, tarea: str) -> None:
+        definicion = TAREAS.get(tarea)
+        try:
+            if definicion is None:
+                raise LookupError(f"Tarea de cola desconocida: {tarea}")
+            definicion.funcion()(job_id)
+        except Exception as e:  # noqa: BLE001
+            logger.exception("job_queue: %s del job %s falló", tarea, job_id)
+            self._fallar(job_id, definicion, f"{type(e).__name__}: {e}")
+            return
+        self._terminar(job_id, {"queue_status": DONE})
+        self._counters["done"] += 1
+
+    def _terminar(self, job_id: int, valores: dict) -> bool:
+        """Cierra el lease propio; False si el job ya no es nuestro."""
+        db = SessionLocal()
+        try:
+            r = db.execute(
+                update(ToolJob)
+                .where(ToolJob.id == job_id, ToolJob.queue_status == LEASED,
+                       ToolJob.queue_lease_owner == self.owner)
+                .values(queue_lease_owner=None, queue_lease_until=None, **valores)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return r.rowcount == 1
+        finally:
+            db.close()
+
+    def _fallar(self, job_id: int, definicion: Optional[Tarea], motivo: str) -> None:
+        db = SessionLocal()
+        try:
+            job = db.get(ToolJob, job_id)
+            intentos = job.queue_attempts if job else 0
+            maximo = (job.queue_max_attempts if job else None) or MAX_ATTEMPTS
+        finally:
+            db.close()
+        if definicion is not None and intentos < maximo:
+            espera = RETRY_BASE_SECONDS * 2 ** max(0, intentos - 1)
+            if self._terminar(job_id, {
+                "queue_status": QUEUED,
+                "queue_run_after": _ahora() + datetime.timedelta(seconds=espera),
+                "status": definicion.estado_pendiente,
+                "error_message": None,
+                "finished_at": None,
+            }):
+                self._counters["retried"] += 1
+            return
+        if self._terminar(job_id, {"queue_status": DEAD}):
+            _marcar_error(job_id, definicion, f"El job falló {intentos} veces: {motivo}")
+            self._counters["dead"] += 1
+
+    def _latir(self) -> None:
+        """Extiende el lease de los jobs que este pool está corriendo."""
+        with self._lock:
+            ids = list(self._en_curso)
+        if not ids:
+            return
+        db = SessionLocal()
+        try:
+            ahora = _ahora()
+            db.execute(
+                update(ToolJob)
+                .where(ToolJob.id.in_(ids), ToolJob.queue_lease_owner == self.owner)
+                .values(queue_heartbeat_at=ahora,
+                        queue_lease_until=ahora + datetime.timedelta(seconds=LEASE_SECONDS))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            logger.exception("job_queue: latido fallido para %s", ids)
+        finally:
+            db.close()
+
+    def requeue_expired(self) -> int:
+        """Devuelve a la cola los jobs cuyo lease venció (su proceso murió)."""
+        db = SessionLocal()
+        try:
+            ahora = _ahora()
+            vencidos = db.execute(
+                select(ToolJob.id, ToolJob.queue_task, ToolJob.queue_attempts,
+                       ToolJob.queue_max_attempts, ToolJob.queue_lease_until)
+                .where(ToolJob.queue_status == LEASED, ToolJob.queue_lease_until < ahora)
+            ).all()
+            muertos = []
+            for job_id, tarea, intentos, maximo, lease in vencidos:
+                agotado = intentos >= (maximo or MAX_ATTEMPTS)
+                r = db.execute(
+                    update(ToolJob)
+                    .where(ToolJob.id == job_id, ToolJob.queue_status == LEASED,
+                           ToolJob.queue_lease_until == lease)
+                    .values(queue_status=DEAD if agotado else QUEUED,
+                            queue_lease_owner=None, queue_lease_until=None,
+                            queue_run_after=None)
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                if r.rowcount == 1:
+                    logger.warning("job_queue: lease vencido del job %s (intento %s)", job_id, intentos)
+                    self._counters["lease_expired"] += 1
+                    if agotado:
+                        muertos.append((job_id, tarea, intentos))
+        finally:
+            db.close()
+        for job_id, tarea, intentos in muertos:
+            _marcar_error(job_id, TAREAS.get(tarea), (
+                f"El procesamiento se interrumpió {intentos} veces (reinicio o memoria "
+                "agotada del worker); no se reintenta más."
+            ))
+            self._counters["dead"] += 1
+        return len(vencidos)
+
+    def stats(self) -> dict:
+        with self._lock:
+            en_curso = len(self._en_curso)
+            vivo = self._hilo is not None and self._hilo.is_alive()
+        return {"mode": self.mode, "workers": self.workers, "owner": self.owner,
+                "running": vivo, "in_flight": en_curso, **self._counters}
+
+
+def _marcar_error(job_id: int, definicion: Optional[Tarea], mensaje: str) -> None:
+    db = SessionLocal()
+    try:
+        job = db.get(ToolJob, job_id)
+        if job is None:
+            return
+        job.status = definicion.estado_error if definicion else "failed"
+        job.error_message = mensaje
+        job.finished_at = _ahora()
+        db.commit()
+    finally:
+        db.close()
+
+
+JOB_QUEUE = JobQueue()
+
+
+def enqueue(
+    db, job_id: int, tarea: str, *, priority: Optional[int] = None,
+    job_values: Optional[dict] = None,
+) -> bool:
+    return JOB_QUEUE.enqueue(db, job_id, tarea, priority=priority, job_values=job_values)
+
+
+def enabled() -> bool:
+    """True si el proceso web debe correr el pool (modo ``embedded``)."""
+    return JOB_QUEUE.mode == "embedded"
+
+
+def start() -> None:
+    JOB_QUEUE.start()
+
+
+def shutdown() -> None:
+    JOB_QUEUE.shutdown()
+
+
+def stats() -> dict:
+    return JOB_QUEUE.stats()
+
+
+def main() -> None:
+    """Proceso worker dedicado: ``python -m backend.app.services.job_queue``."""
+    import signal
+
+    from backend.app.db.session import init_db
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    init_db()
+    signal.signal(signal.SIGTERM, lambda *_: JOB_QUEUE._parar.set())
+    logger.info("job_queue: pool de %s workers (%s)", JOB_QUEUE.workers, JOB_QUEUE.owner)
+    try:
+        JOB_QUEUE.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Caché persistente de parseos direccionada por el contenido del archivo.
+
+Los mismos bytes se parseaban una y otra vez: ``reparse_session_uploads``
+(en cada ``/process`` del ICT) vuelve a pasar pdfplumber/openpyxl sobre todos
+los archivos guardados de la sesión, y el ``process_job`` de AUD/OF relee el
+Mayor General que ``clasificar_mayor_job`` ya había leído en la fase 1.
+
+- Clave: nombre del parser (``módulo.función``) + versión del parser +
+  sha256 de los bytes.
+- Versión del parser: hash del código fuente de su módulo y de todos los
+  módulos ``backend.*`` que importa, transitivamente. Cambiar un parser (o un
+  helper suyo, p. ej. ``cedulas/base.py``) invalida SOLO las entradas de los
+  parsers que dependen de él; un re-parseo tras el deploy rehace esos
+  archivos y sirve el resto desde la caché.
+- Valor: el resultado del parser (dict, ``LecturaMayor``…) en pickle
+  comprimido con zlib, un archivo por entrada en
+  ``<AUD_OF_TMP_DIR>/_parse_cache/``. El directorio lo escribe solo este
+  proceso; nunca se cargan archivos subidos por el usuario con pickle.
+- Solo se guardan resultados; si el parser lanza excepción, se propaga y no
+  se guarda nada.
+- Expulsión por tamaño total (``PARSE_CACHE_MAX_MB``, default 256): se
+  borran primero las entradas usadas hace más tiempo. ``0`` desactiva la
+  caché. Como en result_cache.py, ``put`` no recorre el directorio en cada
+  escritura: suma los bytes que agrega y solo llama a ``purge`` cuando esa
+  cuenta pasa el límite o cada ``PURGE_INTERVAL_SECONDS`` (otros procesos
+  también escriben).
+
+Como en result_cache.py, la caché nunca hace fallar un parseo: cualquier
+error de disco se trata como un fallo de caché.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib.util
+import os
+import pickle
+import threading
+import time
+import uuid
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from backend.app.core.config import env_int
+
+CACHE_DIRNAME = "_parse_cache"
+_SUFFIX = ".pkl.z"
+
+
+CACHE_MAX_MB = env_int("PARSE_CACHE_MAX_MB", 256)
+PURGE_INTERVAL_SECONDS = 300
+
+_MISS = object()
+
+
+def parser_name(parser: Callable) -> str:
+    return f"{parser.__module__}.{parser.__qualname__}"
+
+
+def _backend_imports(path: str, module: str) -> set[str]:
+    """Módulos ``backend.*`` que importa el archivo (incluye imports locales)."""
+    try:
+        tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    package = module if path.endswith("__init__.py") else module.rpartition(".")[0]
+    found: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".")
+                parts = parts[: len(parts) - (node.level - 1)] if node.level > 1 else parts
+                base = ".".join(parts + ([base] if base else []))
+            found.add(base)
+            found.update(f"{base}.{alias.name}" for alias in node.names)
+    return {m for m in found if m == "backend" or m.startswith("backend.")}
+
+
+def _module_file(module: str) -> Optional[str]:
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    origin = getattr(spec, "origin", None) if spec else None
+    return origin if origin and origin.endswith(".py") else None
+
+
+@lru_cache(maxsize=None)
+def module_version(module: str) -> str:
+    """Hash del código de ``module`` y de su clausura de imports ``backend.*``."""
+    pending, seen, files = [module], set(), {}
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = _module_file(name)
+        if path is None:
+            continue
+        files[name] = path
+        pending.extend(_backend_imports(path, name) - seen)
+
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(name.encode("utf-8"))
+        try:
+            digest.update(Path(files[name]).read_bytes())
+        except OSError:
+            continue
+    return digest.hexdigest()[:16]
+
+
+def parser_version(parser: Callable) -> str:
+    return module_version(parser.__module__)
+
+
+class ParseCache:
+    """Caché en disco de resultados de parsers. Segura entre hilos y procesos
+    (las escrituras son atómicas con ``os.replace``)."""
+
+    def __init__(self, base_dir: Optional[str] = None, max_mb: int = CACHE_MAX_MB):
+        self._base_dir = Path(base_dir) if base_dir else None
+        self.max_bytes = max(0, max_mb) * 1024 * 1024
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        # Bytes en disco según el último purge más lo que agregó put desde
+        # entonces (None: todavía no se midió).
+        self._size_bytes: Optional[int] = None
+        self._purged_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def base_dir(self) -> Path:
+        if self._base_dir is None:
+            from backend.app.core.config import settings
+
+            self._base_dir = settings.aud_of_tmp_dir_path / CACHE_DIRNAME
+        return self._base_dir
+
+    def key(self, parser: Callable, data: bytes) -> str:
+        return hashlib.sha256(
+            b"\0".join((
+                parser_name(parser).encode("utf-8"),
+                parser_version(parser).encode("ascii"),
+                hashlib.sha256(data).digest(),
+            ))
+        ).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.base_dir / key[:2] / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> Any:
+        """Resultado guardado para ``key`` o ``_MISS``."""
+        entry = self._entry(key)
+        try:
+            with open(entry, "rb") as fh:
+                value = pickle.loads(zlib.decompress(fh.read()))
+        except FileNotFoundError:
+            self._count("misses")
+            return _MISS
+        except Exception:
+            # Entrada corrupta o de una versión de Python incompatible.
+            try:
+                entry.unlink()
+            except OSError:
+                pass
+            self._count("misses")
+            return _MISS
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self._count("hits")
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Guarda ``value``. Nunca lanza excepción."""
+        try:
+            blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        except Exception:
+            return
+        if len(blob) > self.max_bytes:
+            return
+        entry = self._entry(key)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            staging = entry.parent / f".tmp_{uuid.uuid4().hex}"
+            with open(staging, "wb") as fh:
+                fh.write(blob)
+            os.replace(staging, entry)
+        except OSError:
+            return
+        self._count("stores")
+        if self._grow(len(blob)):
+            self.purge()
+
+    def _grow(self, added: int) -> bool:
+        """Suma ``added`` al tamaño estimado; True si toca purgar."""
+        with self._lock:
+            if self._size_bytes is None:
+                return True
+            self._size_bytes += added
+            return (
+                self._size_bytes > self.max_bytes
+                or time.time() - self._purged_at > PURGE_INTERVAL_SECONDS
+            )
+
+    def parse(self, parser: Callable[[bytes], Any], data: bytes) -> Any:
+        """``parser(data)``, servido desde la caché si esos bytes ya se
+        parsearon con esta misma versión del parser."""
+        if not self.enabled:
+            return parser(data)
+        key = self.key(parser, data)
+        value = self.get(key)
+        if value is _MISS:
+            value = parser(data)
+            self.put(key, value)
+        return value
+
+    def purge(self) -> None:
+        """Si la caché supera ``max_bytes``, borra las entradas menos usadas."""
+        now = time.time()
+        entries = []
+        try:
+            for path in self.base_dir.glob(f"*/*{_SUFFIX}"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self._count("evictions")
+        with self._lock:
+            self._size_bytes = total
+            self._purged_at = now
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "max_mb": self.max_bytes // (1024 * 1024), **self._counters}
+
+
+PARSE_CACHE = ParseCache()
+
+
+def cached_parse(parser: Callable[[bytes], Any], data: bytes) -> Any:
+    """``parser(data)`` a través de la caché global (ver ``ParseCache.parse``)."""
+    return PARSE_CACHE.parse(parser, data)
@@ -14,8 +14,8 @@ import tempfile
 
 from backend.app.core.config import settings
 from backend.app.security import sandbox
-
-_EXECUTION_SEMAPHORE = asyncio.Semaphore(settings.EXECUTION_CONCURRENCY)
+from backend.app.services import runner_pool
+from backend.app.services.admission import EXECUTION_ADMISSION
 
 
 def _kill_process_tree(process) -> None:
@@ -115,30 +115,41 @@ async def _execute_script_subprocess(code: str, inputs: dict) -> dict:
     with open(payload_path, "w", encoding="utf-8") as fh:
         json.dump({"code": code, "inputs": inputs}, fh, ensure_ascii=False)
 
-    process = await asyncio.create_subprocess_exec(
-        settings.PYTHON_EXECUTABLE,
-        settings.RUNNER_PATH,
-        payload_path,
-        output_path,
-        cwd=job_dir,
-        env=env,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        start_new_session=True,
-        preexec_fn=sandbox.make_rlimit_preexec(),
+    timeout_message = (
+        f"La ejecucion excedio el limite de {settings.EXECUTION_TIMEOUT_SECONDS} segundos."
     )
-
-    try:
-        stdout_bytes, stderr_bytes = await asyncio.wait_for(
-            process.communicate(), timeout=settings.EXECUTION_TIMEOUT_SECONDS
-        )
-    except asyncio.TimeoutError:
-        _kill_process_tree(process)
-        await process.communicate()
-        raise TimeoutError(
-            f"La ejecucion excedio el limite de {settings.EXECUTION_TIMEOUT_SECONDS} segundos."
+    if runner_pool.enabled():
+        # Worker precalentado: mismo entorno saneado y rlimits (ver runner_pool).
+        try:
+            returncode, stdout_bytes, stderr_bytes = await runner_pool.run_job(
+                payload_path, output_path, job_dir, settings.EXECUTION_TIMEOUT_SECONDS
+            )
+        except TimeoutError:
+            raise TimeoutError(timeout_message)
+    else:
+        process = await asyncio.create_subprocess_exec(
+            settings.PYTHON_EXECUTABLE,
+            settings.RUNNER_PATH,
+            payload_path,
+            output_path,
+            cwd=job_dir,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            preexec_fn=sandbox.make_rlimit_preexec(),
         )
 
+        try:
+            stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                process.communicate(), timeout=settings.EXECUTION_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            _kill_process_tree(process)
+            await process.communicate()
+            raise TimeoutError(timeout_message)
+        returncode = process.returncode
+
     runner_stdout = stdout_bytes.decode("utf-8", errors="replace")
     runner_stderr = stderr_bytes.decode("utf-8", errors="replace")
 
@@ -151,7 +162,7 @@ async def _execute_script_subprocess(code: str, inputs: dict) -> dict:
     with open(output_path, "r", encoding="utf-8") as fh:
         result_payload = json.load(fh)
 
-    if process.returncode != 0 and "error" not in result_payload:
+    if returncode != 0 and "error" not in result_payload:
         result_payload["error"] = (
             "La ejecucion del runner fallo."
             + (f" STDERR: {runner_stderr[:500]}" if runner_stderr else "")
@@ -165,10 +176,15 @@ async def _execute_script_subprocess(code: str, inputs: dict) -> dict:
     return result_payload
 
 
-async def run_python_code(code: str, inputs: dict = None, response_mode: str = None) -> dict:
+async def run_python_code(
+    code: str, inputs: dict = None, response_mode: str = None, is_disconnected=None
+) -> dict:
     """Punto de entrada del service para la plataforma v1.
 
-    Devuelve una respuesta estructurada (sin tocar el flujo legacy).
+    Devuelve una respuesta estructurada (sin tocar el flujo legacy). El turno
+    de ejecución pasa por el control de admisión compartido con app.py: lanza
+    ``AdmissionRejected`` (cola llena / espera vencida) o ``ClientDisconnected``
+    si ``is_disconnected`` indica que el cliente se fue mientras esperaba.
     """
     inputs = inputs or {}
     mode = (response_mode or settings.DEFAULT_RESPONSE_MODE).strip().lower()
@@ -176,7 +192,7 @@ async def run_python_code(code: str, inputs: dict = None, response_mode: str = N
     if not code:
         return {"error": "No se recibió ningún script para ejecutar."}
 
-    async with _EXECUTION_SEMAPHORE:
+    async with EXECUTION_ADMISSION.slot(is_disconnected=is_disconnected):
         execution_output = await _execute_script_subprocess(code, inputs)
 
     if execution_output.get("error"):
@@ -0,0 +1,253 @@
+"""Caché de resultados de /run_python direccionada por contenido (opt-in).
+
+Los GPTs reenvían a menudo el mismo ``script`` + ``inputs`` (reintento tras
+un timeout del cliente, regenerar el mismo reporte). Si la request pide
+``"cache": true``, el resultado se busca aquí antes de lanzar el subproceso:
+un acierto se sirve sin ejecutar nada.
+
+- Clave: sha256 de ``script`` + ``inputs`` (JSON canónico) + versión del
+  runner (hash de ``auditbrain_exec_runner.py``): cambiar el motor invalida
+  toda la caché sin tener que borrarla a mano.
+- Valor: el payload de ``output.json`` del runner y una copia de los archivos
+  generados, en ``resultados/_result_cache/<clave>/``. Al servir un acierto
+  los archivos se vuelven a publicar como en una ejecución normal.
+- Solo se guardan ejecuciones sin ``error``.
+- Expulsión: por antigüedad (``AUDITBRAIN_RESULT_CACHE_TTL_SECONDS``) y por
+  tamaño total (``AUDITBRAIN_RESULT_CACHE_MAX_MB``, se borran primero las
+  entradas usadas hace más tiempo). ``put`` no recorre la caché en cada
+  escritura: lleva la cuenta de los bytes que agregó y solo llama a
+  ``purge`` cuando esa cuenta pasa el límite o cada ``PURGE_INTERVAL_SECONDS``.
+- Todo es E/S de disco bloqueante: desde el event loop se llama con
+  ``asyncio.to_thread`` (``app.py``).
+
+El caller debe pedir caché solo para scripts deterministas: un script que lee
+la hora o la red devolverá el valor del momento en que se guardó.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend.app.core.config import env_int
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+RUNNER_PATH = PROJECT_ROOT / "auditbrain_exec_runner.py"
+CACHE_DIRNAME = "_result_cache"
+_OUTPUT_NAME = "output.json"
+_FILES_DIRNAME = "files"
+
+
+CACHE_TTL_SECONDS = env_int("AUDITBRAIN_RESULT_CACHE_TTL_SECONDS", 3600)
+CACHE_MAX_MB = env_int("AUDITBRAIN_RESULT_CACHE_MAX_MB", 200)
+PURGE_INTERVAL_SECONDS = 300
+
+
+@lru_cache(maxsize=1)
+def runner_version() -> str:
+    """Hash corto del runner: forma parte de la clave de caché."""
+    try:
+        return hashlib.sha256(RUNNER_PATH.read_bytes()).hexdigest()[:16]
+    except OSError:
+        return "unknown"
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class ResultCache:
+    """Caché en disco de ejecuciones de /run_python. Seguro entre hilos."""
+
+    def __init__(
+        self,
+        base_dir: str,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+        max_mb: int = CACHE_MAX_MB,
+        version: Optional[str] = None,
+    ):
+        self.base_dir = Path(base_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max(0, max_mb) * 1024 * 1024
+        self.version = version or runner_version()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        # Bytes en disco según el último purge más lo que agregó put desde
+        # entonces (None: todavía no se midió).
+        self._size_bytes: Optional[int] = None
+        self._purged_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_bytes > 0
+
+    def key(self, code: str, inputs) -> str:
+        canonical = json.dumps(
+            {"script": code, "inputs": inputs, "runner": self.version},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.base_dir / key
+
+    def get(self, key: str) -> Optional[dict]:
+        """Payload del runner guardado para ``key`` o ``None`` si no hay.
+
+        Los ``generated_paths`` apuntan a las copias de la caché (listos para
+        ``_publish_generated_files``). Un acierto renueva el uso de la entrada
+        para la expulsión por tamaño.
+        """
+        if not self.enabled:
+            return None
+        entry = self._entry(key)
+        output_path = entry / _OUTPUT_NAME
+        try:
+            with open(output_path, "r", encoding="utf-8") as fh:
+                stored = json.load(fh)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if time.time() - stored.get("cached_at", 0) > self.ttl_seconds:
+            shutil.rmtree(entry, ignore_errors=True)
+            self._count("misses")
+            return None
+
+        payload = stored["payload"]
+        paths = [str(entry / rel) for rel in stored.get("files", [])]
+        if not all(os.path.isfile(p) for p in paths):
+            shutil.rmtree(entry, ignore_errors=True)
+            self._count("misses")
+            return None
+        payload["generated_paths"] = paths
+        payload["cached_at"] = stored["cached_at"]
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self._count("hits")
+        return payload
+
+    def put(self, key: str, execution_output: dict) -> None:
+        """Guarda una ejecución exitosa. Nunca lanza excepción."""
+        if not self.enabled or execution_output.get("error"):
+            return
+        try:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            staging = self.base_dir / f".tmp_{uuid.uuid4().hex}"
+            files = []
+            added = 0
+            for index, source in enumerate(execution_output.get("generated_paths", [])):
+                if not os.path.isfile(source):
+                    continue
+                rel = f"{_FILES_DIRNAME}/{index}/{os.path.basename(source)}"
+                (staging / rel).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, staging / rel)
+                files.append(rel)
+                added += os.path.getsize(staging / rel)
+            payload = {
+                k: v
+                for k, v in execution_output.items()
+                if k in ("stdout", "stderr", "result")
+            }
+            staging.mkdir(parents=True, exist_ok=True)
+            with open(staging / _OUTPUT_NAME, "w", encoding="utf-8") as fh:
+                json.dump(
+                    {"cached_at": time.time(), "payload": payload, "files": files},
+                    fh,
+                    ensure_ascii=False,
+                )
+            added += os.path.getsize(staging / _OUTPUT_NAME)
+            entry = self._entry(key)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                # Otra request guardó la misma clave a la vez: vale la suya.
+                shutil.rmtree(staging, ignore_errors=True)
+            self._count("stores")
+        except OSError:
+            return
+        if self._grow(added):
+            self.purge()
+
+    def _grow(self, added: int) -> bool:
+        """Suma ``added`` al tamaño estimado; True si toca purgar."""
+        with self._lock:
+            if self._size_bytes is None:
+                return True
+            self._size_bytes += added
+            return (
+                self._size_bytes > self.max_bytes
+                or time.time() - self._purged_at > min(self.ttl_seconds, PURGE_INTERVAL_SECONDS)
+            )
+
+    def purge(self) -> None:
+        """Expulsa entradas vencidas y, si hace falta, las menos usadas."""
+        now = time.time()
+        if not self.base_dir.is_dir():
+            self._measured(0, now)
+            return
+        entries = []
+        for entry in self.base_dir.iterdir():
+            if not entry.is_dir():
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            if entry.name.startswith(".tmp_"):
+                if now - mtime > 3600:
+                    shutil.rmtree(entry, ignore_errors=True)
+                continue
+            if now - mtime > self.ttl_seconds:
+                shutil.rmtree(entry, ignore_errors=True)
+                self._count("evictions")
+                continue
+            entries.append((mtime, _dir_size(entry), entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            self._count("evictions")
+        self._measured(total, now)
+
+    def _measured(self, total: int, now: float) -> None:
+        with self._lock:
+            self._size_bytes = total
+            self._purged_at = now
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl_seconds,
+                "max_mb": self.max_bytes // (1024 * 1024),
+                "runner_version": self.version,
+                **self._counters,
+            }
@@ -0,0 +1,325 @@
+"""Pool de workers precalentados para /run_python (opt-in).
+
+Cada ejecución en frío lanza ``python auditbrain_exec_runner.py`` y el script
+del GPT paga el import de pandas/numpy/openpyxl dentro de su presupuesto de
+tiempo (~45 s de la Action). Con el pool activo hay ``AUDITBRAIN_POOL_SIZE``
+procesos ``auditbrain_pool_worker.py`` ya arrancados, con esas librerías
+importadas, esperando un job por stdin.
+
+Reglas del pool:
+
+- Cada worker se lanza exactamente como el runner en frío: entorno saneado
+  (``sandbox.build_child_env``), rlimits (``sandbox.make_rlimit_preexec``) y
+  su propio grupo de procesos (``start_new_session``) para poder matar todo
+  el árbol en un timeout.
+- Por defecto cada worker atiende UN job y se recicla
+  (``AUDITBRAIN_POOL_MAX_JOBS=1``): los rlimits, el entorno y el estado del
+  intérprete son por job, igual que en frío. Con ``MAX_JOBS > 1`` el worker se
+  reutiliza hasta ese número de jobs o hasta superar
+  ``AUDITBRAIN_POOL_MAX_RSS_MB``; ojo, entonces ``RLIMIT_CPU`` se acumula
+  entre los jobs de ese worker.
+- Al tomar un worker se lanza su reemplazo en segundo plano; si no hay
+  ninguno libre se lanza uno en el momento (cuenta como ``cold_start``).
+
+Como en sandbox.py, los knobs se leen del entorno aquí (no en config) para
+que app.py y la plataforma v1 compartan el mismo pool y comportamiento. Con
+``AUDITBRAIN_POOL_SIZE=0`` (default) el pool queda inerte y ambos flujos
+usan el subproceso en frío de siempre.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+from backend.app.core.config import env_int
+from backend.app.security import sandbox
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+WORKER_PATH = str(PROJECT_ROOT / "auditbrain_pool_worker.py")
+STDOUT_LOG = "runner_stdout.log"
+STDERR_LOG = "runner_stderr.log"
+
+
+POOL_SIZE = max(0, env_int("AUDITBRAIN_POOL_SIZE", 0))
+POOL_MAX_JOBS = max(1, env_int("AUDITBRAIN_POOL_MAX_JOBS", 1))
+POOL_MAX_RSS_MB = max(0, env_int("AUDITBRAIN_POOL_MAX_RSS_MB", 0))
+POOL_PRELOAD = os.getenv("AUDITBRAIN_POOL_PRELOAD", "pandas,numpy,openpyxl").strip()
+MAX_STD_STREAM_CHARS = env_int("AUDITBRAIN_MAX_STREAM_CHARS", 200000)
+
+
+class _Worker:
+    __slots__ = ("proc", "jobs")
+
+    def __init__(self, proc: subprocess.Popen):
+        self.proc = proc
+        self.jobs = 0
+
+
+class RunnerPool:
+    """Conjunto de workers precalentados. Seguro entre hilos."""
+
+    def __init__(
+        self,
+        size: int,
+        max_jobs: int = 1,
+        max_rss_mb: int = 0,
+        preload: str = POOL_PRELOAD,
+        python_executable: str = sys.executable,
+        worker_path: str = WORKER_PATH,
+    ):
+        self.size = max(0, size)
+        self.max_jobs = max(1, max_jobs)
+        self.max_rss_mb = max(0, max_rss_mb)
+        self.preload = preload
+        self.python_executable = python_executable
+        self.worker_path = worker_path
+        self._idle: Deque[_Worker] = deque()
+        self._busy = 0
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "spawned": 0,
+            "jobs": 0,
+            "warm_hits": 0,
+            "cold_starts": 0,
+            "timeouts": 0,
+            "recycled_max_jobs": 0,
+            "recycled_max_rss": 0,
+            "recycled_exit": 0,
+            "recycled_dead": 0,
+        }
+        self._last_rss_kb = 0
+        self._peak_rss_kb = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and os.name == "posix"
+
+    # --- ciclo de vida --------------------------------------------------
+
+    def _spawn(self) -> _Worker:
+        env = sandbox.build_child_env(
+            extra={
+                "AUDITBRAIN_MAX_STREAM_CHARS": str(MAX_STD_STREAM_CHARS),
+                "AUDITBRAIN_POOL_PRELOAD": self.preload,
+            }
+        )
+        proc = subprocess.Popen(
+            [self.python_executable, self.worker_path],
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            preexec_fn=sandbox.make_rlimit_preexec(),
+        )
+        with self._lock:
+            self._counters["spawned"] += 1
+        return _Worker(proc)
+
+    def start(self) -> None:
+        """Rellena el pool hasta ``size`` workers libres (idempotente)."""
+        if not self.enabled:
+            return
+        while True:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+            worker = self._spawn()
+            with self._lock:
+                self._idle.append(worker)
+
+    def shutdown(self) -> None:
+        """Mata los workers libres. Los ocupados se reciclan al terminar."""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for worker in idle:
+            self._kill(worker)
+
+    @staticmethod
+    def _kill(worker: _Worker) -> None:
+        try:
+            os.killpg(worker.proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, OSError):
+            try:
+                worker.proc.kill()
+            except ProcessLookupError:
+                pass
+        for stream in (worker.proc.stdin, worker.proc.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        try:
+            worker.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:  # pragma: no cover - defensa
+            pass
+
+    def _acquire(self) -> _Worker:
+        worker = None
+        with self._lock:
+            while self._idle:
+                candidate = self._idle.popleft()
+                if candidate.proc.poll() is None:
+                    worker = candidate
+                    break
+                self._counters["recycled_dead"] += 1
+            self._busy += 1
+            self._counters["warm_hits" if worker else "cold_starts"] += 1
+        if worker is None:
+            worker = self._spawn()
+        if self.max_jobs == 1:
+            # El worker no vuelve al pool: su reemplazo precalienta mientras
+            # corre el job. Con reutilización se repone en ``_release``.
+            self.start()
+        return worker
+
+    def _release(self, worker: _Worker, reusable: bool) -> None:
+        with self._lock:
+            self._busy -= 1
+            keep = reusable and len(self._idle) < self.size
+            if keep:
+                self._idle.append(worker)
+        if not keep:
+            self._kill(worker)
+            self.start()
+
+    # --- ejecución ------------------------------------------------------
+
+    @staticmethod
+    def _read_line(fd: int, deadline: float) -> Optional[bytes]:
+        """Lee una línea del protocolo; ``None`` si el worker cerró el canal."""
+        chunks = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                raise TimeoutError
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _read_log(job_dir: str, name: str) -> bytes:
+        try:
+            with open(os.path.join(job_dir, name), "rb") as fh:
+                return fh.read()
+        except OSError:
+            return b""
+
+    def run(
+        self, payload_path: str, output_path: str, job_dir: str, timeout: float
+    ) -> Tuple[int, bytes, bytes]:
+        """Ejecuta un job en un worker. Devuelve ``(returncode, stdout, stderr)``.
+
+        Lanza ``TimeoutError`` (tras matar el grupo del worker) si el job no
+        termina dentro de ``timeout`` segundos.
+        """
+        worker = self._acquire()
+        deadline = time.monotonic() + timeout
+        job = {"payload": payload_path, "output": output_path, "cwd": job_dir}
+        line = None
+        try:
+            worker.proc.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+            worker.proc.stdin.flush()
+            line = self._read_line(worker.proc.stdout.fileno(), deadline)
+        except TimeoutError:
+            with self._lock:
+                self._counters["timeouts"] += 1
+            self._release(worker, reusable=False)
+            raise
+        except (BrokenPipeError, OSError):
+            line = None
+
+        worker.jobs += 1
+        reusable = False
+        if line is None:
+            # El worker murió a mitad del job (OOM killer, rlimit, os._exit).
+            self._kill(worker)
+            returncode = worker.proc.returncode
+            returncode = returncode if returncode not in (None, 0) else 1
+            with self._lock:
+                self._counters["recycled_exit"] += 1
+        else:
+            message = json.loads(line)
+            returncode = int(message.get("returncode", 1))
+            rss_kb = int(message.get("rss_kb", 0))
+            with self._lock:
+                self._last_rss_kb = rss_kb
+                self._peak_rss_kb = max(self._peak_rss_kb, rss_kb)
+                if returncode != 0:
+                    self._counters["recycled_exit"] += 1
+                elif worker.jobs >= self.max_jobs:
+                    self._counters["recycled_max_jobs"] += 1
+                elif self.max_rss_mb and rss_kb > self.max_rss_mb * 1024:
+                    self._counters["recycled_max_rss"] += 1
+                else:
+                    reusable = True
+
+        with self._lock:
+            self._counters["jobs"] += 1
+        stdout = self._read_log(job_dir, STDOUT_LOG)
+        stderr = self._read_log(job_dir, STDERR_LOG)
+        self._release(worker, reusable)
+        return returncode, stdout, stderr
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": self.size,
+                "max_jobs": self.max_jobs,
+                "max_rss_mb": self.max_rss_mb,
+                "preload": [m for m in self.preload.split(",") if m.strip()],
+                "idle": len(self._idle),
+                "busy": self._busy,
+                "last_rss_mb": round(self._last_rss_kb / 1024, 1),
+                "peak_rss_mb": round(self._peak_rss_kb / 1024, 1),
+                **self._counters,
+            }
+
+
+POOL = RunnerPool(POOL_SIZE, max_jobs=POOL_MAX_JOBS, max_rss_mb=POOL_MAX_RSS_MB)
+
+
+def enabled() -> bool:
+    return POOL.enabled
+
+
+def start() -> None:
+    """Precalienta el pool (arranque de la app). Nunca lanza excepción."""
+    try:
+        POOL.start()
+    except Exception:  # pragma: no cover - el pool es opcional
+        pass
+
+
+def shutdown() -> None:
+    POOL.shutdown()
+
+
+def stats() -> dict:
+    return POOL.stats()
+
+
+async def run_job(
+    payload_path: str, output_path: str, job_dir: str, timeout: float
+) -> Tuple[int, bytes, bytes]:
+    """Versión async de ``RunnerPool.run`` (no bloquea el event loop)."""
+    return await asyncio.to_thread(POOL.run, payload_path, output_path, job_dir, timeout)
@@ -20,13 +20,10 @@ def find_casillero_value(text: str, casillero: str) -> float | None:
     """
     esc = re.escape(casillero)
     # 1) Línea que termina en el valor, con el código (y posible ruido) antes.
-    line_pat = rf"(?<!\d){esc}(?:\.\d{{1,2}})?(?:\s+0\.00)*\s+(-?[\d.,]*\d\.\d{{2}})\s*$"
     for ln in text.split("\n"):
-        m = re.search(line_pat, ln)
-        if m:
-            val = _to_float(m.group(1))
-            if val is not None:
-                return val
+        val = find_casillero_line_value(ln, casillero)
+        if val is not None:
+            return val
     # 2) Fallback global tolerante (código seguido de un valor decimal).
     pattern = rf"(?<!\d){esc}(?:\.\d{{1,2}})?\s+(-?[\d.,]+\d)"
     for raw in re.findall(pattern, text):
@@ -36,6 +33,15 @@ def find_casillero_value(text: str, casillero: str) -> float | None:
     return None
 
 
+def find_casillero_line_value(line: str, casillero: str) -> float | None:
+    """Paso 1 de ``find_casillero_value`` sobre UNA línea: el valor si la
+    línea termina en el importe del casillero, si no ``None``."""
+    esc = re.escape(casillero)
+    line_pat = rf"(?<!\d){esc}(?:\.\d{{1,2}})?(?:\s+0\.00)*\s+(-?[\d.,]*\d\.\d{{2}})\s*$"
+    m = re.search(line_pat, line)
+    return _to_float(m.group(1)) if m else None
+
+
 def is_formato_declaracion(text: str) -> bool:
     """True si el PDF es el formato vigente 'Declaración de Renta Sociedades'.
 
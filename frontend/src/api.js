@@ -780,7 +780,8 @@ export async function estadoSlotsOF(jobId) {
   );
 }
 
-// Fase 1: clasifica el Mayor General y deja el job en 'revision'.
+// Fase 1: encola la clasificación del Mayor General (202, job en
+// 'pending'); el workspace consulta el job hasta que queda en 'revision'.
 export async function procesarOF(jobId) {
   return parse(
     await apiFetch(`${OF_BASE}/jobs/${jobId}/procesar`, {
@@ -5,7 +5,17 @@ import "./ofWorkspace.css";
 import SlotChip from "./SlotChip.jsx";
 import EditarDatosModal from "./EditarDatosModal.jsx";
 import RevisionClasificacion from "./RevisionClasificacion.jsx";
-import { contarSubidos, estadoTile, etiquetaEstadoTile, encontrarJobActivo } from "./ofLogic.js";
+import {
+  clasificando,
+  contarSubidos,
+  estadoTile,
+  etiquetaEstadoTile,
+  encontrarJobActivo,
+  textoAvance,
+} from "./ofLogic.js";
+
+// Cada cuánto se consulta el job mientras la clasificación corre en el backend.
+const POLL_MS = 1500;
 
 // `label` es el texto corto del chip (para que la barra quepa en una fila,
 // como en el ICT); `descripcion` es el detalle completo, que va como tooltip
@@ -84,6 +94,22 @@ export default function ObligacionesFiscalesWorkspace({ projectId }) {
 
   useEffect(() => { cargarTodo(); }, [cargarTodo]);
 
+  // Mientras la fase 1 corre en segundo plano, refresca el job (y con él el
+  // avance) hasta que quede en 'revision' o 'failed'.
+  useEffect(() => {
+    if (!clasificando(job)) return undefined;
+    const t = setTimeout(async () => {
+      try {
+        const actualizado = await api.getObligacionesFiscalesJob(job.id);
+        setJob(actualizado);
+        if (actualizado.status === "failed") setError(actualizado.error_message || "");
+      } catch (e) {
+        setError(e.message);
+      }
+    }, POLL_MS);
+    return () => clearTimeout(t);
+  }, [job]);
+
   if (!projectId) {
     return (
       <div className="notice warn">
@@ -151,7 +177,8 @@ export default function ObligacionesFiscalesWorkspace({ projectId }) {
   const subidos = contarSubidos(slotsEstado, SLOT_KEYS);
   const tieneMayorGeneral = (slotsEstado.mayor_general?.n_archivos || 0) > 0;
   const jobEditable = job && (job.status === "borrador" || job.status === "revision");
-  const puedeProcesar = jobEditable && tieneMayorGeneral && !procesando;
+  const enCurso = procesando || clasificando(job);
+  const puedeProcesar = jobEditable && tieneMayorGeneral && !enCurso;
   let procesarTitle;
   if (!jobEditable) procesarTitle = STRINGS.of_ws_procesar_disabled_no_borrador;
   else if (!tieneMayorGeneral) procesarTitle = STRINGS.of_ws_procesar_disabled_sin_mayor;
@@ -244,8 +271,11 @@ export default function ObligacionesFiscalesWorkspace({ projectId }) {
                   title={procesarTitle}
                   style={{ fontWeight: 700 }}
                 >
-                  {procesando ? STRINGS.of_ws_procesando : STRINGS.of_ws_procesar}
+                  {enCurso ? STRINGS.of_ws_procesando : STRINGS.of_ws_procesar}
                 </button>
+                {clasificando(job) && (
+                  <span className="muted" style={{ fontSize: 12 }}>{textoAvance(job)}</span>
+                )}
                 <button
                   type="button"
                   className="pc-chip accent"
@@ -44,12 +44,35 @@ export function contarSubidos(estadoSlots, slotKeys) {
   return (slotKeys || []).filter((k) => (estadoSlots?.[k]?.n_archivos || 0) > 0).length;
 }
 
+// La fase 1 (clasificación del Mayor) corre en segundo plano: POST /procesar
+// deja el job en 'pending' con summary_json.fase = "clasificacion" y el
+// workspace consulta el job hasta que pasa a 'revision' o 'failed'.
+export function clasificando(job) {
+  return Boolean(
+    job &&
+      (job.status === "pending" || job.status === "running") &&
+      job.summary_json?.fase === "clasificacion"
+  );
+}
+
+// Texto de avance de la clasificación en curso, a partir de
+// summary_json.progreso. "" si todavía no hay avance publicado.
+export function textoAvance(job) {
+  const p = job?.summary_json?.progreso;
+  if (!p || p.filas_leidas === undefined) return "";
+  const n = (x) => Number(x || 0).toLocaleString("es-EC");
+  if (p.etapa === "clasificando") return `Clasificando ${n(p.cuentas_perfiladas)} cuentas…`;
+  return `Leyendo archivo ${Math.min(p.archivos_leidos + 1, p.archivos)} de ${p.archivos}: ` +
+    `${n(p.filas_leidas)} filas, ${n(p.cuentas_perfiladas)} cuentas`;
+}
+
 // Job a retomar al montar el workspace: el más reciente en 'borrador' o
-// 'revision' (los únicos estados donde "seguir trabajando" tiene sentido).
-// null si no hay ninguno — ahí el workspace ofrece crear un encargo nuevo.
+// 'revision' (los únicos estados donde "seguir trabajando" tiene sentido),
+// o uno cuya clasificación sigue en curso. null si no hay ninguno — ahí el
+// workspace ofrece crear un encargo nuevo.
 export function encontrarJobActivo(jobs) {
   const activos = (jobs || []).filter(
-    (j) => j.status === "borrador" || j.status === "revision"
+    (j) => j.status === "borrador" || j.status === "revision" || clasificando(j)
   );
   if (activos.length === 0) return null;
   return activos.reduce((mejor, j) => (j.id > mejor.id ? j : mejor));
@@ -1,12 +1,14 @@
 import { describe, expect, it } from "vitest";
 import {
   calcularCorrecciones,
+  clasificando,
   contarRequierenRevision,
   contarSubidos,
   datosEncargoParaGuardar,
   encontrarJobActivo,
   estadoTile,
   ordenarPorConfianza,
+  textoAvance,
 } from "./ofLogic.js";
 
 describe("ordenarPorConfianza", () => {
@@ -113,6 +115,38 @@ describe("encontrarJobActivo", () => {
   it("null con lista vacía", () => {
     expect(encontrarJobActivo([])).toBeNull();
   });
+
+  it("retoma un job cuya clasificación sigue en curso", () => {
+    const jobs = [
+      { id: 2, status: "borrador" },
+      { id: 3, status: "pending", summary_json: { fase: "clasificacion" } },
+      { id: 4, status: "running", summary_json: {} },
+    ];
+    expect(encontrarJobActivo(jobs).id).toBe(3);
+  });
+});
+
+describe("clasificando / textoAvance", () => {
+  const job = (status, progreso) => ({
+    status,
+    summary_json: { fase: "clasificacion", progreso },
+  });
+
+  it("solo la fase 1 en pending/running cuenta como clasificando", () => {
+    expect(clasificando(job("pending", {}))).toBe(true);
+    expect(clasificando(job("running", {}))).toBe(true);
+    expect(clasificando(job("revision", {}))).toBe(false);
+    expect(clasificando({ status: "running", summary_json: null })).toBe(false);
+  });
+
+  it("describe el avance publicado por el backend", () => {
+    expect(textoAvance(job("pending", {}))).toBe("");
+    const leyendo = { etapa: "leyendo", archivos: 2, archivos_leidos: 0,
+                      filas_leidas: 20000, cuentas_perfiladas: 340 };
+    expect(textoAvance(job("running", leyendo))).toContain("archivo 1 de 2");
+    expect(textoAvance(job("running", { ...leyendo, etapa: "clasificando" })))
+      .toContain("Clasificando");
+  });
 });
 
 describe("datosEncargoParaGuardar", () => {
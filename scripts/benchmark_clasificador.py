@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_clasificador.py — Tiempo de ``clasificar`` (fase 1 de AUD/OF)
+frente al camino anterior: ``clasificar_cuenta`` dos veces por cuenta.
+
+El camino anterior recalculaba en la segunda pasada todas las señales
+propias de cada cuenta (nombre, código, naturaleza, movimientos) y
+``senal_rama`` recorría todas las cuentas clasificadas por cada cuenta.
+El script corre ambos sobre los mismos perfiles, verifica que los
+resultados sean idénticos y reporta los tiempos.
+
+CÓMO SE USA
+-----------
+    # mayores reales del cliente (NO se commitean: son cifras de clientes)
+    python scripts/benchmark_clasificador.py ruta/mayor_2025.xlsx [...]
+
+    # con AUD_OF_FIXTURES_DIR (como tests/test_of_mayor_real_cliente.py)
+    AUD_OF_FIXTURES_DIR=... python scripts/benchmark_clasificador.py
+
+    # sin argumentos ni fixtures: plan de cuentas sintético de 5.000 cuentas
+    python scripts/benchmark_clasificador.py
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.aud.obligaciones_fiscales.mayor import senales  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.clasificador import (  # noqa: E402
+    clasificar,
+    clasificar_cuenta,
+)
+from backend.app.aud.obligaciones_fiscales.mayor.cuentas import perfilar  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.reader import leer_mayor  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import PerfilCuenta  # noqa: E402
+
+NOMBRES = [
+    "IVA en ventas 15%", "IVA sobre compras locales", "IVA diferido", "IVA retenido por clientes",
+    "Ret. 10% honorarios", "Ret. 70% servicios", "Retención fuente 1%", "Ret renta",
+    "Ventas tarifa 15%", "Ingresos por servicios", "Descuento en ventas", "Rebaja comercial",
+    "Importaciones en tránsito", "Adquisición de activos", "Proveedores locales", "Bancos",
+    "Caja chica", "Sueldos por pagar", "Gastos de viaje", "Cuenta puente", "Anticipos",
+]
+
+
+def perfiles_sinteticos(n: int = 5000, semilla: int = 3) -> dict[str, PerfilCuenta]:
+    """Plan de cuentas con ramas grandes, contrapartidas y empates de rama."""
+    r = random.Random(semilla)
+    codigos = []
+    while len(codigos) < n:
+        grupo = r.choice("12345")
+        rama = f"{grupo}.{r.randint(1, 3)}.{r.randint(1, 9)}.{r.randint(1, 9)}"
+        codigo = f"{rama}.{r.randint(1, 400)}" if r.random() < 0.9 else f"{grupo}1{r.randint(10000, 99999)}"
+        if codigo not in codigos:
+            codigos.append(codigo)
+    perfiles = {}
+    for codigo in codigos:
+        debe, haber = r.choice([(100.0, 0.0), (0.0, 100.0), (50.0, 50.0)])
+        perfiles[codigo] = PerfilCuenta(
+            codigo=codigo,
+            nombre=f"{r.choice(NOMBRES)} {codigo}",
+            debe=debe,
+            haber=haber,
+            prefijos_asiento=r.choice([{}, {"VTA": 9}, {"COM": 5, "VTA": 1}, {"RET": 7}, {"DIA": 3}]),
+            contrapartidas=[(r.choice(codigos), r.randint(1, 50))] if r.random() < 0.6 else [],
+        )
+    return perfiles
+
+
+def clasificar_anterior(perfiles, historial=None):
+    """El camino anterior: ``clasificar_cuenta`` dos veces por cuenta."""
+    historial = historial or {}
+    primera = {c: clasificar_cuenta(p, historial=historial) for c, p in perfiles.items()}
+    apoyo = {c: r.categoria for c, r in primera.items() if r.categoria and r.confianza == "alta"}
+    segunda = [clasificar_cuenta(p, historial=historial, clasificadas=apoyo) for p in perfiles.values()]
+    return sorted(segunda, key=lambda r: r.codigo)
+
+
+def _perfiles() -> dict[str, PerfilCuenta]:
+    rutas = sys.argv[1:]
+    fixtures = os.getenv("AUD_OF_FIXTURES_DIR")
+    if not rutas and fixtures and (Path(fixtures) / "MAYOR DE IMPUESTOS.xlsx").exists():
+        rutas = [str(Path(fixtures) / "MAYOR DE IMPUESTOS.xlsx")]
+    if not rutas:
+        return perfiles_sinteticos()
+    return perfilar(TablaMovimientos.concatenar(leer_mayor(Path(r).read_bytes()).movimientos for r in rutas))
+
+
+def _medir(funcion, perfiles):
+    senales.rasgos_nombre.cache_clear()
+    senales._rama.cache_clear()
+    inicio = time.perf_counter()
+    resultado = funcion(perfiles)
+    return resultado, time.perf_counter() - inicio
+
+
+def main() -> None:
+    perfiles = _perfiles()
+    print(f"{len(perfiles)} cuentas")
+    anterior, t_anterior = _medir(clasificar_anterior, perfiles)
+    nuevo, t_nuevo = _medir(clasificar, perfiles)
+    assert nuevo == anterior, "los resultados difieren"
+    print(f"anterior: {t_anterior:.3f} s")
+    print(f"   nuevo: {t_nuevo:.3f} s  (x{t_anterior / max(t_nuevo, 1e-9):.1f}, resultados idénticos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_guardar_clasificacion.py — Guardar la clasificación de un job y
+las homologaciones del cliente: fila a fila con el ORM (camino anterior)
+frente a la inserción masiva / upsert actual.
+
+El camino anterior hacía un ``db.add`` por cuenta en
+``guardar_clasificacion`` y un SELECT + INSERT/UPDATE por cuenta en
+``guardar_homologaciones``. Con miles de cuentas sobre Postgres eso son
+miles de round-trips.
+
+CÓMO SE USA
+-----------
+    # SQLite temporal (default)
+    python scripts/benchmark_guardar_clasificacion.py [n_cuentas]
+
+    # Postgres (una base de pruebas: el script crea sus tablas y filas)
+    BENCH_DATABASE_URL=postgresql://... python scripts/benchmark_guardar_clasificacion.py 5000
+"""
+
+import datetime
+import os
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or (
+    f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import delete, select  # noqa: E402
+
+from backend.app.aud.obligaciones_fiscales.mayor.clasificacion_service import (  # noqa: E402
+    guardar_clasificacion,
+)
+from backend.app.aud.obligaciones_fiscales.mayor.clasificador import clasificar  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.cuentas import monto_segun_libros  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.homologaciones import (  # noqa: E402
+    _norm,
+    guardar_homologaciones,
+)
+from backend.app.aud.obligaciones_fiscales.mayor.models import (  # noqa: E402
+    MayorClasificacionJob,
+    MayorHomologacion,
+)
+from backend.app.aud.obligaciones_fiscales.models import ToolJob  # noqa: E402
+from backend.app.context.models import Client, Organization, Project  # noqa: E402
+from backend.app.db.session import DATABASE_URL, SessionLocal, init_db  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from benchmark_clasificador import perfiles_sinteticos  # noqa: E402
+
+
+def _clasificacion_orm(db, *, job_id, resultados, perfiles):
+    db.execute(delete(MayorClasificacionJob).where(MayorClasificacionJob.job_id == job_id))
+    for r in resultados:
+        p = perfiles.get(r.codigo)
+        db.add(MayorClasificacionJob(
+            job_id=job_id, codigo_cuenta=r.codigo, nombre_cuenta=r.nombre,
+            n_movimientos=p.n_movimientos, debe=p.debe, haber=p.haber,
+            por_mes_json=monto_segun_libros(p, r.categoria),
+            categoria_sugerida=r.categoria, categoria_final=r.categoria, tarifa=r.tarifa,
+            confianza=r.confianza, origen=r.origen, senales_json=[asdict(s) for s in r.senales],
+        ))
+    db.commit()
+
+
+def _homologaciones_orm(db, *, client_id, asignaciones, user_id=None):
+    ahora = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    for a in asignaciones:
+        fila = db.execute(select(MayorHomologacion).where(
+            MayorHomologacion.client_id == client_id,
+            MayorHomologacion.codigo_cuenta == a["codigo_cuenta"],
+        )).scalar_one_or_none()
+        if fila is None:
+            db.add(MayorHomologacion(
+                client_id=client_id, codigo_cuenta=a["codigo_cuenta"],
+                nombre_norm=_norm(a["nombre_cuenta"]), categoria=a["categoria"],
+                tarifa=a.get("tarifa"), veces_usada=1, creada_por_user_id=user_id,
+                created_at=ahora, updated_at=ahora,
+            ))
+        else:
+            fila.categoria = a["categoria"]
+            fila.veces_usada += 1
+            fila.updated_at = ahora
+    db.commit()
+
+
+def _job_id(db) -> int:
+    tag = uuid.uuid4().hex[:8]
+    org = Organization(name=f"bench-{tag}", slug=f"bench-{tag}")
+    db.add(org)
+    db.flush()
+    cli = Client(organization_id=org.id, name=f"bench-{tag}")
+    db.add(cli)
+    db.flush()
+    proyecto = Project(organization_id=org.id, client_id=cli.id, name="bench")
+    db.add(proyecto)
+    db.flush()
+    job = ToolJob(project_id=proyecto.id, tool_code="bench", cliente_name="bench",
+                  period_label="2025", expires_at=datetime.datetime(2100, 1, 1))
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def _medir(funcion, **kwargs) -> float:
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        funcion(db, **kwargs)
+        return time.perf_counter() - inicio
+    finally:
+        db.close()
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    init_db()
+    perfiles = perfiles_sinteticos(n)
+    resultados = clasificar(perfiles)
+    asignaciones = [{"codigo_cuenta": r.codigo, "nombre_cuenta": r.nombre,
+                     "categoria": r.categoria or "VENTAS", "tarifa": r.tarifa} for r in resultados]
+    db = SessionLocal()
+    try:
+        jobs = [_job_id(db) for _ in range(2)]
+    finally:
+        db.close()
+
+    print(f"{DATABASE_URL.split('://')[0]}, {n} cuentas")
+    for nombre, funcion, job_id in (("orm", _clasificacion_orm, jobs[0]),
+                                    ("masivo", guardar_clasificacion, jobs[1])):
+        t = _medir(funcion, job_id=job_id, resultados=resultados, perfiles=perfiles)
+        print(f"guardar_clasificacion {nombre:>6}: {t:.3f} s")
+    for nombre, funcion, client_id in (("orm", _homologaciones_orm, 900_001),
+                                       ("masivo", guardar_homologaciones, 900_002)):
+        nuevas = _medir(funcion, client_id=client_id, asignaciones=asignaciones)
+        repetidas = _medir(funcion, client_id=client_id, asignaciones=asignaciones)
+        print(f"guardar_homologaciones {nombre:>6}: {nuevas:.3f} s nuevas, {repetidas:.3f} s actualizando")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_ict_expansion_filas.py — Costo de insertar filas en los cuadros de
+un anexo ICT: el snapshot + ``insert_rows`` + re-aplicación por cuadro del
+camino anterior, un ``expand_tabular_block`` por cuadro y un solo
+``RowExpansionPlan`` con todos (``fillers/row_expand.py``).
+
+Expande tres cuadros de la hoja A5 de la plantilla (Cuadro A con muchos
+casilleros no deducibles y dos cuadros más abajo), verifica que los tres
+caminos dejen la hoja igual (valores, fórmulas, estilos, merges, altos) y
+reporta la mediana de tiempo de cada uno.
+
+CÓMO SE USA
+-----------
+    python scripts/benchmark_ict_expansion_filas.py [filas_cuadro_a]   # default 200
+"""
+
+import statistics
+import sys
+import time
+import warnings
+from copy import copy
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.ict.fillers.base import load_template  # noqa: E402
+from backend.app.ict.fillers.row_expand import (  # noqa: E402
+    RowExpansionPlan,
+    expand_tabular_block,
+    shift_formula_rows,
+)
+
+warnings.simplefilter("ignore")
+
+HOJA = "CONCILIACIÓN COSTOS Y GASTOS A5"
+REPETICIONES = 5
+
+
+def bloques(filas_a: int) -> list[dict]:
+    return [
+        dict(insert_at=22, amount=filas_a, style_row=21,
+             inner_merges=[(5, 6), (7, 8), (9, 10)], last_col=13),
+        dict(insert_at=40, amount=20, style_row=39, inner_merges=[(2, 4)], last_col=10),
+        dict(insert_at=60, amount=20, style_row=58, last_col=14),
+    ]
+
+
+_ESTILO = ("font", "border", "fill", "number_format", "alignment", "protection")
+
+
+def _snapshot_y_reaplicar(ws, *, insert_at, amount, style_row, inner_merges=None, last_col=13):
+    """``expand_tabular_block`` del camino anterior (copia por celda)."""
+    max_row = ws.max_row
+    snapshot = {}
+    for r in range(insert_at, max_row + 1):
+        for c in range(1, last_col + 1):
+            cell = ws.cell(r, c)
+            snapshot[(r, c)] = (cell.value, *(copy(getattr(cell, a)) for a in _ESTILO))
+    old_merges = [
+        (mc.min_col, mc.min_row, mc.max_col, mc.max_row)
+        for mc in ws.merged_cells.ranges
+        if mc.min_row >= insert_at
+    ]
+    for col_ini, row_ini, col_fin, row_fin in old_merges:
+        ws.unmerge_cells(start_row=row_ini, start_column=col_ini,
+                         end_row=row_fin, end_column=col_fin)
+    old_heights = {
+        r: ws.row_dimensions[r].height
+        for r in range(insert_at, max_row + 1)
+        if ws.row_dimensions[r].height is not None
+    }
+    ws.insert_rows(insert_at, amount)
+    for (r, c), (val, *estilo) in snapshot.items():
+        dst = ws.cell(r + amount, c)
+        dst.value = shift_formula_rows(val, threshold=insert_at, amount=amount)
+        for a, v in zip(_ESTILO, estilo):
+            setattr(dst, a, v)
+    for r, h in old_heights.items():
+        ws.row_dimensions[r + amount].height = h
+    for col_ini, row_ini, col_fin, row_fin in old_merges:
+        ws.merge_cells(start_row=row_ini + amount, start_column=col_ini,
+                       end_row=row_fin + amount, end_column=col_fin)
+    src_height = ws.row_dimensions[style_row].height
+    for new_row in range(insert_at, insert_at + amount):
+        if src_height is not None:
+            ws.row_dimensions[new_row].height = src_height
+        for col in range(1, last_col + 1):
+            src, dst = ws.cell(style_row, col), ws.cell(new_row, col)
+            if src.has_style:
+                for a in _ESTILO:
+                    setattr(dst, a, copy(getattr(src, a)))
+        for col_ini, col_fin in (inner_merges or []):
+            ws.merge_cells(start_row=new_row, start_column=col_ini,
+                           end_row=new_row, end_column=col_fin)
+
+
+def anterior(ws, filas_a: int) -> None:
+    for b in sorted(bloques(filas_a), key=lambda b: -b["insert_at"]):
+        _snapshot_y_reaplicar(ws, **b)
+
+
+def por_bloque(ws, filas_a: int) -> None:
+    # Con coordenadas previas a expandir, de abajo hacia arriba.
+    for b in sorted(bloques(filas_a), key=lambda b: -b["insert_at"]):
+        expand_tabular_block(ws, **b)
+
+
+def con_plan(ws, filas_a: int) -> None:
+    plan = RowExpansionPlan(ws)
+    for b in bloques(filas_a):
+        plan.add(**b)
+    plan.apply()
+
+
+def contenido(ws):
+    celdas = {
+        k: (c.value, c.number_format, repr(c.font), repr(c.fill), repr(c.border),
+            repr(c.alignment), repr(c.protection))
+        for k, c in ws._cells.items()
+    }
+    return (celdas, sorted(str(m) for m in ws.merged_cells.ranges),
+            {k: v.height for k, v in ws.row_dimensions.items()})
+
+
+def medir(expandir, filas_a: int) -> tuple[float, object]:
+    tiempos = []
+    for _ in range(REPETICIONES):
+        ws = load_template()[HOJA]
+        inicio = time.perf_counter()
+        expandir(ws, filas_a)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), ws
+
+
+def main() -> None:
+    filas_a = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    antes, ws_antes = medir(anterior, filas_a)
+    bloque, ws_bloque = medir(por_bloque, filas_a)
+    ahora, ws_ahora = medir(con_plan, filas_a)
+    esperado = contenido(ws_antes)
+    assert contenido(ws_bloque) == esperado, "expand_tabular_block no deja la hoja igual"
+    assert contenido(ws_ahora) == esperado, "el plan no deja la hoja igual"
+    print(f"A5 con {filas_a} + 20 + 20 filas insertadas en 3 cuadros (mediana de {REPETICIONES})")
+    print(f"{'snapshot + insert_rows':>24}: {antes * 1000:8.1f} ms")
+    print(f"{'un bloque a la vez':>24}: {bloque * 1000:8.1f} ms")
+    print(f"{'un solo plan':>24}: {ahora * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_ict_indice_celdas.py — Búsquedas por casillero en las hojas DATOS
+del ICT: el recorrido lineal por casillero del camino anterior
+(``_read_cas_value`` de ``audit/metrics.py`` y ``balance_rows_for_casillero``
+sin índice) frente a ``CellIndex`` (``fillers/cell_index.py``).
+
+Arma una sesión completa: DATOS F-101 con los 888 casilleros del catálogo
+(todos con valor, así el bloque CUADRE también queda lleno) y DATOS BALANCE
+con ``n`` cuentas repartidas entre esos casilleros. Después consulta el
+valor F-101 y las filas del balance de cada casillero, verifica que ambos
+caminos respondan lo mismo y reporta la mediana de tiempo de cada uno.
+
+CÓMO SE USA
+-----------
+    python scripts/benchmark_ict_indice_celdas.py [n_cuentas]   # default 3000
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl  # noqa: E402
+
+from backend.app.ict.catalogo_f101 import F101_CASILLERO_NAMES  # noqa: E402
+from backend.app.ict.fillers.cell_index import CellIndex  # noqa: E402
+from backend.app.ict.fillers.referential_helpers import balance_rows_for_casillero  # noqa: E402
+from backend.app.ict.fillers.source_data_sheets import (  # noqa: E402
+    build_balance_sheet,
+    build_f101_sheet,
+)
+
+REPETICIONES = 3
+
+
+def sesion(n_cuentas: int):
+    casilleros = sorted(F101_CASILLERO_NAMES, key=lambda c: int(c) if c.isdigit() else 99999)
+    f101 = {cas: float(i + 1) for i, cas in enumerate(casilleros)}
+    balance = [
+        {"casillero_sri": casilleros[i % len(casilleros)], "codigo": f"1.{i:05d}",
+         "descripcion": f"Cuenta {i}", "saldo": float(i)}
+        for i in range(n_cuentas)
+    ]
+    wb = openpyxl.Workbook()
+    build_f101_sheet(wb, f101, {})
+    balance_lookup = build_balance_sheet(wb, balance)
+    return wb, casilleros, balance, balance_lookup
+
+
+def _valor_escaneando(sheet, cas: str):
+    """``_read_cas_value`` del camino anterior: recorre DATOS F-101 desde la fila 2."""
+    for row in sheet.iter_rows(min_row=2, values_only=False):
+        if row and row[0].value and str(row[0].value).strip() == cas:
+            return row[2].value if len(row) > 2 else None
+    return None
+
+
+def anterior(wb, casilleros, balance, balance_lookup):
+    datos = {"balance_mapeado": balance}
+    return {
+        cas: (_valor_escaneando(wb["DATOS F-101"], cas),
+              balance_rows_for_casillero(datos, cas, balance_lookup))
+        for cas in casilleros
+    }
+
+
+def con_indice(wb, casilleros, balance, balance_lookup):
+    index = CellIndex.from_workbook(wb)
+    datos = {"balance_mapeado": balance, "_cell_index": index}
+    return {
+        cas: (index.f101_value(cas), balance_rows_for_casillero(datos, cas, balance_lookup))
+        for cas in casilleros
+    }
+
+
+def medir(buscar, args) -> tuple[float, dict]:
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        resultado = buscar(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), resultado
+
+
+def main() -> None:
+    n_cuentas = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    args = sesion(n_cuentas)
+    antes, esperado = medir(anterior, args)
+    ahora, resultado = medir(con_indice, args)
+    assert resultado == esperado, "el índice no responde lo mismo que el recorrido"
+    print(f"{len(args[1])} casilleros F-101 + {n_cuentas} cuentas de balance "
+          f"(mediana de {REPETICIONES})")
+    print(f"{'recorrido por casillero':>24}: {antes * 1000:9.1f} ms")
+    print(f"{'CellIndex (incl. armado)':>24}: {ahora * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
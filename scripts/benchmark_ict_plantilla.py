@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_ict_plantilla.py — Costo por generación de cargar la plantilla SRI
+del ICT: ``load_workbook`` (camino anterior) frente a la copia del snapshot
+de ``fillers/template_cache.py``.
+
+Mide tres casos: parsear la plantilla, el primer ``load_template`` de un
+proceso nuevo con el snapshot ya en disco (lo que paga cada hijo del worker
+de generación) y los siguientes dentro del mismo proceso. Antes de medir
+verifica que la copia guarde las mismas celdas que la plantilla parseada.
+
+CÓMO SE USA
+-----------
+    python scripts/benchmark_ict_plantilla.py [repeticiones]   # default 10
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openpyxl import load_workbook  # noqa: E402
+
+from backend.app.ict.fillers import template_cache  # noqa: E402
+from backend.app.ict.fillers.base import TEMPLATE_PATH, load_template  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+
+def _celdas(wb) -> list:
+    buffer = BytesIO()
+    wb.save(buffer)
+    guardado = load_workbook(BytesIO(buffer.getvalue()))
+    return [
+        (ws.title, c.coordinate, c.value, c.number_format, repr(c.font), repr(c.fill),
+         repr(c.border), repr(c.alignment))
+        for ws in guardado.worksheets for fila in ws.iter_rows() for c in fila
+    ]
+
+
+def _medir(nombre: str, cargar, n: int, antes=None) -> float:
+    tiempos = []
+    for _ in range(n):
+        if antes:
+            antes()
+        inicio = time.perf_counter()
+        cargar()
+        tiempos.append(time.perf_counter() - inicio)
+    mediana = statistics.median(tiempos) * 1000
+    print(f"{nombre:>38}: {mediana:7.1f} ms")
+    return mediana
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    cache_dir = Path(tempfile.mkdtemp())
+    template_cache._cache_dir = lambda: cache_dir
+    assert _celdas(load_template()) == _celdas(template_cache._parse(TEMPLATE_PATH))
+
+    print(f"plantilla {TEMPLATE_PATH.name}, mediana de {n} cargas")
+    antes = _medir("load_workbook", lambda: template_cache._parse(TEMPLATE_PATH), n)
+    hijo = _medir("proceso nuevo (snapshot en disco)", load_template, n, antes=template_cache.clear)
+    load_template()
+    mismo = _medir("mismo proceso (snapshot en memoria)", load_template, n)
+    print(f"ahorro por generación: {antes - hijo:.1f} ms en un hijo nuevo, "
+          f"{antes - mismo:.1f} ms con hijos reutilizados o inline")
+
+
+if __name__ == "__main__":
+    main()
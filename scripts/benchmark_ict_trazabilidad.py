@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_ict_trazabilidad.py — Memoria del trace log de los fillers ICT:
+la lista de dicts del camino anterior frente a ``TraceLog``
+(``fillers/trace.py``), y tiempo de volcarlo a la hoja TRAZABILIDAD.
+
+Registra ``n`` escrituras con la forma de una generación real (casilleros
+F-101, grillas mensuales F-103/F-104, pocas hojas y orígenes repetidos) y
+mide con tracemalloc lo que queda vivo en cada representación. Después
+escribe la hoja TRAZABILIDAD en streaming desde el ``TraceLog``.
+
+CÓMO SE USA
+-----------
+    python scripts/benchmark_ict_trazabilidad.py [n_escrituras]   # default 50000
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import openpyxl  # noqa: E402
+
+from backend.app.ict.fillers import streaming  # noqa: E402
+from backend.app.ict.fillers.base import _TRACE, write_trace_sheet  # noqa: E402
+from backend.app.ict.fillers.trace import TraceLog  # noqa: E402
+
+HOJAS = ("MAPEO DE LA DECLARACIÓN A1", "DATOS F-103", "DATOS F-104", "COSTOS  GASTOS A3")
+
+
+def escrituras(n: int):
+    for i in range(n):
+        hoja = HOJAS[i % len(HOJAS)]
+        mes = f"2025-{i % 12 + 1:02d}"
+        yield ("A1" if i % 3 else "A3", str(300 + i % 900), hoja, f"C{13 + i // 4}",
+               float(i) * 1.5, f"F-103 mes {mes}" if "F-103" in hoja else "F-101 página 1",
+               "written" if i % 10 else "skipped_formula")
+
+
+def _memoria(construir) -> tuple[object, float]:
+    tracemalloc.start()
+    valor = construir()
+    vivo = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return valor, vivo / 1024 / 1024
+
+
+def _como_dicts(n: int) -> list[dict]:
+    campos = ("anexo", "casillero", "sheet", "cell", "valor", "origen", "status")
+    return [dict(zip(campos, e)) for e in escrituras(n)]
+
+
+def _como_tracelog(n: int) -> TraceLog:
+    trace = TraceLog()
+    for e in escrituras(n):
+        trace.append(*e)
+    return trace
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    _, antes = _memoria(lambda: _como_dicts(n))
+    trace, ahora = _memoria(lambda: _como_tracelog(n))
+    print(f"{n} escrituras")
+    print(f"{'lista de dicts':>16}: {antes:7.1f} MiB")
+    print(f"{'TraceLog':>16}: {ahora:7.1f} MiB")
+
+    _TRACE.set(trace)
+    wb = openpyxl.Workbook()
+    inicio = time.perf_counter()
+    write_trace_sheet(wb, streaming=True)
+    with tempfile.TemporaryFile() as destino:
+        streaming.save_workbook(wb, destino)
+    streaming.discard_streaming_sheets(wb)
+    print(f"hoja TRAZABILIDAD (streaming + guardado): {time.perf_counter() - inicio:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
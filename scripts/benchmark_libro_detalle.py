@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_libro_detalle.py — Memoria y tiempo de la hoja 'Detalle mayor'
+del libro DM: el camino anterior (libro en memoria, un Font y un formato por
+celda, ``wb.save``) frente al actual (hoja en streaming con estilos con
+nombre, ``streaming.save_workbook``).
+
+Con un mayor de 200k líneas el camino anterior mantenía 2,6M celdas con
+estilo propio vivas hasta guardar. El script construye la hoja con ambos
+caminos sobre los mismos movimientos sintéticos, verifica que el contenido
+guardado sea el mismo (en una muestra chica) y reporta el tiempo de pared
+y el pico de memoria (tracemalloc, en una segunda corrida aparte porque
+tracemalloc deforma los tiempos).
+
+CÓMO SE USA
+-----------
+    python scripts/benchmark_libro_detalle.py [n_movimientos]   # default 200000
+"""
+
+import datetime
+import random
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openpyxl import Workbook, load_workbook  # noqa: E402
+from openpyxl.utils import get_column_letter  # noqa: E402
+
+from backend.app.aud.obligaciones_fiscales.libro import hoja_detalle as hd  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento  # noqa: E402
+from backend.app.ict.fillers import streaming  # noqa: E402
+
+
+def movimientos_sinteticos(n: int, semilla: int = 7) -> list[Movimiento]:
+    r = random.Random(semilla)
+    cuentas = [(f"{r.randint(1, 5)}.1.{r.randint(1, 9)}.{i}", f"Cuenta {i}") for i in range(300)]
+    movs = []
+    for i in range(n):
+        codigo, cuenta = r.choice(cuentas)
+        debe = round(r.random() * 1000, 2) if i % 2 else 0.0
+        movs.append(Movimiento(
+            codigo=codigo, cuenta=cuenta,
+            fecha=datetime.date(2025, 1 + i % 12, 1 + i % 28) if i % 50 else None,
+            asiento=f"VTA {i}", documento=f"FAC 001-001-{i:09d}",
+            identificacion="0999999999001", persona="CLIENTE DEMO S.A.",
+            descripcion="VENTA DE PRUEBA", debe=debe, haber=0.0 if debe else 10.0,
+            saldo=debe,
+        ))
+    return movs
+
+
+def _detalle_anterior(wb, movimientos, categorias) -> None:
+    """``build_hoja_detalle`` antes del streaming: Font y formato por celda."""
+    ws = wb.create_sheet(hd.SHEET_DETALLE)
+    ws.cell(1, 1, "DETALLE DEL MAYOR · movimientos clasificados").font = hd.FONT_TITULO
+    for i, texto in enumerate(hd.ENCABEZADO, start=1):
+        ws.cell(hd.FILA_ENCABEZADO, i, texto).font = hd.FONT_ENCABEZADO
+    fila = hd.FILA_ENCABEZADO + 1
+    for m in movimientos:
+        valores = [
+            categorias.get(m.codigo, hd.SIN_CLASIFICAR),
+            m.codigo, m.cuenta, m.fecha, m.asiento, m.documento,
+            m.identificacion, m.persona, m.descripcion,
+            m.debe, m.haber, m.saldo, m.mes or "",
+        ]
+        for i, v in enumerate(valores, start=1):
+            c = ws.cell(fila, i, v)
+            c.font = hd.FONT_DATA
+            if i in (10, 11, 12):
+                c.number_format = hd.FORMATO_NUM
+            if i == 4 and m.fecha:
+                c.number_format = "yyyy-mm-dd"
+        fila += 1
+    ws.auto_filter.ref = f"A{hd.FILA_ENCABEZADO}:{get_column_letter(len(hd.ENCABEZADO))}{fila - 1}"
+    ws.freeze_panes = f"A{hd.FILA_ENCABEZADO + 1}"
+
+
+def anterior(movimientos, categorias) -> bytes:
+    wb = Workbook()
+    _detalle_anterior(wb, movimientos, categorias)
+    bio = BytesIO()
+    wb.save(bio)
+    return bio.getvalue()
+
+
+def actual(movimientos, categorias) -> bytes:
+    wb = Workbook()
+    try:
+        hd.build_hoja_detalle(wb, movimientos, categorias, streaming=True)
+        bio = BytesIO()
+        streaming.save_workbook(wb, bio)
+        return bio.getvalue()
+    finally:
+        streaming.discard_streaming_sheets(wb)
+
+
+def _valores(contenido: bytes):
+    ws = load_workbook(BytesIO(contenido))[hd.SHEET_DETALLE]
+    return [[(c.value, c.number_format) for c in fila] for fila in ws.iter_rows()], ws.auto_filter.ref
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    movimientos = movimientos_sinteticos(n)
+    categorias = {m.codigo: "VENTAS" for m in movimientos[::3]}
+    muestra = movimientos[:500]
+    assert _valores(anterior(muestra, categorias)) == _valores(actual(muestra, categorias)), \
+        "el contenido difiere"
+
+    print(f"{n} movimientos ({n * len(hd.ENCABEZADO):,} celdas)")
+    for nombre, funcion in (("anterior", anterior), ("actual", actual)):
+        inicio = time.perf_counter()
+        tamano = len(funcion(movimientos, categorias))
+        segundos = time.perf_counter() - inicio
+        tracemalloc.start()
+        funcion(movimientos, categorias)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{nombre:>8}: {segundos:6.2f} s, pico {pico / 2**20:7.1f} MiB, xlsx {tamano / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
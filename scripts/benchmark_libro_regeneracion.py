@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_libro_regeneracion.py — Tiempo de ``armar_libro`` al regenerar el
+libro DM de un job después de corregir categorías, con y sin la caché del
+job (``libro/cache.py``).
+
+Sin caché, cada regeneración reescribe 'Detalle mayor' entera; con caché
+solo se reescribe su columna Categoría (más el resumen y las cédulas, que
+dependen de las categorías). El script arma una vez sin caché, una vez con
+la caché vacía (la primera generación, que la llena) y dos regeneraciones
+corrigiendo una cuenta cada vez.
+
+CÓMO SE USA
+-----------
+    python scripts/benchmark_libro_regeneracion.py [n_movimientos]   # default 200000
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.aud.obligaciones_fiscales import file_storage  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.libro.cache import CacheLibro  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.libro.ensamblador import armar_libro  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from benchmark_libro_detalle import movimientos_sinteticos  # noqa: E402
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    movimientos = TablaMovimientos.desde(movimientos_sinteticos(n))
+    clasificacion = [
+        SimpleNamespace(codigo_cuenta=c, nombre_cuenta=c, categoria_final="VENTAS",
+                        por_mes_json={"01": 1.0}, n_movimientos=1, debe=0.0, haber=0.0)
+        for c in sorted(set(movimientos.vocabularios["codigo"]) - {""})
+    ]
+    raiz = Path(tempfile.mkdtemp())
+    file_storage._root = lambda: raiz
+    job_dir = file_storage.create_job_dir(1)
+    file_storage.save_input(job_dir, "mayor_general", "mayor.xlsx", b"mayor sintetico")
+
+    print(f"{n} movimientos, {len(clasificacion)} cuentas")
+    pasos = (("sin caché", None), ("primera generación", job_dir),
+             ("corrección 1", job_dir), ("corrección 2", job_dir))
+    for i, (nombre, directorio) in enumerate(pasos):
+        if nombre.startswith("corrección"):
+            clasificacion[i].categoria_final = "IVA_COMPRAS"
+        inicio = time.perf_counter()
+        armar_libro(
+            clasificacion=clasificacion, movimientos=movimientos,
+            f104_monthly={}, f103_monthly={}, periodo="2025",
+            cache=CacheLibro(directorio) if directorio else None,
+        )
+        print(f"{nombre:>18}: {time.perf_counter() - inicio:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
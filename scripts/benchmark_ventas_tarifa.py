@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmark_ventas_tarifa.py — Cuántos asientos de ventas resuelve la
+separación gravada / 0% con la búsqueda por mitades frente al tope anterior.
+
+Antes, todo asiento con más de MAX_LINEAS_BUSQUEDA (24) líneas de venta
+quedaba POR ASIGNAR sin buscar. Este script corre ``separar_ventas_por_tarifa``
+dos veces sobre el mismo mayor:
+
+  - "tope 24": con MAX_COMBINACIONES = 0 la búsqueda por mitades se rinde
+    en seguida, que es exactamente el comportamiento anterior;
+  - "mitades": con el presupuesto normal por asiento.
+
+y reporta asientos resueltos, monto POR ASIGNAR y tiempo de cada corrida.
+
+CÓMO SE USA
+-----------
+    # mayores reales del cliente (NO se commitean: son cifras de clientes)
+    python scripts/benchmark_ventas_tarifa.py ruta/mayor_2025.xlsx [...]
+
+    # sin argumentos: un mayor sintético con asientos de cierre grandes
+    python scripts/benchmark_ventas_tarifa.py
+
+Las categorías salen del clasificador automático (sin historial), como en la
+fase 1 de un job nuevo.
+"""
+
+import datetime
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.aud.obligaciones_fiscales.mayor import ventas_tarifa  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.clasificador import clasificar  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.cuentas import perfilar  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.reader import leer_mayor  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos  # noqa: E402
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento  # noqa: E402
+
+
+def _mayor_sintetico(semilla: int = 7):
+    """Asientos de 1 a 200 líneas; en cada uno unas pocas líneas gravadas."""
+    r = random.Random(semilla)
+    movs, categorias = [], {"4.1.1.1": "VENTAS", "4.1.1.2": "VENTAS", "2.1.7.4.1": "IVA_VENTAS"}
+    for n in range(300):
+        lineas = r.choice([1, 2, 3, 5, 8, 19, 30, 60, 120, 200])
+        importes = [r.randrange(100, 2_000_000) / 100 for _ in range(lineas)]
+        gravadas = r.sample(range(lineas), min(lineas, r.choice([1, 2, 3, 4])))
+        fecha = datetime.date(2025, 1 + n % 12, 28)
+        for i, v in enumerate(importes):
+            movs.append(Movimiento(codigo=r.choice(["4.1.1.1", "4.1.1.2"]), asiento=f"CIE {n}",
+                                   fecha=fecha, haber=v))
+        iva = round(sum(importes[i] for i in gravadas) * 0.15, 2)
+        movs.append(Movimiento(codigo="2.1.7.4.1", asiento=f"CIE {n}", fecha=fecha, haber=iva))
+    return movs, categorias
+
+
+def _mayor_real(rutas: list[str]):
+    movs = TablaMovimientos.concatenar(leer_mayor(Path(r).read_bytes()).movimientos for r in rutas)
+    categorias = {r.codigo: r.categoria for r in clasificar(perfilar(movs))}
+    return movs, categorias
+
+
+def _correr(movs, categorias, max_combinaciones: int) -> dict:
+    original_cupo, original_buscador = ventas_tarifa.MAX_COMBINACIONES, ventas_tarifa._buscador
+    resueltos, intentados = [0], [0]
+
+    def _contar(valores):
+        buscar = original_buscador(valores)
+        intentados[0] += 1
+        hallado = [False]
+
+        def _buscar(objetivo):
+            indices = buscar(objetivo)
+            if indices is not None and not hallado[0]:
+                hallado[0] = True
+                resueltos[0] += 1
+            return indices
+
+        return _buscar
+
+    ventas_tarifa.MAX_COMBINACIONES = max_combinaciones
+    ventas_tarifa._buscador = _contar
+    try:
+        inicio = time.perf_counter()
+        desglose = ventas_tarifa.separar_ventas_por_tarifa(movs, categorias)
+        segundos = time.perf_counter() - inicio
+    finally:
+        ventas_tarifa.MAX_COMBINACIONES = original_cupo
+        ventas_tarifa._buscador = original_buscador
+    por_asignar = sum(v for c in desglose.values() for v in c["por_asignar"].values())
+    return {"buscados": intentados[0], "resueltos": resueltos[0],
+            "por_asignar": round(por_asignar, 2), "segundos": round(segundos, 2)}
+
+
+def main() -> None:
+    movs, categorias = _mayor_real(sys.argv[1:]) if len(sys.argv) > 1 else _mayor_sintetico()
+    print(f"{len(movs)} movimientos, {sum(1 for k in categorias.values() if k == 'VENTAS')} cuentas de ventas")
+    for nombre, cupo in (("tope 24", 0), ("mitades", ventas_tarifa.MAX_COMBINACIONES)):
+        r = _correr(movs, categorias, cupo)
+        print(f"{nombre:>8}: {r['resueltos']}/{r['buscados']} asientos mixtos resueltos, "
+              f"por asignar {r['por_asignar']:,.2f}, {r['segundos']} s")
+
+
+if __name__ == "__main__":
+    main()
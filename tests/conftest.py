@@ -34,6 +34,13 @@ else:
     _TEST_DB.unlink(missing_ok=True)
     os.environ["DATABASE_URL"] = f"sqlite:///{_TEST_DB.as_posix()}"
 
+# --- Cola de jobs ------------------------------------------------------
+#
+# En modo ``inline`` la tarea corre dentro del request que la encola, como
+# corrían los BackgroundTasks en TestClient: los tests siguen siendo
+# síncronos. Los que prueban el pool en segundo plano usan ``job_pool``.
+os.environ.setdefault("AUDITBRAIN_JOB_QUEUE_MODE", "inline")
+
 sys.path.insert(0, str(_REPO_ROOT))
 
 import app as legacy_app  # noqa: E402
@@ -60,3 +67,15 @@ def _ensure_schema():
 def client():
     with TestClient(legacy_app.app) as c:
         yield c
+
+
+@pytest.fixture()
+def job_pool(monkeypatch):
+    """Pool de la cola de jobs corriendo en segundo plano (modo ``embedded``)."""
+    from backend.app.services import job_queue
+
+    cola = job_queue.JobQueue(mode="embedded")
+    monkeypatch.setattr(job_queue, "JOB_QUEUE", cola)
+    cola.start()
+    yield cola
+    cola.shutdown()
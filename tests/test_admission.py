@@ -0,0 +1,145 @@
+"""Control de admisión del runner: cola y espera acotadas, desconexión."""
+
+import asyncio
+
+import pytest
+
+from backend.app.services import admission
+
+
+async def _ocupar(ctrl, liberar: asyncio.Event, **kwargs):
+    async with ctrl.slot(**kwargs):
+        await liberar.wait()
+
+
+async def test_slot_libre_entra_sin_esperar():
+    ctrl = admission.AdmissionController(concurrency=1, max_queue=0, max_wait_seconds=1)
+    async with ctrl.slot():
+        assert ctrl.stats()["running"] == 1
+    stats = ctrl.stats()
+    assert stats["admitted"] == 1
+    assert stats["wait_seconds"]["count"] == 1
+    assert stats["queue_depth_on_arrival"]["buckets"]["0"] == 1
+
+
+async def test_cola_llena_rechaza_con_429():
+    ctrl = admission.AdmissionController(concurrency=1, max_queue=1, max_wait_seconds=10)
+    liberar = asyncio.Event()
+    ocupante = asyncio.create_task(_ocupar(ctrl, liberar))
+    en_cola = asyncio.create_task(_ocupar(ctrl, liberar))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(admission.AdmissionRejected) as exc:
+        async with ctrl.slot():
+            pass
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+
+    liberar.set()
+    await asyncio.gather(ocupante, en_cola)
+    assert ctrl.stats()["rejected_queue_full"] == 1
+    assert ctrl.stats()["admitted"] == 2
+
+
+async def test_espera_vencida_rechaza_con_503():
+    ctrl = admission.AdmissionController(concurrency=1, max_queue=4, max_wait_seconds=0.2)
+    liberar = asyncio.Event()
+    ocupante = asyncio.create_task(_ocupar(ctrl, liberar))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(admission.AdmissionRejected) as exc:
+        async with ctrl.slot():
+            pass
+    assert exc.value.status_code == 503
+
+    liberar.set()
+    await ocupante
+    # El slot que venció no quedó tomado: se puede volver a entrar.
+    async with ctrl.slot():
+        pass
+    assert ctrl.stats()["waiting"] == 0
+
+
+async def test_desconexion_cancela_la_espera(monkeypatch):
+    monkeypatch.setattr(admission, "_DISCONNECT_POLL_SECONDS", 0.05)
+    ctrl = admission.AdmissionController(concurrency=1, max_queue=4, max_wait_seconds=10)
+    liberar = asyncio.Event()
+    ocupante = asyncio.create_task(_ocupar(ctrl, liberar))
+    await asyncio.sleep(0.01)
+
+    async def desconectado():
+        return True
+
+    ejecutado = False
+    with pytest.raises(admission.ClientDisconnected):
+        async with ctrl.slot(is_disconnected=desconectado):
+            ejecutado = True
+    assert ejecutado is False
+    assert ctrl.stats()["cancelled_disconnect"] == 1
+
+    liberar.set()
+    await ocupante
+
+
+async def test_no_acotado_ignora_cola_y_plazo():
+    ctrl = admission.AdmissionController(concurrency=1, max_queue=0, max_wait_seconds=0.05)
+    liberar = asyncio.Event()
+    ocupante = asyncio.create_task(_ocupar(ctrl, liberar))
+    await asyncio.sleep(0.01)
+
+    async def tarde():
+        await asyncio.sleep(0.2)
+        liberar.set()
+
+    asyncio.create_task(tarde())
+    async with ctrl.slot(bounded=False):
+        pass
+    await ocupante
+    assert ctrl.stats()["admitted"] == 2
+
+
+async def test_jobs_async_en_cola_no_provocan_429_en_requests_sincronas():
+    ctrl = admission.AdmissionController(concurrency=1, max_queue=2, max_wait_seconds=10)
+    liberar = asyncio.Event()
+    jobs = [asyncio.create_task(_ocupar(ctrl, liberar, bounded=False)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    stats = ctrl.stats()
+    assert stats["running"] == 1
+    assert stats["waiting"] == 0 and stats["waiting_unbounded"] == 2
+
+    sincronas = [asyncio.create_task(_ocupar(ctrl, liberar)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert ctrl.stats()["waiting"] == 2
+    assert ctrl.stats()["rejected_queue_full"] == 0
+
+    liberar.set()
+    await asyncio.gather(*jobs, *sincronas)
+    stats = ctrl.stats()
+    assert stats["admitted"] == 5
+    assert stats["waiting"] == 0 and stats["waiting_unbounded"] == 0
+
+
+def test_run_python_rechazado_devuelve_429_con_retry_after(client, monkeypatch):
+    async def rechazar(*args, **kwargs):
+        raise admission.AdmissionRejected(429, "Servidor ocupado", 12)
+
+    class _Ctrl:
+        def slot(self, **kwargs):
+            class _Ctx:
+                __aenter__ = rechazar
+
+                async def __aexit__(self, *exc):
+                    return False
+
+            return _Ctx()
+
+    monkeypatch.setattr(admission, "EXECUTION_ADMISSION", _Ctrl())
+    resp = client.post("/run_python", json={"script": "result = 1"})
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "12"
+
+
+def test_endpoint_de_metricas_de_admision(client):
+    body = client.get("/api/v1/python/admission").json()
+    assert {"waiting", "running", "wait_seconds", "queue_depth_on_arrival"} <= set(body)
+    assert "+Inf" in body["wait_seconds"]["buckets"]
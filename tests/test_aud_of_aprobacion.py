@@ -1,12 +1,12 @@
 """El auditor corrige, aprueba, y lo aprendido queda para el próximo año."""
 
-from tests.test_aud_of_fase1 import _borrador_con_mayor  # noqa: F401
+from tests.test_aud_of_fase1 import _borrador_con_mayor, _procesar  # noqa: F401
 from tests.test_aud_of_router import _db, _h, _mk_admin_project  # noqa: F401
 
 
 def _procesado(client):
     tok, jid = _borrador_con_mayor(client)
-    client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    _procesar(client, tok, jid)
     return tok, jid
 
 
@@ -86,7 +86,7 @@ def test_el_segundo_job_del_mismo_cliente_ya_llega_clasificado_por_historial(cli
         files=[("archivos", ("mayor.xlsx", io.BytesIO(_mayor_bytes()),
                 "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"))],
     )
-    client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid2}/procesar", headers=_h(tok))
+    _procesar(client, tok, jid2)
     r3 = client.get(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid2}/clasificacion", headers=_h(tok))
     cuentas = {c["codigo_cuenta"]: c for c in r3.json()["cuentas"]}
     assert cuentas["4.1.1.4"]["categoria_final"] == "IVA_VENTAS"
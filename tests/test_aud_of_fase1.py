@@ -43,17 +43,23 @@ def _borrador_con_mayor(client):
     return tok, jid
 
 
+def _procesar(client, tok, jid):
+    # La suite encola en modo inline (conftest.py): al responder, la
+    # clasificación ya terminó.
+    return client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+
+
 def test_procesar_deja_el_job_en_revision(client):
     tok, jid = _borrador_con_mayor(client)
-    r = client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
-    assert r.status_code == 200, r.text
+    r = _procesar(client, tok, jid)
+    assert r.status_code == 202, r.text
     r2 = client.get(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}", headers=_h(tok))
     assert r2.json()["status"] == "revision"
 
 
 def test_la_clasificacion_queda_disponible_para_la_pantalla_de_revision(client):
     tok, jid = _borrador_con_mayor(client)
-    client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    _procesar(client, tok, jid)
     r = client.get(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/clasificacion", headers=_h(tok))
     assert r.status_code == 200
     cuentas = {c["codigo_cuenta"]: c for c in r.json()["cuentas"]}
@@ -65,7 +71,7 @@ def test_la_clasificacion_queda_disponible_para_la_pantalla_de_revision(client):
 
 def test_la_respuesta_trae_las_categorias_disponibles_para_el_selector(client):
     tok, jid = _borrador_con_mayor(client)
-    client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    _procesar(client, tok, jid)
     r = client.get(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/clasificacion", headers=_h(tok))
     codigos = {c["codigo"] for c in r.json()["categorias"]}
     assert "IVA_COMPRAS" in codigos and "VENTAS" in codigos
@@ -73,7 +79,7 @@ def test_la_respuesta_trae_las_categorias_disponibles_para_el_selector(client):
 
 def test_cada_cuenta_explica_por_que_quedo_ahi(client):
     tok, jid = _borrador_con_mayor(client)
-    client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    _procesar(client, tok, jid)
     r = client.get(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/clasificacion", headers=_h(tok))
     cuenta = next(c for c in r.json()["cuentas"] if c["codigo_cuenta"] == "1.1.5.1.1")
     assert cuenta["justificacion"], "la pantalla necesita el porqué de cada clasificación"
@@ -104,7 +110,7 @@ def test_un_mayor_ilegible_deja_el_job_en_failed_con_el_motivo(client):
         files=[("archivos", ("roto.xlsx", io.BytesIO(b"no soy un excel"),
                 "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"))],
     )
-    client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    _procesar(client, tok, jid)
     r2 = client.get(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}", headers=_h(tok))
     assert r2.json()["status"] == "failed"
     assert r2.json()["error_message"]
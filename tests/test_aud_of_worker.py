@@ -0,0 +1,99 @@
+"""Fase 1 de AUD/OF en el worker (backend/app/aud/obligaciones_fiscales/worker.py)."""
+
+import datetime
+import threading
+import time
+
+from backend.app.aud.obligaciones_fiscales import jobs, service, worker
+from backend.app.aud.obligaciones_fiscales.models import ToolJob
+from backend.app.db.session import SessionLocal
+from backend.app.services import job_queue
+from tests.test_aud_of_fase1 import _borrador_con_mayor, _procesar  # noqa: F401
+from tests.test_aud_of_router import _db, _h, _mk_admin_project  # noqa: F401
+
+
+def _job(client, tok, jid):
+    return client.get(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}", headers=_h(tok)).json()
+
+
+def _esperar(client, tok, jid, timeout=30.0):
+    """Consulta el job (como el frontend) hasta que el pool de la cola
+    termina la clasificación."""
+    fin = time.monotonic() + timeout
+    while True:
+        job = _job(client, tok, jid)
+        if job["status"] not in ("pending", "running") or time.monotonic() > fin:
+            return job
+        time.sleep(0.05)
+
+
+def test_procesar_responde_sin_esperar_la_clasificacion(client, job_pool, monkeypatch):
+    tok, jid = _borrador_con_mayor(client)
+    soltar = threading.Event()
+    original = jobs.clasificar_mayor_job
+
+    def _lenta(job_id):
+        soltar.wait(10)
+        original(job_id)
+
+    monkeypatch.setattr(jobs, "clasificar_mayor_job", _lenta)
+    r = client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    assert r.status_code == 202
+    assert r.json()["status"] == "pending"
+    assert r.json()["summary_json"]["fase"] == "clasificacion"
+
+    # Mientras está en cola no se puede volver a procesar.
+    r2 = client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    assert r2.status_code == 409
+
+    soltar.set()
+    assert _esperar(client, tok, jid)["status"] == "revision"
+
+
+def test_el_avance_se_publica_mientras_se_lee_el_mayor(client, monkeypatch):
+    tok, jid = _borrador_con_mayor(client)
+    publicados = []
+    original = service.mark_progress
+
+    def _anotar(db, job_id, progreso):
+        publicados.append(progreso)
+        original(db, job_id, progreso)
+
+    monkeypatch.setattr(jobs, "AVANCE_CADA_FILAS", 2)
+    monkeypatch.setattr(service, "mark_progress", _anotar)
+    _procesar(client, tok, jid)
+
+    assert publicados[0] == {"etapa": "leyendo", "archivos": 1, "archivos_leidos": 0,
+                             "filas_leidas": 2, "cuentas_perfiladas": 2}
+    assert publicados[-1] == {"etapa": "clasificando", "archivos": 1, "archivos_leidos": 1,
+                              "filas_leidas": 3, "cuentas_perfiladas": 3}
+    assert _job(client, tok, jid)["summary_json"]["movimientos_leidos"] == 3
+
+
+def test_la_clasificacion_que_un_reinicio_dejo_a_medias_se_retoma(client, job_pool):
+    """El proceso murió con el job reclamado: al vencer el lease, la cola lo
+    devuelve a ``queued`` y el pool de este proceso lo termina."""
+    tok, jid = _borrador_con_mayor(client)
+    db = SessionLocal()
+    try:
+        job = db.get(ToolJob, jid)
+        job.status = "running"
+        job.summary_json = {"fase": "clasificacion", "progreso": {"filas_leidas": 1}}
+        job.queue_task, job.queue_status, job.queue_attempts = worker.TAREA, "leased", 1
+        job.queue_lease_owner = "muerto:1:abc"
+        job.queue_lease_until = datetime.datetime(2020, 1, 1)
+        db.commit()
+    finally:
+        db.close()
+
+    assert job_pool.requeue_expired() >= 1
+    job_pool._despertar.set()
+    assert _esperar(client, tok, jid)["status"] == "revision"
+
+
+def test_modo_inline_clasifica_dentro_del_request(client, monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_QUEUE", job_queue.JobQueue(mode="inline"))
+    tok, jid = _borrador_con_mayor(client)
+    r = client.post(f"/api/v1/aud/obligaciones-fiscales/jobs/{jid}/procesar", headers=_h(tok))
+    assert r.status_code == 202
+    assert r.json()["status"] == "revision"
@@ -96,7 +96,7 @@ def test_create_stub_job_and_complete(client, logged_client, db_session):
     assert r.status_code == 201
     job_id = r.json()["id"]
 
-    # Poll until done (BackgroundTasks runs synchronously in TestClient)
+    # The job queue runs inline in the test suite (see conftest.py)
     r2 = client.get(
         f"/api/v1/client/tools/jobs/{job_id}",
         headers=logged_client["headers"],
@@ -83,3 +83,14 @@ def test_compute_anexos_metrics_returns_9_anexos():
     assert len(am.anexos) == 9
     codes = [a.codigo for a in am.anexos]
     assert codes == ["A1", "A2", "A3", "A4", "A5", "A6", "A7", "A8", "A9"]
+
+
+def test_compute_a1_metrics_usa_el_indice_de_la_generacion():
+    from backend.app.ict.fillers.cell_index import CellIndex
+    wb = _build_minimal_a1_workbook()
+    index = CellIndex.from_workbook(wb)
+    # Cambios posteriores a la hoja no se releen: el índice es de la generación.
+    wb["DATOS F-101"]["C2"] = 1.0
+    m = compute_a1_metrics(wb, index=index)
+    assert m.activo_total == Decimal("21671880.68")
+    assert compute_a1_metrics(wb).activo_total == Decimal("1.0")
@@ -20,3 +20,74 @@ def test_load_template_data_only_false_preserves_formulas():
     # Just verify it loads without error and is a Workbook
     from openpyxl.workbook import Workbook as WB
     assert isinstance(wb, WB)
+
+
+def test_load_template_returns_independent_copies():
+    first = load_template()
+    first["INDICE"]["A1"] = "escrito por otra generación"
+    second = load_template()
+    assert second["INDICE"]["A1"].value != "escrito por otra generación"
+    assert second is not first and second["INDICE"].parent is second
+    # Las dimensiones siguen creándose a demanda, como en un load_workbook.
+    assert second["INDICE"].row_dimensions[5000].height is None
+    assert second["INDICE"].column_dimensions["ZZ"].index == "ZZ"
+
+
+def test_template_snapshot_is_reused_across_processes_and_invalidated_on_change(tmp_path, monkeypatch):
+    import shutil
+
+    from openpyxl import load_workbook
+
+    from backend.app.ict.fillers import template_cache
+    from backend.app.ict.fillers.base import TEMPLATE_PATH
+
+    template = tmp_path / "plantilla.xlsx"
+    shutil.copy(TEMPLATE_PATH, template)
+    monkeypatch.setattr(template_cache, "_cache_dir", lambda: tmp_path / "cache")
+    template_cache.clear()
+    assert template_cache.load(template)["INDICE"]["A1"].value == load_workbook(template)["INDICE"]["A1"].value
+    assert len(list((tmp_path / "cache").glob("*.pkl"))) == 1
+
+    # Un proceso nuevo (sin snapshot en memoria) no vuelve a parsear.
+    template_cache.clear()
+    parses = []
+    real_parse = template_cache._parse
+    monkeypatch.setattr(template_cache, "_parse", lambda p: parses.append(p) or real_parse(p))
+    template_cache.load(template)
+    assert parses == []
+
+    wb = load_workbook(template)
+    wb["INDICE"]["A1"] = "PLANTILLA NUEVA"
+    wb.save(template)
+    assert template_cache.load(template)["INDICE"]["A1"].value == "PLANTILLA NUEVA"
+    assert parses == [template]
+    template_cache.clear()
+
+
+def test_trace_log_keeps_entries_and_indexes_by_cell_and_casillero():
+    from backend.app.ict.fillers.base import _record, get_trace, reset_trace
+
+    reset_trace()
+    _record("A1", 301, "A1", "C13", 10.5, "F-101", "written")
+    _record("A2", None, "A2", "D5", "=SUM(D1:D4)", None, "skipped_formula")
+    _record("A1", "301", "A1", "C13", 11.0, "F-101 v2", "written")
+    trace = get_trace()
+
+    assert len(trace) == 3 and trace.count("written") == 2
+    assert trace[1] == {"anexo": "A2", "casillero": "", "sheet": "A2", "cell": "D5",
+                        "valor": "=SUM(D1:D4)", "origen": "", "status": "skipped_formula"}
+    assert [e["valor"] for e in trace.at("A1", "C13")] == [10.5, 11.0]
+    assert [e["origen"] for e in trace.for_casillero("301")] == ["F-101", "F-101 v2"]
+    assert trace.at("A9", "Z1") == [] and trace.written_by_anexo() == {"A1": 2}
+    _record("A3", "301", "A3", "E7", 1.0, "Balance", "written")
+    assert len(trace.for_casillero(301)) == 3
+
+
+def test_get_trace_devuelve_el_trace_activo_aunque_este_vacio():
+    from backend.app.ict.fillers.base import _record, get_trace, reset_trace
+
+    reset_trace()
+    trace = get_trace()
+    assert len(trace) == 0
+    _record("A1", "301", "A1", "C13", 1.0, "F-101", "written")
+    assert len(trace) == 1 and get_trace() is trace
@@ -0,0 +1,64 @@
+"""Huella de entradas de /process del ICT (backend/app/ict/fingerprint.py)."""
+
+from types import SimpleNamespace
+
+from backend.app.aud.obligaciones_fiscales import file_storage
+from backend.app.ict import fingerprint
+from backend.app.ict import service as ict_service
+from tests.test_ict_router import db_session, logged_client  # noqa: F401
+
+
+def _sesion(tmp_path, monkeypatch, **campos):
+    monkeypatch.setattr(file_storage, "_root", lambda: tmp_path)
+    anexo = SimpleNamespace(anexo_code="A1", extracted_data={"f101": {"399": 10.0}},
+                            uploaded_files={"f101": [{"filename": "f101.pdf"}]})
+    datos = dict(id=7, ruc="0999999999001", razon_social="DEMO S.A.", ejercicio_fiscal="2025",
+                 numero_adhesivo="", anexos=[anexo])
+    datos.update(campos)
+    return SimpleNamespace(**datos)
+
+
+def test_la_huella_solo_cambia_con_el_contenido_y_dice_que_cambio(tmp_path, monkeypatch):
+    sesion = _sesion(tmp_path, monkeypatch)
+    pdf = tmp_path / "ict" / "7" / "A1" / "f101" / "f101.pdf"
+    pdf.parent.mkdir(parents=True)
+    pdf.write_bytes(b"%PDF v1")
+    (tmp_path / "ict" / "7" / "_output").mkdir()
+    (tmp_path / "ict" / "7" / "_output" / "ICT_SRI.xlsx").write_bytes(b"x")
+    antes = fingerprint.compute(sesion)
+    assert list(antes["archivos"]) == ["A1/f101/f101.pdf"]  # _output no cuenta
+
+    pdf.write_bytes(b"%PDF v1")  # mismo contenido, otro mtime
+    assert fingerprint.changed_inputs(antes, fingerprint.compute(sesion, antes)) == []
+
+    pdf.write_bytes(b"%PDF v2")
+    sesion.razon_social = "DEMO CIA. LTDA."
+    sesion.anexos[0].extracted_data = {"f101": {"399": 11.0}}
+    assert fingerprint.changed_inputs(antes, fingerprint.compute(sesion, antes)) == [
+        "archivo A1/f101/f101.pdf", "contribuyente razon_social", "datos del anexo A1",
+    ]
+    assert fingerprint.changed_inputs(None, antes) == ["sin procesamiento anterior"]
+
+
+def test_process_sin_cambios_devuelve_el_reporte_guardado(client, logged_client, monkeypatch):  # noqa: F811
+    kw = dict(headers=logged_client["headers"], cookies=logged_client["cookies"])
+    r = client.post("/api/v1/client/ict/sessions",
+                    json={"ejercicio_fiscal": "2025", "ruc": "1234567890001", "razon_social": "X"}, **kw)
+    session_id = r.json()["id"]
+    monkeypatch.setattr("backend.app.ict.worker.ICT_WORKER.mode", "inline")
+    fingerprint.invalidate(session_id)  # por si quedó una huella de otra base de tests
+
+    primero = client.post(f"/api/v1/client/ict/sessions/{session_id}/process", **kw).json()
+    assert primero["excel_ready"] and primero["cached"] is False
+
+    reparseos = []
+    monkeypatch.setattr(ict_service, "reparse_session_uploads",
+                        lambda db, session: reparseos.append(session.id))
+    segundo = client.post(f"/api/v1/client/ict/sessions/{session_id}/process", **kw).json()
+    assert segundo["cached"] is True and reparseos == []
+    assert segundo["results"] == primero["results"]
+
+    client.patch(f"/api/v1/client/ict/sessions/{session_id}", json={"razon_social": "Y"}, **kw)
+    tercero = client.post(f"/api/v1/client/ict/sessions/{session_id}/process", **kw).json()
+    assert tercero["cached"] is False and reparseos == [session_id]
+    assert tercero["changed_inputs"] == ["contribuyente razon_social"]
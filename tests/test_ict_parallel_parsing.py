@@ -0,0 +1,58 @@
+"""Parseo en paralelo de lotes F-103/F-104 (backend/app/ict/parsers/parallel.py).
+
+El modo en paralelo debe dar EXACTAMENTE lo mismo que el bucle secuencial:
+mismo orden, mismos errores por archivo, mismas reglas de período duplicado.
+"""
+import shutil
+from pathlib import Path
+
+from backend.app.aud.obligaciones_fiscales.cedulas import f104_extractor
+from backend.app.ict.parsers import f103_pdf, parallel
+
+FIXTURES = Path(__file__).parent / "fixtures" / "obligaciones_fiscales"
+
+
+def _lote(tmp_path: Path, fixture: str) -> list[Path]:
+    """Mismo PDF dos veces (período duplicado) + un archivo que no es PDF."""
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name in ("a.pdf", "b.pdf"):
+        dest = tmp_path / name
+        shutil.copy(FIXTURES / fixture, dest)
+        paths.append(dest)
+    basura = tmp_path / "c.pdf"
+    basura.write_bytes(b"no es un pdf")
+    paths.append(basura)
+    return paths
+
+
+def test_parse_paths_en_paralelo_conserva_orden_y_errores(tmp_path):
+    paths = _lote(tmp_path, "f103_enero.pdf") + [tmp_path / "no_existe.pdf"]
+    secuencial = parallel.parse_paths(f103_pdf.parse_f103, paths, workers=1)
+    paralelo = parallel.parse_paths(f103_pdf.parse_f103, paths, workers=2)
+
+    assert [o.result for o in paralelo] == [o.result for o in secuencial]
+    assert paralelo[0].result["periodo"] == paralelo[1].result["periodo"]
+    assert paralelo[2] == (None, None)  # parse_f103 devuelve None
+    assert isinstance(paralelo[3].error, FileNotFoundError)
+    assert type(secuencial[3].error) is type(paralelo[3].error)
+
+
+def test_parse_all_f103_y_f104_iguales_con_y_sin_workers(tmp_path, monkeypatch):
+    f103_paths = _lote(tmp_path / "f103", "f103_enero.pdf")
+    f104_paths = _lote(tmp_path / "f104", "f104_enero.pdf")
+
+    resultados = {}
+    for workers in (1, 3):
+        monkeypatch.setattr(parallel, "PDF_PARSE_WORKERS", workers)
+        resultados[workers] = (
+            f103_pdf.parse_all_f103(f103_paths),
+            f104_extractor.extract_all_f104(f104_paths),
+        )
+
+    assert resultados[1] == resultados[3]
+    (f103_mensual, f103_errores), (f104_mensual, f104_errores) = resultados[3]
+    assert len(f103_mensual) == 1 and len(f104_mensual) == 1
+    assert any("duplicado" in e for e in f103_errores)
+    assert any("duplicado" in e for e in f104_errores)
+    assert any(e.startswith("c.pdf") for e in f103_errores)
@@ -0,0 +1,93 @@
+"""Extracción dirigida por páginas (backend/app/ict/parsers/pdf_pages.py).
+
+parse_f101/parse_f103 solo extraen las páginas que pueden aportar un campo
+pendiente; el resultado tiene que ser IDÉNTICO al de correr las mismas regex
+sobre el texto del documento completo.
+"""
+import re
+from io import BytesIO
+from pathlib import Path
+
+import pdfplumber
+
+from backend.app.aud.obligaciones_fiscales.cedulas.base import find_periodo
+from backend.app.ict.parsers import f101_pdf, f103_pdf, pdf_pages
+from backend.app.tax.planificacion_utilidades.parsers.sri_text import find_casillero_value
+
+FIXTURES = Path(__file__).parent / "fixtures"
+F101 = FIXTURES / "informe_cumplimiento_tributario" / "f101_axxis.pdf"
+F103 = FIXTURES / "obligaciones_fiscales" / "f103_enero.pdf"
+
+
+def _texto_completo(data: bytes) -> str:
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        return "\n".join(p.extract_text() or "" for p in pdf.pages)
+
+
+def _f101_documento_completo(data: bytes) -> dict:
+    text = _texto_completo(data)
+    casilleros = {}
+    for num in f101_pdf.ALL_F101_CASILLEROS:
+        v = find_casillero_value(text, num)
+        if v is not None:
+            casilleros[num] = v
+    return {"periodo": find_periodo(text), "casilleros": casilleros, "errores": []}
+
+
+def test_f101_igual_al_texto_completo_y_salta_anexos(monkeypatch):
+    data = F101.read_bytes()
+    extraidas = []
+    original = pdfplumber.page.Page.extract_text
+
+    def _contar(page, *args, **kwargs):
+        extraidas.append(page.page_number)
+        return original(page, *args, **kwargs)
+
+    monkeypatch.setattr(pdfplumber.page.Page, "extract_text", _contar)
+    resultado = f101_pdf.parse_f101(data)
+    paginas = len(extraidas)
+    monkeypatch.undo()
+
+    assert resultado == _f101_documento_completo(data)
+    assert len(resultado["casilleros"]) > 800
+    assert paginas < 22  # las páginas finales sin casilleros pendientes no se leen
+
+
+def test_f103_igual_al_texto_completo():
+    data = F103.read_bytes()
+    text = _texto_completo(data)
+    resultado = f103_pdf.parse_f103(data)
+
+    assert resultado["casilleros"] == f103_pdf._extract_casilleros(text)
+    assert resultado["periodo"] == f103_pdf._extract_periodo(text)
+    assert resultado["ruc"] == re.search(r"Identificaci[óo]n:\s*(\d{10,13})", text).group(1)
+
+
+def test_sin_texto_rapido_se_extraen_todas_las_paginas(monkeypatch):
+    data = F101.read_bytes()
+    dirigido = f101_pdf.parse_f101(data)
+    monkeypatch.setattr(pdf_pages, "quick_page_texts", lambda _data: None)
+    assert f101_pdf.parse_f101(data) == dirigido
+
+
+def test_numeros_del_texto_rapido_cubren_los_de_pdfplumber():
+    """La decisión de saltar una página se toma con el texto de pdfium: todo
+    número que pdfplumber ve en la página tiene que estar también ahí."""
+    data = F101.read_bytes()
+    rapidos = pdf_pages.quick_page_texts(data)
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        for page, rapido in zip(pdf.pages, rapidos):
+            # "(cid:N)" es un glifo sin mapeo de pdfminer, no un número real.
+            texto = re.sub(r"\(cid:\d+\)", " ", page.extract_text() or "")
+            assert pdf_pages.digit_runs(texto) <= pdf_pages.digit_runs(rapido)
+
+
+def test_page_targets_sin_feed_u_open_codes_no_se_instancia():
+    import pytest
+
+    class _SoloFeed(pdf_pages.PageTargets):
+        def feed(self, page_text):
+            pass
+
+    with pytest.raises(TypeError):
+        _SoloFeed()
@@ -199,8 +199,13 @@ def test_upload_unsupported_slot_returns_400(client, logged_client):
     assert r2.status_code == 400
 
 
-def test_upload_multiple_f104_pdfs_in_one_call(client, logged_client):
+def test_upload_multiple_f104_pdfs_in_one_call(client, logged_client, monkeypatch):
     """Multi-upload: subir 2 F-104 PDFs (de 2 meses distintos) en un solo POST."""
+    from backend.app.ict.parsers import parallel
+
+    # Sin pool (PDF_PARSE_WORKERS=1) no se bufferea el lote: archivo por archivo.
+    monkeypatch.setattr(parallel, "PDF_PARSE_WORKERS", 1)
+    monkeypatch.setattr(parallel, "parse_payloads", lambda *a, **k: pytest.fail("lote sin pool"))
     r = client.post(
         "/api/v1/client/ict/sessions",
         json={"ejercicio_fiscal": "2025", "ruc": "1234567890001", "razon_social": "X"},
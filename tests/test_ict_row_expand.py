@@ -101,3 +101,60 @@ def test_expand_preserva_merges_de_filas_desplazadas():
     assert "A35:C35" in merges, f"merge A31→A35 perdido. {merges}"
     # No deben quedar merges fantasma en la posición vieja
     assert "A30:E30" not in merges, f"merge fantasma en pos vieja. {merges}"
+
+
+# ── RowExpansionPlan: varios cuadros en un solo desplazamiento ────────────────
+
+def _hoja_con_cuadros():
+    from openpyxl import Workbook
+    from openpyxl.styles import Border
+    wb = Workbook()
+    ws = wb.active
+    b = Border(top=_thin(), bottom=_thin())
+    for r in (10, 20, 30):
+        ws.cell(r, 1).value = f"fila {r}"
+        ws.cell(r, 2).border = b
+        ws.merge_cells(start_row=r, start_column=3, end_row=r, end_column=4)
+    ws.cell(40, 2).value = "=SUM(B10:B30)+B20"
+    ws.merge_cells("A40:A41")
+    ws.row_dimensions[30].height = 25
+    return ws
+
+
+def _contenido(ws):
+    celdas = {k: (c.value, repr(c.border)) for k, c in ws._cells.items()}
+    return (celdas, sorted(str(m) for m in ws.merged_cells.ranges),
+            {k: v.height for k, v in ws.row_dimensions.items()})
+
+
+def test_plan_equivale_a_expandir_cada_bloque_de_abajo_hacia_arriba():
+    from backend.app.ict.fillers.row_expand import RowExpansionPlan
+    bloques = [dict(insert_at=11, amount=3, style_row=10, inner_merges=[(3, 4)], last_col=5),
+               dict(insert_at=21, amount=2, style_row=20, inner_merges=[(3, 4)], last_col=5)]
+    esperado = _hoja_con_cuadros()
+    for b in reversed(bloques):
+        expand_tabular_block(esperado, **b)
+
+    ws = _hoja_con_cuadros()
+    plan = RowExpansionPlan(ws)
+    for b in bloques:
+        plan.add(**b)
+    assert plan.shift(20) == 23 and plan.shift(30) == 35
+    plan.apply()
+
+    assert _contenido(ws) == _contenido(esperado)
+    assert ws.cell(45, 2).value == "=SUM(B10:B35)+B23"
+    assert "C12:D12" in {str(m) for m in ws.merged_cells.ranges}
+
+
+def test_plan_rechaza_bloques_invalidos():
+    import pytest
+    from openpyxl import Workbook
+    from backend.app.ict.fillers.row_expand import RowExpansionPlan
+    plan = RowExpansionPlan(Workbook().active)
+    plan.add(insert_at=11, amount=0, style_row=10)  # sin filas: se ignora
+    plan.add(insert_at=11, amount=2, style_row=10)
+    with pytest.raises(ValueError):
+        plan.add(insert_at=11, amount=1, style_row=10)
+    with pytest.raises(ValueError):
+        plan.add(insert_at=20, amount=1, style_row=20)
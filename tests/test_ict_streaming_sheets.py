@@ -0,0 +1,165 @@
+"""Hojas DATOS/TRAZABILIDAD en streaming (fillers/streaming.py).
+
+El camino en streaming debe producir EXACTAMENTE el mismo contenido que el
+camino en memoria: mismos valores, estilos, merges, anchos, altos,
+hipervínculos, freeze panes y autofiltros. Lo único que puede cambiar es la
+numeración interna de estilos (``s="N"``), que openpyxl asigna en el orden
+en que escribe las celdas.
+"""
+from io import BytesIO
+from types import SimpleNamespace
+
+import openpyxl
+import pytest
+
+from backend.app.ict import service as ict_service
+from backend.app.ict.fillers import streaming
+from backend.app.ict.fillers.base import _record, reset_trace, write_trace_sheet
+from backend.app.ict.fillers.source_data_sheets import (
+    build_balance_sheet,
+    build_f101_sheet,
+    build_f103_sheet,
+    build_f104_sheet,
+)
+
+
+def _datos():
+    f101 = {"311": 1500.25, "499": 98000.0, "699": 98000.0, "6999": 120000.0, "99999": 7.0}
+    meses = {f"2025-{m:02d}": {"casilleros": {"302": 100.0 * m, "332": 12.5}} for m in range(1, 13)}
+    balance = [
+        {"casillero_sri": "311", "codigo": f"1.1.{i:03d}", "descripcion": f"=Caja {i}", "saldo": 10.0 * i}
+        for i in range(120)
+    ]
+    return f101, meses, balance
+
+
+def _construir(streaming_on: bool) -> openpyxl.Workbook:
+    f101, meses, balance = _datos()
+    wb = openpyxl.Workbook()
+    build_f101_sheet(wb, f101, {"99999": "EXTRA"}, streaming=streaming_on)
+    build_f103_sheet(wb, meses, streaming=streaming_on)
+    build_f104_sheet(wb, {}, streaming=streaming_on)
+    build_balance_sheet(wb, balance, streaming=streaming_on)
+    reset_trace()
+    for i in range(80):
+        _record("A1", str(300 + i), "A1", f"C{13 + i}", float(i), "F-101", "written")
+    _record("A2", "", "A2", "D5", "texto", "Balance", "skipped_formula")
+    write_trace_sheet(wb, streaming=streaming_on)
+    return wb
+
+
+def _contenido(ws):
+    celdas = {
+        coord: (
+            c.value, repr(c.font), repr(c.fill), repr(c.border), repr(c.alignment),
+            c.number_format, c.hyperlink.target if c.hyperlink else None,
+        )
+        for coord, c in ws._cells.items()
+    }
+    return (
+        celdas,
+        sorted(str(r) for r in ws.merged_cells.ranges),
+        {k: v.height for k, v in ws.row_dimensions.items()},
+        {k: v.width for k, v in ws.column_dimensions.items()},
+        ws.freeze_panes,
+        ws.auto_filter.ref,
+        ws.dimensions,
+    )
+
+
+def _guardar(wb) -> openpyxl.Workbook:
+    buf = BytesIO()
+    streaming.save_workbook(wb, buf)
+    streaming.discard_streaming_sheets(wb)
+    return openpyxl.load_workbook(BytesIO(buf.getvalue()))
+
+
+def test_streaming_produce_el_mismo_contenido_que_en_memoria():
+    en_memoria = _guardar(_construir(False))
+    en_streaming = _guardar(_construir(True))
+
+    assert en_memoria.sheetnames == en_streaming.sheetnames
+    for nombre in en_memoria.sheetnames:
+        assert _contenido(en_memoria[nombre]) == _contenido(en_streaming[nombre]), nombre
+    assert en_streaming["TRAZABILIDAD"]["D14"].hyperlink.target == "#A1!C13"
+
+
+def test_hoja_en_streaming_no_retiene_celdas():
+    wb = _construir(True)
+    for nombre in ("DATOS F-101", "DATOS BALANCE", "TRAZABILIDAD"):
+        ws = wb[nombre]
+        assert isinstance(ws, streaming.StreamingWorksheet)
+        assert len({r for r, _ in ws._cells}) <= streaming.WINDOW_ROWS
+        assert ws.max_row > streaming.WINDOW_ROWS
+    streaming.discard_streaming_sheets(wb)
+
+
+def test_columnas_retenidas_se_pueden_releer():
+    wb = openpyxl.Workbook()
+    build_f101_sheet(wb, {"311": 1500.25}, {}, streaming=True)
+    ws = wb["DATOS F-101"]
+    assert ws.cell(4, 1).value == "311"
+    assert ws.cell(4, 3).value == 1500.25
+    streaming.discard_streaming_sheets(wb)
+
+
+@pytest.mark.parametrize("streaming_on", [False, True])
+def test_cell_index_coincide_con_los_lookups_de_los_builders(streaming_on):
+    from backend.app.ict.fillers.cell_index import CellIndex
+    from backend.app.ict.fillers.referential_helpers import balance_rows_for_casillero
+
+    f101, _meses, balance = _datos()
+    balance = balance + [{"casillero_sri": "499", "codigo": "1", "descripcion": "x", "saldo": 1.0}]
+    wb = openpyxl.Workbook()
+    f101_lookup = build_f101_sheet(wb, f101, {"99999": "EXTRA"}, streaming=streaming_on)
+    balance_lookup = build_balance_sheet(wb, balance, streaming=streaming_on)
+
+    index = CellIndex.from_workbook(wb)
+    # El bloque CUADRE repite casilleros más abajo: el índice se queda con el detalle.
+    assert index.f101_casilleros == set(f101_lookup)
+    assert {cas: index.f101_row(cas) for cas in f101_lookup} == f101_lookup
+    assert index.f101_value("311") == 1500.25 and index.f101_value("1") is None
+    assert index.balance_cuentas == len(balance)
+    for cas in ("311", "499", "699"):
+        escaneo = balance_rows_for_casillero({"balance_mapeado": balance}, cas, balance_lookup)
+        assert index.balance_rows(cas) == escaneo
+        assert balance_rows_for_casillero(
+            {"balance_mapeado": balance, "_cell_index": index}, cas, balance_lookup
+        ) == escaneo
+    streaming.discard_streaming_sheets(wb)
+
+
+def test_escribir_una_fila_ya_volcada_falla_en_voz_alta():
+    wb = openpyxl.Workbook()
+    ws = streaming.create_streaming_sheet(wb, "X")
+    for r in range(1, streaming.WINDOW_ROWS + 10):
+        ws.cell(r, 1, value=r)
+    with pytest.raises(RuntimeError):
+        ws.cell(2, 2, value="tarde")
+    streaming.discard_streaming_sheets(wb)
+
+
+def test_generate_excel_streaming_igual_al_camino_en_memoria(monkeypatch):
+    f101, meses, balance = _datos()
+    session = SimpleNamespace(
+        id=1, ruc="1791859596001", razon_social="X S.A.", ejercicio_fiscal=2025,
+        numero_adhesivo="",
+        anexos=[
+            SimpleNamespace(anexo_code="A1", status="ready",
+                            extracted_data={"f101": f101, "balance_mapeado": balance}),
+            SimpleNamespace(anexo_code="A5", status="ready",
+                            extracted_data={"f103_monthly": meses}),
+        ],
+    )
+    salidas = {}
+    for flag in ("0", "1"):
+        monkeypatch.setenv("ICT_STREAMING_SHEETS", flag)
+        salidas[flag] = ict_service.generate_excel(None, session=session)
+
+    for idx in (0, 1):  # (sri, papel de trabajo)
+        a = openpyxl.load_workbook(BytesIO(salidas["0"][idx]))
+        b = openpyxl.load_workbook(BytesIO(salidas["1"][idx]))
+        assert a.sheetnames == b.sheetnames
+        for nombre in a.sheetnames:
+            assert _contenido(a[nombre]) == _contenido(b[nombre]), nombre
+            assert a[nombre].sheet_state == b[nombre].sheet_state
@@ -0,0 +1,72 @@
+"""Generación del ICT en proceso hijo (backend/app/ict/worker.py)."""
+
+import pickle
+from io import BytesIO
+from types import SimpleNamespace
+
+import openpyxl
+import pytest
+
+from backend.app.ict import worker
+
+
+def _session():
+    return SimpleNamespace(
+        id=7, ruc="1791859596001", razon_social="X S.A.", ejercicio_fiscal=2025,
+        numero_adhesivo=None,
+        anexos=[
+            SimpleNamespace(anexo_code="A1", status="ready", extracted_data={
+                "f101": {"311": 1500.25, "499": 98000.0},
+                "balance_mapeado": [
+                    {"casillero_sri": "311", "codigo": "1.1.01", "descripcion": "Caja", "saldo": 1500.25},
+                ],
+            }),
+            SimpleNamespace(anexo_code="A2", status="empty", extracted_data=None),
+        ],
+    )
+
+
+def _valores(data: bytes) -> dict:
+    wb = openpyxl.load_workbook(BytesIO(data))
+    return {
+        ws.title: (ws.sheet_state, [[c.value for c in row] for row in ws.iter_rows()])
+        for ws in wb.worksheets
+    }
+
+
+def test_snapshot_es_plano_y_serializable():
+    snap = worker.session_snapshot(_session())
+    assert snap["numero_adhesivo"] == ""
+    assert snap["anexos"][1] == {"anexo_code": "A2", "status": "empty", "extracted_data": {}}
+    assert pickle.loads(pickle.dumps(snap)) == snap
+
+
+def test_proceso_hijo_genera_lo_mismo_que_en_linea():
+    snap = worker.session_snapshot(_session())
+    en_linea = worker.ICTGenerationWorker(mode="inline").generate(snap)
+
+    hijo = worker.ICTGenerationWorker(mode="process", timeout=300)
+    try:
+        en_hijo = hijo.generate(snap)
+    finally:
+        hijo.shutdown()
+
+    assert hijo.stats()["generated"] == 1
+    for a, b in zip(en_linea, en_hijo):
+        assert _valores(a) == _valores(b)
+
+
+def test_timeout_mata_el_hijo_y_el_siguiente_job_usa_otro():
+    snap = worker.session_snapshot(_session())
+    hijo = worker.ICTGenerationWorker(mode="process", timeout=0.01)
+    try:
+        with pytest.raises(worker.ICTGenerationError):
+            hijo.generate(snap)
+        assert hijo.stats()["timeouts"] == 1
+        assert hijo._executor is None
+
+        hijo.timeout = 300
+        bytes_sri, bytes_papel = hijo.generate(snap)
+        assert bytes_sri[:2] == b"PK" and bytes_papel[:2] == b"PK"
+    finally:
+        hijo.shutdown()
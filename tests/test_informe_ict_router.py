@@ -87,7 +87,7 @@ def test_end_to_end_create_and_download_docx(client):
     jid = r.json()["id"]
     assert r.json()["tool_code"] == "AUD.CONCLUSION.INFORME_CUMPLIMIENTO_TRIBUTARIO"
 
-    # TestClient corre el BackgroundTask sync al cerrar el context.
+    # La cola de jobs corre inline en la suite (conftest.py).
     r = client.get(f"{BASE}/jobs/{jid}", headers=_h(tok))
     assert r.json()["status"] == "done", r.json()
 
@@ -0,0 +1,174 @@
+"""Cola durable de jobs sobre tool_jobs (backend/app/services/job_queue.py)."""
+
+import datetime
+
+from backend.app.aud.obligaciones_fiscales import file_storage
+from backend.app.aud.obligaciones_fiscales.models import ToolJob
+from backend.app.db.session import SessionLocal
+from backend.app.services import job_queue
+from tests.test_informe_ict_jobs import _job
+
+LLAMADAS = []
+
+
+def _tarea_ok(job_id):
+    LLAMADAS.append(job_id)
+
+
+def _tarea_falla(job_id):
+    raise RuntimeError("se cayó el parser")
+
+
+def _leer(job_id):
+    db = SessionLocal()
+    try:
+        return db.get(ToolJob, job_id)
+    finally:
+        db.close()
+
+
+def _encolar(cola, tarea, priority):
+    job_id = _job()
+    db = SessionLocal()
+    try:
+        assert cola.enqueue(db, job_id, tarea, priority=priority)
+    finally:
+        db.close()
+    return job_id
+
+
+def _fijar(job_id, **valores):
+    db = SessionLocal()
+    try:
+        job = db.get(ToolJob, job_id)
+        for k, v in valores.items():
+            setattr(job, k, v)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_se_reclama_por_prioridad_y_dos_pools_nunca_toman_el_mismo_job(monkeypatch):
+    monkeypatch.setitem(job_queue.TAREAS, "test.ok", job_queue.Tarea("tests.test_job_queue:_tarea_ok"))
+    web = job_queue.JobQueue(mode="external")
+    baja, alta, media = (_encolar(web, "test.ok", p) for p in (9000, 9002, 9001))
+    db = SessionLocal()
+    try:
+        assert not web.enqueue(db, alta, "test.ok")  # ya está en cola
+    finally:
+        db.close()
+
+    uno, otro = job_queue.JobQueue(mode="external"), job_queue.JobQueue(mode="external")
+    assert uno._reclamar(2) == [(alta, "test.ok"), (media, "test.ok")]
+    assert otro._reclamar(1) == [(baja, "test.ok")]
+    assert _leer(alta).queue_lease_owner == uno.owner
+    assert _leer(baja).queue_attempts == 1
+
+    otro._ejecutar(baja, "test.ok")
+    assert baja in LLAMADAS
+    assert _leer(baja).queue_status == "done"
+    for job_id in (alta, media):
+        uno._ejecutar(job_id, "test.ok")
+
+
+def test_una_tarea_que_falla_se_reintenta_y_despues_queda_muerta(monkeypatch):
+    monkeypatch.setitem(job_queue.TAREAS, "test.falla",
+                        job_queue.Tarea("tests.test_job_queue:_tarea_falla", estado_error="error"))
+    monkeypatch.setattr(job_queue, "MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(job_queue, "RETRY_BASE_SECONDS", 60)
+    cola = job_queue.JobQueue(mode="inline")
+    jid = _encolar(cola, "test.falla", 9100)
+
+    job = _leer(jid)
+    assert (job.queue_status, job.queue_attempts, job.queue_lease_owner) == ("queued", 1, None)
+    assert job.status == "pending"  # esperando el reintento, no en error
+    assert job.queue_run_after > job_queue._ahora() + datetime.timedelta(seconds=50)
+    assert cola._reclamar(1) != [(jid, "test.falla")]  # el backoff lo aparta
+
+    _fijar(jid, queue_run_after=None)
+    assert cola._reclamar(1) == [(jid, "test.falla")]
+    cola._ejecutar(jid, "test.falla")
+    job = _leer(jid)
+    assert (job.queue_status, job.queue_attempts, job.status) == ("dead", 2, "error")
+    assert "se cayó el parser" in job.error_message
+
+
+def test_un_lease_vencido_vuelve_a_la_cola_hasta_agotar_los_intentos(monkeypatch):
+    monkeypatch.setitem(job_queue.TAREAS, "test.ok", job_queue.Tarea("tests.test_job_queue:_tarea_ok"))
+    cola = job_queue.JobQueue(mode="external")
+    vencido = datetime.datetime(2020, 1, 1)
+    reintento, agotado = (_encolar(cola, "test.ok", 0) for _ in range(2))
+    _fijar(reintento, queue_status="leased", queue_attempts=1, queue_lease_until=vencido,
+           queue_lease_owner="otro:1:x")
+    _fijar(agotado, queue_status="leased", queue_attempts=job_queue.MAX_ATTEMPTS,
+           queue_lease_until=vencido, queue_lease_owner="otro:1:x", status="running")
+
+    assert cola.requeue_expired() >= 2
+    assert _leer(reintento).queue_status == "queued"
+    job = _leer(agotado)
+    assert (job.queue_status, job.status) == ("dead", "failed")
+    assert "interrumpió" in job.error_message
+    _fijar(reintento, queue_status="done")
+
+
+def test_el_latido_extiende_el_lease_de_los_jobs_en_curso(monkeypatch):
+    monkeypatch.setitem(job_queue.TAREAS, "test.ok", job_queue.Tarea("tests.test_job_queue:_tarea_ok"))
+    cola = job_queue.JobQueue(mode="external")
+    jid = _encolar(cola, "test.ok", 9200)
+    assert cola._reclamar(1) == [(jid, "test.ok")]
+    casi = job_queue._ahora() + datetime.timedelta(seconds=1)
+    _fijar(jid, queue_lease_until=casi)
+
+    cola._en_curso.add(jid)
+    cola._latir()
+    assert _leer(jid).queue_lease_until > casi + datetime.timedelta(seconds=job_queue.LEASE_SECONDS / 2)
+    cola._ejecutar(jid, "test.ok")
+    assert _leer(jid).queue_status == "done"
+
+
+def test_un_error_transitorio_de_una_tarea_real_se_reintenta(monkeypatch):
+    """Las tareas registradas relanzan sin marcar el job: la cola reintenta."""
+    from backend.app.aud.informe_cumplimiento_tributario import jobs as informe_jobs
+
+    fallos = ["disco lleno"]
+
+    def _assemble(**_kwargs):
+        if fallos:
+            raise OSError(fallos.pop())
+        return b"docx"
+
+    monkeypatch.setattr(informe_jobs.docx_assembler, "assemble", _assemble)
+    monkeypatch.setattr(job_queue, "RETRY_BASE_SECONDS", 0)
+    cola = job_queue.JobQueue(mode="inline")
+    jid = _job()
+    file_storage.create_job_dir(jid)
+    db = SessionLocal()
+    try:
+        assert cola.enqueue(db, jid, "informe_cumplimiento", priority=9300)
+    finally:
+        db.close()
+
+    job = _leer(jid)
+    assert (job.queue_status, job.queue_attempts, job.status) == ("queued", 1, "pending")
+    assert job.error_message is None and job.finished_at is None
+
+    assert cola._reclamar(1) == [(jid, "informe_cumplimiento")]
+    cola._ejecutar(jid, "informe_cumplimiento")
+    job = _leer(jid)
+    assert (job.queue_status, job.queue_attempts, job.status) == ("done", 2, "done")
+
+
+def test_encolar_un_job_en_curso_no_lo_deja_pendiente():
+    from backend.app.aud.obligaciones_fiscales import worker
+
+    jid = _job()
+    _fijar(jid, status="running", queue_task=worker.TAREA, queue_status="leased",
+           queue_attempts=1, queue_lease_owner="otro:1:x")
+    db = SessionLocal()
+    try:
+        assert worker.encolar(db, jid) is False
+    finally:
+        db.close()
+    job = _leer(jid)
+    assert (job.status, job.queue_status) == ("running", "leased")
+    _fijar(jid, queue_status="done")
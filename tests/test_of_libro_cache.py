@@ -0,0 +1,84 @@
+"""Regeneración del libro con la caché del job (libro/cache.py)."""
+
+import datetime
+from io import BytesIO
+
+from openpyxl import load_workbook
+
+from backend.app.aud.obligaciones_fiscales import file_storage
+from backend.app.aud.obligaciones_fiscales.libro import fuentes, hoja_detalle
+from backend.app.aud.obligaciones_fiscales.libro.cache import CacheLibro
+from backend.app.aud.obligaciones_fiscales.libro.ensamblador import armar_libro
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento
+from tests.test_of_libro_ensamblador import CLASIFICACION, _Fila
+
+MOVS = TablaMovimientos.desde([
+    Movimiento(codigo="1.1.5.1.1", cuenta="IVA sobre Compras", fecha=datetime.date(2025, 1, 5),
+               asiento="COM 1", documento="FAC 001", persona="PROVEEDOR & HIJOS", debe=659.57),
+    Movimiento(codigo="4.1.1.1", cuenta="Venta de mercadería", asiento="VTA 1", haber=5000.0),
+    Movimiento(codigo="9.9.9", cuenta="Cuenta nueva", fecha=datetime.date(2025, 2, 1), debe=1.0),
+])
+
+
+def _job(tmp_path, monkeypatch, mayor=b"mayor v1"):
+    monkeypatch.setattr(file_storage, "_root", lambda: tmp_path)
+    job_dir = file_storage.create_job_dir(1)
+    file_storage.save_input(job_dir, "mayor_general", "mayor.xlsx", mayor)
+    return job_dir
+
+
+def _detalle(clasificacion, cache=None):
+    contenido = armar_libro(
+        clasificacion=clasificacion, movimientos=MOVS, f104_monthly={}, f103_monthly={},
+        periodo="2025", cache=cache,
+    )
+    ws = load_workbook(BytesIO(contenido))["Detalle mayor"]
+    return [[(c.value, c.number_format, c.font.b, c.font.sz) for c in fila] for fila in ws.iter_rows()]
+
+
+def test_tras_una_correccion_solo_se_reescribe_la_columna_categoria(tmp_path, monkeypatch):
+    cache = CacheLibro(_job(tmp_path, monkeypatch))
+    assert _detalle(CLASIFICACION, cache) == _detalle(CLASIFICACION)
+
+    guardados = []
+    monkeypatch.setattr(hoja_detalle, "_guardar_sin_categorias",
+                        lambda *a: guardados.append(a))
+    corregida = [_Fila("1.1.5.1.1", "IVA sobre Compras", "GASTO_NO_DEDUCIBLE", {"01": 659.57}),
+                 _Fila("4.1.1.1", "Venta de mercadería", None, {"01": 5000.0})]
+    filas = _detalle(corregida, CacheLibro(cache.job_dir))
+    assert guardados == []  # las filas salieron de la caché
+    assert filas == _detalle(corregida)
+    assert [f[0][0] for f in filas[3:]] == ["GASTO_NO_DEDUCIBLE", None, "SIN_CLASIFICAR"]
+
+
+def test_otro_mayor_invalida_las_filas_guardadas(tmp_path, monkeypatch):
+    job_dir = _job(tmp_path, monkeypatch)
+    _detalle(CLASIFICACION, CacheLibro(job_dir))
+    file_storage.save_input(job_dir, "mayor_general", "mayor.xlsx", b"mayor v2")
+
+    guardados = []
+    monkeypatch.setattr(hoja_detalle, "_guardar_sin_categorias",
+                        lambda *a: guardados.append(a))
+    _detalle(CLASIFICACION, CacheLibro(job_dir))
+    assert len(guardados) == 1
+
+
+def test_las_declaraciones_se_leen_una_sola_vez_por_job(tmp_path, monkeypatch):
+    job_dir = _job(tmp_path, monkeypatch)
+    file_storage.save_input(job_dir, "f104", "f104_enero.pdf", b"%PDF-1.4 enero")
+    lecturas = []
+
+    def leer(directorio):
+        lecturas.append(directorio)
+        return {"2025-01": {"casilleros": {"429": 4341.16}}}, {}
+
+    monkeypatch.setattr(fuentes, "leer_declaraciones", leer)
+    monkeypatch.setattr(fuentes, "leer_ats", lambda directorio: {})
+    primera = CacheLibro(job_dir).declaraciones()
+    assert CacheLibro(job_dir).declaraciones() == primera
+    assert len(lecturas) == 1
+
+    file_storage.save_input(job_dir, "f104", "f104_febrero.pdf", b"%PDF-1.4 febrero")
+    CacheLibro(job_dir).declaraciones()
+    assert len(lecturas) == 2
@@ -1,14 +1,16 @@
 """Hoja de detalle: todos los movimientos con su categoría."""
 
 import datetime
+from io import BytesIO
 
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 
 from backend.app.aud.obligaciones_fiscales.libro.hoja_detalle import (
     SHEET_DETALLE,
     build_hoja_detalle,
 )
 from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento
+from backend.app.ict.fillers import streaming
 
 MOVS = [
     Movimiento(codigo="1.1.5.1.1", cuenta="IVA sobre Compras",
@@ -65,3 +67,30 @@ def test_conserva_los_datos_de_trazabilidad_del_movimiento():
     assert "FAC 001" in fila
     assert "PROVEEDOR DEMO S.A." in fila
     assert 2.39 in fila
+
+
+def _guardado(streaming_on: bool):
+    wb = Workbook()
+    build_hoja_detalle(wb, MOVS + [Movimiento(codigo="4.1.1.4", cuenta="Sin fecha")],
+                       CATEGORIAS, streaming=streaming_on)
+    bio = BytesIO()
+    try:
+        streaming.save_workbook(wb, bio)
+    finally:
+        streaming.discard_streaming_sheets(wb)
+    return load_workbook(BytesIO(bio.getvalue()))[SHEET_DETALLE]
+
+
+def test_en_streaming_la_hoja_es_identica_a_la_de_memoria():
+    en_memoria, en_streaming = _guardado(False), _guardado(True)
+
+    def contenido(ws):
+        return [[(c.value, c.number_format, c.font.sz, c.style) for c in fila]
+                for fila in ws.iter_rows()]
+
+    assert contenido(en_streaming) == contenido(en_memoria)
+    assert en_streaming.auto_filter.ref == en_memoria.auto_filter.ref == "A3:M6"
+    assert en_streaming.freeze_panes == "A4"
+    assert en_streaming["J4"].number_format == "#,##0.00"
+    assert en_streaming["D4"].number_format == "yyyy-mm-dd"
+    assert en_streaming.column_dimensions["C"].width == en_memoria.column_dimensions["C"].width
@@ -100,3 +100,29 @@ def test_clasificar_devuelve_un_resultado_por_cuenta():
         "4.1.1.4": _perfil("4.1.1.4", "Venta de insumos odontologicos"),
     }
     assert len(clasificar(perfiles)) == 2
+
+
+def test_clasificar_da_lo_mismo_que_clasificar_cuenta_dos_veces():
+    """La segunda pasada reutiliza las señales propias de la primera y cuenta
+    los votos de rama una vez; el resultado no cambia."""
+    import random
+
+    r = random.Random(8)
+    nombres = ["IVA ventas", "IVA compras", "Ret. 70%", "Ret. 1%", "Retencion", "Ventas",
+               "Servicios", "Bancos", "IVA diferido", "Caja"]
+    codigos = sorted({f"{r.choice('1245')}.1.{r.randint(1, 3)}.{r.randint(1, 40)}" for _ in range(400)})
+    perfiles = {
+        c: _perfil(c, r.choice(nombres), debe=r.choice([0.0, 10.0]), haber=r.choice([0.0, 10.0]),
+                   prefijos_asiento=r.choice([{}, {"VTA": 3}, {"RET": 2}, {"COM": 4}]),
+                   contrapartidas=[(r.choice(codigos), 3)] if r.random() < 0.5 else [])
+        for c in codigos
+    }
+    historial = {codigos[0]: "VENTAS"}
+
+    primera = {c: clasificar_cuenta(p, historial=historial) for c, p in perfiles.items()}
+    apoyo = {c: x.categoria for c, x in primera.items() if x.categoria and x.confianza == "alta"}
+    esperado = sorted(
+        (clasificar_cuenta(p, historial=historial, clasificadas=apoyo) for p in perfiles.values()),
+        key=lambda x: x.codigo,
+    )
+    assert clasificar(perfiles, historial=historial) == esperado
@@ -122,3 +122,58 @@ def test_monto_segun_libros_usa_el_haber_para_categorias_de_pasivo_e_ingreso():
 def test_monto_segun_libros_sin_categoria_usa_el_debe_por_defecto():
     perfiles = perfilar([_mov("9.9.9", "Cuenta puente", 1, debe=5.0, haber=1.0)])
     assert monto_segun_libros(perfiles["9.9.9"], None) == {"01": 5.0}
+
+
+def _mayor_aleatorio(n, semilla):
+    import random
+
+    r = random.Random(semilla)
+    return [
+        Movimiento(
+            codigo=f"1.{r.randrange(12)}",
+            cuenta=r.choice(["", "Cuenta"]),
+            fecha=r.choice([None, datetime.date(2025, r.randint(1, 12), 1)]),
+            asiento=r.choice(["", f"{r.choice(['VTA', 'COM'])} {r.randrange(n // 3 + 1)}"]),
+            descripcion=r.choice(["", f"glosa {r.randrange(40)}"]),
+            debe=round(r.uniform(0, 500), 2),
+            haber=round(r.uniform(0, 500), 2) if r.random() < 0.4 else 0.0,
+        )
+        for _ in range(n)
+    ]
+
+
+def test_perfilador_incremental_da_lo_mismo_que_perfilar(monkeypatch):
+    from backend.app.aud.obligaciones_fiscales.mayor import cuentas
+
+    # Tope bajo para que también se ejerza el recorte de asientos grandes.
+    monkeypatch.setattr(cuentas, "MAX_CUENTAS_POR_ASIENTO", 4)
+    for semilla in range(5):
+        movs = _mayor_aleatorio(600, semilla)
+        perfilador = cuentas.PerfiladorIncremental()
+        for m in movs:
+            perfilador.agregar(
+                codigo=m.codigo, cuenta=m.cuenta, fecha=m.fecha, asiento=m.asiento,
+                descripcion=m.descripcion, debe=m.debe, haber=m.haber,
+            )
+        esperados = perfilar(movs)
+        assert perfilador.perfiles() == esperados
+        assert perfilador.lineas == 600
+
+
+def test_leer_mayor_en_streaming_no_guarda_las_lineas():
+    from backend.app.aud.obligaciones_fiscales.mayor.cuentas import PerfiladorIncremental
+    from backend.app.aud.obligaciones_fiscales.mayor.reader import leer_mayor
+    from tests._mayor_fixtures import mayor_xlsx
+
+    filas = [
+        ["4.1.1.4", "Ventas", "2025-01-05", "VTA 1", "", "", "", "", "Factura", None, 100, 0],
+        ["2.1.7.4.1", "IVA Ventas", "2025-01-05", "VTA 1", "", "", "", "", "", None, 15, 0],
+        ["4.1.1.4", "Ventas", "2025-02-05", "VTA 2", "", "", "", "", "", None, 50, 0],
+    ]
+    perfilador = PerfiladorIncremental()
+    lectura = leer_mayor(mayor_xlsx(filas), destino=perfilador)
+
+    assert lectura.mapeo_suficiente
+    assert len(lectura.movimientos) == 0
+    assert perfilador.perfiles() == perfilar(leer_mayor(mayor_xlsx(filas)).movimientos)
+    assert perfilador.perfiles()["4.1.1.4"].por_mes_haber == {"01": 100.0, "02": 50.0}
@@ -108,3 +108,36 @@ def test_una_asignacion_sin_categoria_se_ignora():
         assert historial_de_cliente(db, client_id=4247) == {}
     finally:
         db.close()
+
+
+def test_una_cuenta_repetida_cuenta_cada_uso_y_un_nombre_vacio_no_pisa_el_anterior():
+    """El upsert masivo se comporta como guardar las asignaciones una a una."""
+    db = SessionLocal()
+    try:
+        db.query(MayorHomologacion).filter_by(client_id=4248).delete()
+        db.commit()
+        guardadas = guardar_homologaciones(
+            db, client_id=4248,
+            asignaciones=[
+                {"codigo_cuenta": "2.1.7.3.2", "nombre_cuenta": "Ret. 70% Servicios",
+                 "categoria": "RET_RENTA", "tarifa": None},
+                {"codigo_cuenta": " 2.1.7.3.2 ", "nombre_cuenta": "",
+                 "categoria": "RET_IVA", "tarifa": 70.0},
+                {"codigo_cuenta": "4.1.1.4", "nombre_cuenta": "Ventas", "categoria": "VENTAS"},
+            ],
+            user_id=1,
+        )
+        assert guardadas == 3
+        guardar_homologaciones(
+            db, client_id=4248,
+            asignaciones=[{"codigo_cuenta": "2.1.7.3.2", "categoria": "RET_IVA", "tarifa": 70.0}],
+            user_id=1,
+        )
+        fila = db.query(MayorHomologacion).filter_by(client_id=4248, codigo_cuenta="2.1.7.3.2").one()
+        assert (fila.categoria, fila.tarifa, fila.veces_usada) == ("RET_IVA", 70.0, 3)
+        assert fila.nombre_norm == "ret. 70% servicios"
+        assert historial_de_cliente(db, client_id=4248)["4.1.1.4"] == "VENTAS"
+    finally:
+        db.query(MayorHomologacion).filter_by(client_id=4248).delete()
+        db.commit()
+        db.close()
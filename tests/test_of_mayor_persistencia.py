@@ -0,0 +1,95 @@
+"""Movimientos del mayor guardados en disco entre la fase 1 y la fase 2."""
+
+import datetime
+
+import numpy as np
+
+from backend.app.aud.obligaciones_fiscales.mayor import persistencia
+from backend.app.aud.obligaciones_fiscales.mayor.cuentas import PerfiladorIncremental, perfilar
+from backend.app.aud.obligaciones_fiscales.mayor.reader import leer_mayor
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento
+from tests._mayor_fixtures import mayor_xlsx
+
+FILAS = [
+    ["4.1.1.4", "Ventas", "2025-01-05", "VTA 1", "001-001-9", "1790000000001",
+     "ACME Cía", "", "Factura ñandú", None, 100.1, 0],
+    ["2.1.7.4.1", "IVA Ventas", "2025-01-05", "VTA 1", "", "", "", "", "", None, 15, 0],
+    ["1.1.2.1", "Clientes", None, "VTA 1", "", "", "", "", "", 115.1, None, -3.5],
+    ["4.1.1.4", "Ventas", "2025-02-05", "VTA 2", "", "", "", "", "", None, 50, 0],
+]
+
+
+def _guardar(tmp_path, archivos):
+    rutas = []
+    escritor = persistencia.EscritorMovimientos(tmp_path / "movimientos")
+    for nombre, data in archivos:
+        ruta = tmp_path / nombre
+        ruta.write_bytes(data)
+        rutas.append(ruta)
+        leer_mayor(data, destino=escritor)
+    assert escritor.cerrar(persistencia.huellas(rutas))
+    return rutas
+
+
+def test_la_tabla_cargada_es_igual_a_la_leida_del_excel(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistencia, "FILAS_POR_TANDA", 3)  # varias tandas
+    data = mayor_xlsx(FILAS)
+    otro = mayor_xlsx(FILAS[:2])
+    rutas = _guardar(tmp_path, [("a.xlsx", data), ("b.xlsx", otro)])
+
+    tabla = persistencia.cargar_movimientos(tmp_path / "movimientos", rutas)
+
+    esperados = list(leer_mayor(data).movimientos) + list(leer_mayor(otro).movimientos)
+    assert list(tabla) == esperados
+    assert isinstance(tabla.importes["debe"], np.memmap)
+    assert perfilar(tabla) == perfilar(esperados)
+    assert tabla.de_cuentas(["4.1.1.4"])[0].persona == "ACME Cía"
+    assert not list((tmp_path).glob(".movimientos.*"))  # sin temporales
+
+
+def test_archivos_distintos_o_lector_nuevo_no_se_cargan(tmp_path, monkeypatch):
+    rutas = _guardar(tmp_path, [("a.xlsx", mayor_xlsx(FILAS))])
+    directorio = tmp_path / "movimientos"
+
+    rutas[0].write_bytes(mayor_xlsx(FILAS[:1]))
+    assert persistencia.cargar_movimientos(directorio, rutas) is None
+
+    rutas = _guardar(tmp_path, [("a.xlsx", mayor_xlsx(FILAS))])
+    assert persistencia.cargar_movimientos(directorio, rutas) is not None
+    monkeypatch.setattr(persistencia, "_version_lector", lambda: "otra")
+    assert persistencia.cargar_movimientos(directorio, rutas) is None
+    assert persistencia.cargar_movimientos(tmp_path / "no-existe", rutas) is None
+
+
+def test_reparto_alimenta_perfilador_y_escritor_en_una_pasada(tmp_path):
+    perfilador = PerfiladorIncremental()
+    escritor = persistencia.EscritorMovimientos(tmp_path / "movimientos")
+    ruta = tmp_path / "a.xlsx"
+    ruta.write_bytes(mayor_xlsx(FILAS))
+    leer_mayor(ruta.read_bytes(), destino=persistencia.Reparto(perfilador, escritor))
+    escritor.cerrar(persistencia.huellas([ruta]))
+
+    tabla = persistencia.cargar_movimientos(tmp_path / "movimientos", [ruta])
+    assert perfilador.perfiles() == perfilar(tabla)
+    assert tabla[2] == Movimiento(
+        codigo="1.1.2.1", cuenta="Clientes", fecha=None, asiento="VTA 1",
+        debe=115.1, saldo=-3.5, fila=4,
+    )
+
+
+def test_mayor_vacio_y_error_de_disco(tmp_path, monkeypatch):
+    ruta = tmp_path / "a.xlsx"
+    ruta.write_bytes(b"x")
+    escritor = persistencia.EscritorMovimientos(tmp_path / "movimientos")
+    escritor.cerrar(persistencia.huellas([ruta]))
+    assert len(persistencia.cargar_movimientos(tmp_path / "movimientos", [ruta])) == 0
+
+    escritor = persistencia.EscritorMovimientos(tmp_path / "otro")
+
+    def _falla(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr("builtins.open", _falla)
+    escritor.agregar(codigo="1", fecha=datetime.date(2025, 1, 1), debe=1.0)
+    assert escritor.cerrar([]) is False
+    assert not (tmp_path / "otro").exists()
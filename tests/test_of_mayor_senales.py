@@ -237,3 +237,58 @@ def test_la_propagacion_por_rama_funciona_con_codigos_planos():
         {"1150105": "RET_RENTA", "1150108": "RET_RENTA"},
     )
     assert senales[0].categoria == "RET_RENTA"
+
+
+def _senal_nombre_por_busquedas(perfil):
+    """senal_nombre antes del regex único: una búsqueda por patrón."""
+    import re
+
+    from backend.app.aud.obligaciones_fiscales.mayor import senales as s
+
+    n = s._norm(perfil.nombre)
+    if "iva" in n and "diferido" in n:
+        return "IVA_DIFERIDO"
+    if "iva" in n and "retenido" in n:
+        return "IVA_RETENIDO"
+    if "iva" in n and re.search(r"compra|adquisic|importac", n):
+        return "IVA_COMPRAS"
+    if "iva" in n and "venta" in n:
+        return "IVA_VENTAS"
+    if re.search(r"\bret\b|retenc", n):
+        return "RET"
+    if re.search(r"venta|ingreso|servicio|descuento|rebaja", n):
+        return "VENTAS"
+    return None
+
+
+def test_el_regex_unico_de_nombre_equivale_a_las_busquedas_por_separado():
+    import random
+
+    r = random.Random(4)
+    trozos = ["iva", "IVA", "diferido", "retenido", "ret", "Ret.", "retenc", "compra",
+              "adquisic", "importac", "venta", "ingreso", "servicio", "descuento", "rebaja",
+              "Retención", "ventadquisic", "cautiva", "a", "e", " ", "-", "%", "12"]
+    for _ in range(3000):
+        nombre = "".join(r.choice(trozos) + r.choice(["", " ", "."]) for _ in range(r.randint(0, 6)))
+        senales = senal_nombre(_perfil("9", nombre))
+        obtenida = senales[0].categoria if senales else None
+        if obtenida in ("RET_RENTA", "RET_IVA"):
+            obtenida = "RET"
+        assert obtenida == _senal_nombre_por_busquedas(_perfil("9", nombre)), nombre
+
+
+def test_el_indice_de_ramas_da_lo_mismo_que_senal_rama():
+    """Incluye empates (gana la categoría que aparece primero) y cuentas que
+    votan en su propia rama (su voto no cuenta)."""
+    import random
+
+    from backend.app.aud.obligaciones_fiscales.mayor.senales import IndiceRamas
+
+    r = random.Random(6)
+    for _ in range(300):
+        codigos = [f"2.1.{r.randint(1, 3)}.{r.randint(1, 6)}" for _ in range(12)] + ["1150101", "11502"]
+        clasificadas = {c: r.choice(["RET_RENTA", "RET_IVA", "VENTAS"]) for c in codigos if r.random() < 0.7}
+        indice = IndiceRamas(clasificadas)
+        for codigo in codigos + ["2.1.9.9", "4"]:
+            perfil = _perfil(codigo, "x")
+            assert indice.senal(perfil) == senal_rama(perfil, clasificadas), (codigo, clasificadas)
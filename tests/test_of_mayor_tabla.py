@@ -0,0 +1,84 @@
+"""Tabla columnar de movimientos y perfilado vectorizado."""
+
+import datetime
+import pickle
+
+from backend.app.aud.obligaciones_fiscales.mayor.cuentas import perfilar
+from backend.app.aud.obligaciones_fiscales.mayor.tabla import TablaMovimientos
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import Movimiento
+from backend.app.aud.obligaciones_fiscales.mayor.ventas_tarifa import separar_ventas_por_tarifa
+
+
+def _mov(codigo, asiento, mes=1, debe=0.0, haber=0.0, **kw):
+    fecha = datetime.date(2025, mes, 15) if mes else None
+    return Movimiento(codigo=codigo, asiento=asiento, fecha=fecha, debe=debe, haber=haber, **kw)
+
+
+MOVS = [
+    _mov("4.1.1.4", "VTA 1", haber=100.0, cuenta="Ventas", descripcion="Factura 1", fila=5),
+    _mov("2.1.7.4.1", "VTA 1", haber=15.0, cuenta="IVA Ventas", fila=6),
+    _mov("1.1.2.1", "VTA 1", debe=115.0, cuenta="Clientes", documento="001-001-1", fila=7),
+    _mov("4.1.1.4", "VTA 2", mes=2, haber=200.0, persona="ACME", identificacion="1790000000001"),
+    _mov("1.1.2.1", "VTA 2", mes=None, debe=200.0, saldo=-3.5),
+]
+
+
+def test_la_tabla_se_recorre_como_la_lista_de_movimientos():
+    tabla = TablaMovimientos.desde(MOVS)
+    assert len(tabla) == len(MOVS)
+    assert list(tabla) == MOVS
+    assert tabla[-1] == MOVS[-1]
+    assert tabla[3].mes == "02" and tabla[4].mes is None
+    assert tabla[2].neto == 115.0
+
+
+def test_los_textos_repetidos_se_guardan_una_vez():
+    tabla = TablaMovimientos.desde(MOVS * 1000)
+    assert len(tabla) == 5000
+    assert tabla.vocabularios["codigo"] == ["", "4.1.1.4", "2.1.7.4.1", "1.1.2.1"]
+    assert tabla.importes["debe"].dtype.kind == "i"  # centavos enteros
+
+
+def test_concatenar_conserva_el_orden_y_une_vocabularios():
+    otra = [_mov("9.9.9", "VTA 9", debe=1.25), MOVS[0]]
+    tabla = TablaMovimientos.concatenar([TablaMovimientos.desde(MOVS), otra])
+    assert list(tabla) == MOVS + otra
+    assert tabla.vocabularios["codigo"].count("4.1.1.4") == 1
+    assert list(pickle.loads(pickle.dumps(tabla))) == MOVS + otra
+
+
+def test_perfilar_da_lo_mismo_con_tabla_o_con_lista():
+    perfiles = perfilar(TablaMovimientos.desde(MOVS))
+    assert perfiles == perfilar(list(MOVS))
+    assert list(perfiles) == ["4.1.1.4", "2.1.7.4.1", "1.1.2.1"]
+    ventas = perfiles["4.1.1.4"]
+    assert ventas.por_mes == {"01": -100.0, "02": -200.0}
+    assert ventas.prefijos_asiento == {"VTA": 2}
+    assert ventas.descripciones == ["Factura 1"]
+    assert perfiles["1.1.2.1"].por_mes_debe == {"01": 115.0}
+    assert perfiles["1.1.2.1"].debe == 315.0
+
+
+def test_contrapartidas_empatadas_se_ordenan_por_aparicion():
+    """Antes el desempate dependía del orden de un set (hash aleatorio por
+    proceso); ahora gana la cuenta que compartió asiento primero."""
+    movs = [
+        _mov("A", "1"), _mov("C", "1"), _mov("B", "1"),
+        _mov("A", "2"), _mov("B", "2"),
+    ]
+    assert perfilar(movs)["A"].contrapartidas == [("B", 2), ("C", 1)]
+    assert perfilar(movs)["C"].contrapartidas == [("A", 1), ("B", 1)]
+
+
+def test_sumas_en_centavos_no_acumulan_error_de_redondeo():
+    movs = [_mov("1", "", debe=0.1) for _ in range(10)] + [_mov("1", "", haber=0.3)]
+    p = perfilar(TablaMovimientos.desde(movs))["1"]
+    assert p.debe == 1.0
+    assert p.por_mes == {"01": 0.7}
+
+
+def test_desglose_de_ventas_igual_con_tabla():
+    categorias = {"4.1.1.4": "VENTAS", "2.1.7.4.1": "IVA_VENTAS", "1.1.2.1": None}
+    assert separar_ventas_por_tarifa(TablaMovimientos.desde(MOVS), categorias) == (
+        separar_ventas_por_tarifa(MOVS, categorias)
+    )
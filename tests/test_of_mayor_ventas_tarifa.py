@@ -137,3 +137,65 @@ def test_un_asiento_ambiguo_de_22_lineas_se_resuelve_rapido():
     inicio = time.perf_counter()
     separar_ventas_por_tarifa(lineas + [_iva(3.33, "VTA 9")], CATEGORIAS)
     assert time.perf_counter() - inicio < 2.0
+
+
+def test_la_busqueda_por_mitades_da_lo_mismo_que_en_profundidad():
+    import random
+
+    from backend.app.aud.obligaciones_fiscales.mayor import ventas_tarifa
+
+    r = random.Random(11)
+    for _ in range(400):
+        n = r.randint(2, 14)
+        valores = [r.choice([r.randrange(1, 30) * 100, r.randrange(1, 90000)]) for _ in range(n)]
+        elegidas = r.sample(range(n), r.randint(1, n - 1))
+        objetivo = sum(valores[i] for i in elegidas) + r.randint(-6, 6)
+        assert ventas_tarifa._PorMitades(valores).unico(objetivo) == (
+            ventas_tarifa._en_profundidad(valores, objetivo)
+        )
+
+
+def test_un_asiento_de_cierre_de_120_lineas_se_separa():
+    """Antes del tope de 24 líneas quedaba POR ASIGNAR sin buscar."""
+    import random
+
+    r = random.Random(5)
+    importes = [r.randrange(100_000, 90_000_000) / 100 for _ in range(120)]
+    lineas = [_venta("4.1.1.1", v, "CIE 1") for v in importes]
+    lineas[7] = _venta("4.1.1.2", importes[7], "CIE 1")
+    lineas[90] = _venta("4.1.1.2", importes[90], "CIE 1")
+    iva = round((importes[7] + importes[90]) * 0.15, 2)
+    desglose = separar_ventas_por_tarifa(lineas + [_iva(iva, "CIE 1")], CATEGORIAS)
+    assert desglose["4.1.1.2"]["gravada"]["01"] == round(importes[7] + importes[90], 2)
+    assert desglose["4.1.1.1"]["por_asignar"] == {}
+
+
+def test_sin_presupuesto_el_asiento_grande_queda_por_asignar(monkeypatch):
+    from backend.app.aud.obligaciones_fiscales.mayor import ventas_tarifa
+
+    monkeypatch.setattr(ventas_tarifa, "MAX_COMBINACIONES", 0)
+    importes = [1000.0 + 37.31 * i for i in range(30)]
+    lineas = [_venta("4.1.1.1", v, "CIE 1") for v in importes]
+    desglose = separar_ventas_por_tarifa(
+        lineas + [_iva(round(importes[3] * 0.15, 2), "CIE 1")], CATEGORIAS
+    )
+    assert desglose["4.1.1.1"]["por_asignar"]["01"] == round(sum(importes), 2)
+
+
+def test_agotado_el_tiempo_del_libro_los_asientos_grandes_quedan_por_asignar(monkeypatch, caplog):
+    from backend.app.aud.obligaciones_fiscales.mayor import ventas_tarifa
+
+    monkeypatch.setattr(ventas_tarifa, "PRESUPUESTO_LIBRO", -1.0)
+    grande = [_venta("4.1.1.1", 1000.0 + 37.31 * i, "CIE 1") for i in range(30)]
+    chico = [_venta("4.1.1.2", 100.0, "VTA 2"), _venta("4.1.1.2", 40.0, "VTA 2")]
+    with caplog.at_level("WARNING", logger=ventas_tarifa.__name__):
+        desglose = separar_ventas_por_tarifa(
+            grande + [_iva(round(1000.0 * 0.15, 2), "CIE 1")]
+            + chico + [_iva(15.0, "VTA 2")],
+            CATEGORIAS,
+        )
+    assert desglose["4.1.1.1"]["por_asignar"]["01"] == round(sum(m.haber for m in grande), 2)
+    # Los asientos chicos se siguen resolviendo.
+    assert desglose["4.1.1.2"]["gravada"]["01"] == 100.0
+    assert desglose["4.1.1.2"]["cero"]["01"] == 40.0
+    assert "se agotaron" in caplog.text
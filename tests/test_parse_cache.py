@@ -0,0 +1,123 @@
+"""Caché persistente de parseos (backend/app/services/parse_cache.py)."""
+
+import datetime
+import os
+
+from backend.app.aud.obligaciones_fiscales.mayor.tipos import LecturaMayor, Movimiento
+from backend.app.services import parse_cache
+
+LLAMADAS = []
+
+
+def _parser(data: bytes) -> dict:
+    LLAMADAS.append(data)
+    return {"largo": len(data), "texto": data.decode()}
+
+
+def _lector_mayor(data: bytes) -> LecturaMayor:
+    LLAMADAS.append(data)
+    return LecturaMayor(
+        movimientos=[Movimiento(codigo="1.1.01", fecha=datetime.date(2025, 1, 31), debe=10.5)],
+        columnas_detectadas={"codigo": 0, "debe": 1, "haber": 2},
+        hojas_leidas=["Enero"],
+    )
+
+
+def test_mismos_bytes_se_sirven_de_la_cache(tmp_path):
+    LLAMADAS.clear()
+    cache = parse_cache.ParseCache(base_dir=str(tmp_path))
+    primero = cache.parse(_parser, b"abc")
+    segundo = cache.parse(_parser, b"abc")
+    otro = cache.parse(_parser, b"abcd")
+
+    assert primero == segundo == {"largo": 3, "texto": "abc"}
+    assert segundo is not primero  # cada acierto es una copia independiente
+    assert otro["largo"] == 4
+    assert LLAMADAS == [b"abc", b"abcd"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_lectura_mayor_vuelve_identica(tmp_path):
+    cache = parse_cache.ParseCache(base_dir=str(tmp_path))
+    original = cache.parse(_lector_mayor, b"mayor.xlsx")
+    cacheada = cache.parse(_lector_mayor, b"mayor.xlsx")
+    assert cacheada == original
+    assert cacheada.mapeo_suficiente
+    assert cacheada.movimientos[0].mes == "01"
+
+
+def test_cambio_de_version_del_parser_invalida_solo_ese_parser(tmp_path, monkeypatch):
+    LLAMADAS.clear()
+    cache = parse_cache.ParseCache(base_dir=str(tmp_path))
+    cache.parse(_parser, b"x")
+
+    version_real = parse_cache.parser_version
+    monkeypatch.setattr(
+        parse_cache, "parser_version",
+        lambda p: "nueva" if p is _parser else version_real(p),
+    )
+    cache.parse(_parser, b"x")
+    assert LLAMADAS == [b"x", b"x"]
+
+
+def test_version_del_parser_sigue_sus_imports():
+    """f104_pdf delega en el extractor de AUD/OF: su versión depende de él."""
+    deps = set()
+    pendientes = ["backend.app.ict.parsers.f104_pdf"]
+    while pendientes:
+        mod = pendientes.pop()
+        if mod in deps:
+            continue
+        deps.add(mod)
+        ruta = parse_cache._module_file(mod)
+        if ruta:
+            pendientes.extend(parse_cache._backend_imports(ruta, mod))
+    assert "backend.app.aud.obligaciones_fiscales.cedulas.f104_extractor" in deps
+    assert "backend.app.aud.obligaciones_fiscales.cedulas.base" in deps
+
+
+def test_entrada_corrupta_se_reparsea(tmp_path):
+    LLAMADAS.clear()
+    cache = parse_cache.ParseCache(base_dir=str(tmp_path))
+    cache.parse(_parser, b"abc")
+    cache._entry(cache.key(_parser, b"abc")).write_bytes(b"basura")
+    assert cache.parse(_parser, b"abc")["texto"] == "abc"
+    assert len(LLAMADAS) == 2
+
+
+def test_expulsion_por_tamano_borra_lo_menos_usado(tmp_path):
+    cache = parse_cache.ParseCache(base_dir=str(tmp_path))
+    cache.parse(_parser, b"a" * 50)
+    vieja = cache._entry(cache.key(_parser, b"a" * 50))
+    tamano = vieja.stat().st_size
+    os.utime(vieja, (1, 1))
+    cache.max_bytes = tamano * 2
+    cache.parse(_parser, b"b" * 50)
+    cache.parse(_parser, b"c" * 50)
+
+    assert not cache._entry(cache.key(_parser, b"a" * 50)).exists()
+    assert cache._entry(cache.key(_parser, b"c" * 50)).exists()
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_put_solo_recorre_la_cache_al_pasar_el_limite(tmp_path, monkeypatch):
+    cache = parse_cache.ParseCache(base_dir=str(tmp_path))
+    purgas = []
+    purge = cache.purge
+    monkeypatch.setattr(cache, "purge", lambda: (purgas.append(1), purge()))
+    cache.parse(_parser, b"a" * 50)  # la primera escritura mide la caché
+    tamano = cache._entry(cache.key(_parser, b"a" * 50)).stat().st_size
+    cache.max_bytes = tamano * 2
+    cache.parse(_parser, b"b" * 50)
+    assert len(purgas) == 1
+    cache.parse(_parser, b"c" * 50)
+    assert len(purgas) == 2
+
+
+def test_desactivada_con_max_mb_cero(tmp_path):
+    LLAMADAS.clear()
+    cache = parse_cache.ParseCache(base_dir=str(tmp_path), max_mb=0)
+    cache.parse(_parser, b"z")
+    cache.parse(_parser, b"z")
+    assert len(LLAMADAS) == 2
+    assert not any(tmp_path.iterdir())
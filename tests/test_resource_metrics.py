@@ -0,0 +1,89 @@
+"""Instrumentación de recursos por ruta (ResourceMetricsMiddleware)."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core import resource_metrics
+
+
+def _app(registry):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    @app.post("/eco")
+    async def eco(payload: dict):
+        return payload
+
+    @app.get("/pesado")
+    def pesado():
+        blob = bytearray(40 * 1024 * 1024)
+        return {"n": len(blob)}
+
+    app.add_middleware(resource_metrics.ResourceMetricsMiddleware, registry=registry)
+    return app
+
+
+def test_metrics_enabled_es_opt_in(monkeypatch):
+    monkeypatch.delenv("ENABLE_RESOURCE_METRICS", raising=False)
+    assert resource_metrics.metrics_enabled() is False
+    monkeypatch.setenv("ENABLE_RESOURCE_METRICS", "true")
+    assert resource_metrics.metrics_enabled() is True
+
+
+def test_agrega_por_plantilla_de_ruta(caplog):
+    registry = resource_metrics.ResourceMetricsRegistry(top_n=5)
+    client = TestClient(_app(registry))
+    with caplog.at_level("INFO", logger="auditbrain"):
+        client.get("/items/1?token=secreto")
+        client.get("/items/2")
+        client.post("/eco", json={"a": "x" * 100})
+        client.get("/no-existe")
+
+    routes = {(r["method"], r["route"]): r for r in registry.snapshot()["routes"]}
+    items = routes[("GET", "/items/{item_id}")]
+    assert items["count"] == 2
+    assert items["status"] == {"200": 2}
+    assert items["latency_seconds"]["buckets"]["+Inf"] == 2
+    assert routes[("POST", "/eco")]["bytes_in"] > 100
+    assert routes[("POST", "/eco")]["bytes_out"] > 100
+    assert routes[("GET", "<unmatched>")]["status"] == {"404": 1}
+
+    lineas = [r.getMessage() for r in caplog.records if "REQUEST_METRICS" in r.getMessage()]
+    assert len(lineas) == 4
+    assert not any("secreto" in linea or "/items/1" in linea for linea in lineas)
+
+
+def test_top_n_conserva_las_mas_pesadas():
+    registry = resource_metrics.ResourceMetricsRegistry(top_n=1)
+    client = TestClient(_app(registry))
+    client.get("/items/1")
+    client.get("/pesado")
+    client.get("/items/2")
+
+    heaviest = registry.snapshot()["heaviest_requests"]
+    assert len(heaviest) == 1
+    if resource_metrics.current_rss_bytes():
+        assert heaviest[0]["route"] == "/pesado"
+        assert heaviest[0]["rss_peak_bytes"] - heaviest[0]["rss_before_bytes"] >= 30 * 1024 * 1024
+
+
+def test_exposicion_prometheus():
+    registry = resource_metrics.ResourceMetricsRegistry(top_n=0)
+    client = TestClient(_app(registry))
+    client.get("/items/1")
+    text = registry.prometheus()
+    assert "# TYPE auditbrain_request_duration_seconds histogram" in text
+    assert 'auditbrain_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",le="+Inf"} 1' in text
+    assert 'auditbrain_request_bytes_out_total{method="GET",route="/items/{item_id}"}' in text
+
+
+def test_endpoint_admin_json_y_prometheus(client):
+    body = client.get("/api/v1/metrics/resources").json()
+    assert {"enabled", "routes", "heaviest_requests"} <= set(body)
+    resp = client.get("/api/v1/metrics/resources", params={"format": "prometheus"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert "auditbrain_process_rss_bytes" in resp.text
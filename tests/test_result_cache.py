@@ -0,0 +1,118 @@
+"""Caché de resultados de /run_python direccionada por contenido."""
+
+import os
+import time
+
+from backend.app.services import result_cache
+
+
+def _cache(tmp_path, **kwargs):
+    kwargs.setdefault("version", "v1")
+    return result_cache.ResultCache(str(tmp_path / "cache"), **kwargs)
+
+
+def test_key_depende_de_script_inputs_y_version(tmp_path):
+    cache = _cache(tmp_path)
+    base = cache.key("result = 1", {"a": 1, "b": 2})
+
+    assert base == cache.key("result = 1", {"b": 2, "a": 1})  # JSON canónico
+    assert base != cache.key("result = 2", {"a": 1, "b": 2})
+    assert base != cache.key("result = 1", {"a": 1, "b": 3})
+    assert base != _cache(tmp_path, version="v2").key("result = 1", {"a": 1, "b": 2})
+
+
+def test_put_y_get_con_archivos(tmp_path):
+    cache = _cache(tmp_path)
+    generado = tmp_path / "reporte.csv"
+    generado.write_text("a,b\n1,2\n")
+    key = cache.key("x", {})
+
+    cache.put(key, {"result": {"ok": 1}, "stdout": "hola", "generated_paths": [str(generado)],
+                    "job_dir": "/tmp/no-se-guarda"})
+    generado.unlink()  # el job se purga; la caché conserva su copia
+    hit = cache.get(key)
+
+    assert hit["result"] == {"ok": 1}
+    assert hit["stdout"] == "hola"
+    assert "job_dir" not in hit
+    assert len(hit["generated_paths"]) == 1
+    assert os.path.basename(hit["generated_paths"][0]) == "reporte.csv"
+    assert open(hit["generated_paths"][0]).read() == "a,b\n1,2\n"
+    assert cache.stats()["hits"] == 1
+
+
+def test_no_guarda_errores(tmp_path):
+    cache = _cache(tmp_path)
+    key = cache.key("raise", {})
+    cache.put(key, {"error": "boom"})
+    assert cache.get(key) is None
+
+
+def test_ttl_vencido_es_miss(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=1)
+    key = cache.key("x", {})
+    cache.put(key, {"result": 1})
+    assert cache.get(key) is not None
+
+    time.sleep(1.1)
+    assert cache.get(key) is None
+    assert not (tmp_path / "cache" / key).exists()
+
+
+def test_expulsion_por_tamano_total(tmp_path):
+    cache = _cache(tmp_path, max_mb=1)
+    keys = []
+    for i in range(3):
+        blob = tmp_path / f"blob{i}.bin"
+        blob.write_bytes(b"x" * 400_000)
+        key = cache.key(f"script {i}", {})
+        cache.put(key, {"result": i, "generated_paths": [str(blob)]})
+        entry = tmp_path / "cache" / key
+        os.utime(entry, (time.time() - 100 + i, time.time() - 100 + i))
+        keys.append(key)
+    cache.purge()
+
+    assert cache.get(keys[0]) is None       # la menos usada se expulsa
+    assert cache.get(keys[2])["result"] == 2
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_put_solo_purga_al_pasar_el_limite(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, max_mb=1)
+    purgas = []
+    purge = cache.purge
+    monkeypatch.setattr(cache, "purge", lambda: (purgas.append(1), purge()))
+
+    for i in range(3):
+        blob = tmp_path / f"blob{i}.bin"
+        blob.write_bytes(b"x" * 400_000)
+        cache.put(cache.key(f"script {i}", {}), {"result": i, "generated_paths": [str(blob)]})
+    # La primera escritura mide la caché; la segunda entra en el límite; la
+    # tercera lo pasa y purga.
+    assert len(purgas) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_run_python_cache_hit_no_ejecuta(client, tmp_path):
+    marca = tmp_path / "ejecuciones.txt"
+    script = (
+        f"open({str(marca)!r}, 'a').write('x')\n"
+        "open('tabla.csv', 'w').write('a\\n1\\n')\n"
+        "result = {'total': sum(inputs['v'])}"
+    )
+    body = {"script": script, "inputs": {"v": [1, 2]}, "cache": True}
+
+    first = client.post("/run_python", json=body).json()
+    second = client.post("/run_python", json=body).json()
+
+    assert first["cache"]["hit"] is False
+    assert second["cache"]["hit"] is True
+    assert second["result"] == first["result"] == {"total": 3}
+    assert marca.read_text() == "x"  # el segundo no ejecutó el script
+    assert second["generated_files"][0]["filename"].startswith("tabla")
+    assert client.get(f"/resultados/{second['generated_files'][0]['filename']}").status_code == 200
+
+
+def test_run_python_sin_cache_no_marca(client):
+    body = client.post("/run_python", json={"script": "result = 1"}).json()
+    assert "cache" not in body
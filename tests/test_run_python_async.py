@@ -0,0 +1,88 @@
+"""Modo asíncrono de /run_python: job_id inmediato + polling del resultado."""
+
+import time
+
+import app as legacy_app
+
+
+def _esperar(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f"/run_python/jobs/{job_id}").json()
+        if body["status"] in ("completed", "failed"):
+            return body
+        time.sleep(0.1)
+    raise AssertionError(f"el job {job_id} no terminó en {timeout}s")
+
+
+def test_async_devuelve_job_id_y_luego_el_resultado(client):
+    resp = client.post(
+        "/run_python",
+        json={
+            "script": "result = {'total': sum(inputs['valores'])}",
+            "inputs": {"valores": [1, 2, 3]},
+            "execution_mode": "async",
+        },
+    )
+    assert resp.status_code == 202
+    submitted = resp.json()
+    assert submitted["status"] == "queued"
+    assert submitted["status_url"].endswith(f"/run_python/jobs/{submitted['job_id']}")
+
+    body = _esperar(client, submitted["job_id"])
+    assert body["status"] == "completed"
+    assert body["result"] == {"total": 6}
+    assert body["started_at"] and body["finished_at"]
+    assert body["service"] == "AuditBrain Python Runner"
+
+
+def test_async_publica_archivos_generados(client):
+    script = "open('reporte.csv', 'w').write('a,b\\n1,2\\n')\nresult = {'ok': True}"
+    resp = client.post(
+        "/run_python",
+        json={"script": script, "output_expectations": {"execution_mode": "async"}},
+    )
+    body = _esperar(client, resp.json()["job_id"])
+
+    files = body["generated_files"]
+    assert len(files) == 1 and files[0]["filename"].startswith("reporte")
+    assert client.get(f"/resultados/{files[0]['filename']}").status_code == 200
+
+
+def test_async_resultado_compacto(client):
+    resp = client.post(
+        "/run_python",
+        json={"script": "result = list(range(100))", "execution_mode": "async"},
+    )
+    body = _esperar(client, resp.json()["job_id"])
+    assert body["result_truncated"] is True
+    assert len(body["result"]) == legacy_app.MAX_RESULT_ITEMS + 1
+
+
+def test_async_error_del_script_marca_failed(client):
+    resp = client.post(
+        "/run_python", json={"script": "raise ValueError('boom')", "execution_mode": "async"}
+    )
+    body = _esperar(client, resp.json()["job_id"])
+    assert body["status"] == "failed"
+    assert "boom" in body["error"]
+
+
+def test_async_cola_llena_responde_429(client, monkeypatch):
+    monkeypatch.setattr(legacy_app, "ASYNC_QUEUE_MAX", 1)
+    monkeypatch.setitem(
+        legacy_app.ASYNC_JOBS, "ocupado", {"job_id": "ocupado", "status": "running"}
+    )
+    resp = client.post("/run_python", json={"script": "result = 1", "execution_mode": "async"})
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"]
+
+
+def test_async_job_inexistente_404(client):
+    assert client.get("/run_python/jobs/no-existe").status_code == 404
+
+
+def test_sin_execution_mode_sigue_siendo_sincrono(client):
+    resp = client.post("/run_python", json={"script": "result = 7"})
+    assert resp.status_code == 200
+    assert resp.json()["result"] == 7
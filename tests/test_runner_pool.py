@@ -0,0 +1,134 @@
+"""Tests del pool de workers precalentados de /run_python.
+
+Usan un ``RunnerPool`` propio (no el singleton del módulo) con precarga
+mínima para que la suite no pague el import de pandas por cada worker.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from backend.app.services import python_runner_service, runner_pool
+
+pytestmark = pytest.mark.skipif(
+    os.name != "posix", reason="el pool usa select/killpg (solo POSIX)"
+)
+
+
+def _job(tmp_path, code, inputs=None, name="job"):
+    job_dir = tmp_path / name
+    job_dir.mkdir()
+    payload = job_dir / "payload.json"
+    payload.write_text(json.dumps({"code": code, "inputs": inputs or {}}), encoding="utf-8")
+    return str(payload), str(job_dir / "output.json"), str(job_dir)
+
+
+def _output(output_path):
+    with open(output_path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@pytest.fixture()
+def pool():
+    p = runner_pool.RunnerPool(1, preload="json")
+    p.start()
+    yield p
+    p.shutdown()
+
+
+def test_pool_ejecuta_job_y_recicla_por_defecto(pool, tmp_path):
+    payload, output, job_dir = _job(tmp_path, "result = {'a': inputs['x'] * 2}", {"x": 21})
+
+    returncode, _, _ = pool.run(payload, output, job_dir, timeout=30)
+
+    assert returncode == 0
+    assert _output(output)["result"] == {"a": 42}
+    stats = pool.stats()
+    assert stats["warm_hits"] == 1
+    assert stats["recycled_max_jobs"] == 1  # MAX_JOBS=1: un job y se recicla
+    assert stats["idle"] == 1               # el reemplazo ya está esperando
+
+
+def test_pool_reutiliza_worker_hasta_max_jobs(tmp_path):
+    p = runner_pool.RunnerPool(1, max_jobs=2, preload="json")
+    p.start()
+    try:
+        pids = []
+        for i in range(3):
+            payload, output, job_dir = _job(
+                tmp_path, "import os\nresult = os.getpid()", name=f"job{i}"
+            )
+            assert p.run(payload, output, job_dir, timeout=30)[0] == 0
+            pids.append(_output(output)["result"])
+        assert pids[0] == pids[1]  # reutilizado
+        assert pids[2] != pids[1]  # reciclado tras 2 jobs
+        assert p.stats()["recycled_max_jobs"] == 1
+    finally:
+        p.shutdown()
+
+
+def test_pool_captura_salida_de_bajo_nivel(pool, tmp_path):
+    code = "import os\nos.write(1, b'fd-level')\nresult = 1"
+    payload, output, job_dir = _job(tmp_path, code)
+
+    _, stdout, _ = pool.run(payload, output, job_dir, timeout=30)
+
+    assert stdout == b"fd-level"
+
+
+def test_pool_timeout_mata_el_worker(pool, tmp_path):
+    payload, output, job_dir = _job(tmp_path, "import time\ntime.sleep(30)")
+
+    with pytest.raises(TimeoutError):
+        pool.run(payload, output, job_dir, timeout=1)
+
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_pool_sys_exit_no_reutiliza_el_worker(tmp_path):
+    p = runner_pool.RunnerPool(1, max_jobs=5, preload="json")
+    p.start()
+    try:
+        payload, output, job_dir = _job(tmp_path, "import sys\nsys.exit(3)")
+        returncode, _, _ = p.run(payload, output, job_dir, timeout=30)
+        assert returncode == 3
+        assert not os.path.exists(output)
+        assert p.stats()["recycled_exit"] == 1
+    finally:
+        p.shutdown()
+
+
+def test_pool_scrub_de_entorno(pool, tmp_path, monkeypatch):
+    """El worker se lanza con build_child_env: la API Key no llega al script."""
+    pool.shutdown()  # el worker precalentado nació antes del setenv
+    monkeypatch.setenv("AUDITBRAIN_API_KEY", "leak-me-if-you-can")
+    code = (
+        "import os, sys\n"
+        "result = {'key': os.environ.get('AUDITBRAIN_API_KEY'),\n"
+        "          'backend': any(os.path.isdir(os.path.join(p, 'backend')) for p in sys.path if p)}\n"
+    )
+    payload, output, job_dir = _job(tmp_path, code)
+
+    pool.run(payload, output, job_dir, timeout=30)
+
+    assert _output(output)["result"] == {"key": None, "backend": False}
+
+
+def test_service_usa_el_pool_si_esta_activo(monkeypatch):
+    p = runner_pool.RunnerPool(1, preload="json")
+    monkeypatch.setattr(runner_pool, "POOL", p)
+    try:
+        out = asyncio.run(python_runner_service.run_python_code("result = {'ok': True}"))
+        assert out["result"] == {"ok": True}
+        assert p.stats()["jobs"] == 1
+    finally:
+        p.shutdown()
+
+
+def test_endpoint_de_metricas_del_pool(client):
+    resp = client.get("/api/v1/python/pool")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert {"enabled", "size", "idle", "busy", "warm_hits", "cold_starts"} <= set(body)